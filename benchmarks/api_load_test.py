@@ -0,0 +1,244 @@
+"""
+Prueba de carga del servicio HTTP de la API v2 (`src.api_service`).
+
+Lanza el servicio en un proceso aparte con el backend indicado (o usa uno
+ya en marcha con `--url`), arma un conjunto de URLs distintas a partir de
+los propios catálogos del servicio (estados, ciudades, municipios y códigos
+postales reales, más búsquedas por nombre) y las pide desde `--concurrency`
+conexiones keep-alive hasta completar `--requests`. Informa peticiones por
+segundo, latencias p50/p90/p99 y el origen de las respuestas (`X-Cache`).
+
+El número de URLs distintas (`--distinct`) frente al de peticiones fija la
+proporción de aciertos de la caché; `--cache-size 0` mide el backend sin
+caché. El cliente y el servicio comparten la máquina, así que las cifras
+son relativas entre configuraciones.
+
+Uso:
+    python -m benchmarks.api_load_test --backend memory --scale 150k
+    python -m benchmarks.api_load_test --backend postgres --dsn postgresql://postgres@localhost:5432/sepomex_psql_db_v2
+    python -m benchmarks.api_load_test --url http://127.0.0.1:8000 --requests 50000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from src.config import API_CACHE_SIZE, LOG_FORMAT
+
+from .run_benchmarks import BENCH_DATA_DIR
+from .synthetic_data import SCALES, synthetic_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS = 20000
+DEFAULT_CONCURRENCY = 32
+DEFAULT_DISTINCT = 2000
+# Segundos máximos de espera a que el servicio lanzado responda
+STARTUP_TIMEOUT = 300
+
+
+async def _get(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str) -> Tuple[int, str, bytes]:
+    """GET sobre una conexión abierta; devuelve código, X-Cache y cuerpo."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return int(head[0].split(" ")[1]), headers.get("x-cache", ""), body
+
+
+async def _fetch_json(host: str, port: int, path: str) -> Any:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, _, body = await _get(reader, writer, host, path)
+        return json.loads(body)["data"]
+    finally:
+        writer.close()
+
+
+async def build_urls(host: str, port: int, distinct: int, seed: int) -> List[str]:
+    """URLs distintas de los 14 endpoints con parámetros tomados de los datos del servicio."""
+    rng = random.Random(seed)
+    states = [s["codigo_estado"] for s in await _fetch_json(host, port, "/api/v2/estado")]
+    cities = [(c["codigo_estado"], c["codigo_ciudad"]) for c in await _fetch_json(host, port, "/api/v2/cities")]
+    municipalities, codes, names = [], [], []
+    for estado in states:
+        municipalities += [
+            (m["codigo_estado"], m["codigo_municipio"])
+            for m in await _fetch_json(host, port, f"/api/v2/estado/{estado}/municipios")
+        ]
+        rows = await _fetch_json(host, port, f"/api/v2/postal/estado/{estado}?limit=100")
+        codes += [r["codigo_postal"] for r in rows]
+        names += [r["nombre_asentamiento"] for r in rows]
+
+    def page() -> str:
+        return f"limit={rng.choice((10, 20, 50, 100))}&offset={rng.choice((0, 0, 0, 20, 100))}"
+
+    def term() -> str:
+        name = rng.choice(names)
+        start = rng.randrange(max(1, len(name) - 4))
+        return quote(name[start:start + rng.choice((3, 4, 6))])
+
+    generators = [
+        lambda: f"/api/v2/postal/search?q={term()}&{page()}",
+        lambda: f"/api/v2/postal/codigo/{rng.choice(codes)}",
+        lambda: f"/api/v2/postal/estado/{rng.choice(states)}?{page()}",
+        lambda: "/api/v2/postal/municipio/{}/{}?".format(*rng.choice(municipalities)) + page(),
+        lambda: "/api/v2/postal/ciudad/{}/{}?".format(*rng.choice(cities)) + page(),
+        lambda: "/api/v2/estado",
+        lambda: f"/api/v2/estado/{rng.choice(states)}",
+        lambda: f"/api/v2/estado/{rng.choice(states)}/cities",
+        lambda: f"/api/v2/estado/{rng.choice(states)}/municipios",
+        lambda: f"/api/v2/estado/{rng.choice(states)}/asentamientos?{page()}",
+        lambda: "/api/v2/cities",
+        lambda: "/api/v2/cities/{}/{}".format(*rng.choice(cities)),
+        lambda: "/api/v2/cities/{}/{}/colonias?".format(*rng.choice(cities)) + page(),
+        lambda: "/api/v2/cities/{}/{}/codigos?".format(*rng.choice(cities)) + page(),
+    ]
+    # Más peso a las consultas por código postal y por nombre, las más frecuentes en un servicio real
+    weights = [4, 6, 1, 1, 1, 0.2, 0.5, 0.5, 0.5, 1, 0.2, 0.5, 1, 1]
+    urls = set()
+    for _ in range(distinct * 20):
+        if len(urls) >= distinct:
+            break
+        urls.add(rng.choices(generators, weights)[0]())
+    return sorted(urls)
+
+
+async def run_load(host: str, port: int, urls: List[str], requests: int, concurrency: int,
+                   seed: int) -> Dict[str, Any]:
+    """Lanza `requests` peticiones desde `concurrency` conexiones y reúne latencias y orígenes."""
+    rng = random.Random(seed)
+    plan = iter([rng.choice(urls) for _ in range(requests)])
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    origins: Counter = Counter()
+    errors = 0
+
+    async def client() -> None:
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for path in plan:
+                start = time.perf_counter()
+                try:
+                    status, origin, _ = await _get(reader, writer, host, path)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    errors += 1
+                    writer.close()
+                    reader, writer = await asyncio.open_connection(host, port)
+                    continue
+                latencies.append(time.perf_counter() - start)
+                statuses[status] += 1
+                origins[origin] += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies), "errors": errors, "seconds": seconds,
+        "rps": len(latencies) / seconds if seconds else 0.0,
+        "p50_ms": percentile(0.50), "p90_ms": percentile(0.90), "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "statuses": dict(statuses), "origins": dict(origins),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(host: str, port: int, process: subprocess.Popen) -> bool:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            await _fetch_json(host, port, "/api/v2/estado")
+            return True
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await asyncio.sleep(0.2)
+    return False
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de la API v2.")
+    parser.add_argument("--url", help="Servicio ya en marcha (p. ej. http://127.0.0.1:8000); si no, se lanza uno.")
+    parser.add_argument("--backend", choices=["memory", "binary", "sqlite", "postgres"], default="memory")
+    parser.add_argument("--scale", choices=list(SCALES), default="150k", help="Escala del archivo sintético (memory).")
+    parser.add_argument("--input", type=Path, help="Archivo fuente en lugar del sintético (memory).")
+    parser.add_argument("--path", type=Path, help="Archivo de los backends binary y sqlite.")
+    parser.add_argument("--dsn", help="Cadena de conexión del backend postgres.")
+    parser.add_argument("--cache-size", type=int, default=API_CACHE_SIZE, help="Caché del servicio lanzado (0 = sin caché).")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Peticiones en total.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Conexiones simultáneas.")
+    parser.add_argument("--distinct", type=int, default=DEFAULT_DISTINCT, help="URLs distintas entre las que se reparte la carga.")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de los datos y de las URLs.")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        command = [sys.executable, "-m", "src.api_service", "--backend", args.backend, "--host", host,
+                   "--port", str(port), "--cache-size", str(args.cache_size)]
+        if args.backend == "memory":
+            command += ["--input", str(args.input or synthetic_file(BENCH_DATA_DIR, args.scale, args.seed))]
+        if args.path:
+            command += ["--path", str(args.path)]
+        if args.dsn:
+            command += ["--dsn", args.dsn]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if process is not None and not await _wait_ready(host, port, process):
+            logger.error("El servicio no respondió; revise logs/sepomex_generator.log.")
+            return 1
+        urls = await build_urls(host, port, args.distinct, args.seed)
+        result = await run_load(host, port, urls, args.requests, args.concurrency, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    target = args.url or f"{args.backend}, caché de {args.cache_size} respuestas"
+    print(f"\n{target}: {result['requests']} peticiones sobre {len(urls)} URLs distintas, "
+          f"{args.concurrency} conexiones")
+    print(f"  {result['rps']:.0f} peticiones/s en {result['seconds']:.1f} s; errores de conexión: {result['errors']}")
+    print(f"  latencia ms: p50 {result['p50_ms']:.2f}, p90 {result['p90_ms']:.2f}, "
+          f"p99 {result['p99_ms']:.2f}, máx. {result['max_ms']:.2f}")
+    print(f"  códigos: {result['statuses']}; X-Cache: {result['origins']}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Instantánea binaria mapeable (`src.binary_snapshot`) frente a construir la consulta.
+
+Construye la consulta en memoria a partir del archivo sintético de una escala,
+la guarda en el formato binario y mide:
+
+- el tiempo de escritura, el tamaño del archivo y el tiempo de apertura
+  frente al de construcción (`load_lookup`);
+- la latencia por consulta de la versión mapeada frente a la construida,
+  comprobando que ambas devuelven los mismos resultados;
+- la memoria de varios procesos que mapean el mismo archivo: RSS (páginas
+  residentes del proceso) frente a PSS (cada página compartida se reparte
+  entre los procesos que la usan). Requiere Linux (/proc/self/smaps).
+
+Uso:
+    python -m benchmarks.binary_snapshot_benchmark --scale 150k
+    python -m benchmarks.binary_snapshot_benchmark --input data/raw/CPdescarga.txt --workers 8
+"""
+
+import argparse
+import logging
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.binary_snapshot import open_binary_snapshot, write_binary_snapshot
+from src.config import BINARY_SNAPSHOT_FILENAME, LOG_FORMAT
+from src.lookup import load_lookup
+
+from .lookup_benchmark import _sample_calls, _time_calls
+from .run_benchmarks import BENCH_DATA_DIR
+from .synthetic_data import SCALES, synthetic_file
+
+logger = logging.getLogger(__name__)
+
+# Llamadas por tipo de consulta
+DEFAULT_CALLS = 2000
+# Procesos que mapean el archivo a la vez
+DEFAULT_WORKERS = 4
+
+
+def _mapping_kb(path: Path) -> Tuple[int, int]:
+    """RSS y PSS (kB) de las regiones del proceso que mapean `path`, según /proc/self/smaps."""
+    rss = pss = 0
+    current = False
+    with open("/proc/self/smaps") as f:
+        for line in f:
+            fields = line.split()
+            if "-" in fields[0] and len(fields) >= 5:
+                current = fields[-1] == str(path)
+            elif current and fields[0] == "Rss:":
+                rss += int(fields[1])
+            elif current and fields[0] == "Pss:":
+                pss += int(fields[1])
+    return rss, pss
+
+
+def _worker(path: Path, barrier, results) -> None:
+    """Mapea el archivo, toca todas sus páginas y mide la memoria mientras los demás lo tienen mapeado."""
+    lookup = open_binary_snapshot(path)
+    for array in lookup.arrays().values():
+        array.sum()
+    barrier.wait()
+    results.put(_mapping_kb(path))
+    barrier.wait()
+
+
+def _shared_memory(path: Path, workers: int) -> List[Tuple[int, int]]:
+    """RSS y PSS del mapa en cada uno de `workers` procesos simultáneos."""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(path, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    usage = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return usage
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Instantánea binaria mapeable frente a construir la consulta.")
+    parser.add_argument("--scale", choices=list(SCALES), default="150k", help="Escala del archivo sintético.")
+    parser.add_argument("--input", type=Path, help="Archivo fuente en lugar del sintético.")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="Llamadas por tipo de consulta.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Procesos que mapean el archivo a la vez.")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de los datos y de las entradas.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    input_path = args.input or synthetic_file(BENCH_DATA_DIR, args.scale, args.seed)
+    start = time.perf_counter()
+    built = load_lookup([input_path], use_cache=False)
+    if built is None:
+        return 1
+    build_seconds = time.perf_counter() - start
+
+    path = BENCH_DATA_DIR / f"{input_path.stem}_{BINARY_SNAPSHOT_FILENAME}"
+    start = time.perf_counter()
+    if not write_binary_snapshot(built, path):
+        return 1
+    write_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    mapped = open_binary_snapshot(path)
+    if mapped is None:
+        return 1
+    open_seconds = time.perf_counter() - start
+
+    print(f"\n{input_path.name}: {len(built)} asentamientos")
+    print(f"  construcción (load_lookup): {build_seconds:.2f} s; arreglos y nombres: "
+          f"{built.memory_bytes() / (1024 * 1024):.1f} MB")
+    print(f"  escritura: {write_seconds * 1000:.0f} ms; archivo: {path.stat().st_size / (1024 * 1024):.1f} MB; "
+          f"apertura mapeada: {open_seconds * 1000:.1f} ms")
+
+    print(f"\n{'consulta':<36}{'construida µs':>15}{'mapeada µs':>13}")
+    for name, (_, calls) in _sample_calls(built, args.calls, args.seed).items():
+        for call in calls:
+            if getattr(built, name)(*call) != getattr(mapped, name)(*call):
+                logger.error(f"Resultados distintos en {name}{call}.")
+                return 1
+        print(f"{name:<36}{_time_calls(getattr(built, name), calls):>15.1f}"
+              f"{_time_calls(getattr(mapped, name), calls):>13.1f}")
+
+    if sys.platform.startswith("linux") and args.workers > 0:
+        usage = _shared_memory(path, args.workers)
+        print(f"\n{args.workers} procesos con el archivo mapeado (todas las páginas tocadas):")
+        print(f"  RSS por proceso: {max(rss for rss, _ in usage) / 1024:.1f} MB; "
+              f"PSS por proceso: {max(pss for _, pss in usage) / 1024:.1f} MB; "
+              f"PSS total: {sum(pss for _, pss in usage) / 1024:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
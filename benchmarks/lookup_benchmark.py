@@ -0,0 +1,134 @@
+"""
+Latencia y memoria de la consulta en memoria (`src.lookup.PostalLookup`).
+
+Construye la consulta a partir del archivo sintético de una escala y mide,
+por tipo de consulta, el tiempo medio por llamada sobre entradas aleatorias.
+Con `--dsn` mide además las mismas funciones en PostgreSQL (ida y vuelta
+incluida) sobre una base cargada con los mismos datos.
+
+Uso:
+    python -m benchmarks.lookup_benchmark --scale 150k
+    python -m benchmarks.lookup_benchmark --scale 150k --dsn postgresql://postgres@localhost:5432/sepomex_psql_db_v2
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import LOG_FORMAT
+from src.lookup import PostalLookup, load_lookup
+from src.metrics import peak_rss_mb
+
+from .run_benchmarks import BENCH_DATA_DIR
+from .synthetic_data import SCALES, synthetic_file
+
+logger = logging.getLogger(__name__)
+
+# Llamadas por tipo de consulta
+DEFAULT_CALLS = 2000
+
+
+def _time_calls(func: Callable[..., Any], calls: List[Tuple]) -> float:
+    """Tiempo medio por llamada en microsegundos."""
+    start = time.perf_counter()
+    for args in calls:
+        func(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def _sample_calls(lookup: PostalLookup, calls: int, seed: int) -> Dict[str, Tuple[str, List[Tuple]]]:
+    """
+    Entradas aleatorias por consulta: nombre -> (función SQL equivalente, argumentos).
+    """
+    rng = random.Random(seed)
+    codes = [f"{c:05d}" for c in lookup.codigo[:: max(1, len(lookup) // 5000)].tolist()]
+    states = [s.codigo_estado for s in lookup.get_all_states()]
+    municipalities = [
+        (m.codigo_estado, m.codigo_municipio) for s in states for m in lookup.get_municipalities_by_state(s)
+    ]
+    cities = [(c.codigo_estado, c.codigo_ciudad) for c in lookup.get_all_cities()]
+
+    def pick(values: List[Any]) -> Any:
+        return values[rng.randrange(len(values))]
+
+    return {
+        "search_by_postal_code": ("search_by_postal_code(%s)", [(pick(codes),) for _ in range(calls)]),
+        "get_postal_codes_by_state": (
+            "get_postal_codes_by_state(%s, %s, %s)",
+            [(pick(states), 100, rng.randrange(0, 5000)) for _ in range(calls)],
+        ),
+        "get_postal_codes_by_municipality": (
+            "get_postal_codes_by_municipality(%s, %s, %s, %s)",
+            [(*pick(municipalities), 20, 0) for _ in range(calls)],
+        ),
+        "get_postal_codes_by_city": (
+            "get_postal_codes_by_city(%s, %s, %s, %s)",
+            [(*pick(cities), 20, 0) for _ in range(calls)],
+        ),
+        "get_settlements_by_city": (
+            "get_settlements_by_city(%s, %s, %s, %s)",
+            [(*pick(cities), 20, 0) for _ in range(calls)],
+        ),
+        "get_municipalities_by_state": ("get_municipalities_by_state(%s)", [(pick(states),) for _ in range(calls)]),
+    }
+
+
+def _time_postgres(dsn: str, sql: str, calls: List[Tuple]) -> Optional[float]:
+    """Tiempo medio por llamada a la función en PostgreSQL (µs), o None si no hay conexión."""
+    try:
+        import psycopg
+    except ImportError:
+        logger.error("La comparación con PostgreSQL requiere el paquete 'psycopg'.")
+        return None
+    try:
+        with psycopg.connect(dsn) as conn:
+            query = f"SELECT * FROM {sql}"
+            return _time_calls(lambda *args: conn.execute(query, args).fetchall(), calls)
+    except psycopg.Error as e:
+        logger.error(f"No se pudo medir en PostgreSQL: {e}")
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latencia de la consulta en memoria de códigos postales.")
+    parser.add_argument("--scale", choices=list(SCALES), default="150k", help="Escala del archivo sintético.")
+    parser.add_argument("--input", type=Path, help="Archivo fuente en lugar del sintético.")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="Llamadas por tipo de consulta.")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de los datos y de las entradas.")
+    parser.add_argument("--dsn", help="Comparar con las funciones de una base PostgreSQL con los mismos datos.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    input_path = args.input or synthetic_file(BENCH_DATA_DIR, args.scale, args.seed)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    lookup = load_lookup([input_path], use_cache=False)
+    if lookup is None:
+        return 1
+    build_seconds = time.perf_counter() - start
+
+    print(f"\n{input_path.name}: {len(lookup)} asentamientos")
+    print(f"  construcción: {build_seconds:.2f} s; arreglos y nombres: {lookup.memory_bytes() / (1024 * 1024):.1f} MB"
+          + (f"; pico RSS del proceso: {peak_rss_mb():.0f} MB (antes {rss_before:.0f} MB)" if rss_before else ""))
+    print(f"\n{'consulta':<36}{'memoria µs':>12}" + (f"{'PostgreSQL µs':>16}" if args.dsn else ""))
+    for name, (sql, calls) in _sample_calls(lookup, args.calls, args.seed).items():
+        line = f"{name:<36}{_time_calls(getattr(lookup, name), calls):>12.1f}"
+        if args.dsn:
+            pg = _time_postgres(args.dsn, sql, calls)
+            line += f"{pg:>16.1f}" if pg is not None else f"{'n/d':>16}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
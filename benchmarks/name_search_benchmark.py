@@ -0,0 +1,99 @@
+"""
+Latencia del índice de n-gramas de nombres (`src.name_search.NameSearchIndex`).
+
+Construye la consulta en memoria y el índice a partir del archivo sintético
+de una escala y compara, sobre subcadenas aleatorias de nombres reales, el
+tiempo medio por búsqueda del índice frente a un recorrido lineal de los
+nombres plegados. Que ambos devuelvan los mismos registros se comprueba en
+tests/test_name_search.py.
+
+Uso:
+    python -m benchmarks.name_search_benchmark --scale 150k
+    python -m benchmarks.name_search_benchmark --input data/raw/CPdescarga.txt --calls 500
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.config import LOG_FORMAT
+from src.lookup import ilike_regex, load_lookup
+from src.models import PostalCodeRecord
+from src.name_search import NameSearchIndex, fold
+
+from .lookup_benchmark import _time_calls
+from .run_benchmarks import BENCH_DATA_DIR
+from .synthetic_data import SCALES, synthetic_file
+
+logger = logging.getLogger(__name__)
+
+# Búsquedas por longitud de consulta
+DEFAULT_CALLS = 500
+# Longitudes de las subcadenas buscadas
+QUERY_LENGTHS = (3, 5, 8, 12)
+# Página de resultados por búsqueda
+PAGE_LIMIT = 20
+
+
+def _linear_search(index: NameSearchIndex, query: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+    """Búsqueda de referencia: recorre todos los nombres plegados, con parada temprana."""
+    pattern = ilike_regex(fold(query))
+    matches = (name_id for name_id, name in enumerate(index.folded) if pattern.search(name))
+    return index.lookup.records_for_names(matches, limit, offset)
+
+
+def _sample_queries(index: NameSearchIndex, length: int, calls: int, rng: random.Random) -> List[Tuple]:
+    """Subcadenas de nombres al azar, en mayúsculas y sin acentos como las teclearía un usuario."""
+    names = [name for name in index.folded if len(name) >= length]
+    queries = []
+    for _ in range(calls):
+        name = names[rng.randrange(len(names))]
+        start = rng.randrange(len(name) - length + 1)
+        queries.append((name[start:start + length].upper(), PAGE_LIMIT, 0))
+    return queries
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Índice de n-gramas frente a búsqueda lineal de nombres.")
+    parser.add_argument("--scale", choices=list(SCALES), default="150k", help="Escala del archivo sintético.")
+    parser.add_argument("--input", type=Path, help="Archivo fuente en lugar del sintético.")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="Búsquedas por longitud de consulta.")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de los datos y de las consultas.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    input_path = args.input or synthetic_file(BENCH_DATA_DIR, args.scale, args.seed)
+    lookup = load_lookup([input_path], use_cache=False)
+    if lookup is None:
+        return 1
+    start = time.perf_counter()
+    index = NameSearchIndex(lookup)
+    build_seconds = time.perf_counter() - start
+
+    print(f"\n{input_path.name}: {len(lookup)} asentamientos, {len(index.folded)} nombres distintos")
+    print(f"  índice: {build_seconds:.2f} s; listas de n-gramas: {index.memory_bytes() / (1024 * 1024):.1f} MB")
+    print(f"\n{'consulta':<24}{'índice µs':>12}{'lineal µs':>12}{'aceleración':>14}")
+    rng = random.Random(args.seed)
+    for length in QUERY_LENGTHS:
+        calls = _sample_queries(index, length, args.calls, rng)
+        indexed = _time_calls(index.search, calls)
+        linear = _time_calls(lambda *call: _linear_search(index, *call), calls)
+        print(f"{f'{length} caracteres':<24}{indexed:>12.1f}{linear:>12.1f}{linear / indexed:>13.1f}x")
+
+    ranked = _time_calls(index.search_ranked, _sample_queries(index, 5, args.calls, rng))
+    print(f"{'ordenada (5 caracteres)':<24}{ranked:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Paginación por LIMIT/OFFSET frente a paginación por cursor (funciones *_keyset).
+
+Recorre todas las páginas de un estado con `get_postal_codes_by_state` y con
+`get_postal_codes_by_state_keyset` y mide el tiempo por página según su
+profundidad, además del recorrido completo (como el de un exportador).
+Comprueba que ambos recorridos devuelven los mismos asentamientos.
+
+Uso:
+    python -m benchmarks.pagination_benchmark --dsn postgresql://postgres@localhost:5432/sepomex_psql_db_v2
+    python -m benchmarks.pagination_benchmark --dsn ... --state 15 --limit 50
+"""
+
+import argparse
+import logging
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from src.config import DATABASE_URL, LOG_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Profundidades (en páginas) que se informan por separado
+REPORT_PAGES = (1, 10, 100, 1000, 5000)
+
+
+def _walk_offset(conn, state: str, limit: int) -> Tuple[List[tuple], List[float]]:
+    """Todas las páginas con LIMIT/OFFSET; devuelve las filas y los segundos por página."""
+    rows: List[tuple] = []
+    seconds: List[float] = []
+    while True:
+        start = time.perf_counter()
+        page = conn.execute(
+            "SELECT * FROM get_postal_codes_by_state(%s, %s, %s)", (state, limit, len(rows))
+        ).fetchall()
+        seconds.append(time.perf_counter() - start)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows, seconds
+
+
+def _walk_keyset(conn, state: str, limit: int) -> Tuple[List[tuple], List[float]]:
+    """Todas las páginas con cursor (código postal, nombre, id de la última fila)."""
+    rows: List[tuple] = []
+    seconds: List[float] = []
+    cursor: Tuple = (None, None, None)
+    while True:
+        start = time.perf_counter()
+        page = conn.execute(
+            "SELECT * FROM get_postal_codes_by_state_keyset(%s, %s, %s, %s, %s)", (state, limit, *cursor)
+        ).fetchall()
+        seconds.append(time.perf_counter() - start)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows, seconds
+        last = page[-1]
+        cursor = (last[0], last[1], last[-1])
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Paginación por OFFSET frente a paginación por cursor.")
+    parser.add_argument("--dsn", default=DATABASE_URL, help="Cadena de conexión de una base cargada.")
+    parser.add_argument("--state", help="Código del estado a recorrer (por defecto, el de más asentamientos).")
+    parser.add_argument("--limit", type=int, default=100, help="Registros por página (1-100).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    try:
+        import psycopg
+    except ImportError:
+        logger.error("La comparación requiere el paquete 'psycopg'.")
+        return 1
+
+    try:
+        with psycopg.connect(args.dsn, autocommit=True) as conn:
+            state = args.state or conn.execute(
+                "SELECT codigo_estado FROM vm_codigos_postales GROUP BY 1 ORDER BY count(*) DESC LIMIT 1"
+            ).fetchone()[0]
+            offset_rows, offset_seconds = _walk_offset(conn, state, args.limit)
+            keyset_rows, keyset_seconds = _walk_keyset(conn, state, args.limit)
+    except psycopg.Error as e:
+        logger.error(f"Error de PostgreSQL: {e}")
+        return 1
+
+    # El orden de OFFSET no desempata filas con igual código postal y nombre: se comparan como conjuntos
+    if sorted(offset_rows) != sorted(row[:-1] for row in keyset_rows):
+        logger.error("Los recorridos por OFFSET y por cursor devuelven asentamientos distintos.")
+        return 1
+
+    print(f"\nEstado {state}: {len(keyset_rows)} asentamientos, {len(keyset_seconds)} páginas de {args.limit}")
+    print(f"\n{'página':<16}{'OFFSET ms':>12}{'cursor ms':>12}")
+    for page in REPORT_PAGES:
+        if page <= len(keyset_seconds):
+            print(f"{page:<16}{offset_seconds[page - 1] * 1000:>12.2f}{keyset_seconds[page - 1] * 1000:>12.2f}")
+    print(f"{'última':<16}{offset_seconds[-1] * 1000:>12.2f}{keyset_seconds[-1] * 1000:>12.2f}")
+    print(f"{'recorrido (s)':<16}{sum(offset_seconds):>12.2f}{sum(keyset_seconds):>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
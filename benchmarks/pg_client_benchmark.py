@@ -0,0 +1,168 @@
+"""
+Cliente de PostgreSQL (`src.pg_client.SepomexClient`) frente a conexiones ad hoc.
+
+Sobre una base cargada (con `database/functions.sql`), toma entradas reales
+de la propia base y mide el tiempo por llamada de cada función con:
+
+- una conexión nueva por llamada (lo que hace hoy cada servicio);
+- el pool sin sentencias preparadas;
+- el pool con sentencias preparadas en el servidor;
+- el pool con la caché de resultados (segunda pasada sobre las mismas entradas).
+
+Las llamadas se reparten entre `--threads` hilos que comparten el cliente, y
+se comprueba que todos los modos devuelven los mismos registros. Si la base
+tiene la marca dataset_version, comprueba además que la caché se vacía al
+cambiar la marca (la reescribe y la restaura en una transacción aparte).
+
+Uso:
+    python -m benchmarks.pg_client_benchmark --dsn postgresql://postgres@localhost:5432/sepomex_psql_db_v2
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import DATABASE_URL, LOG_FORMAT, PG_POOL_SIZE
+from src.db_loader import DATASET_VERSION_TABLE, dataset_version_sql
+from src.pg_client import RECORD_TYPES, SepomexClient
+
+logger = logging.getLogger(__name__)
+
+# Llamadas por tipo de consulta
+DEFAULT_CALLS = 500
+
+
+def _sample_calls(client: SepomexClient, calls: int, seed: int) -> Dict[str, List[Tuple]]:
+    """Entradas aleatorias por función, tomadas de los catálogos y códigos de la base."""
+    rng = random.Random(seed)
+    states = [s.codigo_estado for s in client.get_all_states()]
+    cities = [(c.codigo_estado, c.codigo_ciudad) for c in client.get_all_cities()]
+    municipalities = [(m.codigo_estado, m.codigo_municipio) for s in states for m in client.get_municipalities_by_state(s)]
+    rows = [r for s in states for r in client.get_postal_codes_by_state(s, 100, 0)]
+    codes = [r.codigo_postal for r in rows]
+    names = [r.nombre_asentamiento for r in rows]
+
+    def pick(values: List[Any]) -> Any:
+        return values[rng.randrange(len(values))]
+
+    def term() -> str:
+        name = pick(names)
+        start = rng.randrange(max(1, len(name) - 4))
+        return name[start:start + 4]
+
+    return {
+        "search_by_postal_code": [(pick(codes),) for _ in range(calls)],
+        "search_settlements_by_name": [(term(), 20, 0) for _ in range(calls)],
+        "get_postal_codes_by_state": [(pick(states), 100, rng.randrange(0, 2000)) for _ in range(calls)],
+        "get_postal_codes_by_municipality": [(*pick(municipalities), 20, 0) for _ in range(calls)],
+        "get_settlements_by_city": [(*pick(cities), 20, 0) for _ in range(calls)],
+        "get_municipalities_by_state": [(pick(states),) for _ in range(calls)],
+        "get_city_by_id": [pick(cities) for _ in range(calls)],
+    }
+
+
+def _ad_hoc(dsn: str) -> Callable[[str, Tuple], List[Any]]:
+    """Una conexión nueva por llamada, como en los servicios actuales."""
+    import psycopg
+
+    def call(function: str, args: Tuple) -> List[Any]:
+        with psycopg.connect(dsn) as conn:
+            rows = conn.execute(f"SELECT * FROM {function}({', '.join(['%s'] * len(args))})", args).fetchall()
+        return [RECORD_TYPES[function](*row) for row in rows]
+
+    return call
+
+
+def _time_calls(call: Callable[[str, Tuple], List[Any]], function: str, calls: List[Tuple],
+                threads: int) -> Tuple[float, List[List[Any]]]:
+    """Tiempo de reloj por llamada (µs) con `threads` hilos y los resultados en orden."""
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(lambda args: call(function, args), calls))
+        return (time.perf_counter() - start) / len(calls) * 1e6, results
+
+
+def _check_invalidation(client: SepomexClient, dsn: str) -> Optional[bool]:
+    """Reescribe la marca de versión y comprueba que la caché se vacía; restaura la marca original."""
+    import psycopg
+
+    original = client.refresh_version()
+    if original is None:
+        return None
+    client.get_all_states()
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(dataset_version_sql("comprobacion"))
+        try:
+            client.refresh_version()
+            invalidated = client.cache_stats()["entries"] == 0 and client.cache_stats()["version"] == "comprobacion"
+        finally:
+            conn.execute(f"UPDATE {DATASET_VERSION_TABLE} SET version = %s WHERE pk_id = 1", (original,))
+    client.refresh_version()
+    return invalidated
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cliente de PostgreSQL con pool y caché frente a conexiones ad hoc.")
+    parser.add_argument("--dsn", default=DATABASE_URL, help="Base cargada con los datos y database/functions.sql.")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="Llamadas por función.")
+    parser.add_argument("--threads", type=int, default=PG_POOL_SIZE, help="Hilos que comparten el cliente.")
+    parser.add_argument("--pool-size", type=int, default=PG_POOL_SIZE, help="Conexiones máximas del pool.")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de las entradas.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+
+    unprepared = SepomexClient(args.dsn, args.pool_size, cache_size=0, prepare=False)
+    prepared = SepomexClient(args.dsn, args.pool_size, cache_size=0)
+    cached = SepomexClient(args.dsn, args.pool_size, cache_size=args.calls * 10)
+    clients = [unprepared, prepared, cached]
+    try:
+        samples = _sample_calls(prepared, args.calls, args.seed)
+        modes = [
+            ("ad hoc", _ad_hoc(args.dsn)),
+            ("pool", lambda function, a: getattr(unprepared, function)(*a)),
+            ("preparadas", lambda function, a: getattr(prepared, function)(*a)),
+            ("caché", lambda function, a: getattr(cached, function)(*a)),
+        ]
+        print(f"\n{args.calls} llamadas por función, {args.threads} hilo(s), pool de {args.pool_size} conexiones (µs por llamada)")
+        print(f"{'función':<36}" + "".join(f"{name:>12}" for name, _ in modes))
+        for function, calls in samples.items():
+            line = f"{function:<36}"
+            reference = None
+            for name, call in modes:
+                if name == "caché":
+                    _time_calls(call, function, calls, args.threads)
+                micros, results = _time_calls(call, function, calls, args.threads)
+                # Mismos registros (el orden de los empates no está definido en las funciones)
+                normalized = [sorted(map(repr, rows)) for rows in results]
+                if reference is None:
+                    reference = normalized
+                elif normalized != reference:
+                    logger.error(f"'{name}' devuelve registros distintos en {function}.")
+                    return 1
+                line += f"{micros:>12.1f}"
+            print(line)
+        print(f"caché: {cached.cache_stats()}")
+        invalidated = _check_invalidation(cached, args.dsn)
+        if invalidated is None:
+            print(f"La base no tiene {DATASET_VERSION_TABLE}: no se comprobó la invalidación de la caché.")
+        else:
+            print(f"invalidación al cambiar {DATASET_VERSION_TABLE}: {'correcta' if invalidated else 'FALLIDA'}")
+            if not invalidated:
+                return 1
+    finally:
+        for client in clients:
+            client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Benchmarks del generador SEPOMEX v2 con datos sintéticos a varias escalas.
+
+Mide, por escala, la lectura, la validación, la normalización, la extracción de
+catálogos, cada `generate_*_sql` y el script de la v1 (`legacy_v1`), e informa
+filas/s y memoria pico por etapa. Si alguna etapa empeora más allá de la
+tolerancia respecto a la línea base guardada, termina con código de salida 1.
+
+Uso:
+    python -m benchmarks.run_benchmarks --scales 150k 1.5M
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src import sql_generator
+from src.config import LOG_FORMAT, BASE_DIR
+from src.data_reader import read_sepomex_data
+from src.data_validator import validate_dataframe
+from src.data_normalizer import normalize_dataframe
+from src.catalogs import extract_catalogs
+from src.sql_generator import (
+    generate_estados_sql,
+    generate_municipios_sql,
+    generate_tipos_asentamiento_sql,
+    generate_zonas_sql,
+    generate_ciudades_sql,
+    generate_codigos_postales_sql,
+)
+from src.metrics import peak_rss_mb, reset_peak_rss
+from src.utils import reset_memo_caches
+
+from .synthetic_data import SCALES, synthetic_file
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = Path(__file__).resolve().parent
+BENCH_DATA_DIR = BENCH_DIR / "data"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+LEGACY_SCRIPT = BASE_DIR / "legacy_v1" / "scripts" / "generate_sql_v1.py"
+LEGACY_INPUT_FILENAME = "sepomex_original_data.txt"
+
+# Tolerancia por defecto frente a la línea base (0.25 = 25 % peor)
+DEFAULT_TOLERANCE = 0.25
+# Las etapas más cortas que esto en la línea base no se comparan por tiempo (ruido)
+MIN_CHECK_SECONDS = 0.05
+# Margen absoluto de memoria antes de considerar una regresión
+MEMORY_SLACK_MB = 32.0
+# El script v1 recorre las filas con iterrows: por encima de esto se omite
+LEGACY_MAX_ROWS = 1_500_000
+
+
+@dataclass
+class StageResult:
+    """Medición de una etapa."""
+    stage: str
+    rows: int
+    seconds: float
+    rows_per_s: float
+    peak_rss_mb: Optional[float]
+
+
+def _measure(stage: str, func: Callable[[], Any], rows: Callable[[Any], int], repeat: int) -> Tuple[Any, StageResult]:
+    """
+    Ejecuta una etapa `repeat` veces y conserva el mejor tiempo.
+
+    Args:
+        stage (str): Nombre de la etapa.
+        func (Callable[[], Any]): Etapa a medir.
+        rows (Callable[[Any], int]): Filas procesadas a partir del resultado.
+        repeat (int): Repeticiones.
+
+    Returns:
+        Tuple[Any, StageResult]: Resultado de la última ejecución y su medición.
+    """
+    best = float("inf")
+    peak = None
+    for _ in range(repeat):
+        reset_memo_caches()
+        reset_peak_rss()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        hwm = peak_rss_mb()
+        if hwm is not None:
+            peak = hwm if peak is None else max(peak, hwm)
+    processed = rows(result)
+    return result, StageResult(
+        stage=stage,
+        rows=processed,
+        seconds=best,
+        rows_per_s=processed / best if best > 0 else 0.0,
+        peak_rss_mb=peak,
+    )
+
+
+def _run_legacy(input_path: Path, rows: int) -> StageResult:
+    """
+    Ejecuta `legacy_v1/scripts/generate_sql_v1.py` en un directorio temporal.
+
+    El script lee `sepomex_original_data.txt` y escribe en `data/` del directorio
+    actual; la memoria pico es la del proceso hijo.
+    """
+    with tempfile.TemporaryDirectory(prefix="sepomex_v1_") as workdir:
+        target = Path(workdir) / LEGACY_INPUT_FILENAME
+        try:
+            os.symlink(input_path.resolve(), target)
+        except OSError:
+            shutil.copyfile(input_path, target)
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, str(LEGACY_SCRIPT)], cwd=workdir,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        peak = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak = usage.ru_maxrss / 1024  # kB en Linux
+        else:
+            process.wait()
+        seconds = time.perf_counter() - start
+    if process.returncode != 0:
+        logger.error(f"El script v1 terminó con código {process.returncode}.")
+    return StageResult("legacy_v1", rows, seconds, rows / seconds if seconds > 0 else 0.0, peak)
+
+
+def run_scale(scale: str, repeat: int, legacy: bool, seed: int) -> List[StageResult]:
+    """
+    Ejecuta todas las etapas sobre el archivo sintético de una escala.
+
+    Args:
+        scale (str): Escala (clave de `SCALES`).
+        repeat (int): Repeticiones por etapa (se conserva el mejor tiempo).
+        legacy (bool): Incluir el script v1.
+        seed (int): Semilla de los datos sintéticos.
+
+    Returns:
+        List[StageResult]: Mediciones en orden de ejecución.
+    """
+    input_path = synthetic_file(BENCH_DATA_DIR, scale, seed)
+    logger.info(f"Escala {scale}: {input_path.name}")
+    results = []
+
+    df_raw, result = _measure("read", lambda: read_sepomex_data([input_path]), len, repeat)
+    results.append(result)
+    df_valid, result = _measure("validate", lambda: validate_dataframe(df_raw, rejects_path=None), lambda _: len(df_raw), repeat)
+    results.append(result)
+    del df_raw
+    df_norm, result = _measure("normalize", lambda: normalize_dataframe(df_valid), len, repeat)
+    results.append(result)
+    del df_valid
+    catalogs, result = _measure("extract_catalogs", lambda: extract_catalogs(df_norm), lambda _: len(df_norm), repeat)
+    results.append(result)
+
+    # Los generadores escriben en un directorio temporal en lugar de OUTPUT_DIR
+    with tempfile.TemporaryDirectory(prefix="sepomex_bench_") as output_dir:
+        original_output_dir = sql_generator.OUTPUT_DIR
+        sql_generator.OUTPUT_DIR = Path(output_dir)
+        try:
+            generators = [
+                ("generate_estados_sql", lambda: generate_estados_sql(catalogs.estados), int),
+                ("generate_municipios_sql", lambda: generate_municipios_sql(catalogs.municipios), int),
+                ("generate_tipos_asentamiento_sql", lambda: generate_tipos_asentamiento_sql(catalogs.tipos_asentamiento), int),
+                ("generate_zonas_sql", generate_zonas_sql, int),
+                ("generate_ciudades_sql", lambda: generate_ciudades_sql(catalogs.ciudades), int),
+                ("generate_codigos_postales_sql", lambda: generate_codigos_postales_sql(df_norm, 1), sum),
+            ]
+            for stage, func, rows in generators:
+                _, result = _measure(stage, func, rows, repeat)
+                results.append(result)
+        finally:
+            sql_generator.OUTPUT_DIR = original_output_dir
+    del df_norm
+
+    if legacy:
+        if SCALES[scale] > LEGACY_MAX_ROWS:
+            logger.info(f"Se omite legacy_v1 en la escala {scale} (más de {LEGACY_MAX_ROWS} registros).")
+        else:
+            results.append(_run_legacy(input_path, SCALES[scale]))
+    return results
+
+
+def _format_mb(value: Optional[float]) -> str:
+    return "n/d" if value is None else f"{value:.1f}"
+
+
+def print_report(scale: str, results: List[StageResult]) -> None:
+    """Imprime la tabla de mediciones de una escala."""
+    print(f"\nEscala {scale} ({SCALES[scale]} registros)")
+    print(f"{'etapa':<33}{'filas':>10}{'segundos':>11}{'filas/s':>13}{'pico RSS MB':>13}")
+    for r in results:
+        print(f"{r.stage:<33}{r.rows:>10}{r.seconds:>11.3f}{r.rows_per_s:>13.0f}{_format_mb(r.peak_rss_mb):>13}")
+
+
+def check_regressions(
+    current: Dict[str, List[StageResult]], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """
+    Compara las mediciones con la línea base.
+
+    Una etapa regresa si sus filas/s caen más de `tolerance` (solo etapas de al
+    menos `MIN_CHECK_SECONDS` en la línea base) o si su memoria pico crece más
+    de `tolerance` más `MEMORY_SLACK_MB`.
+
+    Returns:
+        List[str]: Descripción de cada regresión (vacía si no hay).
+    """
+    regressions = []
+    for scale, results in current.items():
+        stages = baseline.get("scales", {}).get(scale, {})
+        for r in results:
+            base = stages.get(r.stage)
+            if base is None:
+                continue
+            if base["seconds"] >= MIN_CHECK_SECONDS and r.rows_per_s < base["rows_per_s"] * (1 - tolerance):
+                regressions.append(
+                    f"{scale}/{r.stage}: {r.rows_per_s:.0f} filas/s frente a {base['rows_per_s']:.0f} en la línea base"
+                )
+            now, before = r.peak_rss_mb, base.get("peak_rss_mb")
+            if now is not None and before is not None and now > before * (1 + tolerance) + MEMORY_SLACK_MB:
+                regressions.append(f"{scale}/{r.stage}: {now:.1f} MB de memoria frente a {before:.1f} MB en la línea base")
+    return regressions
+
+
+def _rounded(result: StageResult) -> Dict[str, Any]:
+    """Medición como diccionario, redondeada para guardarla en JSON."""
+    return {
+        key: round(value, 4) if isinstance(value, float) else value
+        for key, value in asdict(result).items()
+    }
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    """Lee la línea base (vacía si no existe)."""
+    if not path.is_file():
+        return {"scales": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, baseline: Dict[str, Any], current: Dict[str, List[StageResult]]) -> None:
+    """Sustituye en la línea base las escalas medidas."""
+    baseline["environment"] = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+    for scale, results in current.items():
+        baseline.setdefault("scales", {})[scale] = {r.stage: _rounded(r) for r in results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    logger.info(f"Línea base actualizada en {path}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks del generador SEPOMEX v2 con datos sintéticos.")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["150k"], help="Escalas a medir.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por etapa (se toma el mejor tiempo).")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de los datos sintéticos.")
+    parser.add_argument("--no-legacy", dest="legacy", action="store_false", help="No medir el script de la v1.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Archivo JSON de la línea base.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Empeoramiento tolerado (0.25 = 25 %%).")
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar las mediciones como nueva línea base.")
+    parser.add_argument("--output", type=Path, help="Guardar también las mediciones en este archivo JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    logging.getLogger("src").setLevel(logging.ERROR) # Sin el detalle de validación por etapa
+
+    current = {}
+    for scale in args.scales:
+        current[scale] = run_scale(scale, args.repeat, args.legacy, args.seed)
+        print_report(scale, current[scale])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({scale: [_rounded(r) for r in results] for scale, results in current.items()}, f, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        save_baseline(args.baseline, baseline, current)
+        return 0
+
+    regressions = check_regressions(current, baseline, args.tolerance)
+    if regressions:
+        print("\nRegresiones respecto a la línea base:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\nSin regresiones respecto a la línea base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+EXPLAIN ANALYZE de la búsqueda por nombre con y sin los índices de trigramas.
+
+Para cada término ejecuta la consulta de `search_settlements_by_name` (con el
+patrón ya resuelto, como la planifica la función) con `EXPLAIN (ANALYZE,
+BUFFERS)` dos veces:
+
+- antes: dentro de una transacción que elimina los índices GIN de trigramas
+  de `vm_codigos_postales` y se revierte al terminar (los índices no se
+  pierden, pero la tabla queda bloqueada mientras tanto);
+- después: con el índice de `trgm.sql` (y el de `unaccent.sql` con
+  `--unaccent`).
+
+Informa el nodo de acceso elegido, la mediana del tiempo de ejecución y los
+bloques leídos. Requiere una base cargada con los índices de trigramas (por
+ejemplo con `python -m src.parallel_loader --trgm`).
+
+Uso:
+    python -m benchmarks.search_explain --dsn postgresql://postgres@localhost:5432/sepomex_psql_db_v2
+    python -m benchmarks.search_explain --dsn ... --query "Obregón" --query "Centro" --unaccent
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import DATABASE_URL, LOG_FORMAT
+from src.parallel_loader import MATERIALIZED_VIEW
+
+logger = logging.getLogger(__name__)
+
+# Términos por defecto: selectivos, comunes, inexistente y demasiado corto para los trigramas
+DEFAULT_QUERIES = ("Obregón", "Santa María", "Hacienda", "Centro", "Xochimilco", "zzzz", "Ju")
+# Ejecuciones por término y variante (se informa la mediana)
+DEFAULT_REPEAT = 5
+# Página consultada, como la primera página de la API
+PAGE_LIMIT = 20
+
+SEARCH_SQL = f"""
+SELECT vm.codigo_postal, vm.nombre_asentamiento, vm.nombre_tipo_asentamiento, vm.nombre_zona,
+       vm.codigo_estado, vm.nombre_estado, vm.codigo_municipio, vm.nombre_municipio,
+       vm.codigo_ciudad, vm.nombre_ciudad
+FROM {MATERIALIZED_VIEW} vm
+WHERE {{column}} ILIKE {{pattern}}
+ORDER BY vm.nombre_asentamiento
+LIMIT {PAGE_LIMIT} OFFSET 0
+"""
+SEARCH_COLUMNS = {
+    "search_settlements_by_name": ("vm.nombre_asentamiento", "%s"),
+    "search_settlements_by_name_unaccent": ("f_unaccent(vm.nombre_asentamiento)", "f_unaccent(%s)"),
+}
+
+
+def _scan_nodes(plan: Dict[str, Any]) -> List[str]:
+    """Nodos de acceso a la vista (Seq Scan, Bitmap Index Scan, ...) de un plan en JSON."""
+    nodes = [plan["Node Type"]] if "Scan" in plan["Node Type"] else []
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+def explain(cur, function: str, query: str, repeat: int) -> Tuple[str, float, int]:
+    """
+    Ejecuta EXPLAIN ANALYZE `repeat` veces sobre la consulta de una función.
+
+    Returns:
+        Tuple[str, float, int]: Nodos de acceso, mediana del tiempo de ejecución (ms)
+        y bloques compartidos leídos o encontrados en caché.
+    """
+    column, pattern = SEARCH_COLUMNS[function]
+    sql = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + SEARCH_SQL.format(column=column, pattern=pattern)
+    times = []
+    for _ in range(repeat):
+        cur.execute(sql, (f"%{query}%",))
+        result = cur.fetchone()[0][0]
+        times.append(result["Execution Time"])
+    plan = result["Plan"]
+    blocks = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    return " + ".join(dict.fromkeys(_scan_nodes(plan))), statistics.median(times), blocks
+
+
+def _trigram_indexes(cur) -> List[str]:
+    cur.execute(
+        "SELECT indexname FROM pg_indexes WHERE tablename = %s AND indexdef LIKE %s",
+        (MATERIALIZED_VIEW, "%gin_trgm_ops%"),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE de la búsqueda por nombre antes y después de los índices de trigramas.")
+    parser.add_argument("--dsn", default=DATABASE_URL, help="Cadena de conexión de una base cargada.")
+    parser.add_argument("--query", action="append", help="Término a buscar (repetible).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Ejecuciones por término y variante.")
+    parser.add_argument("--unaccent", action="store_true", help="Medir también search_settlements_by_name_unaccent.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    try:
+        import psycopg
+    except ImportError:
+        logger.error("El análisis requiere el paquete 'psycopg'.")
+        return 1
+
+    functions = ["search_settlements_by_name"] + (["search_settlements_by_name_unaccent"] if args.unaccent else [])
+    queries = args.query or list(DEFAULT_QUERIES)
+    try:
+        with psycopg.connect(args.dsn, cursor_factory=psycopg.ClientCursor) as conn:
+            with conn.cursor() as cur:
+                indexes = _trigram_indexes(cur)
+                if not indexes:
+                    logger.warning(
+                        f"{MATERIALIZED_VIEW} no tiene índices de trigramas (aplique database/trgm.sql): "
+                        "'después' coincidirá con 'antes'."
+                    )
+                rows = []
+                for function in functions:
+                    for query in queries:
+                        # Antes: sin índices de trigramas, en una transacción que se revierte
+                        for index in indexes:
+                            cur.execute(f'DROP INDEX "{index}"')
+                        before = explain(cur, function, query, args.repeat)
+                        conn.rollback()
+                        after = explain(cur, function, query, args.repeat)
+                        conn.rollback()
+                        rows.append((function, query, before, after))
+    except psycopg.Error as e:
+        logger.error(f"Error de PostgreSQL: {e}")
+        return 1
+
+    print(f"\nÍndices de trigramas en {MATERIALIZED_VIEW}: {', '.join(indexes) or 'ninguno'}")
+    print(f"Página de {PAGE_LIMIT} filas; mediana de {args.repeat} ejecuciones.\n")
+    print(f"{'función':<38}{'término':<16}{'antes ms':>10}{'después ms':>12}{'aceleración':>13}  "
+          f"{'bloques antes/después':<22}plan después")
+    for function, query, (_, before_ms, before_blocks), (after_nodes, after_ms, after_blocks) in rows:
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"{function:<38}{query:<16}{before_ms:>10.2f}{after_ms:>12.2f}{speedup:>12.1f}x  "
+              f"{f'{before_blocks}/{after_blocks}':<22}{after_nodes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Latencia de la base SQLite (`src.sqlite_lookup`) frente a la consulta en memoria y PostgreSQL.
+
+Construye las tablas a partir del archivo sintético de una escala, genera la
+base SQLite (como `--export sqlite`) y mide el tiempo medio por llamada de
+cada consulta en memoria (`PostalLookup`) y en SQLite, comprobando que ambas
+devuelven lo mismo. Con `--dsn` mide además las funciones de una base
+PostgreSQL cargada con los mismos datos.
+
+Uso:
+    python -m benchmarks.sqlite_benchmark --scale 150k
+    python -m benchmarks.sqlite_benchmark --scale 150k --dsn postgresql://postgres@localhost:5432/sepomex_psql_db_v2
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from src.config import LOG_FORMAT, SQLITE_FILENAME
+from src.exporters import denormalized_frame
+from src.lookup import PostalLookup, load_tables
+from src.sqlite_lookup import build_sqlite_database, open_sqlite_lookup
+
+from .lookup_benchmark import _sample_calls, _time_calls, _time_postgres
+from .run_benchmarks import BENCH_DATA_DIR
+from .synthetic_data import SCALES, synthetic_file
+
+logger = logging.getLogger(__name__)
+
+# Llamadas por tipo de consulta
+DEFAULT_CALLS = 1000
+# Longitudes de las subcadenas de la búsqueda por nombre
+QUERY_LENGTHS = (2, 4, 8)
+
+
+def _name_calls(lookup: PostalLookup, length: int, calls: int, rng: random.Random) -> List[tuple]:
+    """Subcadenas de nombres reales para `search_settlements_by_name` (primera página de 20)."""
+    names = [name for name in lookup.names if len(name) >= length]
+    queries = []
+    for _ in range(calls):
+        name = names[rng.randrange(len(names))]
+        start = rng.randrange(len(name) - length + 1)
+        queries.append((name[start:start + length], 20, 0))
+    return queries
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latencia de la base SQLite frente a memoria y PostgreSQL.")
+    parser.add_argument("--scale", choices=list(SCALES), default="150k", help="Escala del archivo sintético.")
+    parser.add_argument("--input", type=Path, help="Archivo fuente en lugar del sintético.")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="Llamadas por tipo de consulta.")
+    parser.add_argument("--seed", type=int, default=2021, help="Semilla de los datos y de las entradas.")
+    parser.add_argument("--dsn", help="Comparar con las funciones de una base PostgreSQL con los mismos datos.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    input_path = args.input or synthetic_file(BENCH_DATA_DIR, args.scale, args.seed)
+    tables = load_tables([input_path], use_cache=False)
+    if tables is None:
+        return 1
+    lookup = PostalLookup(tables)
+    path = BENCH_DATA_DIR / f"{input_path.stem}_{SQLITE_FILENAME}"
+    start = time.perf_counter()
+    if not build_sqlite_database(tables, denormalized_frame(tables), path):
+        return 1
+    build_seconds = time.perf_counter() - start
+    sqlite = open_sqlite_lookup(path)
+    if sqlite is None:
+        return 1
+
+    print(f"\n{input_path.name}: {len(lookup)} asentamientos")
+    print(f"  base SQLite: {build_seconds:.1f} s; {path.stat().st_size / (1024 * 1024):.1f} MB")
+    calls = {name: spec for name, spec in _sample_calls(lookup, args.calls, args.seed).items()}
+    rng = random.Random(args.seed)
+    for length in QUERY_LENGTHS:
+        calls[f"search_settlements_by_name ({length})"] = (
+            "search_settlements_by_name(%s, %s, %s)", _name_calls(lookup, length, args.calls, rng)
+        )
+
+    print(f"\n{'consulta':<36}{'memoria µs':>12}{'SQLite µs':>12}" + (f"{'PostgreSQL µs':>16}" if args.dsn else ""))
+    for name, (sql, arguments) in calls.items():
+        method = name.split(" ")[0]
+        for call in arguments:
+            if getattr(lookup, method)(*call) != getattr(sqlite, method)(*call):
+                logger.error(f"Resultados distintos en {method}{call}.")
+                return 1
+        line = f"{name:<36}{_time_calls(getattr(lookup, method), arguments):>12.1f}"
+        line += f"{_time_calls(getattr(sqlite, method), arguments):>12.1f}"
+        if args.dsn:
+            pg = _time_postgres(args.dsn, sql, arguments)
+            line += f"{pg:>16.1f}" if pg is not None else f"{'n/d':>16}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+import logging
+from pathlib import Path
+
+from src.config import FILE_ENCODING, FILE_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+# Columnas del archivo original de SEPOMEX, en su orden
+SEPOMEX_COLUMNS = [
+    "d_codigo", "d_asenta", "d_tipo_asenta", "D_mnpio", "d_estado", "d_ciudad", "d_CP",
+    "c_estado", "c_oficina", "c_CP", "c_tipo_asenta", "c_mnpio", "id_asenta_cpcons",
+    "d_zona", "c_cve_ciudad",
+]
+
+# Estados: (nombre, prefijos de código postal, municipios, peso aproximado de registros)
+ESTADOS = [
+    ("Aguascalientes", [20], 11, 9),
+    ("Baja California", [21, 22], 7, 22),
+    ("Baja California Sur", [23], 5, 10),
+    ("Campeche", [24], 13, 11),
+    ("Coahuila de Zaragoza", [25, 26, 27], 38, 25),
+    ("Colima", [28], 10, 9),
+    ("Chiapas", [29, 30], 124, 43),
+    ("Chihuahua", [31, 32, 33], 67, 41),
+    ("Ciudad de México", list(range(1, 17)), 16, 19),
+    ("Durango", [34, 35], 39, 25),
+    ("Guanajuato", [36, 37, 38], 46, 62),
+    ("Guerrero", [39, 40, 41], 81, 36),
+    ("Hidalgo", [42, 43], 84, 42),
+    ("Jalisco", [44, 45, 46, 47, 48, 49], 125, 61),
+    ("México", [50, 51, 52, 53, 54, 55, 56, 57], 125, 65),
+    ("Michoacán de Ocampo", [58, 59, 60, 61], 113, 67),
+    ("Morelos", [62], 36, 13),
+    ("Nayarit", [63], 20, 14),
+    ("Nuevo León", [64, 65, 66, 67], 51, 41),
+    ("Oaxaca", [68, 69, 70, 71], 570, 56),
+    ("Puebla", [72, 73, 74, 75], 217, 55),
+    ("Querétaro", [76], 18, 22),
+    ("Quintana Roo", [77], 11, 9),
+    ("San Luis Potosí", [78, 79], 58, 30),
+    ("Sinaloa", [80, 81, 82], 18, 33),
+    ("Sonora", [83, 84, 85], 72, 31),
+    ("Tabasco", [86], 17, 20),
+    ("Tamaulipas", [87, 88, 89], 43, 33),
+    ("Tlaxcala", [90], 60, 9),
+    ("Veracruz de Ignacio de la Llave", [91, 92, 93, 94, 95, 96], 212, 96),
+    ("Yucatán", [97], 106, 14),
+    ("Zacatecas", [98, 99], 58, 21),
+]
+
+# Tipos de asentamiento: (código, nombre, peso aproximado)
+TIPOS_ASENTAMIENTO = [
+    ("09", "Colonia", 450), ("28", "Pueblo", 80), ("29", "Ranchería", 110),
+    ("21", "Fraccionamiento", 150), ("15", "Ejido", 50), ("02", "Barrio", 25),
+    ("33", "Unidad habitacional", 12), ("10", "Condominio", 20), ("17", "Granja", 5),
+    ("31", "Rancho", 40), ("26", "Paraje", 10), ("37", "Zona industrial", 6),
+    ("16", "Equipamiento", 8), ("04", "Campamento", 2), ("30", "Residencial", 15),
+    ("48", "Hacienda", 8),
+]
+
+# Palabras para componer nombres, con acentos, eñes y algún carácter a escapar
+NOMBRES = [
+    "San", "Santa", "José", "María", "Guadalupe", "Álvaro", "Obregón", "Niños", "Héroes",
+    "Lomas", "Jardín", "Peña", "Cañada", "Ampliación", "Ex-Hacienda", "Benito", "Juárez",
+    "Emiliano", "Zapata", "Reforma", "Independencia", "Revolución", "Valle", "Arboledas",
+    "Chapultepec", "Cuauhtémoc", "Tláloc", "Xochimilco", "Ocotlán", "Zaragoza", "Morelos",
+    "Hidalgo", "Insurgentes", "Mártires", "Pípila", "Piñón", "Señorial", "Miramar",
+]
+ESPECIALES = ["O'Higgins", '"La Cumbre"', "Sección  A", "Bosques\\Norte"]
+
+# Zonas tal como aparecen en la fuente (pesos aproximados)
+ZONAS = [("Urbano", 45), ("Rural", 48), ("Semiurbano", 4), ("urbano ", 1), (" RURAL", 1), ("", 1)]
+
+# Códigos mal formados inyectados en una fracción de las filas
+CODIGOS_INVALIDOS = np.array(["", "ABC", "-1", "123456", "1e2", "7.5"], dtype=object)
+
+SCALES = {"150k": 150_000, "1.5M": 1_500_000, "15M": 15_000_000}
+
+BLOCK_ROWS = 500_000
+
+
+def _weights(values) -> np.ndarray:
+    """Normaliza una lista de pesos a probabilidades."""
+    weights = np.asarray(values, dtype=float)
+    return weights / weights.sum()
+
+
+def _compose(rng: np.random.Generator, n: int, words: np.ndarray, max_words: int) -> np.ndarray:
+    """Compone `n` nombres de 1 a `max_words` palabras tomadas de `words`."""
+    counts = rng.integers(1, max_words + 1, size=n)
+    result = words[rng.integers(0, len(words), size=n)].astype(object)
+    for position in range(2, max_words + 1):
+        extra = counts >= position
+        result[extra] = result[extra] + " " + words[rng.integers(0, len(words), size=int(extra.sum()))]
+    return result
+
+
+def _corrupt(rng: np.random.Generator, values: np.ndarray, rate: float, replacements: np.ndarray) -> np.ndarray:
+    """Sustituye una fracción `rate` de los valores por elementos de `replacements`."""
+    mask = rng.random(len(values)) < rate
+    values[mask] = replacements[rng.integers(0, len(replacements), size=int(mask.sum()))]
+    return values
+
+
+def _synthetic_block(rng: np.random.Generator, start: int, n: int, error_rate: float) -> pd.DataFrame:
+    """
+    Genera un bloque de `n` filas con la forma del archivo de SEPOMEX.
+
+    Args:
+        rng (np.random.Generator): Generador pseudoaleatorio.
+        start (int): Número de la primera fila (para `id_asenta_cpcons`).
+        n (int): Filas del bloque.
+        error_rate (float): Fracción de valores corruptos por columna.
+
+    Returns:
+        pd.DataFrame: Bloque con las columnas de `SEPOMEX_COLUMNS`.
+    """
+    words = np.array(NOMBRES, dtype=object)
+    estado_idx = rng.choice(len(ESTADOS), size=n, p=_weights([e[3] for e in ESTADOS]))
+    nombres_estado = np.array([e[0] for e in ESTADOS], dtype=object)
+    municipios = np.array([e[2] for e in ESTADOS])
+
+    # Código postal dentro de los prefijos reales del estado
+    prefix_count = np.array([len(e[1]) for e in ESTADOS])
+    prefix_table = np.zeros((len(ESTADOS), prefix_count.max()), dtype=int)
+    for i, estado in enumerate(ESTADOS):
+        prefix_table[i, : len(estado[1])] = estado[1]
+    prefix = prefix_table[estado_idx, (rng.random(n) * prefix_count[estado_idx]).astype(int)]
+    d_codigo = pd.Series(prefix * 1000 + rng.integers(0, 1000, size=n)).astype(str).str.zfill(5).to_numpy(dtype=object)
+
+    c_estado = pd.Series(estado_idx + 1).astype(str).str.zfill(2).to_numpy(dtype=object)
+    mnpio = (rng.random(n) * municipios[estado_idx]).astype(int) + 1
+    c_mnpio = pd.Series(mnpio).astype(str).str.zfill(3).to_numpy(dtype=object)
+    # Nombre de municipio estable por (estado, municipio)
+    d_mnpio = words[(estado_idx * 131 + mnpio * 7) % len(words)] + " " + words[(mnpio * 13) % len(words)]
+
+    tipo_idx = rng.choice(len(TIPOS_ASENTAMIENTO), size=n, p=_weights([t[2] for t in TIPOS_ASENTAMIENTO]))
+    c_tipo = np.array([t[0] for t in TIPOS_ASENTAMIENTO], dtype=object)[tipo_idx]
+    d_tipo = np.array([t[1] for t in TIPOS_ASENTAMIENTO], dtype=object)[tipo_idx]
+
+    d_asenta = _compose(rng, n, words, 4)
+    especiales = rng.random(n) < 0.01
+    d_asenta[especiales] = d_asenta[especiales] + " " + np.array(ESPECIALES, dtype=object)[
+        rng.integers(0, len(ESPECIALES), size=int(especiales.sum()))
+    ]
+
+    # Ciudad solo en una parte de los registros (NULL en el resto)
+    has_city = rng.random(n) < 0.4
+    ciudad = rng.integers(1, 31, size=n)
+    c_ciudad = np.where(has_city, pd.Series(ciudad).astype(str).str.zfill(2).to_numpy(dtype=object), "")
+    d_ciudad = np.where(has_city, words[(estado_idx * 17 + ciudad) % len(words)] + " de " + nombres_estado[estado_idx], "")
+
+    d_zona = np.array([z[0] for z in ZONAS], dtype=object)[
+        rng.choice(len(ZONAS), size=n, p=_weights([z[1] for z in ZONAS]))
+    ]
+
+    empty = np.array([""], dtype=object)
+    return pd.DataFrame({
+        "d_codigo": _corrupt(rng, d_codigo, error_rate, CODIGOS_INVALIDOS),
+        "d_asenta": _corrupt(rng, d_asenta, error_rate, empty),
+        "d_tipo_asenta": d_tipo,
+        "D_mnpio": _corrupt(rng, d_mnpio, error_rate, empty),
+        "d_estado": _corrupt(rng, nombres_estado[estado_idx], error_rate, empty),
+        "d_ciudad": d_ciudad,
+        "d_CP": d_codigo,
+        "c_estado": _corrupt(rng, c_estado, error_rate, CODIGOS_INVALIDOS),
+        "c_oficina": d_codigo,
+        "c_CP": "",
+        "c_tipo_asenta": _corrupt(rng, c_tipo, error_rate, CODIGOS_INVALIDOS),
+        "c_mnpio": _corrupt(rng, c_mnpio, error_rate, CODIGOS_INVALIDOS),
+        "id_asenta_cpcons": (np.arange(start, start + n) % 9999 + 1).astype(str),
+        "d_zona": d_zona,
+        "c_cve_ciudad": _corrupt(rng, c_ciudad, error_rate * has_city.mean(), CODIGOS_INVALIDOS),
+    }, columns=SEPOMEX_COLUMNS)
+
+
+def write_synthetic_file(path: Path, rows: int, seed: int = 2021, error_rate: float = 0.003) -> Path:
+    """
+    Escribe un archivo con la forma del de SEPOMEX (separado por '|', windows-1252).
+
+    Reproduce la distribución de códigos postales por estado, los municipios por
+    estado, los tipos de asentamiento más frecuentes, nombres con acentos y
+    caracteres a escapar, ciudades nulas y una fracción de códigos mal formados.
+    Se genera por bloques, por lo que la memoria no depende de `rows`.
+
+    Args:
+        path (Path): Archivo de salida.
+        rows (int): Registros a generar.
+        seed (int): Semilla (mismo valor, mismo archivo).
+        error_rate (float): Fracción de valores corruptos por columna.
+
+    Returns:
+        Path: Ruta del archivo generado.
+    """
+    rng = np.random.default_rng(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    logger.info(f"Generando {rows} registros sintéticos en {path}...")
+    with open(tmp_path, "w", encoding=FILE_ENCODING, newline="") as f:
+        f.write(FILE_SEPARATOR.join(SEPOMEX_COLUMNS) + "\n")
+        for start in range(0, rows, BLOCK_ROWS):
+            block = _synthetic_block(rng, start, min(BLOCK_ROWS, rows - start), error_rate)
+            # Sin entrecomillar, como el archivo original
+            lines = block[SEPOMEX_COLUMNS[0]].str.cat(
+                [block[col] for col in SEPOMEX_COLUMNS[1:]], sep=FILE_SEPARATOR
+            )
+            f.write("\n".join(lines.tolist()) + "\n")
+    tmp_path.replace(path)
+    return path
+
+
+def synthetic_file(data_dir: Path, scale: str, seed: int = 2021) -> Path:
+    """
+    Devuelve el archivo sintético de una escala, generándolo si no existe.
+
+    Args:
+        data_dir (Path): Directorio de archivos sintéticos.
+        scale (str): Escala (clave de `SCALES`).
+        seed (int): Semilla.
+
+    Returns:
+        Path: Ruta del archivo.
+    """
+    path = data_dir / f"sepomex_synthetic_{scale}_{seed}.txt"
+    if not path.is_file():
+        write_synthetic_file(path, SCALES[scale], seed)
+    return path
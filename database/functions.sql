@@ -10,6 +10,10 @@
  * @param p_limit: Límite de registros por página (1-100).
  * @param p_offset: Desplazamiento para paginación (>=0).
  * @returns: Tabla con estructura PostalCodeRecord (CHAR para códigos).
+ * @note: La consulta se ejecuta con EXECUTE para que se planifique con el patrón real:
+ *        así el planificador usa el índice de trigramas (idx_vm_codigos_postales_nombre_asentamiento_trgm,
+ *        opcional, ver trgm.sql) en términos selectivos y el recorrido secuencial cuando el término
+ *        es muy corto o muy común.
  */
 CREATE OR REPLACE FUNCTION search_settlements_by_name(
     p_query VARCHAR(100),
@@ -36,7 +40,7 @@ BEGIN
         RAISE EXCEPTION 'El offset debe ser mayor o igual a 0';
     END IF;
 
-    RETURN QUERY
+    RETURN QUERY EXECUTE '
     SELECT
         vm.codigo_postal,
         vm.nombre_asentamiento,
@@ -49,9 +53,10 @@ BEGIN
         vm.codigo_ciudad AS pk_codigo_ciudad,
         vm.nombre_ciudad
     FROM vm_codigos_postales vm
-    WHERE vm.nombre_asentamiento ILIKE '%' || p_query || '%'
+    WHERE vm.nombre_asentamiento ILIKE $1
     ORDER BY vm.nombre_asentamiento
-    LIMIT p_limit OFFSET p_offset;
+    LIMIT $2 OFFSET $3'
+    USING '%' || p_query || '%', p_limit, p_offset;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -500,3 +505,365 @@ BEGIN
     LIMIT p_limit OFFSET p_offset;
 END;
 $$ LANGUAGE plpgsql;
+
+/*
+ * Variantes con paginación por cursor (keyset).
+ *
+ * En lugar de LIMIT/OFFSET reciben la clave de orden de la última fila de la página
+ * anterior y devuelven las siguientes con un recorrido por rango de índice, por lo que
+ * el costo de una página no crece con su profundidad. La clave incluye id_codigo_postal
+ * como desempate (el código postal y el nombre no son únicos); cada fila la devuelve
+ * como última columna. Para la primera página se omite el cursor (NULL).
+ *
+ * Cada función tiene una sola consulta, con la condición del cursor en la forma
+ * `(p_after IS NULL OR (clave) > (cursor))`, y la ejecuta con EXECUTE ... USING para
+ * que se planifique con los valores reales: el planificador descarta la rama que no
+ * aplica y usa la comparación de filas como condición del índice compuesto. Con un
+ * plan genérico en caché, la comparación quedaría como filtro y la página recorrería
+ * todas las filas anteriores al cursor.
+ */
+
+/**
+ * @function: get_postal_codes_by_state_keyset
+ * @description: Como get_postal_codes_by_state, con paginación por cursor.
+ * @param p_codigo_estado: Código del estado (2 dígitos).
+ * @param p_limit: Límite de registros por página (1-100).
+ * @param p_after_codigo_postal: Código postal de la última fila vista (NULL en la primera página).
+ * @param p_after_nombre_asentamiento: Nombre de asentamiento de la última fila vista.
+ * @param p_after_id: id_codigo_postal de la última fila vista.
+ * @returns: Tabla con estructura PostalCodeRecord más id_codigo_postal, ordenada por código postal, nombre e id.
+ */
+CREATE OR REPLACE FUNCTION get_postal_codes_by_state_keyset(
+    p_codigo_estado VARCHAR(2),
+    p_limit INTEGER,
+    p_after_codigo_postal VARCHAR(5) DEFAULT NULL,
+    p_after_nombre_asentamiento VARCHAR(100) DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    codigo_postal CHAR(5),
+    nombre_asentamiento VARCHAR(100),
+    tipo_asentamiento VARCHAR(50),
+    zona VARCHAR(20),
+    codigo_estado CHAR(2),
+    nombre_estado VARCHAR(50),
+    pk_codigo_municipio CHAR(3),
+    nombre_municipio VARCHAR(50),
+    pk_codigo_ciudad CHAR(2),
+    nombre_ciudad VARCHAR(50),
+    id_codigo_postal INTEGER
+) AS $$
+BEGIN
+    IF p_codigo_estado !~ '^[0-9]{2}$' THEN
+        RAISE EXCEPTION 'El código de estado debe ser de 2 dígitos';
+    END IF;
+    IF p_limit < 1 OR p_limit > 100 THEN
+        RAISE EXCEPTION 'El límite debe estar entre 1 y 100';
+    END IF;
+    IF p_after_codigo_postal !~ '^[0-9]{5}$' THEN
+        RAISE EXCEPTION 'El código postal debe ser de 5 dígitos';
+    END IF;
+    IF (p_after_codigo_postal IS NULL) <> (p_after_nombre_asentamiento IS NULL)
+        OR (p_after_codigo_postal IS NULL) <> (p_after_id IS NULL) THEN
+        RAISE EXCEPTION 'El cursor debe incluir código postal, nombre de asentamiento e id';
+    END IF;
+
+    RETURN QUERY EXECUTE '
+    SELECT
+        vm.codigo_postal,
+        vm.nombre_asentamiento,
+        vm.nombre_tipo_asentamiento AS tipo_asentamiento,
+        vm.nombre_zona AS zona,
+        vm.codigo_estado,
+        vm.nombre_estado,
+        vm.codigo_municipio AS pk_codigo_municipio,
+        vm.nombre_municipio,
+        vm.codigo_ciudad AS pk_codigo_ciudad,
+        vm.nombre_ciudad,
+        vm.id_codigo_postal
+    FROM vm_codigos_postales vm
+    WHERE vm.codigo_estado = $1::CHAR(2)
+    AND ($3 IS NULL OR (vm.codigo_postal, vm.nombre_asentamiento, vm.id_codigo_postal)
+        > ($3::CHAR(5), $4, $5))
+    ORDER BY vm.codigo_postal, vm.nombre_asentamiento, vm.id_codigo_postal
+    LIMIT $2'
+    USING p_codigo_estado, p_limit, p_after_codigo_postal, p_after_nombre_asentamiento, p_after_id;
+END;
+$$ LANGUAGE plpgsql;
+
+/**
+ * @function: get_postal_codes_by_municipality_keyset
+ * @description: Como get_postal_codes_by_municipality, con paginación por cursor.
+ * @param p_codigo_estado: Código del estado (2 dígitos).
+ * @param p_codigo_municipio: Código del municipio (3 dígitos).
+ * @param p_limit: Límite de registros por página (1-100).
+ * @param p_after_codigo_postal: Código postal de la última fila vista (NULL en la primera página).
+ * @param p_after_nombre_asentamiento: Nombre de asentamiento de la última fila vista.
+ * @param p_after_id: id_codigo_postal de la última fila vista.
+ * @returns: Tabla con estructura PostalCodeRecord más id_codigo_postal, ordenada por código postal, nombre e id.
+ */
+CREATE OR REPLACE FUNCTION get_postal_codes_by_municipality_keyset(
+    p_codigo_estado VARCHAR(2),
+    p_codigo_municipio VARCHAR(3),
+    p_limit INTEGER,
+    p_after_codigo_postal VARCHAR(5) DEFAULT NULL,
+    p_after_nombre_asentamiento VARCHAR(100) DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    codigo_postal CHAR(5),
+    nombre_asentamiento VARCHAR(100),
+    tipo_asentamiento VARCHAR(50),
+    zona VARCHAR(20),
+    codigo_estado CHAR(2),
+    nombre_estado VARCHAR(50),
+    pk_codigo_municipio CHAR(3),
+    nombre_municipio VARCHAR(50),
+    pk_codigo_ciudad CHAR(2),
+    nombre_ciudad VARCHAR(50),
+    id_codigo_postal INTEGER
+) AS $$
+BEGIN
+    IF p_codigo_estado !~ '^[0-9]{2}$' THEN
+        RAISE EXCEPTION 'El código de estado debe ser de 2 dígitos';
+    END IF;
+    IF p_codigo_municipio !~ '^[0-9]{3}$' THEN
+        RAISE EXCEPTION 'El código de municipio debe ser de 3 dígitos';
+    END IF;
+    IF p_limit < 1 OR p_limit > 100 THEN
+        RAISE EXCEPTION 'El límite debe estar entre 1 y 100';
+    END IF;
+    IF p_after_codigo_postal !~ '^[0-9]{5}$' THEN
+        RAISE EXCEPTION 'El código postal debe ser de 5 dígitos';
+    END IF;
+    IF (p_after_codigo_postal IS NULL) <> (p_after_nombre_asentamiento IS NULL)
+        OR (p_after_codigo_postal IS NULL) <> (p_after_id IS NULL) THEN
+        RAISE EXCEPTION 'El cursor debe incluir código postal, nombre de asentamiento e id';
+    END IF;
+
+    RETURN QUERY EXECUTE '
+    SELECT
+        vm.codigo_postal,
+        vm.nombre_asentamiento,
+        vm.nombre_tipo_asentamiento AS tipo_asentamiento,
+        vm.nombre_zona AS zona,
+        vm.codigo_estado,
+        vm.nombre_estado,
+        vm.codigo_municipio AS pk_codigo_municipio,
+        vm.nombre_municipio,
+        vm.codigo_ciudad AS pk_codigo_ciudad,
+        vm.nombre_ciudad,
+        vm.id_codigo_postal
+    FROM vm_codigos_postales vm
+    WHERE vm.codigo_estado = $1::CHAR(2)
+    AND vm.codigo_municipio = $2::CHAR(3)
+    AND ($4 IS NULL OR (vm.codigo_postal, vm.nombre_asentamiento, vm.id_codigo_postal)
+        > ($4::CHAR(5), $5, $6))
+    ORDER BY vm.codigo_postal, vm.nombre_asentamiento, vm.id_codigo_postal
+    LIMIT $3'
+    USING p_codigo_estado, p_codigo_municipio, p_limit, p_after_codigo_postal, p_after_nombre_asentamiento,
+        p_after_id;
+END;
+$$ LANGUAGE plpgsql;
+
+/**
+ * @function: get_postal_codes_by_city_keyset
+ * @description: Como get_postal_codes_by_city, con paginación por cursor.
+ * @param p_codigo_estado: Código del estado (2 dígitos).
+ * @param p_codigo_ciudad: Código de la ciudad (2 dígitos).
+ * @param p_limit: Límite de registros por página (1-100).
+ * @param p_after_codigo_postal: Código postal de la última fila vista (NULL en la primera página).
+ * @param p_after_nombre_asentamiento: Nombre de asentamiento de la última fila vista.
+ * @param p_after_id: id_codigo_postal de la última fila vista.
+ * @returns: Tabla con estructura PostalCodeRecord más id_codigo_postal, ordenada por código postal, nombre e id.
+ */
+CREATE OR REPLACE FUNCTION get_postal_codes_by_city_keyset(
+    p_codigo_estado VARCHAR(2),
+    p_codigo_ciudad VARCHAR(2),
+    p_limit INTEGER,
+    p_after_codigo_postal VARCHAR(5) DEFAULT NULL,
+    p_after_nombre_asentamiento VARCHAR(100) DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    codigo_postal CHAR(5),
+    nombre_asentamiento VARCHAR(100),
+    tipo_asentamiento VARCHAR(50),
+    zona VARCHAR(20),
+    codigo_estado CHAR(2),
+    nombre_estado VARCHAR(50),
+    pk_codigo_municipio CHAR(3),
+    nombre_municipio VARCHAR(50),
+    pk_codigo_ciudad CHAR(2),
+    nombre_ciudad VARCHAR(50),
+    id_codigo_postal INTEGER
+) AS $$
+BEGIN
+    IF p_codigo_estado !~ '^[0-9]{2}$' THEN
+        RAISE EXCEPTION 'El código de estado debe ser de 2 dígitos';
+    END IF;
+    IF p_codigo_ciudad !~ '^[0-9]{2}$' THEN
+        RAISE EXCEPTION 'El código de ciudad debe ser de 2 dígitos';
+    END IF;
+    IF p_limit < 1 OR p_limit > 100 THEN
+        RAISE EXCEPTION 'El límite debe estar entre 1 y 100';
+    END IF;
+    IF p_after_codigo_postal !~ '^[0-9]{5}$' THEN
+        RAISE EXCEPTION 'El código postal debe ser de 5 dígitos';
+    END IF;
+    IF (p_after_codigo_postal IS NULL) <> (p_after_nombre_asentamiento IS NULL)
+        OR (p_after_codigo_postal IS NULL) <> (p_after_id IS NULL) THEN
+        RAISE EXCEPTION 'El cursor debe incluir código postal, nombre de asentamiento e id';
+    END IF;
+
+    RETURN QUERY EXECUTE '
+    SELECT
+        vm.codigo_postal,
+        vm.nombre_asentamiento,
+        vm.nombre_tipo_asentamiento AS tipo_asentamiento,
+        vm.nombre_zona AS zona,
+        vm.codigo_estado,
+        vm.nombre_estado,
+        vm.codigo_municipio AS pk_codigo_municipio,
+        vm.nombre_municipio,
+        vm.codigo_ciudad AS pk_codigo_ciudad,
+        vm.nombre_ciudad,
+        vm.id_codigo_postal
+    FROM vm_codigos_postales vm
+    WHERE vm.codigo_estado = $1::CHAR(2)
+    AND vm.codigo_ciudad = $2::CHAR(2)
+    AND ($4 IS NULL OR (vm.codigo_postal, vm.nombre_asentamiento, vm.id_codigo_postal)
+        > ($4::CHAR(5), $5, $6))
+    ORDER BY vm.codigo_postal, vm.nombre_asentamiento, vm.id_codigo_postal
+    LIMIT $3'
+    USING p_codigo_estado, p_codigo_ciudad, p_limit, p_after_codigo_postal, p_after_nombre_asentamiento,
+        p_after_id;
+END;
+$$ LANGUAGE plpgsql;
+
+/**
+ * @function: get_settlements_by_city_keyset
+ * @description: Como get_settlements_by_city, con paginación por cursor.
+ * @param p_codigo_estado: Código del estado (2 dígitos).
+ * @param p_codigo_ciudad: Código de la ciudad (2 dígitos).
+ * @param p_limit: Límite de registros por página (1-100).
+ * @param p_after_nombre_asentamiento: Nombre de asentamiento de la última fila vista (NULL en la primera página).
+ * @param p_after_id: id_codigo_postal de la última fila vista.
+ * @returns: Tabla con estructura PostalCodeRecord más id_codigo_postal, ordenada por nombre e id.
+ */
+CREATE OR REPLACE FUNCTION get_settlements_by_city_keyset(
+    p_codigo_estado VARCHAR(2),
+    p_codigo_ciudad VARCHAR(2),
+    p_limit INTEGER,
+    p_after_nombre_asentamiento VARCHAR(100) DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    codigo_postal CHAR(5),
+    nombre_asentamiento VARCHAR(100),
+    tipo_asentamiento VARCHAR(50),
+    zona VARCHAR(20),
+    codigo_estado CHAR(2),
+    nombre_estado VARCHAR(50),
+    pk_codigo_municipio CHAR(3),
+    nombre_municipio VARCHAR(50),
+    pk_codigo_ciudad CHAR(2),
+    nombre_ciudad VARCHAR(50),
+    id_codigo_postal INTEGER
+) AS $$
+BEGIN
+    IF p_codigo_estado !~ '^[0-9]{2}$' THEN
+        RAISE EXCEPTION 'El código de estado debe ser de 2 dígitos';
+    END IF;
+    IF p_codigo_ciudad !~ '^[0-9]{2}$' THEN
+        RAISE EXCEPTION 'El código de ciudad debe ser de 2 dígitos';
+    END IF;
+    IF p_limit < 1 OR p_limit > 100 THEN
+        RAISE EXCEPTION 'El límite debe estar entre 1 y 100';
+    END IF;
+    IF (p_after_nombre_asentamiento IS NULL) <> (p_after_id IS NULL) THEN
+        RAISE EXCEPTION 'El cursor debe incluir nombre de asentamiento e id';
+    END IF;
+
+    RETURN QUERY EXECUTE '
+    SELECT
+        vm.codigo_postal,
+        vm.nombre_asentamiento,
+        vm.nombre_tipo_asentamiento AS tipo_asentamiento,
+        vm.nombre_zona AS zona,
+        vm.codigo_estado,
+        vm.nombre_estado,
+        vm.codigo_municipio AS pk_codigo_municipio,
+        vm.nombre_municipio,
+        vm.codigo_ciudad AS pk_codigo_ciudad,
+        vm.nombre_ciudad,
+        vm.id_codigo_postal
+    FROM vm_codigos_postales vm
+    WHERE vm.codigo_estado = $1::CHAR(2)
+    AND vm.codigo_ciudad = $2::CHAR(2)
+    AND ($4 IS NULL OR (vm.nombre_asentamiento, vm.id_codigo_postal) > ($4, $5))
+    ORDER BY vm.nombre_asentamiento, vm.id_codigo_postal
+    LIMIT $3'
+    USING p_codigo_estado, p_codigo_ciudad, p_limit, p_after_nombre_asentamiento, p_after_id;
+END;
+$$ LANGUAGE plpgsql;
+
+/**
+ * @function: search_settlements_by_name_keyset
+ * @description: Como search_settlements_by_name, con paginación por cursor.
+ * @param p_query: Término de búsqueda (máx. 100 caracteres).
+ * @param p_limit: Límite de registros por página (1-100).
+ * @param p_after_nombre_asentamiento: Nombre de asentamiento de la última fila vista (NULL en la primera página).
+ * @param p_after_id: id_codigo_postal de la última fila vista.
+ * @returns: Tabla con estructura PostalCodeRecord más id_codigo_postal, ordenada por nombre e id.
+ * @note: Como search_settlements_by_name, se planifica con el patrón real (EXECUTE): el planificador
+ *        elige entre el índice de trigramas y recorrer idx_vm_codigos_postales_nombre_id desde el cursor.
+ */
+CREATE OR REPLACE FUNCTION search_settlements_by_name_keyset(
+    p_query VARCHAR(100),
+    p_limit INTEGER,
+    p_after_nombre_asentamiento VARCHAR(100) DEFAULT NULL,
+    p_after_id INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+    codigo_postal CHAR(5),
+    nombre_asentamiento VARCHAR(100),
+    tipo_asentamiento VARCHAR(50),
+    zona VARCHAR(20),
+    codigo_estado CHAR(2),
+    nombre_estado VARCHAR(50),
+    pk_codigo_municipio CHAR(3),
+    nombre_municipio VARCHAR(50),
+    pk_codigo_ciudad CHAR(2),
+    nombre_ciudad VARCHAR(50),
+    id_codigo_postal INTEGER
+) AS $$
+BEGIN
+    IF p_limit < 1 OR p_limit > 100 THEN
+        RAISE EXCEPTION 'El límite debe estar entre 1 y 100';
+    END IF;
+    IF (p_after_nombre_asentamiento IS NULL) <> (p_after_id IS NULL) THEN
+        RAISE EXCEPTION 'El cursor debe incluir nombre de asentamiento e id';
+    END IF;
+
+    RETURN QUERY EXECUTE '
+    SELECT
+        vm.codigo_postal,
+        vm.nombre_asentamiento,
+        vm.nombre_tipo_asentamiento AS tipo_asentamiento,
+        vm.nombre_zona AS zona,
+        vm.codigo_estado,
+        vm.nombre_estado,
+        vm.codigo_municipio AS pk_codigo_municipio,
+        vm.nombre_municipio,
+        vm.codigo_ciudad AS pk_codigo_ciudad,
+        vm.nombre_ciudad,
+        vm.id_codigo_postal
+    FROM vm_codigos_postales vm
+    WHERE vm.nombre_asentamiento ILIKE $1
+    AND ($3 IS NULL OR (vm.nombre_asentamiento, vm.id_codigo_postal) > ($3, $4))
+    ORDER BY vm.nombre_asentamiento, vm.id_codigo_postal
+    LIMIT $2'
+    USING '%' || p_query || '%', p_limit, p_after_nombre_asentamiento, p_after_id;
+END;
+$$ LANGUAGE plpgsql;
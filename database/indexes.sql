@@ -69,11 +69,12 @@ CREATE INDEX idx_ciudades_codigo_estado
 ON ciudades (fk_codigo_estado);
 
 /**
- * @index idx_vm_codigos_postales_nombre_asentamiento_lower
- * @description Índice para búsquedas por nombre de asentamiento en la vista materializada.
+ * @index idx_vm_codigos_postales_id_codigo_postal
+ * @description Índice único de la vista materializada: permite REFRESH MATERIALIZED VIEW CONCURRENTLY,
+ *              que no bloquea las lecturas mientras se recalcula la vista tras una recarga.
  */
-CREATE INDEX idx_vm_codigos_postales_nombre_asentamiento_lower
-ON vm_codigos_postales (LOWER(nombre_asentamiento));
+CREATE UNIQUE INDEX idx_vm_codigos_postales_id_codigo_postal
+ON vm_codigos_postales (id_codigo_postal);
 
 /**
  * @index idx_vm_codigos_postales_codigo_postal
@@ -83,8 +84,42 @@ CREATE INDEX idx_vm_codigos_postales_codigo_postal
 ON vm_codigos_postales (codigo_postal);
 
 /**
- * @index idx_vm_codigos_postales_codigo_estado
- * @description Índice para filtros por estado en la vista materializada.
+ * @index idx_vm_codigos_postales_estado_cp_nombre_id
+ * @description Índice para filtros por estado en la vista materializada, en el orden de paginación
+ *              (código postal, nombre, id): get_postal_codes_by_state y su variante _keyset leen
+ *              cada página como un recorrido por rango, sin ordenar.
  */
-CREATE INDEX idx_vm_codigos_postales_codigo_estado
-ON vm_codigos_postales (codigo_estado);
\ No newline at end of file
+CREATE INDEX idx_vm_codigos_postales_estado_cp_nombre_id
+ON vm_codigos_postales (codigo_estado, codigo_postal, nombre_asentamiento, id_codigo_postal);
+
+/**
+ * @index idx_vm_codigos_postales_municipio_cp_nombre_id
+ * @description Índice para get_postal_codes_by_municipality y su variante _keyset.
+ */
+CREATE INDEX idx_vm_codigos_postales_municipio_cp_nombre_id
+ON vm_codigos_postales (codigo_estado, codigo_municipio, codigo_postal, nombre_asentamiento, id_codigo_postal)
+WHERE codigo_municipio IS NOT NULL;
+
+/**
+ * @index idx_vm_codigos_postales_ciudad_cp_nombre_id
+ * @description Índice para get_postal_codes_by_city y su variante _keyset.
+ */
+CREATE INDEX idx_vm_codigos_postales_ciudad_cp_nombre_id
+ON vm_codigos_postales (codigo_estado, codigo_ciudad, codigo_postal, nombre_asentamiento, id_codigo_postal)
+WHERE codigo_ciudad IS NOT NULL;
+
+/**
+ * @index idx_vm_codigos_postales_ciudad_nombre_id
+ * @description Índice para get_settlements_by_city y su variante _keyset (orden por nombre).
+ */
+CREATE INDEX idx_vm_codigos_postales_ciudad_nombre_id
+ON vm_codigos_postales (codigo_estado, codigo_ciudad, nombre_asentamiento, id_codigo_postal)
+WHERE codigo_ciudad IS NOT NULL;
+
+/**
+ * @index idx_vm_codigos_postales_nombre_id
+ * @description Índice en el orden de search_settlements_by_name_keyset: para términos comunes
+ *              basta recorrerlo desde el cursor filtrando con ILIKE hasta llenar la página.
+ */
+CREATE INDEX idx_vm_codigos_postales_nombre_id
+ON vm_codigos_postales (nombre_asentamiento, id_codigo_postal);
\ No newline at end of file
@@ -78,4 +78,16 @@ CREATE TABLE codigos_postales (
     FOREIGN KEY (fk_codigo_tipo_asentamiento) REFERENCES tipos_asentamiento(pk_codigo_tipo_asentamiento) ON DELETE RESTRICT ON UPDATE CASCADE,
     FOREIGN KEY (fk_id_zona) REFERENCES zonas(pk_id_zona) ON DELETE RESTRICT ON UPDATE CASCADE,
     CONSTRAINT chk_codigo_postal CHECK (codigo_postal ~ '^[0-9]{5}$')
-) WITH (FILLFACTOR = 90);
\ No newline at end of file
+) WITH (FILLFACTOR = 90);
+
+/**
+ * @table dataset_version
+ * @description Marca de la versión de los datos cargados (una sola fila). La reescribe cada carga
+ * (carga directa, carga orquestada y delta.sql) y los clientes la consultan para invalidar sus cachés.
+ */
+CREATE TABLE dataset_version (
+    pk_id SMALLINT PRIMARY KEY DEFAULT 1,
+    version VARCHAR(32) NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT chk_dataset_version_unica CHECK (pk_id = 1)
+);
\ No newline at end of file
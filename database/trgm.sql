@@ -0,0 +1,21 @@
+/**
+ * @file trgm.sql
+ * @description Índice de trigramas para la búsqueda por nombre (opcional). Requiere la extensión
+ *              pg_trgm (paquete contrib) y se aplica después de indexes.sql y views.sql.
+ *              Sin este índice, search_settlements_by_name funciona igual con un recorrido secuencial.
+ */
+
+/**
+ * @extension pg_trgm
+ * @description Operadores de trigramas para índices GIN sobre texto.
+ */
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+/**
+ * @index idx_vm_codigos_postales_nombre_asentamiento_trgm
+ * @description Índice GIN de trigramas (pg_trgm) para búsquedas por nombre de asentamiento con
+ *              ILIKE '%término%' en la vista materializada (search_settlements_by_name); un índice
+ *              btree no sirve para patrones que empiezan con comodín.
+ */
+CREATE INDEX IF NOT EXISTS idx_vm_codigos_postales_nombre_asentamiento_trgm
+ON vm_codigos_postales USING gin (nombre_asentamiento gin_trgm_ops);
@@ -0,0 +1,90 @@
+/**
+ * @file unaccent.sql
+ * @description Búsqueda por nombre sin distinguir acentos (opcional). Requiere las extensiones unaccent
+ *              y pg_trgm (paquete contrib) y se aplica después de indexes.sql, views.sql y functions.sql.
+ */
+
+/**
+ * @extension pg_trgm
+ * @description Operadores de trigramas para el índice GIN sobre el nombre sin acentos.
+ */
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+/**
+ * @extension unaccent
+ * @description Diccionario para eliminar acentos ('Álvaro Obregón' -> 'Alvaro Obregon').
+ */
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+/**
+ * @function: f_unaccent
+ * @description: Envoltura IMMUTABLE de unaccent (que es STABLE) para poder indexar la expresión.
+ *               Fija el diccionario para que el resultado no dependa de search_path.
+ * @param p_text: Texto a normalizar.
+ * @returns: Texto sin acentos.
+ */
+CREATE OR REPLACE FUNCTION f_unaccent(p_text TEXT)
+RETURNS TEXT AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, p_text);
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+/**
+ * @index idx_vm_codigos_postales_nombre_asentamiento_unaccent_trgm
+ * @description Índice GIN de trigramas sobre el nombre sin acentos para search_settlements_by_name_unaccent.
+ */
+CREATE INDEX IF NOT EXISTS idx_vm_codigos_postales_nombre_asentamiento_unaccent_trgm
+ON vm_codigos_postales USING gin (f_unaccent(nombre_asentamiento) gin_trgm_ops);
+
+/**
+ * @function: search_settlements_by_name_unaccent
+ * @description: Como search_settlements_by_name, pero sin distinguir acentos ni mayúsculas
+ *               ('alvaro obregon' encuentra 'Álvaro Obregón'). Mismas columnas, orden y validaciones.
+ * @param p_query: Término de búsqueda (máx. 100 caracteres).
+ * @param p_limit: Límite de registros por página (1-100).
+ * @param p_offset: Desplazamiento para paginación (>=0).
+ * @returns: Tabla con estructura PostalCodeRecord (CHAR para códigos).
+ */
+CREATE OR REPLACE FUNCTION search_settlements_by_name_unaccent(
+    p_query VARCHAR(100),
+    p_limit INTEGER,
+    p_offset INTEGER
+)
+RETURNS TABLE (
+    codigo_postal CHAR(5),
+    nombre_asentamiento VARCHAR(100),
+    tipo_asentamiento VARCHAR(50),
+    zona VARCHAR(20),
+    codigo_estado CHAR(2),
+    nombre_estado VARCHAR(50),
+    pk_codigo_municipio CHAR(3),
+    nombre_municipio VARCHAR(50),
+    pk_codigo_ciudad CHAR(2),
+    nombre_ciudad VARCHAR(50)
+) AS $$
+BEGIN
+    IF p_limit < 1 OR p_limit > 100 THEN
+        RAISE EXCEPTION 'El límite debe estar entre 1 y 100';
+    END IF;
+    IF p_offset < 0 THEN
+        RAISE EXCEPTION 'El offset debe ser mayor o igual a 0';
+    END IF;
+
+    RETURN QUERY EXECUTE '
+    SELECT
+        vm.codigo_postal,
+        vm.nombre_asentamiento,
+        vm.nombre_tipo_asentamiento AS tipo_asentamiento,
+        vm.nombre_zona AS zona,
+        vm.codigo_estado,
+        vm.nombre_estado,
+        vm.codigo_municipio AS pk_codigo_municipio,
+        vm.nombre_municipio,
+        vm.codigo_ciudad AS pk_codigo_ciudad,
+        vm.nombre_ciudad
+    FROM vm_codigos_postales vm
+    WHERE f_unaccent(vm.nombre_asentamiento) ILIKE f_unaccent($1)
+    ORDER BY vm.nombre_asentamiento
+    LIMIT $2 OFFSET $3'
+    USING '%' || p_query || '%', p_limit, p_offset;
+END;
+$$ LANGUAGE plpgsql;
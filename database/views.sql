@@ -6,11 +6,13 @@
 /**
  * @view vm_codigos_postales
  * @description Vista materializada que precomputa los joins más comunes para consultas de códigos postales.
+ *              id_codigo_postal sirve de desempate en la paginación por cursor (funciones *_keyset).
  */
 CREATE MATERIALIZED VIEW vm_codigos_postales
 WITH (FILLFACTOR = 90)
 AS
 SELECT
+    cp.pk_id_codigo_postal AS id_codigo_postal,
     cp.codigo_postal,
     cp.nombre_asentamiento,
     ta.nombre_tipo_asentamiento,
@@ -26,7 +28,8 @@ JOIN estados e ON cp.fk_codigo_estado = e.pk_codigo_estado
 JOIN tipos_asentamiento ta ON cp.fk_codigo_tipo_asentamiento = ta.pk_codigo_tipo_asentamiento
 JOIN zonas z ON cp.fk_id_zona = z.pk_id_zona
 LEFT JOIN municipios m ON cp.fk_codigo_municipio = m.pk_codigo_municipio AND cp.fk_codigo_estado = m.fk_codigo_estado
-LEFT JOIN ciudades c ON cp.fk_codigo_ciudad = c.pk_codigo_ciudad AND cp.fk_codigo_estado = c.fk_codigo_estado
+LEFT JOIN ciudades c ON cp.fk_codigo_ciudad = c.pk_codigo_ciudad AND cp.fk_codigo_estado = c.fk_codigo_estado;
 
--- Refrescar la vista materializada
-REFRESH MATERIALIZED VIEW vm_codigos_postales;
\ No newline at end of file
+-- La vista se puebla al crearse. Tras recargar datos se refresca sin bloquear a los lectores
+-- (requiere el índice único idx_vm_codigos_postales_id_codigo_postal de indexes.sql):
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY vm_codigos_postales;
\ No newline at end of file
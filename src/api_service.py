@@ -0,0 +1,451 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .config import (
+    LOG_FILE,
+    LOG_FORMAT,
+    OUTPUT_DIR,
+    DATABASE_URL,
+    BINARY_SNAPSHOT_FILENAME,
+    SQLITE_FILENAME,
+    API_HOST,
+    API_PORT,
+    API_BACKEND,
+    API_DEFAULT_LIMIT,
+    API_CACHE_SIZE,
+    API_CACHE_TTL_SECONDS,
+    API_POOL_SIZE,
+)
+from .pg_client import RECORD_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Tamaño máximo de la línea de petición y las cabeceras
+MAX_HEADER_BYTES = 16384
+
+# Respuesta: código de estado HTTP y cuerpo JSON ya codificado
+Response = Tuple[int, bytes]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+@dataclass(frozen=True)
+class Route:
+    """Endpoint de la API v2 y la función de database/functions.sql que lo respalda."""
+    pattern: re.Pattern
+    function: str
+    query: Tuple[str, ...] = ()   # Parámetros obligatorios de la query string, tras los de la ruta
+    paginated: bool = False       # Añade `limit` y `offset` a los argumentos
+    single: bool = False          # `data` es un objeto (404 si la función no devuelve filas)
+
+
+def _route(path: str, function: str, **options: Any) -> Route:
+    return Route(re.compile(path.replace("{}", "([^/]+)")), function, **options)
+
+
+# Los 14 endpoints de docs/SEPOMEX_V2.md, en su orden
+ROUTES: List[Route] = [
+    _route("/api/v2/postal/search", "search_settlements_by_name", query=("q",), paginated=True),
+    _route("/api/v2/postal/codigo/{}", "search_by_postal_code"),
+    _route("/api/v2/postal/estado/{}", "get_postal_codes_by_state", paginated=True),
+    _route("/api/v2/postal/municipio/{}/{}", "get_postal_codes_by_municipality", paginated=True),
+    _route("/api/v2/postal/ciudad/{}/{}", "get_postal_codes_by_city", paginated=True),
+    _route("/api/v2/estado", "get_all_states"),
+    _route("/api/v2/estado/{}", "get_state_by_id", single=True),
+    _route("/api/v2/estado/{}/cities", "get_cities_by_state"),
+    _route("/api/v2/estado/{}/municipios", "get_municipalities_by_state"),
+    _route("/api/v2/estado/{}/asentamientos", "get_postal_codes_by_state", paginated=True),
+    _route("/api/v2/cities", "get_all_cities"),
+    _route("/api/v2/cities/{}/{}", "get_city_by_id", single=True),
+    _route("/api/v2/cities/{}/{}/colonias", "get_settlements_by_city", paginated=True),
+    _route("/api/v2/cities/{}/{}/codigos", "get_postal_codes_by_city", paginated=True),
+]
+
+
+def _json_response(status: int, message: str, data: Any = None) -> Response:
+    """Cuerpo con la forma de la API v2: `success`, `message` y `data`."""
+    body = {"success": status == 200, "message": message}
+    if status == 200:
+        body["data"] = data
+    return status, json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Caché LRU de respuestas con caducidad y agrupación de peticiones en curso.
+
+    Una clave ausente o caducada se calcula una sola vez: las peticiones
+    iguales que llegan mientras tanto esperan el mismo resultado en lugar de
+    repetir la consulta al backend (single-flight). Solo se guardan las
+    respuestas deterministas (códigos menores que 500). Todo ocurre en el
+    hilo del bucle de eventos, por lo que no necesita bloqueos.
+    """
+
+    def __init__(self, max_entries: int = API_CACHE_SIZE, ttl_seconds: float = API_CACHE_TTL_SECONDS) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Response]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Response]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Response]]
+    ) -> Tuple[Response, str]:
+        """
+        Devuelve la respuesta de `key`, calculándola con `compute` si hace falta.
+
+        Returns:
+            Tuple[Response, str]: Respuesta y su origen ("HIT", "MISS" o "COALESCED").
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], "HIT"
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            origin = "COALESCED"
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(key, compute))
+            self._inflight[key] = task
+            origin = "MISS"
+        # shield: si el cliente que inició el cálculo se desconecta, los demás siguen esperándolo
+        return await asyncio.shield(task), origin
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Response]]) -> Response:
+        try:
+            response = await compute()
+        finally:
+            del self._inflight[key]
+        if response[0] < 500 and self.max_entries > 0:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+class LookupBackend:
+    """
+    Backend sobre un objeto con los métodos de `PostalLookup`.
+
+    Sirve para la consulta construida en memoria, la instantánea binaria
+    mapeada y `SQLiteLookup`. Las consultas en memoria tardan microsegundos y
+    se ejecutan en el propio bucle de eventos; con `blocking=True` (SQLite)
+    se ejecutan en un único hilo aparte, que además serializa el uso de la
+    conexión.
+    """
+
+    def __init__(self, lookup: Any, blocking: bool = False) -> None:
+        self.lookup = lookup
+        self._executor = ThreadPoolExecutor(max_workers=1) if blocking else None
+
+    async def call(self, function: str, args: Tuple) -> List[Any]:
+        method = getattr(self.lookup, function)
+        if self._executor is None:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if hasattr(self.lookup, "close"):
+            self.lookup.close()
+
+
+class PostgresBackend:
+    """
+    Backend que llama a las funciones de database/functions.sql.
+
+    Mantiene un pool fijo de conexiones asíncronas en modo autocommit (una
+    cola de conexiones libres) que preparan cada consulta en el servidor,
+    como `pg_client.ConnectionPool`; una conexión rota se reemplaza al tomarla.
+    Los errores de validación de las funciones (`RAISE EXCEPTION`) se
+    convierten en ValueError, como en `PostalLookup`.
+    """
+
+    def __init__(self, dsn: str = DATABASE_URL, pool_size: int = API_POOL_SIZE) -> None:
+        self.dsn = dsn
+        self.pool_size = pool_size
+        self._pool: "asyncio.Queue" = asyncio.Queue()
+
+    async def open(self) -> bool:
+        """Abre las conexiones del pool. Devuelve False si falta psycopg o no hay conexión."""
+        try:
+            import psycopg
+        except ImportError:
+            logger.error("El backend PostgreSQL requiere el paquete 'psycopg' (pip install -r requirements.txt).")
+            return False
+        try:
+            for _ in range(self.pool_size):
+                conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True, prepare_threshold=0)
+                self._pool.put_nowait(conn)
+        except psycopg.Error as e:
+            logger.error(f"No se pudo conectar a PostgreSQL: {e}")
+            await self.close()
+            return False
+        return True
+
+    async def call(self, function: str, args: Tuple) -> List[Any]:
+        import psycopg
+
+        conn = await self._pool.get()
+        try:
+            if conn.broken:
+                await conn.close()
+                conn = await psycopg.AsyncConnection.connect(self.dsn, autocommit=True, prepare_threshold=0)
+            placeholders = ", ".join(["%s"] * len(args))
+            cur = await conn.execute(f"SELECT * FROM {function}({placeholders})", args)
+            rows = await cur.fetchall()
+        except psycopg.errors.RaiseException as e:
+            raise ValueError(e.diag.message_primary) from e
+        finally:
+            self._pool.put_nowait(conn)
+        record_type = RECORD_TYPES[function]
+        return [record_type(*row) for row in rows]
+
+    async def close(self) -> None:
+        while not self._pool.empty():
+            await self._pool.get_nowait().close()
+
+
+class ApiService:
+    """
+    Servicio HTTP/1.1 con los endpoints `/api/v2/...` de docs/SEPOMEX_V2.md.
+
+    Implementado sobre `asyncio.start_server`, sin dependencias externas:
+    atiende solo GET, mantiene las conexiones abiertas (keep-alive) y
+    responde JSON con `success`, `message` y `data`. La clave de la caché es
+    la función y sus argumentos ya validados, de modo que rutas equivalentes
+    (`/postal/estado/{id}` y `/estado/{id}/asentamientos`) comparten entradas.
+    La cabecera `X-Cache` indica si la respuesta vino de la caché.
+    """
+
+    def __init__(
+        self, backend: Any, cache: Optional[ResponseCache] = None, default_limit: int = API_DEFAULT_LIMIT
+    ) -> None:
+        self.backend = backend
+        self.cache = cache if cache is not None else ResponseCache()
+        self.default_limit = default_limit
+
+    def _resolve(self, path: str, query: Dict[str, List[str]]) -> Tuple[Optional[Route], Tuple]:
+        """Ruta y argumentos de la función; ValueError si faltan parámetros o no son enteros."""
+        for route in ROUTES:
+            match = route.pattern.fullmatch(path)
+            if match is None:
+                continue
+            args = [unquote(value) for value in match.groups()]
+            for name in route.query:
+                if name not in query:
+                    raise ValueError(f"Falta el parámetro '{name}'")
+                args.append(query[name][0])
+            if route.paginated:
+                for name, default in (("limit", self.default_limit), ("offset", 0)):
+                    try:
+                        args.append(int(query[name][0]) if name in query else default)
+                    except ValueError:
+                        raise ValueError(f"El parámetro '{name}' debe ser un entero") from None
+            return route, tuple(args)
+        return None, ()
+
+    async def _execute(self, route: Route, args: Tuple) -> Response:
+        try:
+            records = await self.backend.call(route.function, args)
+        except ValueError as e:
+            return _json_response(400, str(e))
+        except Exception:
+            logger.exception(f"Error en {route.function}{args}")
+            return _json_response(500, "Error interno del servidor.")
+        if route.single:
+            if not records:
+                return _json_response(404, "Recurso no encontrado.")
+            return _json_response(200, "Consulta exitosa.", vars(records[0]))
+        return _json_response(200, "Consulta exitosa.", [vars(record) for record in records])
+
+    async def handle(self, method: str, target: str) -> Tuple[Response, str]:
+        """
+        Atiende una petición.
+
+        Args:
+            method (str): Método HTTP.
+            target (str): Ruta con query string.
+
+        Returns:
+            Tuple[Response, str]: Respuesta y origen para `X-Cache` ("HIT", "MISS", "COALESCED" o "BYPASS").
+        """
+        if method != "GET":
+            return _json_response(405, "Método no permitido."), "BYPASS"
+        url = urlsplit(target)
+        try:
+            route, args = self._resolve(url.path.rstrip("/") or "/", parse_qs(url.query))
+        except ValueError as e:
+            return _json_response(400, str(e)), "BYPASS"
+        if route is None:
+            return _json_response(404, "Ruta no encontrada."), "BYPASS"
+        return await self.cache.get_or_compute((route.function, args), lambda: self._execute(route, args))
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                request_line = lines[0].split(" ")
+                if len(request_line) != 3:
+                    break
+                method, target, version = request_line
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+                if headers.get("content-length", "0") not in ("", "0"):
+                    await reader.readexactly(int(headers["content-length"]))
+                connection = headers.get("connection", "")
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                (status, body), origin = await self.handle(method, target)
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"X-Cache: {origin}\r\n"
+                        + ("Allow: GET\r\n" if status == 405 else "")
+                        + f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = API_HOST, port: int = API_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._serve_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+async def open_backend(name: str, path: Optional[Path] = None, dsn: str = DATABASE_URL,
+                       pool_size: int = API_POOL_SIZE, input_paths: Optional[List[Path]] = None) -> Optional[Any]:
+    """
+    Abre el backend indicado.
+
+    Args:
+        name (str): "memory" (construye la consulta desde los archivos fuente),
+            "binary" (instantánea binaria), "sqlite" (base de --export sqlite) o "postgres".
+        path (Optional[Path]): Archivo de "binary" o "sqlite" (por defecto el del directorio de salida).
+        dsn (str): Cadena de conexión de "postgres".
+        pool_size (int): Conexiones de "postgres".
+        input_paths (Optional[List[Path]]): Archivos fuente de "memory".
+
+    Returns:
+        Optional[Any]: Backend, o None si no se pudo abrir.
+    """
+    if name == "memory":
+        from .lookup import load_lookup
+
+        lookup = load_lookup(input_paths)
+        return LookupBackend(lookup) if lookup is not None else None
+    if name == "binary":
+        from .binary_snapshot import open_binary_snapshot
+
+        lookup = open_binary_snapshot(path or OUTPUT_DIR / BINARY_SNAPSHOT_FILENAME)
+        return LookupBackend(lookup) if lookup is not None else None
+    if name == "sqlite":
+        from .sqlite_lookup import open_sqlite_lookup
+
+        lookup = open_sqlite_lookup(path or OUTPUT_DIR / SQLITE_FILENAME)
+        return LookupBackend(lookup, blocking=True) if lookup is not None else None
+    if name == "postgres":
+        backend = PostgresBackend(dsn, pool_size)
+        return backend if await backend.open() else None
+    raise ValueError(f"Backend desconocido: {name}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Interpreta los argumentos de línea de comandos (los valores por defecto vienen de config.py)."""
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de la API v2 de SEPOMEX.")
+    parser.add_argument(
+        "--backend", choices=["memory", "binary", "sqlite", "postgres"], default=API_BACKEND,
+        help="Origen de los datos.",
+    )
+    parser.add_argument("--input", type=Path, nargs="+", help="Archivos fuente del backend memory.")
+    parser.add_argument("--path", type=Path, help="Archivo de los backends binary y sqlite.")
+    parser.add_argument("--dsn", default=DATABASE_URL, help="Cadena de conexión del backend postgres.")
+    parser.add_argument("--pool-size", type=int, default=API_POOL_SIZE, help="Conexiones del backend postgres.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--cache-size", type=int, default=API_CACHE_SIZE, help="Respuestas en caché (0 = sin caché).")
+    parser.add_argument("--cache-ttl", type=float, default=API_CACHE_TTL_SECONDS, help="Segundos de vida de cada respuesta.")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> int:
+    backend = await open_backend(args.backend, args.path, args.dsn, args.pool_size, args.input)
+    if backend is None:
+        logger.error(f"No se pudo abrir el backend {args.backend}.")
+        return 1
+    service = ApiService(backend, ResponseCache(args.cache_size, args.cache_ttl))
+    server = await service.start(args.host, args.port)
+    logger.info(f"API v2 ({args.backend}) escuchando en http://{args.host}:{args.port}/api/v2/")
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        logger.info(f"Caché de respuestas: {service.cache.stats()}")
+        await backend.close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada del servicio."""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(LOG_FILE, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    try:
+        return asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
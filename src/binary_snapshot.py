@@ -0,0 +1,211 @@
+import numpy as np
+import json
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .lookup import PostalLookup, StringTable
+
+logger = logging.getLogger(__name__)
+
+# Firma y versión del formato; un cambio de estructura incrementa la versión
+MAGIC = b"SEPOMEXB"
+BINARY_SNAPSHOT_VERSION = 1
+# Cabecera fija: firma, versión y longitud de la cabecera JSON
+_PREFIX = struct.Struct("<8sII")
+# Alineación de cada sección (una línea de caché)
+ALIGNMENT = 64
+
+# Registro de codigos_postales de ancho fijo (16 bytes); municipio y ciudad son -1 si son NULL
+RECORD_DTYPE = np.dtype([
+    ("codigo_postal", "<i4"),
+    ("nombre", "<i4"),          # Identificador en la tabla de cadenas
+    ("estado", "u1"),
+    ("tipo", "u1"),
+    ("zona", "u1"),
+    ("reservado", "u1"),
+    ("municipio", "<i2"),
+    ("ciudad", "<i2"),
+])
+# Entrada de catálogo (8 bytes); `estado` es 0 en los catálogos que no dependen del estado
+CATALOG_DTYPE = np.dtype([("estado", "<i2"), ("codigo", "<i2"), ("nombre", "<i4")])
+
+# Columnas de PostalLookup que se guardan dentro del registro
+_RECORD_FIELDS = {
+    "codigo": "codigo_postal", "name_id": "nombre", "estado": "estado", "tipo": "tipo",
+    "zona": "zona", "municipio": "municipio", "ciudad": "ciudad",
+}
+_KEYED_CATALOGS = ("municipios", "ciudades")
+
+
+def _catalog_entries(catalog: Dict, keyed: bool) -> List[Tuple[int, int, str]]:
+    """Entradas (estado, código, nombre) de un catálogo, en su orden (el de los empates de los listados)."""
+    if keyed:
+        return [(estado, code, name) for (estado, code), name in catalog.items()]
+    return [(0, code, name) for code, name in catalog.items()]
+
+
+def _sections(lookup: PostalLookup) -> Dict[str, np.ndarray]:
+    """
+    Secciones del archivo: registros, índices, tabla de cadenas y catálogos.
+
+    La tabla de cadenas es compartida: une los nombres de asentamiento y los
+    de los catálogos, ordenados. Como los nombres de asentamiento ya estaban
+    ordenados, su nuevo identificador conserva el orden y `by_name` no cambia;
+    `name_starts` se recalcula sobre la tabla compartida.
+    """
+    catalogs = lookup.catalogs()
+    entries = {
+        name: _catalog_entries(catalog, name in _KEYED_CATALOGS) for name, catalog in catalogs.items()
+    }
+    names = list(lookup.names)
+    strings = sorted(set(names).union(name for rows in entries.values() for _, _, name in rows))
+    string_ids = {value: i for i, value in enumerate(strings)}
+    table = StringTable(strings)
+
+    remap = np.array([string_ids[name] for name in names], dtype=np.int32)
+    name_id = remap[lookup.name_id]
+    records = np.zeros(len(lookup), dtype=RECORD_DTYPE)
+    for column, field in _RECORD_FIELDS.items():
+        records[field] = name_id if column == "name_id" else getattr(lookup, column)
+
+    sections: Dict[str, np.ndarray] = {"records": records}
+    for name, array in lookup.arrays().items():
+        if name not in _RECORD_FIELDS:
+            sections[name] = array
+    sections["name_starts"] = np.searchsorted(
+        name_id[lookup.by_name], np.arange(len(strings) + 1)
+    ).astype(np.int32)
+    sections["strings.offsets"] = table.offsets
+    sections["strings.data"] = np.frombuffer(table.data, dtype=np.uint8)
+    for name, rows in entries.items():
+        sections[name] = np.array(
+            [(estado, code, string_ids[value]) for estado, code, value in rows], dtype=CATALOG_DTYPE
+        )
+    return sections
+
+
+def write_binary_snapshot(lookup: PostalLookup, path: Path) -> bool:
+    """
+    Guarda la consulta en memoria en el formato binario mapeable.
+
+    El archivo empieza con la firma, la versión y una cabecera JSON con la
+    posición, el tipo y la longitud de cada sección; las secciones van
+    alineadas a ALIGNMENT bytes para poder usarlas directamente desde el mapa.
+    Se escribe en un archivo temporal y se renombra, de modo que los procesos
+    que tienen mapeada la versión anterior la siguen leyendo completa.
+
+    Args:
+        lookup (PostalLookup): Consulta construida (o ya mapeada).
+        path (Path): Ruta del archivo.
+
+    Returns:
+        bool: True si se guardó correctamente.
+    """
+    sections = _sections(lookup)
+    layout: Dict[str, Dict] = {}
+    offset = 0
+    for name, array in sections.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {"offset": offset, "count": len(array), "dtype": np.lib.format.dtype_to_descr(array.dtype)}
+        offset += array.nbytes
+    header = json.dumps({"records": len(lookup), "sections": layout}).encode("utf-8")
+    # Las posiciones de la cabecera son relativas al inicio de los datos, tras la cabecera alineada
+    data_start = -(-(_PREFIX.size + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, BINARY_SNAPSHOT_VERSION, len(header)))
+            f.write(header)
+            for name, array in sections.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+        tmp_path.replace(path)
+        logger.info(f"Instantánea binaria guardada en {path} ({path.stat().st_size / (1024 * 1024):.1f} MB)")
+        return True
+    except Exception:
+        logger.exception(f"Error al guardar la instantánea binaria {path}")
+        return False
+
+
+def _read_layout(buffer: mmap.mmap, path: Path) -> Optional[Tuple[int, Dict]]:
+    """Valida firma y versión; devuelve el inicio de los datos y la cabecera JSON."""
+    if len(buffer) < _PREFIX.size:
+        logger.warning(f"{path} no es una instantánea binaria (archivo demasiado corto).")
+        return None
+    magic, version, header_length = _PREFIX.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        logger.warning(f"{path} no es una instantánea binaria (firma inválida).")
+        return None
+    if version != BINARY_SNAPSHOT_VERSION:
+        logger.warning(
+            f"La instantánea binaria {path} tiene la versión {version} (se esperaba {BINARY_SNAPSHOT_VERSION}); se ignora."
+        )
+        return None
+    header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + header_length]))
+    return -(-(_PREFIX.size + header_length) // ALIGNMENT) * ALIGNMENT, header
+
+
+def open_binary_snapshot(path: Path) -> Optional[PostalLookup]:
+    """
+    Abre una instantánea binaria como `PostalLookup`, sin copiar los arreglos.
+
+    El archivo se mapea en modo de solo lectura y cada arreglo es una vista
+    del mapa (las columnas de los registros son vistas con paso de 16 bytes),
+    por lo que abrirlo solo lee la cabecera y los catálogos; las páginas se
+    cargan al consultarlas y el sistema operativo las comparte entre todos
+    los procesos que mapean el mismo archivo.
+
+    Args:
+        path (Path): Ruta del archivo.
+
+    Returns:
+        Optional[PostalLookup]: Consulta, o None si el archivo no existe o no es válido.
+    """
+    if not path.is_file():
+        logger.warning(f"No existe la instantánea binaria {path}.")
+        return None
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        parsed = _read_layout(buffer, path)
+        if parsed is None:
+            buffer.close()
+            return None
+        data_start, header = parsed
+        sections = {
+            name: np.frombuffer(
+                buffer,
+                dtype=np.lib.format.descr_to_dtype(
+                    [tuple(field) for field in spec["dtype"]] if isinstance(spec["dtype"], list) else spec["dtype"]
+                ),
+                count=spec["count"],
+                offset=data_start + spec["offset"],
+            )
+            for name, spec in header["sections"].items()
+        }
+    except (OSError, ValueError, KeyError):
+        logger.exception(f"Error al abrir la instantánea binaria {path}")
+        return None
+
+    offsets = sections.pop("strings.offsets")
+    data = memoryview(sections.pop("strings.data"))
+    strings = StringTable.from_buffers(offsets, data)
+    catalogs: Dict[str, Dict] = {}
+    for name in ("estados", "municipios", "ciudades", "tipos_asentamiento", "zonas"):
+        rows = sections.pop(name).tolist()
+        if name in _KEYED_CATALOGS:
+            catalogs[name] = {(estado, code): strings[value] for estado, code, value in rows}
+        else:
+            catalogs[name] = {code: strings[value] for _, code, value in rows}
+
+    records = sections.pop("records")
+    arrays = {column: records[field] for column, field in _RECORD_FIELDS.items()}
+    arrays.update(sections)
+    lookup = PostalLookup.from_arrays(catalogs, strings, arrays)
+    logger.info(f"Instantánea binaria mapeada desde {path}: {len(lookup)} asentamientos.")
+    return lookup
@@ -0,0 +1,245 @@
+import pandas as pd
+import numpy as np
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .models import (
+    Estado,
+    Municipio,
+    Ciudad,
+    TipoAsentamiento,
+)
+
+logger = logging.getLogger(__name__)
+
+# Columnas normalizadas que participan en algún catálogo
+CATALOG_COLUMNS = [
+    "codigo_estado", "nombre_estado",
+    "codigo_municipio", "nombre_municipio",
+    "codigo_ciudad", "nombre_ciudad",
+    "codigo_tipo_asentamiento", "nombre_tipo_asentamiento",
+]
+
+
+@dataclass(frozen=True)
+class CatalogTables:
+    """
+    Catálogos derivados del DataFrame normalizado.
+
+    Cada atributo es None cuando faltan las columnas fuente necesarias.
+    """
+    estados: Optional[List[Estado]]
+    municipios: Optional[List[Municipio]]
+    ciudades: Optional[List[Ciudad]]
+    tipos_asentamiento: Optional[List[TipoAsentamiento]]
+
+
+def _has_columns(df: pd.DataFrame, columns: List[str]) -> bool:
+    """Indica si el DataFrame contiene todas las columnas indicadas."""
+    return all(col in df.columns for col in columns)
+
+
+def _first_valid(combos: pd.DataFrame, key_cols: List[str], name_col: str) -> pd.DataFrame:
+    """
+    Selecciona, por cada clave, la primera combinación con códigos válidos y nombre no vacío.
+
+    Args:
+        combos (pd.DataFrame): Combinaciones distintas en orden de primera aparición.
+        key_cols (List[str]): Columnas de código que forman la clave del catálogo.
+        name_col (str): Columna con el nombre limpio.
+
+    Returns:
+        pd.DataFrame: Filas seleccionadas en orden de primera aparición.
+    """
+    mask = combos[name_col] != ""
+    for col in key_cols:
+        mask &= combos[col].notna()
+    return combos.loc[mask].drop_duplicates(subset=key_cols, keep="first")
+
+
+def _catalog_combos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce un DataFrame a sus combinaciones distintas de columnas de catálogo.
+
+    Conserva el orden de primera aparición y, si existe, el mínimo de
+    `orden_tipo_asentamiento` de cada combinación. Es idempotente: aplicarla a
+    la concatenación de combinaciones de varios bloques da el mismo resultado
+    que aplicarla a los bloques concatenados.
+
+    Args:
+        df (pd.DataFrame): DataFrame normalizado o combinaciones previas.
+
+    Returns:
+        pd.DataFrame: Combinaciones distintas.
+    """
+    present = [col for col in CATALOG_COLUMNS if col in df.columns]
+    if not present:
+        return pd.DataFrame()
+    combos = df[present].drop_duplicates()
+    if "orden_tipo_asentamiento" in df.columns:
+        # Mínimo por combinación sobre rangos enteros (el mínimo sobre cadenas no es vectorizado)
+        rank, uniques = pd.factorize(df["orden_tipo_asentamiento"], sort=True)
+        rank = np.where(rank < 0, len(uniques), rank)
+        group = df.groupby(present, sort=False, dropna=False).ngroup().to_numpy()
+        min_rank = pd.Series(rank).groupby(group).min().to_numpy()
+        lookup = np.append(uniques.to_numpy(dtype=object), np.array([np.nan], dtype=object))
+        combos = combos.assign(orden_tipo_asentamiento=lookup[min_rank])
+    return combos.reset_index(drop=True)
+
+
+def _catalogs_from_combos(combos: pd.DataFrame) -> CatalogTables:
+    """
+    Construye los catálogos a partir de las combinaciones distintas.
+
+    Semántica por catálogo:
+        - estados, municipios, ciudades: gana la primera combinación con código
+          válido y nombre no vacío.
+        - tipos_asentamiento: gana el nombre menor según el `d_tipo_asenta`
+          original (`orden_tipo_asentamiento`) y el catálogo sale en ese orden.
+
+    Args:
+        combos (pd.DataFrame): Combinaciones distintas (ver `_catalog_combos`).
+
+    Returns:
+        CatalogTables: Catálogos extraídos.
+    """
+    estados = None
+    if _has_columns(combos, ["codigo_estado", "nombre_estado"]):
+        rows = _first_valid(combos, ["codigo_estado"], "nombre_estado")
+        estados = [
+            Estado(pk_codigo_estado=codigo, nombre_estado=nombre)
+            for codigo, nombre in zip(rows["codigo_estado"], rows["nombre_estado"])
+        ]
+
+    municipios = None
+    if _has_columns(combos, ["codigo_municipio", "codigo_estado", "nombre_municipio"]):
+        rows = _first_valid(combos, ["codigo_municipio", "codigo_estado"], "nombre_municipio")
+        municipios = [
+            Municipio(
+                pk_codigo_municipio=codigo_mnpio,
+                fk_codigo_estado=codigo_estado,
+                nombre_municipio=nombre
+            )
+            for codigo_mnpio, codigo_estado, nombre in zip(
+                rows["codigo_municipio"], rows["codigo_estado"], rows["nombre_municipio"]
+            )
+        ]
+
+    ciudades = None
+    if _has_columns(combos, ["codigo_ciudad", "codigo_estado", "nombre_ciudad"]):
+        rows = _first_valid(combos, ["codigo_ciudad", "codigo_estado"], "nombre_ciudad")
+        ciudades = [
+            Ciudad(
+                pk_codigo_ciudad=codigo_ciudad,
+                fk_codigo_estado=codigo_estado,
+                nombre_ciudad=nombre
+            )
+            for codigo_ciudad, codigo_estado, nombre in zip(
+                rows["codigo_ciudad"], rows["codigo_estado"], rows["nombre_ciudad"]
+            )
+        ]
+
+    tipos_asentamiento = None
+    if _has_columns(combos, ["codigo_tipo_asentamiento", "nombre_tipo_asentamiento", "orden_tipo_asentamiento"]):
+        rows = _first_valid(
+            combos.sort_values(by="orden_tipo_asentamiento", kind="stable", na_position="last"),
+            ["codigo_tipo_asentamiento"],
+            "nombre_tipo_asentamiento",
+        )
+        tipos_asentamiento = [
+            TipoAsentamiento(
+                pk_codigo_tipo_asentamiento=codigo,
+                nombre_tipo_asentamiento=nombre
+            )
+            for codigo, nombre in zip(rows["codigo_tipo_asentamiento"], rows["nombre_tipo_asentamiento"])
+        ]
+
+    return CatalogTables(
+        estados=estados,
+        municipios=municipios,
+        ciudades=ciudades,
+        tipos_asentamiento=tipos_asentamiento,
+    )
+
+
+class CatalogAccumulator:
+    """
+    Acumula los catálogos bloque a bloque para la lectura por bloques (streaming).
+
+    Solo retiene las combinaciones distintas de columnas de catálogo, por lo que
+    la memoria no depende del número de registros leídos. Las combinaciones de
+    los bloques nuevos se reducen junto con las acumuladas cuando igualan su
+    número, de modo que cada combinación se reagrupa pocas veces.
+    """
+
+    def __init__(self) -> None:
+        self._combos: Optional[pd.DataFrame] = None
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Incorpora un bloque del DataFrame normalizado.
+
+        Args:
+            df (pd.DataFrame): Bloque normalizado (ver `normalize_dataframe`).
+        """
+        self._add(_catalog_combos(df))
+
+    def merge(self, other: "CatalogAccumulator") -> None:
+        """
+        Incorpora las combinaciones de otro acumulador (p. ej. el de un lote procesado en un worker).
+
+        Args:
+            other (CatalogAccumulator): Acumulador de bloques posteriores a los ya incorporados.
+        """
+        other._reduce()
+        if other._combos is not None:
+            self._add(other._combos)
+
+    def _add(self, combos: pd.DataFrame) -> None:
+        """Deja pendientes las combinaciones de un bloque y reduce si igualan a las acumuladas."""
+        self._pending.append(combos)
+        self._pending_rows += len(combos)
+        if self._pending_rows >= (len(self._combos) if self._combos is not None else 0):
+            self._reduce()
+
+    def _reduce(self) -> None:
+        """Reduce las combinaciones pendientes junto con las acumuladas."""
+        if not self._pending:
+            return
+        frames = ([self._combos] if self._combos is not None else []) + self._pending
+        # Una sola reducción previa basta: `_catalog_combos` es idempotente
+        self._combos = frames[0] if len(frames) == 1 else _catalog_combos(pd.concat(frames, ignore_index=True))
+        self._pending, self._pending_rows = [], 0
+        logger.debug(f"Extracción de catálogos: {len(self._combos)} combinaciones distintas acumuladas.")
+
+    def result(self) -> CatalogTables:
+        """
+        Devuelve los catálogos de todos los bloques incorporados.
+
+        Returns:
+            CatalogTables: Catálogos extraídos.
+        """
+        self._reduce()
+        return _catalogs_from_combos(self._combos if self._combos is not None else pd.DataFrame())
+
+
+def extract_catalogs(df: pd.DataFrame) -> CatalogTables:
+    """
+    Extrae en una sola pasada los catálogos estados, municipios, ciudades y tipos_asentamiento.
+
+    Se agrupa una única vez por todas las columnas de catálogo (en orden de primera
+    aparición), de modo que cada catálogo se deduplica sobre unas pocas miles de
+    combinaciones en lugar de sobre todos los registros (ver `_catalogs_from_combos`).
+
+    Args:
+        df (pd.DataFrame): DataFrame normalizado (ver `normalize_dataframe`).
+
+    Returns:
+        CatalogTables: Catálogos extraídos.
+    """
+    accumulator = CatalogAccumulator()
+    accumulator.update(df)
+    return accumulator.result()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Rutas principales (relativas a la raíz del proyecto)
@@ -36,6 +37,79 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
 # Configuración de procesamiento
 BATCH_SIZE_CODIGOS_POSTALES = 10000
+# Máximo de filas por sentencia INSERT (0 = un único INSERT por archivo)
+MAX_ROWS_PER_INSERT = 0
+# Máximo de filas por archivo SQL (0 = un archivo por tabla; si no, partes numeradas)
+MAX_ROWS_PER_FILE = 0
+# Manifiesto de los archivos SQL generados (orden de carga y partes)
+SQL_MANIFEST_FILENAME = "manifest.json"
+# Procesos para generar los lotes de codigos_postales (1 = en serie)
+WORKERS_CODIGOS_POSTALES = 1
+# Entradas máximas por caché de memoización de clean_text/format_codigo/normalize_zona
+MEMO_CACHE_SIZE = 200000
+# Muestras (fila, valor) conservadas por cada regla del diagnóstico de datos
+DIAGNOSTIC_SAMPLES = 5
+# Registrar en el log cada fila con incidencias (además del resumen final)
+VERBOSE_DIAGNOSTICS = False
+# Métricas por etapa de cada ejecución (se escriben junto a los archivos generados)
+METRICS_FILENAME = "pipeline_metrics.json"
+# Registros por bloque de lectura (0 = leer el archivo completo en memoria)
+READ_CHUNK_SIZE = 0
+
+# Formato de salida: "sql" (INSERT) o "copy" (COPY ... FROM STDIN)
+OUTPUT_FORMAT = "sql"
+# Formato de los datos COPY: "text" o "csv"
+COPY_FORMAT = "text"
+
+# Carga directa a PostgreSQL (--output-format db)
+DATABASE_URL = os.environ.get(
+    "SEPOMEX_DATABASE_URL", "postgresql://postgres@localhost:5432/sepomex_psql_db_v2"
+)
+BATCH_SIZE_DB_LOAD = 10000
+
+# Carga orquestada de los archivos generados (python -m src.parallel_loader)
+DATABASE_DIR = BASE_DIR / "database"
+# Conexiones simultáneas para las partes de codigos_postales y la creación de índices
+LOAD_WORKERS = 4
+# Memoria por sesión para construir índices (maintenance_work_mem)
+INDEX_MAINTENANCE_WORK_MEM = "256MB"
+
+# Validación de la entrada: las filas rechazadas se listan en REJECTS_FILE (archivo, fila, campo, motivo)
+VALIDATE_INPUT = True
+REJECTS_FILE = DATA_DIR / "rechazos_validacion.csv"
+
+# Caché del DataFrame normalizado (se invalida si cambian los archivos fuente o la configuración)
+CACHE_DIR = DATA_DIR / "cache"
+USE_INPUT_CACHE = True
+
+# Instantánea de la salida normalizada de la ejecución anterior (modo delta)
+SNAPSHOT_PATH = DATA_DIR / "snapshots" / "sepomex_snapshot.pkl"
+
+# Instantánea binaria para consultas mapeadas en memoria (--binary-snapshot; ver binary_snapshot.py)
+BINARY_SNAPSHOT_FILENAME = "sepomex_lookup.bin"
+WRITE_BINARY_SNAPSHOT = False
+
+# Exportaciones con la forma de vm_codigos_postales (--export; ver exporters.py)
+EXPORT_TARGETS = []  # "parquet", "jsonl" y/o "sqlite"
+PARQUET_DIRNAME = "vm_codigos_postales_parquet"  # Particionado por fk_codigo_estado; requiere pyarrow
+PARQUET_COMPRESSION = "zstd"
+JSONL_FILENAME = "vm_codigos_postales.jsonl"
+SQLITE_FILENAME = "sepomex.sqlite"  # Base autocontenida con FTS5 (ver sqlite_lookup.py)
+
+# Servicio HTTP de la API v2 (python -m src.api_service; ver docs/SEPOMEX_V2.md)
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+API_BACKEND = "memory"  # "memory", "binary", "sqlite" o "postgres"
+API_DEFAULT_LIMIT = 20  # limit de los endpoints paginados cuando la petición no lo indica
+API_CACHE_SIZE = 10000  # Respuestas en la caché LRU (0 = sin caché; las peticiones iguales en curso se agrupan igual)
+API_CACHE_TTL_SECONDS = 300
+API_POOL_SIZE = 4  # Conexiones del backend PostgreSQL
+
+# Cliente de las funciones de functions.sql (ver pg_client.py)
+PG_POOL_SIZE = 4  # Conexiones máximas del pool
+PG_POOL_TIMEOUT_SECONDS = 30.0  # Espera máxima por una conexión libre
+PG_CACHE_SIZE = 10000  # Resultados en la caché del cliente (0 = sin caché)
+PG_VERSION_CHECK_SECONDS = 5.0  # Cada cuánto se relee dataset_version (lo más que se sirve un resultado tras una recarga)
 
 # Longitudes máximas permitidas por el esquema v2 (para validación)
 MAX_LEN_NOMBRE = 50
@@ -0,0 +1,401 @@
+import pandas as pd
+import csv
+import io
+import logging
+from dataclasses import astuple
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .config import (
+    OUTPUT_DIR,
+    ZONAS_MAP,
+    BATCH_SIZE_CODIGOS_POSTALES,
+    WORKERS_CODIGOS_POSTALES,
+)
+from .models import (
+    Estado,
+    Municipio,
+    Ciudad,
+    TipoAsentamiento,
+)
+from .data_normalizer import CP_TABLE_COLUMNS, select_cp_records
+from .worker_pipeline import WorkerPipeline
+from .utils import BatchStream, map_batches
+from .metrics import TimedBatch, record_batch
+
+logger = logging.getLogger(__name__)
+
+COPY_FORMATS = ("text", "csv")
+COPY_NULL = "\\N"
+
+# --- Funciones auxiliares para escribir datos COPY ---
+
+def unescape_sql_literal(value: str) -> str:
+    """
+    Revierte el escapado de comillas simples que `clean_text` aplica para SQL.
+
+    Así el valor cargado por COPY es idéntico al que se obtiene al ejecutar
+    los archivos INSERT.
+    """
+    return value.replace("''", "'")
+
+
+def _copy_text_field(value: Any) -> str:
+    """
+    Formatea un valor para el formato `text` de COPY.
+
+    Args:
+        value (Any): Valor a formatear (None se escribe como NULL).
+
+    Returns:
+        str: Valor escapado según las reglas de COPY (barra invertida, tab, saltos de línea).
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return COPY_NULL
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_csv_field(value: Any) -> str:
+    """Formatea un valor para el formato `csv` de COPY (None se escribe como NULL)."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return COPY_NULL
+    return str(value)
+
+
+def _copy_statement(table_name: str, columns: List[str], copy_format: str) -> str:
+    """Construye la sentencia COPY ... FROM STDIN para el formato indicado."""
+    cols_sql = ", ".join(columns)
+    if copy_format == "csv":
+        return f"COPY {table_name} ({cols_sql}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}');\n"
+    return f"COPY {table_name} ({cols_sql}) FROM STDIN;\n"
+
+
+def format_copy_text(rows: Iterable[Sequence[Any]]) -> str:
+    """
+    Formatea filas como bloque de datos en formato `text` de COPY.
+
+    Args:
+        rows (Iterable[Sequence[Any]]): Filas a formatear.
+
+    Returns:
+        str: Líneas separadas por tabuladores, terminadas en salto de línea.
+    """
+    return "".join("\t".join(_copy_text_field(v) for v in row) + "\n" for row in rows)
+
+
+def format_copy_rows(rows: Iterable[Sequence[Any]], copy_format: str) -> str:
+    """
+    Formatea filas como bloque de datos COPY en el formato indicado.
+
+    Args:
+        rows (Iterable[Sequence[Any]]): Filas a formatear.
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        str: Bloque de datos listo para escribirse tras la sentencia COPY.
+    """
+    if copy_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([_copy_csv_field(v) for v in row] for row in rows)
+        return buffer.getvalue()
+    return format_copy_text(rows)
+
+
+def _write_copy_file(
+    filepath: Path,
+    table_name: str,
+    columns: List[str],
+    rows: List[Sequence[Any]],
+    entity_name: str,
+    copy_format: str,
+) -> int:
+    """
+    Escribe un archivo SQL con BEGIN/COMMIT y un bloque COPY ... FROM STDIN con los datos.
+
+    El archivo puede ejecutarse directamente con `psql -f`.
+
+    Args:
+        filepath (Path): Ruta completa del archivo a generar.
+        table_name (str): Nombre de la tabla SQL.
+        columns (List[str]): Lista de nombres de columnas.
+        rows (List[Sequence[Any]]): Filas de valores sin escapar.
+        entity_name (str): Nombre de la entidad (para logging, ej: "estados").
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        int: Número de registros escritos en el archivo.
+    """
+    try:
+        with open(filepath, "w", encoding="utf-8", errors="ignore", newline="") as f:
+            f.write("BEGIN;\n")
+            if rows:
+                f.write(_copy_statement(table_name, columns, copy_format))
+                f.write(format_copy_rows(rows, copy_format))
+                count = len(rows)
+                f.write("\\.\n")
+                logger.info(f"Generado COPY ({copy_format}) para {count} {entity_name} en {filepath.name}")
+            else:
+                count = 0
+                f.write(f"-- No se encontraron {entity_name} válidos\n")
+                logger.warning(f"No se encontraron {entity_name} válidos para generar {filepath.name}")
+            f.write("COMMIT;\n")
+        return count
+    except IOError:
+        logger.exception(f"Error al escribir el archivo COPY {filepath.name}")
+        return 0
+    except Exception:
+        logger.exception(f"Error inesperado al generar COPY para {entity_name}")
+        return 0
+
+
+def catalog_copy_rows(records: List[Any]) -> List[Tuple[Any, ...]]:
+    """Convierte registros de catálogo (dataclasses) en filas COPY sin escapado SQL."""
+    return [
+        tuple(unescape_sql_literal(v) if isinstance(v, str) else v for v in astuple(r))
+        for r in records
+    ]
+
+
+def cp_copy_rows(records: pd.DataFrame) -> List[Tuple[Any, ...]]:
+    """
+    Convierte registros de codigos_postales (ver `select_cp_records`) en filas COPY sin escapado SQL.
+    """
+    records = records.assign(
+        nombre_asentamiento=records["nombre_asentamiento"].str.replace("''", "'", regex=False)
+    )
+    return list(records.itertuples(index=False, name=None))
+
+
+def _process_cp_copy_batch(df_batch: pd.DataFrame, copy_format: str) -> Tuple[str, int, int]:
+    """
+    Procesa un lote del DataFrame normalizado para generar datos COPY de codigos_postales.
+
+    Args:
+        df_batch (pd.DataFrame): Lote del DataFrame normalizado a procesar.
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        Tuple[str, int, int]: Bloque de datos COPY, registros escritos y errores.
+    """
+    records, errores_batch = select_cp_records(df_batch)
+    rows = cp_copy_rows(records)
+    return format_copy_rows(rows, copy_format), len(rows), errores_batch
+
+# --- Generadores COPY para cada tabla ---
+
+def generate_estados_copy(estados_data: Optional[List[Estado]], copy_format: str = "text") -> int:
+    """
+    Genera el archivo COPY para la tabla 'estados'.
+
+    Args:
+        estados_data (Optional[List[Estado]]): Catálogo de estados (ver `extract_catalogs`).
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        int: Número de estados escritos.
+    """
+    filepath = OUTPUT_DIR / "001_copy_estados.sql"
+    if estados_data is None:
+        logger.error("Faltan columnas 'c_estado' o 'd_estado' para generar estados.")
+        estados_data = []
+    return _write_copy_file(
+        filepath,
+        "estados",
+        ["pk_codigo_estado", "nombre_estado"],
+        catalog_copy_rows(estados_data),
+        "estados",
+        copy_format,
+    )
+
+
+def generate_municipios_copy(municipios_data: Optional[List[Municipio]], copy_format: str = "text") -> int:
+    """
+    Genera el archivo COPY para la tabla 'municipios'.
+
+    Args:
+        municipios_data (Optional[List[Municipio]]): Catálogo de municipios (ver `extract_catalogs`).
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        int: Número de municipios escritos.
+    """
+    filepath = OUTPUT_DIR / "002_copy_municipios.sql"
+    if municipios_data is None:
+        logger.error("Faltan columnas ['c_mnpio', 'c_estado', 'D_mnpio'] para generar municipios.")
+        municipios_data = []
+    return _write_copy_file(
+        filepath,
+        "municipios",
+        ["pk_codigo_municipio", "fk_codigo_estado", "nombre_municipio"],
+        catalog_copy_rows(municipios_data),
+        "municipios",
+        copy_format,
+    )
+
+
+def generate_tipos_asentamiento_copy(
+    tipos_data: Optional[List[TipoAsentamiento]], copy_format: str = "text"
+) -> int:
+    """
+    Genera el archivo COPY para la tabla 'tipos_asentamiento'.
+
+    Args:
+        tipos_data (Optional[List[TipoAsentamiento]]): Catálogo de tipos de asentamiento
+            (ver `extract_catalogs`).
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        int: Número de tipos de asentamiento escritos.
+    """
+    filepath = OUTPUT_DIR / "003_copy_tipos_asentamiento.sql"
+    if tipos_data is None:
+        logger.error("Faltan columnas ['c_tipo_asenta', 'd_tipo_asenta'] para generar tipos de asentamiento.")
+        tipos_data = []
+    return _write_copy_file(
+        filepath,
+        "tipos_asentamiento",
+        ["pk_codigo_tipo_asentamiento", "nombre_tipo_asentamiento"],
+        catalog_copy_rows(tipos_data),
+        "tipos de asentamiento",
+        copy_format,
+    )
+
+
+def generate_zonas_copy(copy_format: str = "text") -> int:
+    """
+    Genera el archivo COPY para la tabla 'zonas' con valores fijos.
+
+    Args:
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        int: Número de zonas escritas (siempre 3 si tiene éxito).
+    """
+    filepath = OUTPUT_DIR / "004_copy_zonas.sql"
+    rows = [(pk_id, nombre) for nombre, pk_id in ZONAS_MAP.items()]
+    return _write_copy_file(
+        filepath,
+        "zonas",
+        ["pk_id_zona", "nombre_zona"],
+        rows,
+        "zonas",
+        copy_format,
+    )
+
+
+def generate_ciudades_copy(ciudades_data: Optional[List[Ciudad]], copy_format: str = "text") -> int:
+    """
+    Genera el archivo COPY para la tabla 'ciudades'.
+
+    Args:
+        ciudades_data (Optional[List[Ciudad]]): Catálogo de ciudades (ver `extract_catalogs`).
+        copy_format (str): 'text' o 'csv'.
+
+    Returns:
+        int: Número de ciudades escritas.
+    """
+    filepath = OUTPUT_DIR / "005_copy_ciudades.sql"
+    if ciudades_data is None:
+        logger.warning("Faltan columnas ['c_cve_ciudad', 'c_estado', 'd_ciudad'] para generar ciudades. El archivo estará vacío.")
+        ciudades_data = []
+    return _write_copy_file(
+        filepath,
+        "ciudades",
+        ["pk_codigo_ciudad", "fk_codigo_estado", "nombre_ciudad"],
+        catalog_copy_rows(ciudades_data),
+        "ciudades",
+        copy_format,
+    )
+
+
+def generate_codigos_postales_copy(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    copy_format: str = "text",
+    workers: int = WORKERS_CODIGOS_POSTALES,
+    pipeline: Optional[WorkerPipeline] = None,
+) -> Tuple[int, int]:
+    """
+    Genera el archivo COPY para la tabla 'codigos_postales', procesando en lotes.
+
+    Acepta el DataFrame completo o una secuencia de bloques normalizados (modo por
+    bloques). Con `workers > 1` los lotes se procesan en un pool de procesos y se
+    escriben en su orden original, por lo que el archivo es idéntico al del modo serie.
+    Con `pipeline`, los bloques llegan sin procesar y cada lote se valida y
+    normaliza en el propio worker.
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame normalizado
+            completo o bloques normalizados (ver `normalize_dataframe`); con
+            `pipeline`, bloques tal como se leen del archivo fuente.
+        copy_format (str): 'text' o 'csv'.
+        workers (int): Número de procesos para procesar los lotes.
+        pipeline (Optional[WorkerPipeline]): Validación y normalización en los workers.
+
+    Returns:
+        Tuple[int, int]: Tupla con (registros escritos, número de errores).
+    """
+    filepath = OUTPUT_DIR / "006_copy_codigos_postales.sql"
+    batches = BatchStream(data, BATCH_SIZE_CODIGOS_POSTALES)
+    if pipeline is not None:
+        ready = not pipeline.missing_columns(batches.columns)
+    else:
+        ready = "es_valido" in batches.columns
+    if not ready:
+        logger.error("Faltan columnas ['d_codigo', 'd_asenta', 'c_estado', 'c_tipo_asenta'] para generar códigos postales.")
+        _write_copy_file(filepath, "codigos_postales", [], [], "códigos postales", copy_format)
+        return 0, batches.drain()
+
+    total_inserted = 0
+    total_errors = 0
+
+    try:
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
+            f.write("BEGIN;\n")
+            f.write(_copy_statement("codigos_postales", CP_TABLE_COLUMNS, copy_format))
+
+            logger.info(
+                f"Procesando {batches.describe()} en lotes de tamaño "
+                f"{BATCH_SIZE_CODIGOS_POSTALES} ({workers} proceso(s))..."
+            )
+
+            process_batch = partial(_process_cp_copy_batch, copy_format=copy_format)
+            if pipeline is not None:
+                process_batch = pipeline.task(process_batch)
+            batch_results = map_batches(TimedBatch(process_batch), batches, workers)
+            for i, (result, batch_metrics) in enumerate(batch_results):
+                if pipeline is not None:
+                    result = pipeline.merge(result, batch_metrics.rows_in)
+                block, escritos_batch, errores_batch = result
+                logger.debug(f"Procesado lote {i+1} ({batches.rows} registros leídos).")
+                batch_metrics.rows_out, batch_metrics.errors = escritos_batch, errores_batch
+                record_batch(batch_metrics)
+                total_errors += errores_batch
+                total_inserted += escritos_batch
+                f.write(block)
+
+            f.write("\\.\n")
+            if total_inserted > 0:
+                logger.info(f"Generado COPY ({copy_format}) para {total_inserted} códigos postales.")
+            else:
+                logger.warning(f"No se encontraron códigos postales válidos para generar {filepath.name}")
+            f.write("COMMIT;\n")
+
+        if total_errors > 0:
+            logger.warning(f"Se encontraron {total_errors} errores durante el procesamiento de códigos postales.")
+
+        return total_inserted, total_errors
+
+    except IOError:
+        logger.exception(f"Error al escribir el archivo COPY {filepath.name}")
+        return total_inserted, total_errors + (batches.total_rows() - total_inserted - total_errors)
+    except Exception:
+        logger.exception("Error inesperado al generar COPY para códigos postales")
+        return total_inserted, total_errors + (batches.total_rows() - total_inserted - total_errors)
@@ -0,0 +1,254 @@
+import pandas as pd
+import numpy as np
+import logging
+from typing import Callable, Dict, Optional, Tuple, Any
+
+from .config import (
+    MAX_LEN_NOMBRE,
+    MAX_LEN_NOMBRE_ASENTAMIENTO,
+    ZONAS_MAP,
+    DEFAULT_ZONA_ID,
+    DEFAULT_ZONA_NAME,
+    REGEX_CODIGO_POSTAL,
+    REGEX_CODIGO_ESTADO,
+    REGEX_CODIGO_MUNICIPIO,
+    REGEX_CODIGO_CIUDAD,
+    REGEX_CODIGO_TIPO_ASENTA,
+)
+from .utils import C1_TRANSLATOR, MemoCache, _format_codigo, memo_cache
+from .diagnostics import diagnostics
+
+logger = logging.getLogger(__name__)
+
+# Columnas de códigos: columna normalizada -> (columna fuente, dígitos, regex)
+CODE_COLUMNS: Dict[str, Tuple[str, int, str]] = {
+    "codigo_postal": ("d_codigo", 5, REGEX_CODIGO_POSTAL),
+    "codigo_estado": ("c_estado", 2, REGEX_CODIGO_ESTADO),
+    "codigo_municipio": ("c_mnpio", 3, REGEX_CODIGO_MUNICIPIO),
+    "codigo_ciudad": ("c_cve_ciudad", 2, REGEX_CODIGO_CIUDAD),
+    "codigo_tipo_asentamiento": ("c_tipo_asenta", 2, REGEX_CODIGO_TIPO_ASENTA),
+}
+
+# Columnas de nombres: columna normalizada -> (columna fuente, longitud máxima)
+NAME_COLUMNS: Dict[str, Tuple[str, int]] = {
+    "nombre_asentamiento": ("d_asenta", MAX_LEN_NOMBRE_ASENTAMIENTO),
+    "nombre_estado": ("d_estado", MAX_LEN_NOMBRE),
+    "nombre_municipio": ("D_mnpio", MAX_LEN_NOMBRE),
+    "nombre_ciudad": ("d_ciudad", MAX_LEN_NOMBRE),
+    "nombre_tipo_asentamiento": ("d_tipo_asenta", MAX_LEN_NOMBRE),
+}
+
+# Columnas normalizadas requeridas para que un registro de codigos_postales sea evaluable
+CP_REQUIRED_COLUMNS = [
+    "codigo_postal", "nombre_asentamiento", "codigo_estado", "codigo_tipo_asentamiento"
+]
+# Columnas fuente de las que se derivan las de CP_REQUIRED_COLUMNS
+CP_SOURCE_COLUMNS = [{**CODE_COLUMNS, **NAME_COLUMNS}[column][0] for column in CP_REQUIRED_COLUMNS]
+
+
+def _map_unique(
+    series: pd.Series,
+    func: Callable[[pd.Series], pd.Series],
+    na_value: Any,
+    memo: Optional[MemoCache] = None,
+) -> np.ndarray:
+    """
+    Aplica una transformación vectorizada solo sobre los valores distintos de una columna.
+
+    Las columnas de SEPOMEX repiten mucho sus valores, por lo que transformar los
+    únicos y reindexar con los códigos de `pd.factorize` evita trabajo redundante.
+    Con `memo`, además se reutilizan los resultados ya calculados en la ejecución
+    (otras columnas, otros bloques de lectura o la validación).
+
+    Args:
+        series (pd.Series): Columna fuente.
+        func (Callable[[pd.Series], pd.Series]): Transformación sobre una serie sin nulos.
+        na_value (Any): Valor a asignar a las filas nulas.
+        memo (Optional[MemoCache]): Caché de memoización de `func`.
+
+    Returns:
+        np.ndarray: Arreglo (dtype object) alineado con `series`.
+    """
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    mapped = memo.map_values(uniques, func) if memo is not None else func(uniques).tolist()
+    # El código -1 (nulo) toma el último elemento, que es `na_value`
+    return np.array(mapped + [na_value], dtype=object)[codes]
+
+
+def _collapse_whitespace(values: pd.Series) -> pd.Series:
+    """Equivalente vectorizado de `" ".join(text.split())`."""
+    return values.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def clean_text_series(values: pd.Series, max_length: int) -> pd.Series:
+    """
+    Versión vectorizada de `utils.clean_text` para una serie sin nulos.
+
+    Args:
+        values (pd.Series): Valores a limpiar.
+        max_length (int): Longitud máxima permitida.
+
+    Returns:
+        pd.Series: Textos limpios, escapados y truncados.
+    """
+    result = values.map(str).str.translate(C1_TRANSLATOR)
+    result = result.str.encode("utf-8", errors="ignore").str.decode("utf-8")
+    result = _collapse_whitespace(result).str.slice(stop=max_length)
+    for old, new in (("'", "''"), ('"', '""'), ("\\", "/")):
+        result = result.str.replace(old, new, regex=False)
+    return result.str.slice(stop=max_length)
+
+
+def format_codigo_series(values: pd.Series, digits: int) -> pd.Series:
+    """
+    Versión vectorizada de `utils.format_codigo` para una serie sin nulos.
+
+    Los valores compuestos solo por dígitos ASCII se formatean con operaciones
+    de cadena; el resto (decimales, negativos, basura) se delega a `utils._format_codigo`.
+
+    Args:
+        values (pd.Series): Códigos a formatear.
+        digits (int): Número de dígitos esperados.
+
+    Returns:
+        pd.Series: Códigos formateados o None si no son formateables.
+    """
+    stripped = values.map(str).str.strip()
+    is_plain = stripped.str.fullmatch(r"[0-9]+").fillna(False).astype(bool)
+
+    result = pd.Series([None] * len(values), index=values.index, dtype=object)
+    plain = stripped[is_plain].str.lstrip("0").replace("", "0")
+    result[is_plain] = plain.str.zfill(digits)
+    result[~is_plain] = [_format_codigo(v, digits) for v in values[~is_plain]]
+    return result
+
+
+def normalize_zona_series(values: pd.Series) -> pd.Series:
+    """
+    Versión vectorizada de `utils.normalize_zona` para una serie sin nulos.
+
+    Args:
+        values (pd.Series): Textos originales de zona.
+
+    Returns:
+        pd.Series: Nombres de zona normalizados.
+    """
+    zona = _collapse_whitespace(values.map(str)).str.title()
+    return zona.where(zona.isin(["Urbano", "Rural"]), DEFAULT_ZONA_NAME)
+
+
+def _codes_matching(codes: pd.Series, pattern: str) -> pd.Series:
+    """Indica qué códigos formateados cumplen el patrón (los nulos no cumplen)."""
+    matches = _map_unique(codes, lambda u: u.str.match(pattern), False)
+    return pd.Series(matches, index=codes.index, dtype=bool)
+
+
+def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza una sola vez el DataFrame fuente al modelo canónico v2.
+
+    Produce códigos con ceros a la izquierda, nombres limpios/escapados/truncados
+    y el `fk_id_zona` resuelto, conservando el índice original. Los códigos que no
+    cumplen su regex quedan como None. Solo se generan las columnas cuyas
+    columnas fuente existen, salvo `fk_id_zona` que siempre está presente.
+
+    Columnas adicionales:
+        - `orden_tipo_asentamiento`: `d_tipo_asenta` original, usado como clave
+          de orden para elegir el nombre de cada tipo de asentamiento.
+        - `es_valido`: el registro puede insertarse en codigos_postales.
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos fuente.
+
+    Returns:
+        pd.DataFrame: DataFrame normalizado.
+    """
+    logger.info(f"Normalizando {len(df)} registros...")
+    normalized = pd.DataFrame(index=df.index)
+    cp_required_invalid = pd.Series(False, index=df.index)
+
+    for column, (source, digits, pattern) in CODE_COLUMNS.items():
+        if source not in df.columns:
+            continue
+        codes = pd.Series(
+            _map_unique(
+                df[source], lambda u: format_codigo_series(u, digits), None, memo_cache("format_codigo", digits)
+            ),
+            index=df.index,
+            dtype=object,
+        )
+        matches = _codes_matching(codes, pattern)
+        invalid = codes.notna() & ~matches
+        diagnostics().add(source, "FORMATO", invalid, df[source])
+        if column in CP_REQUIRED_COLUMNS:
+            cp_required_invalid |= invalid
+        normalized[column] = codes.where(~invalid, None)
+
+    for column, (source, max_length) in NAME_COLUMNS.items():
+        if source not in df.columns:
+            continue
+        normalized[column] = _map_unique(
+            df[source], lambda u: clean_text_series(u, max_length), "", memo_cache("clean_text", max_length)
+        )
+
+    if "d_tipo_asenta" in df.columns:
+        # Clave de orden comparable entre bloques de lectura (ver `CatalogAccumulator`)
+        normalized["orden_tipo_asentamiento"] = df["d_tipo_asenta"]
+
+    if "d_zona" in df.columns:
+        zonas = _map_unique(df["d_zona"], normalize_zona_series, DEFAULT_ZONA_NAME, memo_cache("normalize_zona"))
+        normalized["fk_id_zona"] = (
+            pd.Series(zonas, index=df.index).map(ZONAS_MAP).fillna(DEFAULT_ZONA_ID).astype(int)
+        )
+    else:
+        normalized["fk_id_zona"] = DEFAULT_ZONA_ID
+
+    if all(col in normalized.columns for col in CP_REQUIRED_COLUMNS):
+        empty_names = normalized["nombre_asentamiento"] == ""
+        diagnostics().add("d_asenta", "VACIO", empty_names, df["d_asenta"])
+        normalized["es_valido"] = ~cp_required_invalid & ~empty_names
+
+    logger.info("Normalización completada.")
+    return normalized
+
+
+# Columnas de la tabla codigos_postales en el orden del esquema v2
+CP_TABLE_COLUMNS = [
+    "codigo_postal", "nombre_asentamiento", "fk_codigo_estado",
+    "fk_codigo_municipio", "fk_codigo_ciudad", "fk_codigo_tipo_asentamiento",
+    "fk_id_zona"
+]
+
+
+def select_cp_records(df_batch: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Selecciona los registros insertables de un lote normalizado de codigos_postales.
+
+    Args:
+        df_batch (pd.DataFrame): Lote del DataFrame normalizado.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: Registros válidos con las columnas de la tabla
+        (`CP_TABLE_COLUMNS`; las FKs opcionales ausentes quedan como None) y el
+        número de registros descartados.
+    """
+    valid = df_batch["es_valido"]
+    errores = int((~valid).sum())
+
+    rows = df_batch[valid]
+    missing = pd.Series([None] * len(rows), index=rows.index, dtype=object)
+    records = pd.DataFrame(
+        {
+            "codigo_postal": rows["codigo_postal"],
+            "nombre_asentamiento": rows["nombre_asentamiento"],
+            "fk_codigo_estado": rows["codigo_estado"],
+            "fk_codigo_municipio": rows.get("codigo_municipio", missing),
+            "fk_codigo_ciudad": rows.get("codigo_ciudad", missing),
+            "fk_codigo_tipo_asentamiento": rows["codigo_tipo_asentamiento"],
+            "fk_id_zona": rows["fk_id_zona"],
+        },
+        index=rows.index,
+        columns=CP_TABLE_COLUMNS,
+    )
+    return records, errores
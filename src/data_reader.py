@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import logging
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from .config import (
     INPUT_FILE_PATH,
@@ -12,59 +14,161 @@ from .config import (
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
 
+# Archivos de la última lectura: (índice global de su primer registro, nombre), para ubicar los rechazos
+_SOURCES: List[Tuple[int, str]] = []
 
-def read_sepomex_data() -> Optional[pd.DataFrame]:
+
+def _register_source(start: int, filepath: Path) -> None:
+    """Anota dónde empieza un archivo en el índice global; el primer archivo reinicia la lista."""
+    if start == 0:
+        _SOURCES.clear()
+    _SOURCES.append((start, Path(filepath).name))
+
+
+def source_lines(index: pd.Index) -> pd.DataFrame:
+    """
+    Archivo y línea (contando el encabezado) de registros con el índice global de la última lectura.
+
+    Con varios archivos el índice es continuo entre ellos (`read_sepomex_data`
+    los concatena y la lectura por bloques continúa la numeración), pero la
+    línea se cuenta desde el inicio del archivo de cada registro. Sin una
+    lectura previa (un DataFrame construido en memoria) se supone un único
+    archivo sin nombre.
+
+    Args:
+        index (pd.Index): Índice global de los registros.
+
+    Returns:
+        pd.DataFrame: Columnas `archivo` y `fila`, en el orden de `index`.
+    """
+    positions = np.asarray(index, dtype=np.int64)
+    if not _SOURCES:
+        return pd.DataFrame({"archivo": "", "fila": positions + 2})
+    starts = np.array([start for start, _ in _SOURCES], dtype=np.int64)
+    names = np.array([name for _, name in _SOURCES], dtype=object)
+    # Un archivo vacío comparte inicio con el siguiente: side="right" elige el último
+    source = np.searchsorted(starts, positions, side="right") - 1
+    return pd.DataFrame({"archivo": names[source], "fila": positions - starts[source] + 2})
+
+
+def _read_csv_options() -> Dict[str, Any]:
+    """Opciones de `pd.read_csv` comunes a la lectura completa y a la lectura por bloques."""
+    # Definir tipos de datos para columnas de códigos para asegurar que se lean como strings
+    dtype_map = {
+        col: str for col in INPUT_COLUMNS_V2
+        if col.startswith('c_') or col == 'd_codigo'
+    }
+    return dict(
+        sep=FILE_SEPARATOR,
+        encoding=FILE_ENCODING,
+        usecols=lambda c: c in INPUT_COLUMNS_V2,
+        dtype=dtype_map,
+    )
+
+
+def _warn_missing_columns(columnas_cargadas: List[str]) -> None:
+    """Avisa de las columnas esenciales ausentes (excepto d_zona que es opcional)."""
+    columnas_faltantes = [
+        col for col in INPUT_COLUMNS_V2
+        if col not in columnas_cargadas and col != 'd_zona'
+    ]
+    if columnas_faltantes:
+        logger.warning("Faltan columnas esenciales en el archivo fuente:")
+        for col in columnas_faltantes:
+            logger.warning(f"  - {col}")
+
+
+def read_sepomex_data(filepaths: Sequence[Path] = (INPUT_FILE_PATH,)) -> Optional[pd.DataFrame]:
     """
     Lee el archivo de datos original de SEPOMEX.
 
     Utiliza la configuración definida en config.py para la ruta, codificación,
-    separador y columnas a leer.
+    separador y columnas a leer. Si se indican varios archivos (p. ej. varias
+    publicaciones históricas), se concatenan en el orden dado.
+
+    Args:
+        filepaths (Sequence[Path]): Archivos a leer.
 
     Returns:
         Optional[pd.DataFrame]: DataFrame con los datos leídos o None si ocurre un error.
     """
-    try:
-        logger.info(f"Iniciando lectura del archivo: {INPUT_FILE_PATH}")
-
-        # Definir tipos de datos para columnas de códigos para asegurar que se lean como strings
-        dtype_map = {
-            col: str for col in INPUT_COLUMNS_V2
-            if col.startswith('c_') or col == 'd_codigo'
-        }
-
-        df = pd.read_csv(
-            INPUT_FILE_PATH,
-            sep=FILE_SEPARATOR,
-            encoding=FILE_ENCODING,
-            usecols=lambda c: c in INPUT_COLUMNS_V2,
-            dtype=dtype_map,
-            low_memory=False,
-        )
-
-        logger.info(f"Lectura completada. {len(df)} registros leídos.")
-        logger.debug(f"Columnas cargadas: {df.columns.tolist()}")
-
-        # Verificar si faltan columnas esenciales (excepto d_zona que es opcional)
-        columnas_cargadas = df.columns.tolist()
-        columnas_faltantes = [
-            col for col in INPUT_COLUMNS_V2
-            if col not in columnas_cargadas and col != 'd_zona'
-        ]
-        if columnas_faltantes:
-            logger.warning("Faltan columnas esenciales en el archivo fuente:")
-            for col in columnas_faltantes:
-                logger.warning(f"  - {col}")
-
-        return df
-
-    except FileNotFoundError:
-        logger.exception(f"Error crítico: Archivo no encontrado en {INPUT_FILE_PATH}")
-        return None
-    except ValueError as ve:
-        logger.exception("Error de valor durante la lectura (¿columnas faltantes?)")
-        logger.error(f"Detalle: {ve}")
-        logger.error(f"Columnas esperadas: {INPUT_COLUMNS_V2}")
+    frames = []
+    offset = 0
+    for filepath in filepaths:
+        try:
+            logger.info(f"Iniciando lectura del archivo: {filepath}")
+            _register_source(offset, filepath)
+
+            df = pd.read_csv(filepath, low_memory=False, **_read_csv_options())
+
+            logger.info(f"Lectura completada. {len(df)} registros leídos.")
+            logger.debug(f"Columnas cargadas: {df.columns.tolist()}")
+
+            # Verificar si faltan columnas esenciales
+            _warn_missing_columns(df.columns.tolist())
+            frames.append(df)
+            offset += len(df)
+
+        except FileNotFoundError:
+            logger.exception(f"Error crítico: Archivo no encontrado en {filepath}")
+            return None
+        except ValueError as ve:
+            logger.exception("Error de valor durante la lectura (¿columnas faltantes?)")
+            logger.error(f"Detalle: {ve}")
+            logger.error(f"Columnas esperadas: {INPUT_COLUMNS_V2}")
+            return None
+        except Exception as e:
+            logger.exception("Error inesperado durante la lectura del archivo.")
+            return None
+
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _iter_chunks(filepaths: Sequence[Path], chunksize: int) -> Iterator[pd.DataFrame]:
+    """Genera los bloques de todos los archivos, en orden, con un índice global continuo."""
+    offset = 0
+    for filepath in filepaths:
+        logger.info(f"Iniciando lectura por bloques de {chunksize} registros: {filepath}")
+        _register_source(offset, filepath)
+        leidos = 0
+        try:
+            with pd.read_csv(filepath, chunksize=chunksize, **_read_csv_options()) as reader:
+                for i, chunk in enumerate(reader):
+                    if i == 0:
+                        logger.debug(f"Columnas cargadas: {chunk.columns.tolist()}")
+                        _warn_missing_columns(chunk.columns.tolist())
+                    chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                    offset += len(chunk)
+                    leidos += len(chunk)
+                    yield chunk
+        except Exception:
+            logger.exception(f"Error durante la lectura por bloques de {filepath} ({leidos} registros leídos).")
+            raise
+        logger.info(f"Lectura completada. {leidos} registros leídos de {filepath}.")
+
+
+def read_sepomex_chunks(
+    chunksize: int, filepaths: Sequence[Path] = (INPUT_FILE_PATH,)
+) -> Optional[Iterator[pd.DataFrame]]:
+    """
+    Lee los archivos de SEPOMEX por bloques de `chunksize` registros (modo streaming).
+
+    Solo hay un bloque en memoria a la vez, por lo que el consumo de memoria
+    depende del tamaño de bloque y no del tamaño de los archivos. Los archivos se
+    comprueban antes de empezar; un error a mitad de lectura se registra y se propaga.
+
+    Args:
+        chunksize (int): Registros por bloque.
+        filepaths (Sequence[Path]): Archivos a leer, en orden.
+
+    Returns:
+        Optional[Iterator[pd.DataFrame]]: Iterador de bloques o None si algún archivo no existe.
+    """
+    faltantes = [filepath for filepath in filepaths if not Path(filepath).is_file()]
+    if faltantes:
+        for filepath in faltantes:
+            logger.error(f"Error crítico: Archivo no encontrado en {filepath}")
         return None
-    except Exception as e:
-        logger.exception("Error inesperado durante la lectura del archivo.")
-        return None 
\ No newline at end of file
+    return _iter_chunks(filepaths, chunksize)
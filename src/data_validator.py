@@ -1,7 +1,8 @@
 import pandas as pd
-import re
+import csv
 import logging
-from typing import Any
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 from .config import (
     MAX_LEN_NOMBRE,
@@ -11,156 +12,201 @@ from .config import (
     REGEX_CODIGO_MUNICIPIO,
     REGEX_CODIGO_CIUDAD,
     REGEX_CODIGO_TIPO_ASENTA,
+    REJECTS_FILE,
 )
-from .utils import format_codigo, clean_text
+from .data_reader import source_lines
+from .data_normalizer import _map_unique, _collapse_whitespace, format_codigo_series
+from .utils import C1_TRANSLATOR, memo_cache
+from .diagnostics import diagnostics
 
 logger = logging.getLogger(__name__)
 
-def verify_length(value: Any, max_length: int, field_name: str, row_idx: int) -> bool:
-    """
-    Verifica que un valor no exceda la longitud máxima esperada.
+# Códigos de motivo del archivo de rechazos
+MOTIVO_VACIO = "VACIO"        # Campo requerido nulo o vacío
+MOTIVO_FORMATO = "FORMATO"    # Código que no cumple su patrón una vez formateado
+MOTIVO_TRUNCADO = "TRUNCADO"  # Nombre que excede la longitud del esquema (solo diagnóstico)
+
+# Columnas del informe de `split_rejects` y del archivo de rechazos
+REPORT_COLUMNS = ["registro", "campo", "motivo"]
+REJECTS_COLUMNS = ["archivo", "fila", "campo", "motivo"]
+
+# Campos requeridos para codigos_postales v2 y sus catálogos
+REQUIRED_FIELDS = ["d_codigo", "d_asenta", "c_estado", "c_tipo_asenta", "d_estado", "d_tipo_asenta"]
+
+# Campos requeridos solo si su código existe: código -> nombre
+CONDITIONAL_FIELDS = {"c_mnpio": "D_mnpio", "c_cve_ciudad": "d_ciudad"}
+
+# Campos de código: campo -> (dígitos, patrón)
+CODE_FIELDS = {
+    "d_codigo": (5, REGEX_CODIGO_POSTAL),
+    "c_estado": (2, REGEX_CODIGO_ESTADO),
+    "c_mnpio": (3, REGEX_CODIGO_MUNICIPIO),
+    "c_cve_ciudad": (2, REGEX_CODIGO_CIUDAD),
+    "c_tipo_asenta": (2, REGEX_CODIGO_TIPO_ASENTA),
+}
+
+# Campos de nombre: campo -> longitud máxima en el esquema v2
+LENGTH_FIELDS = {
+    "d_asenta": MAX_LEN_NOMBRE_ASENTAMIENTO,
+    "d_estado": MAX_LEN_NOMBRE,
+    "D_mnpio": MAX_LEN_NOMBRE,
+    "d_ciudad": MAX_LEN_NOMBRE,
+    "d_tipo_asenta": MAX_LEN_NOMBRE,
+}
+
+
+def _is_empty(series: pd.Series) -> pd.Series:
+    """Máscara de valores nulos o vacíos (solo espacios)."""
+    stripped = pd.Series(_map_unique(series, lambda u: u.map(str).str.strip() == "", True), index=series.index)
+    return stripped.astype(bool)
+
+
+def _is_malformed(series: pd.Series, digits: int, pattern: str) -> pd.Series:
+    """Máscara de códigos no vacíos que, ya formateados, no cumplen el patrón."""
+    # El formateo se memoriza y la normalización posterior lo reutiliza
+    formatted = pd.Series(
+        _map_unique(series, lambda u: format_codigo_series(u, digits), None, memo_cache("format_codigo", digits)),
+        index=series.index,
+        dtype=object,
+    )
+    matches = pd.Series(_map_unique(formatted, lambda u: u.str.match(pattern), False), index=series.index)
+    return ~_is_empty(series) & ~matches.astype(bool)
 
-    Args:
-        value (Any): Valor a verificar (se convertirá a string).
-        max_length (int): Longitud máxima permitida.
-        field_name (str): Nombre del campo (para mensajes de log).
-        row_idx (int): Índice de la fila (para mensajes de log).
 
-    Returns:
-        bool: True si es válido o nulo, False si excede la longitud.
-    """
-    if value is None or pd.isna(value):
-        return True
+def _exceeds_length(series: pd.Series, max_length: int) -> pd.Series:
+    """Máscara de nombres que, una vez limpios, exceden la longitud y se truncarán."""
+    def check(uniques: pd.Series) -> pd.Series:
+        cleaned = _collapse_whitespace(uniques.map(str).str.translate(C1_TRANSLATOR))
+        return cleaned.str.len() > max_length
+    return pd.Series(_map_unique(series, check, False), index=series.index).astype(bool)
 
-    value_str = str(value)
-    if len(value_str) > max_length:
-        logger.warning(
-            f"Fila {row_idx}: Longitud inválida en '{field_name}'. "
-            f"Valor: '{value_str[:20]}...' (longitud {len(value_str)}), "
-            f"máximo permitido: {max_length}."
-        )
-        return False
-    return True
 
-def validate_regex(value: Any, pattern: str, field_name: str, row_idx: int) -> bool:
+def _validation_rules(df: pd.DataFrame) -> List[Tuple[str, str, pd.Series]]:
     """
-    Verifica que un valor cumpla con un patrón regex.
-
-    Args:
-        value (Any): Valor a verificar (se convertirá a string).
-        pattern (str): Patrón regex a aplicar.
-        field_name (str): Nombre del campo (para mensajes de log).
-        row_idx (int): Índice de la fila (para mensajes de log).
+    Evalúa todas las reglas sobre el DataFrame completo.
 
     Returns:
-        bool: True si cumple el patrón o es nulo/vacío, False si no cumple.
+        List[Tuple[str, str, pd.Series]]: (campo, motivo, máscara de filas que fallan).
     """
-    if value is None or pd.isna(value) or str(value).strip() == "":
-        return True
+    rules = []
+    for field in REQUIRED_FIELDS:
+        if field in df.columns:
+            rules.append((field, MOTIVO_VACIO, _is_empty(df[field])))
+    for code_field, name_field in CONDITIONAL_FIELDS.items():
+        if code_field in df.columns and name_field in df.columns:
+            rules.append((name_field, MOTIVO_VACIO, df[code_field].notna() & _is_empty(df[name_field])))
+    for field, (digits, pattern) in CODE_FIELDS.items():
+        if field in df.columns:
+            rules.append((field, MOTIVO_FORMATO, _is_malformed(df[field], digits, pattern)))
+    return rules
+
+
+def write_rejects(rejects: pd.DataFrame, rejects_path: Path, append: bool) -> None:
+    """
+    Escribe (o añade) las filas rechazadas al archivo de rechazos en CSV.
 
-    value_str = str(value).strip()
-    if not re.match(pattern, value_str):
-        logger.warning(
-            f"Fila {row_idx}: Formato inválido en '{field_name}'. "
-            f"Valor: '{value_str}', Patrón esperado: {pattern}."
+    Cada registro del informe (ver `split_rejects`) se ubica por su archivo
+    fuente y su línea en él (ver `data_reader.source_lines`).
+    """
+    located = pd.concat(
+        [source_lines(pd.Index(rejects["registro"])), rejects[["campo", "motivo"]].reset_index(drop=True)], axis=1
+    )
+    try:
+        rejects_path.parent.mkdir(parents=True, exist_ok=True)
+        located[REJECTS_COLUMNS].to_csv(
+            rejects_path,
+            mode="a" if append else "w",
+            header=not append,
+            index=False,
+            encoding="utf-8",
+            quoting=csv.QUOTE_MINIMAL,
         )
-        return False
-    return True
+    except OSError:
+        logger.exception(f"Error al escribir el archivo de rechazos {rejects_path}")
 
-def validate_not_empty(value: Any, field_name: str, row_idx: int) -> bool:
+
+def split_rejects(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
-    Verifica que un valor no sea nulo, NaN o un string vacío.
+    Valida un DataFrame con máscaras por columna y separa las filas rechazadas.
+
+    Aplica las reglas de `validate_dataframe` y registra las incidencias en el
+    diagnóstico, pero no escribe el archivo de rechazos: devuelve su contenido
+    para que lo escriba el llamador (p. ej. el proceso principal, en orden, cuando
+    los lotes se validan en un pool de procesos).
 
     Args:
-        value (Any): Valor a verificar.
-        field_name (str): Nombre del campo (para mensajes de log).
-        row_idx (int): Índice de la fila (para mensajes de log).
+        df (pd.DataFrame): DataFrame a validar.
 
     Returns:
-        bool: True si el valor no está vacío, False si lo está.
-    """
-    is_empty = pd.isna(value) or (isinstance(value, str) and not value.strip())
-    if is_empty:
-        logger.warning(f"Fila {row_idx}: Campo requerido '{field_name}' está vacío o nulo.")
-        return False
-    return True
-
-def validate_row(row: pd.Series, row_idx: int) -> bool:
+        Tuple[pd.DataFrame, pd.DataFrame]: Filas válidas y rechazos (registro, campo, motivo)
+        ordenados por registro, donde `registro` es el índice de la fila en `df`.
     """
-    Valida una fila completa del DataFrame según las reglas v2.
+    logger.info(f"Iniciando validación de {len(df)} registros...")
+    rules = _validation_rules(df)
+
+    collector = diagnostics()
+    invalid = pd.Series(False, index=df.index)
+    rejects = []
+    for field, motivo, mask in rules:
+        if collector.add(field, motivo, mask, df[field]):
+            invalid |= mask
+            rejects.append(pd.DataFrame({
+                "registro": df.index[mask.to_numpy()],
+                "campo": field,
+                "motivo": motivo,
+            }))
+
+    for field, max_length in LENGTH_FIELDS.items():
+        if field in df.columns:
+            collector.add(field, MOTIVO_TRUNCADO, _exceeds_length(df[field], max_length), df[field])
+
+    report = (
+        pd.concat(rejects, ignore_index=True).sort_values("registro", kind="stable")
+        if rejects else pd.DataFrame(columns=REPORT_COLUMNS)
+    )
 
-    Aplica validaciones de nulabilidad, longitud y formato regex.
+    invalid_count = int(invalid.sum())
+    valid_count = len(df) - invalid_count
+    valid_percentage = (valid_count / len(df)) * 100 if len(df) > 0 else 0
+    logger.info(
+        f"Validación completada. Registros válidos: {valid_count} ({valid_percentage:.2f}%). "
+        f"Registros inválidos: {invalid_count}."
+    )
+    return df.loc[~invalid].copy(), report
 
-    Args:
-        row (pd.Series): Fila del DataFrame a validar.
-        row_idx (int): Índice original de la fila (para logging).
 
-    Returns:
-        bool: True si la fila es válida, False si tiene algún error.
-    """
-    is_valid = True
-
-    # Validaciones de nulabilidad para campos requeridos en codigos_postales v2
-    is_valid &= validate_not_empty(row.get('d_codigo'), 'd_codigo', row_idx)
-    is_valid &= validate_not_empty(row.get('d_asenta'), 'd_asenta', row_idx)
-    is_valid &= validate_not_empty(row.get('c_estado'), 'c_estado', row_idx)
-    is_valid &= validate_not_empty(row.get('c_tipo_asenta'), 'c_tipo_asenta', row_idx)
-    
-    # Nombres requeridos para las tablas de catálogo
-    is_valid &= validate_not_empty(row.get('d_estado'), 'd_estado', row_idx)
-    is_valid &= validate_not_empty(row.get('d_tipo_asenta'), 'd_tipo_asenta', row_idx)
-    
-    # Municipio y Ciudad pueden ser null, pero si existen, d_mnpio/d_ciudad deben existir
-    if pd.notna(row.get('c_mnpio')):
-        is_valid &= validate_not_empty(row.get('D_mnpio'), 'D_mnpio', row_idx)
-    if pd.notna(row.get('c_cve_ciudad')):
-         is_valid &= validate_not_empty(row.get('d_ciudad'), 'd_ciudad', row_idx)
-
-    # Validaciones de formato (Regex)
-    is_valid &= validate_regex(row.get('d_codigo'), REGEX_CODIGO_POSTAL, 'd_codigo', row_idx)
-    is_valid &= validate_regex(row.get('c_estado'), REGEX_CODIGO_ESTADO, 'c_estado', row_idx)
-    is_valid &= validate_regex(row.get('c_mnpio'), REGEX_CODIGO_MUNICIPIO, 'c_mnpio', row_idx)
-    is_valid &= validate_regex(row.get('c_cve_ciudad'), REGEX_CODIGO_CIUDAD, 'c_cve_ciudad', row_idx)
-    is_valid &= validate_regex(row.get('c_tipo_asenta'), REGEX_CODIGO_TIPO_ASENTA, 'c_tipo_asenta', row_idx)
-
-    # Validaciones de longitud
-    is_valid &= verify_length(clean_text(row.get('d_asenta'), MAX_LEN_NOMBRE_ASENTAMIENTO), MAX_LEN_NOMBRE_ASENTAMIENTO, 'd_asenta', row_idx)
-    is_valid &= verify_length(clean_text(row.get('d_estado'), MAX_LEN_NOMBRE), MAX_LEN_NOMBRE, 'd_estado', row_idx)
-    is_valid &= verify_length(clean_text(row.get('D_mnpio'), MAX_LEN_NOMBRE), MAX_LEN_NOMBRE, 'D_mnpio', row_idx)
-    is_valid &= verify_length(clean_text(row.get('d_ciudad'), MAX_LEN_NOMBRE), MAX_LEN_NOMBRE, 'd_ciudad', row_idx)
-    is_valid &= verify_length(clean_text(row.get('d_tipo_asenta'), MAX_LEN_NOMBRE), MAX_LEN_NOMBRE, 'd_tipo_asenta', row_idx)
-
-    return is_valid
-
-def validate_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+def validate_dataframe(
+    df: pd.DataFrame, rejects_path: Optional[Path] = REJECTS_FILE, append: bool = False
+) -> pd.DataFrame:
     """
-    Valida un DataFrame completo fila por fila.
+    Valida un DataFrame completo con máscaras por columna.
 
-    Registra errores usando logging y devuelve un DataFrame
-    conteniendo solo las filas válidas.
+    Reglas: campos requeridos no vacíos, nombres de municipio/ciudad requeridos
+    cuando existe su código, y códigos que cumplan su patrón una vez formateados
+    (como hará la normalización). Las reglas se evalúan sobre los valores
+    distintos de cada columna. Los nombres que excedan la longitud del esquema
+    solo se reportan en el log, porque la normalización los trunca.
+
+    Cada fallo se escribe en `rejects_path` como (archivo, fila, campo, motivo),
+    donde `fila` es la línea en ese archivo fuente (contando el encabezado).
 
     Args:
         df (pd.DataFrame): DataFrame a validar.
+        rejects_path (Optional[Path]): Archivo CSV de rechazos (None para no escribirlo).
+        append (bool): Añadir al archivo existente (lectura por bloques).
 
     Returns:
         pd.DataFrame: DataFrame filtrado con solo filas válidas.
     """
-    logger.info(f"Iniciando validación de {len(df)} registros...")
-    valid_indices = []
-    invalid_count = 0
+    df_valid, report = split_rejects(df)
+    if rejects_path is not None:
+        write_rejects(report, rejects_path, append)
 
-    for idx, row in df.iterrows():
-        if validate_row(row, idx + 2):
-            valid_indices.append(idx)
-        else:
-            invalid_count += 1
-
-    valid_percentage = (len(valid_indices) / len(df)) * 100 if len(df) > 0 else 0
-    logger.info(
-        f"Validación completada. Registros válidos: {len(valid_indices)} ({valid_percentage:.2f}%). "
-        f"Registros inválidos: {invalid_count}."
-    )
+    invalid_count = len(df) - len(df_valid)
     if invalid_count > 0:
-        logger.warning(f"Se encontraron {invalid_count} filas con errores. Revise el log para detalles.")
+        logger.warning(
+            f"Se encontraron {invalid_count} filas con errores. "
+            f"Detalle en {rejects_path if rejects_path is not None else 'el log'}."
+        )
 
-    return df.loc[valid_indices].copy()
\ No newline at end of file
+    return df_valid
@@ -0,0 +1,343 @@
+import pandas as pd
+import logging
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .config import (
+    ZONAS_MAP,
+    BATCH_SIZE_DB_LOAD,
+)
+from .models import (
+    Estado,
+    Municipio,
+    Ciudad,
+    TipoAsentamiento,
+    Zona,
+)
+from .catalogs import CatalogTables
+from .data_normalizer import CP_TABLE_COLUMNS, select_cp_records
+from .copy_generator import catalog_copy_rows, cp_copy_rows, format_copy_text
+from .utils import BatchStream
+from .metrics import TimedBatch, record_batch, record_info, stage
+
+logger = logging.getLogger(__name__)
+
+# Tablas en orden de dependencias (FK)
+LOAD_ORDER = [
+    "estados", "municipios", "tipos_asentamiento", "zonas", "ciudades", "codigos_postales"
+]
+# Vista materializada que se refresca tras cargar datos
+MATERIALIZED_VIEW = "vm_codigos_postales"
+# Marca de versión de los datos (database/schema.sql); los clientes la leen para invalidar sus cachés
+DATASET_VERSION_TABLE = "dataset_version"
+# Pausa entre las lecturas del lector de prueba mientras se refresca la vista (segundos)
+READER_PROBE_INTERVAL = 0.05
+
+
+def _columns(model) -> List[str]:
+    """Columnas de la tabla a partir de los campos del modelo."""
+    return [f.name for f in fields(model)]
+
+
+def _copy_rows(cur, table_name: str, columns: List[str], rows: Sequence[Sequence[Any]], batch_size: int) -> int:
+    """
+    Envía filas a una tabla con un único COPY ... FROM STDIN, en bloques de `batch_size`.
+
+    Args:
+        cur: Cursor de psycopg.
+        table_name (str): Nombre de la tabla.
+        columns (List[str]): Columnas de la tabla.
+        rows (Sequence[Sequence[Any]]): Filas sin escapar.
+        batch_size (int): Filas por bloque enviado al servidor.
+
+    Returns:
+        int: Filas que PostgreSQL reporta como copiadas.
+    """
+    with cur.copy(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN") as copy:
+        for start in range(0, len(rows), batch_size):
+            copy.write(format_copy_text(rows[start:start + batch_size]))
+    return cur.rowcount
+
+
+def _copy_codigos_postales(cur, batches: BatchStream) -> Tuple[int, int, int]:
+    """
+    Envía los codigos_postales normalizados con un único COPY, lote a lote.
+
+    Args:
+        cur: Cursor de psycopg.
+        batches (BatchStream): Lotes del DataFrame normalizado o de sus bloques.
+
+    Returns:
+        Tuple[int, int, int]: (filas enviadas, filas reportadas por PostgreSQL, errores).
+    """
+    sent = 0
+    errors = 0
+    logger.info(f"Cargando {batches.describe()} en lotes de tamaño {batches.batch_size}...")
+    with cur.copy(f"COPY codigos_postales ({', '.join(CP_TABLE_COLUMNS)}) FROM STDIN") as copy:
+        def send(batch: pd.DataFrame) -> Tuple[int, int]:
+            records, errores_batch = select_cp_records(batch)
+            rows = cp_copy_rows(records)
+            copy.write(format_copy_text(rows))
+            return len(rows), errores_batch
+
+        for i, ((enviados, errores_batch), batch_metrics) in enumerate(map(TimedBatch(send), batches)):
+            batch_metrics.rows_out, batch_metrics.errors = enviados, errores_batch
+            record_batch(batch_metrics)
+            errors += errores_batch
+            sent += enviados
+            logger.debug(f"Lote {i+1}: {enviados} códigos postales enviados.")
+    return sent, cur.rowcount, errors
+
+
+@dataclass
+class RefreshReport:
+    """Resultado del refresco de la vista tras una carga."""
+    concurrently: bool
+    seconds: float = 0.0
+    # Mayor tiempo que tardó una lectura de la vista desde otra conexión, hasta el COMMIT
+    reader_max_wait_seconds: float = 0.0
+    reader_queries: int = 0
+
+
+class ReaderProbe:
+    """
+    Lector de prueba: desde otra conexión consulta la vista en bucle (tras `start`
+    y hasta salir del bloque `with`) y registra la lectura más lenta.
+
+    Sirve para medir cuánto quedan bloqueados los lectores durante un REFRESH. El
+    bloque `with` debe cerrarse después de confirmar o revertir la transacción que
+    refresca la vista: una lectura bloqueada no termina antes.
+    """
+
+    def __init__(self, dsn: str, interval: float = READER_PROBE_INTERVAL) -> None:
+        self.dsn = dsn
+        self.interval = interval
+        self.max_wait = 0.0
+        self.queries = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ReaderProbe":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="reader-probe", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        import psycopg
+
+        try:
+            with psycopg.connect(self.dsn, autocommit=True) as conn:
+                while not self._stop.is_set():
+                    start = time.perf_counter()
+                    conn.execute(f"SELECT codigo_postal FROM {MATERIALIZED_VIEW} LIMIT 1").fetchall()
+                    self.max_wait = max(self.max_wait, time.perf_counter() - start)
+                    self.queries += 1
+                    self._stop.wait(self.interval)
+        except psycopg.Error as e:
+            logger.warning(f"El lector de prueba de la vista se detuvo: {e}")
+
+
+def refresh_view(cur, probe: Optional[ReaderProbe] = None) -> Optional[RefreshReport]:
+    """
+    Refresca `vm_codigos_postales` si existe.
+
+    Usa REFRESH ... CONCURRENTLY, que no bloquea a los lectores, cuando la vista
+    tiene un índice único sin predicado ni expresiones (ver indexes.sql); si no,
+    un REFRESH normal, que los bloquea hasta el final de la transacción.
+
+    Args:
+        cur: Cursor de psycopg.
+        probe (Optional[ReaderProbe]): Lector de prueba que se inicia justo antes del REFRESH.
+
+    Returns:
+        Optional[RefreshReport]: Tipo y duración del refresco (sin los datos del lector,
+        que se completan tras el COMMIT), o None si la vista no existe.
+    """
+    cur.execute(f"SELECT to_regclass('{MATERIALIZED_VIEW}') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return None
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_index WHERE indrelid = %s::regclass "
+        "AND indisunique AND indpred IS NULL AND indexprs IS NULL)",
+        (MATERIALIZED_VIEW,),
+    )
+    concurrently = cur.fetchone()[0]
+    if probe is not None:
+        probe.start()
+    start = time.perf_counter()
+    if concurrently:
+        logger.info(f"Refrescando vista materializada {MATERIALIZED_VIEW} (CONCURRENTLY)...")
+        cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {MATERIALIZED_VIEW}")
+    else:
+        logger.warning(
+            f"{MATERIALIZED_VIEW} no tiene índice único: el REFRESH bloqueará las lecturas hasta el COMMIT."
+        )
+        cur.execute(f"REFRESH MATERIALIZED VIEW {MATERIALIZED_VIEW}")
+    return RefreshReport(concurrently, time.perf_counter() - start)
+
+
+def dataset_version_sql(version: str) -> str:
+    """Bloque SQL que registra `version` en dataset_version, si la tabla existe (las bases anteriores no la tienen)."""
+    return (
+        "DO $$\n"
+        "BEGIN\n"
+        f"    IF to_regclass('{DATASET_VERSION_TABLE}') IS NOT NULL THEN\n"
+        f"        INSERT INTO {DATASET_VERSION_TABLE} (pk_id, version) VALUES (1, '{version}')\n"
+        "        ON CONFLICT (pk_id) DO UPDATE SET version = EXCLUDED.version, loaded_at = now();\n"
+        "    END IF;\n"
+        "END $$;\n"
+    )
+
+
+def new_dataset_version() -> str:
+    """Identificador de una nueva versión de los datos (aleatorio: los clientes solo lo comparan)."""
+    return uuid.uuid4().hex
+
+
+def write_dataset_version(cur) -> Optional[str]:
+    """
+    Registra una nueva versión de los datos en dataset_version.
+
+    Se llama en la transacción de la carga, de modo que la marca cambia en el
+    mismo momento en que los datos nuevos se hacen visibles.
+
+    Args:
+        cur: Cursor de psycopg.
+
+    Returns:
+        Optional[str]: Versión escrita, o None si la base no tiene la tabla (esquema anterior).
+    """
+    cur.execute(f"SELECT to_regclass('{DATASET_VERSION_TABLE}') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        logger.warning(
+            f"La base no tiene la tabla {DATASET_VERSION_TABLE} (ver database/schema.sql); "
+            "los clientes con caché no detectarán esta carga."
+        )
+        return None
+    version = new_dataset_version()
+    cur.execute(dataset_version_sql(version))
+    return version
+
+
+def load_to_database(
+    catalogs: CatalogTables,
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    dsn: str,
+    batch_size: int = BATCH_SIZE_DB_LOAD,
+    replace: bool = False,
+) -> Tuple[Dict[str, int], int]:
+    """
+    Carga catálogos y codigos_postales directamente en PostgreSQL mediante COPY.
+
+    Usa una sola conexión y una sola transacción: cada tabla se carga con un único
+    COPY en orden de dependencias (FK). Antes de confirmar se concilian las filas
+    enviadas con las reportadas por el servidor (y, si `replace`, con `count(*)`);
+    ante cualquier diferencia o error se hace ROLLBACK. Si existe la vista
+    `vm_codigos_postales`, se refresca tras la carga (ver `refresh_view`); la
+    duración del refresco y la espera máxima de un lector concurrente se
+    registran en las métricas (`view_refresh`). En la misma transacción se
+    escribe una nueva versión en dataset_version (ver `write_dataset_version`).
+
+    Args:
+        catalogs (CatalogTables): Catálogos extraídos (ver `extract_catalogs`).
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame normalizado
+            completo o bloques normalizados (ver `normalize_dataframe`).
+        dsn (str): Cadena de conexión de PostgreSQL.
+        batch_size (int): Filas por bloque enviado en cada COPY.
+        replace (bool): Vaciar las tablas (TRUNCATE) antes de cargar.
+
+    Returns:
+        Tuple[Dict[str, int], int]: Registros cargados por tabla (0 si la carga se
+        revirtió) y número de errores en códigos postales.
+    """
+    empty_counts = {table: 0 for table in LOAD_ORDER}
+    batches = BatchStream(data, batch_size)
+    if "es_valido" not in batches.columns:
+        logger.error("Faltan columnas ['d_codigo', 'd_asenta', 'c_estado', 'c_tipo_asenta'] para cargar códigos postales.")
+        return empty_counts, batches.drain()
+
+    try:
+        import psycopg
+    except ImportError:
+        logger.error("La carga directa requiere el paquete 'psycopg' (pip install -r requirements.txt).")
+        return empty_counts, 0
+
+    catalog_rows = {
+        "estados": (_columns(Estado), catalog_copy_rows(catalogs.estados or [])),
+        "municipios": (_columns(Municipio), catalog_copy_rows(catalogs.municipios or [])),
+        "tipos_asentamiento": (_columns(TipoAsentamiento), catalog_copy_rows(catalogs.tipos_asentamiento or [])),
+        "zonas": (_columns(Zona), [(pk_id, nombre) for nombre, pk_id in ZONAS_MAP.items()]),
+        "ciudades": (_columns(Ciudad), catalog_copy_rows(catalogs.ciudades or [])),
+    }
+
+    expected: Dict[str, int] = {}
+    reported: Dict[str, int] = {}
+    cp_errors = 0
+    report: Optional[RefreshReport] = None
+    version: Optional[str] = None
+    try:
+        with ReaderProbe(dsn) as probe, psycopg.connect(dsn) as conn:
+            with conn.cursor() as cur:
+                if replace:
+                    logger.info("Vaciando tablas antes de la carga (TRUNCATE)...")
+                    cur.execute(f"TRUNCATE {', '.join(reversed(LOAD_ORDER))} RESTART IDENTITY")
+
+                for table in LOAD_ORDER:
+                    if table == "codigos_postales":
+                        sent, copied, cp_errors = _copy_codigos_postales(cur, batches)
+                    else:
+                        columns, rows = catalog_rows[table]
+                        sent, copied = len(rows), _copy_rows(cur, table, columns, rows, batch_size)
+                    expected[table] = sent
+                    reported[table] = copied
+                    logger.info(f"Cargados {copied} registros en '{table}'.")
+
+                # Conciliación de conteos antes de confirmar
+                mismatches = [t for t in LOAD_ORDER if expected[t] != reported[t]]
+                if replace:
+                    for table in LOAD_ORDER:
+                        cur.execute(f"SELECT count(*) FROM {table}")
+                        in_table = cur.fetchone()[0]
+                        if in_table != expected[table] and table not in mismatches:
+                            logger.error(f"'{table}': {in_table} registros en la tabla, {expected[table]} esperados.")
+                            mismatches.append(table)
+                if mismatches:
+                    for table in mismatches:
+                        logger.error(
+                            f"Conciliación fallida en '{table}': enviados {expected[table]}, "
+                            f"copiados {reported[table]}."
+                        )
+                    conn.rollback()
+                    logger.error("Carga revertida por diferencias en los conteos.")
+                    return empty_counts, cp_errors
+
+                with stage("refresh_view"):
+                    report = refresh_view(cur, probe)
+                    version = write_dataset_version(cur)
+                    conn.commit()
+        logger.info("Conciliación de conteos correcta. Carga confirmada (COMMIT).")
+        if version is not None:
+            logger.info(f"Versión de los datos: {version}")
+            record_info("dataset_version", version)
+        if report is not None:
+            report.reader_max_wait_seconds, report.reader_queries = probe.max_wait, probe.queries
+            logger.info(
+                f"Vista refrescada en {report.seconds:.2f} s; lectura más lenta durante el refresco: "
+                f"{report.reader_max_wait_seconds * 1000:.0f} ms ({report.reader_queries} lecturas de prueba)."
+            )
+            record_info("view_refresh", asdict(report))
+        return reported, cp_errors
+
+    except psycopg.Error:
+        logger.exception("Error de PostgreSQL durante la carga directa. La transacción se revirtió.")
+        return empty_counts, cp_errors
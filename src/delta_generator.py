@@ -0,0 +1,349 @@
+import pandas as pd
+import logging
+import math
+import pickle
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .config import (
+    OUTPUT_DIR,
+    ZONAS_MAP,
+    BATCH_SIZE_CODIGOS_POSTALES,
+    SNAPSHOT_PATH,
+)
+from .models import (
+    Estado,
+    Municipio,
+    Ciudad,
+    TipoAsentamiento,
+    Zona,
+)
+from .catalogs import CatalogTables
+from .data_normalizer import CP_TABLE_COLUMNS, select_cp_records
+from .db_loader import LOAD_ORDER, _columns, dataset_version_sql, new_dataset_version
+from .utils import BatchStream
+
+logger = logging.getLogger(__name__)
+
+# Versión del formato de la instantánea; una instantánea de otra versión se ignora
+SNAPSHOT_VERSION = 1
+
+# Tablas: nombre -> (columnas clave, columnas comparadas para UPDATE)
+DELTA_TABLES: Dict[str, Tuple[List[str], List[str]]] = {
+    "estados": (["pk_codigo_estado"], ["nombre_estado"]),
+    "municipios": (["pk_codigo_municipio", "fk_codigo_estado"], ["nombre_municipio"]),
+    "tipos_asentamiento": (["pk_codigo_tipo_asentamiento"], ["nombre_tipo_asentamiento"]),
+    "zonas": (["pk_id_zona"], ["nombre_zona"]),
+    "ciudades": (["pk_codigo_ciudad", "fk_codigo_estado"], ["nombre_ciudad"]),
+    "codigos_postales": (
+        ["codigo_postal", "nombre_asentamiento", "fk_codigo_tipo_asentamiento",
+         "fk_codigo_estado", "fk_codigo_municipio"],
+        ["fk_codigo_ciudad", "fk_id_zona"],
+    ),
+}
+
+
+def _catalog_frame(records: Optional[list], model) -> pd.DataFrame:
+    """Convierte un catálogo (lista de dataclasses) en DataFrame con las columnas del modelo."""
+    return pd.DataFrame([asdict(r) for r in records or []], columns=_columns(model))
+
+
+def collect_cp_records(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+) -> Tuple[Optional[pd.DataFrame], int]:
+    """
+    Reúne los registros insertables de codigos_postales (columnas de la tabla).
+
+    Args:
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame normalizado
+            completo o bloques normalizados (ver `normalize_dataframe`).
+
+    Returns:
+        Tuple[Optional[pd.DataFrame], int]: Registros (None si faltan columnas
+        esenciales) y número de errores.
+    """
+    batches = BatchStream(data, BATCH_SIZE_CODIGOS_POSTALES)
+    if "es_valido" not in batches.columns:
+        logger.error("Faltan columnas ['d_codigo', 'd_asenta', 'c_estado', 'c_tipo_asenta'] para generar códigos postales.")
+        return None, batches.drain()
+
+    frames = []
+    errores = 0
+    for batch in batches:
+        records, errores_batch = select_cp_records(batch)
+        frames.append(records)
+        errores += errores_batch
+    if not frames:
+        return pd.DataFrame(columns=CP_TABLE_COLUMNS), errores
+    return pd.concat(frames, ignore_index=True), errores
+
+
+def build_snapshot(catalogs: CatalogTables, cp_records: pd.DataFrame) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Construye la instantánea de la salida normalizada: las seis tablas tal como se cargan.
+
+    Args:
+        catalogs (CatalogTables): Catálogos extraídos (ver `extract_catalogs`).
+        cp_records (pd.DataFrame): Registros de codigos_postales (ver `collect_cp_records`).
+
+    Returns:
+        Optional[Dict[str, pd.DataFrame]]: Tablas por nombre o None si faltan catálogos esenciales.
+    """
+    if catalogs.estados is None or catalogs.municipios is None or catalogs.tipos_asentamiento is None:
+        logger.error("Faltan columnas de catálogos (estados, municipios o tipos de asentamiento) para generar el delta.")
+        return None
+
+    return {
+        "estados": _catalog_frame(catalogs.estados, Estado),
+        "municipios": _catalog_frame(catalogs.municipios, Municipio),
+        "tipos_asentamiento": _catalog_frame(catalogs.tipos_asentamiento, TipoAsentamiento),
+        "zonas": pd.DataFrame(
+            [(pk_id, nombre) for nombre, pk_id in ZONAS_MAP.items()], columns=_columns(Zona)
+        ),
+        "ciudades": _catalog_frame(catalogs.ciudades, Ciudad),
+        "codigos_postales": cp_records.reset_index(drop=True),
+    }
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Lee la instantánea de la publicación anterior.
+
+    Args:
+        path (Path): Ruta de la instantánea.
+
+    Returns:
+        Optional[Dict[str, pd.DataFrame]]: Tablas por nombre o None si no existe
+        o no es válida.
+    """
+    if not path.is_file():
+        logger.warning(f"No existe instantánea previa en {path}.")
+        return None
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        logger.exception(f"Error al leer la instantánea {path}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"La instantánea {path} no tiene la versión esperada ({SNAPSHOT_VERSION}); se ignora.")
+        return None
+    return snapshot["tables"]
+
+
+def save_snapshot(tables: Dict[str, pd.DataFrame], path: Path = SNAPSHOT_PATH) -> bool:
+    """
+    Guarda la instantánea (se escribe en un archivo temporal y se renombra).
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Tablas por nombre (ver `build_snapshot`).
+        path (Path): Ruta de la instantánea.
+
+    Returns:
+        bool: True si se guardó correctamente.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "tables": tables}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+        logger.info(f"Instantánea actualizada en {path}")
+        return True
+    except Exception:
+        logger.exception(f"Error al guardar la instantánea {path}")
+        return False
+
+
+def _is_null(value: Any) -> bool:
+    """Indica si un valor es nulo (None o NaN)."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _sql_literal(value: Any) -> str:
+    """Formatea un valor ya limpio/escapado como literal SQL."""
+    if _is_null(value):
+        return "NULL"
+    if isinstance(value, int):
+        return str(value)
+    return f"'{value}'"
+
+
+def _sql_where(columns: List[str], values: Tuple) -> str:
+    """Condición de igualdad por clave (IS NULL para claves nulas)."""
+    return " AND ".join(
+        f"{col} IS NULL" if _is_null(value) else f"{col} = {_sql_literal(value)}"
+        for col, value in zip(columns, values)
+    )
+
+
+def diff_table(
+    old: pd.DataFrame, new: pd.DataFrame, key_cols: List[str], attr_cols: List[str]
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Compara dos versiones de una tabla por clave.
+
+    Las claves repetidas se emparejan por orden de aparición. Como UPDATE y DELETE
+    afectan a todas las filas con la misma clave, una clave repetida con cambios
+    se reemplaza completa (DELETE por clave + INSERT de sus filas nuevas).
+
+    Args:
+        old (pd.DataFrame): Tabla de la instantánea anterior.
+        new (pd.DataFrame): Tabla de la publicación nueva.
+        key_cols (List[str]): Columnas clave.
+        attr_cols (List[str]): Columnas comparadas para generar UPDATE.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: (filas a insertar con todas
+        las columnas, filas a actualizar con clave y atributos, claves a borrar).
+    """
+    columns = list(new.columns)
+    old = old[columns].astype(object)
+    new = new.astype(object)
+    old = old.assign(_ocurrencia=old.groupby(key_cols, dropna=False, sort=False).cumcount())
+    new = new.assign(_ocurrencia=new.groupby(key_cols, dropna=False, sort=False).cumcount())
+    merged = old.merge(
+        new, on=key_cols + ["_ocurrencia"], how="outer", suffixes=("_old", ""), indicator=True, sort=False
+    )
+
+    both = merged["_merge"] == "both"
+    changed = pd.Series(False, index=merged.index)
+    for col in attr_cols:
+        before, after = merged[f"{col}_old"], merged[col]
+        changed |= (before != after) & ~(before.isna() & after.isna())
+    changed &= both
+
+    group = merged.groupby(key_cols, dropna=False, sort=False).ngroup()
+    repeated = merged.groupby(group)["_ocurrencia"].transform("max") > 0
+    dirty = ~both | changed
+    replaced = group.isin(group[repeated & dirty].unique())
+
+    in_new = merged["_merge"] != "left_only"
+    inserts = merged.loc[(replaced & in_new) | (~replaced & (merged["_merge"] == "right_only")), columns]
+    updates = merged.loc[~replaced & changed, key_cols + attr_cols]
+    deletes = pd.concat([
+        merged.loc[replaced, key_cols].drop_duplicates(),
+        merged.loc[~replaced & (merged["_merge"] == "left_only"), key_cols],
+    ])
+    return inserts, updates, deletes
+
+
+def _insert_statement(table_name: str, rows: pd.DataFrame) -> str:
+    """Sentencia INSERT multi-fila con el mismo formato que los archivos completos."""
+    values = [
+        "(" + ", ".join(_sql_literal(v) for v in row) + ")"
+        for row in rows.itertuples(index=False, name=None)
+    ]
+    return f"INSERT INTO {table_name} ({', '.join(rows.columns)}) VALUES\n" + ",\n".join(values) + ";\n"
+
+
+def _update_statements(table_name: str, rows: pd.DataFrame, key_cols: List[str], attr_cols: List[str]) -> List[str]:
+    """Una sentencia UPDATE por fila modificada."""
+    statements = []
+    for row in rows.itertuples(index=False, name=None):
+        keys, attrs = row[:len(key_cols)], row[len(key_cols):]
+        sets = ", ".join(f"{col} = {_sql_literal(v)}" for col, v in zip(attr_cols, attrs))
+        statements.append(f"UPDATE {table_name} SET {sets} WHERE {_sql_where(key_cols, keys)};\n")
+    return statements
+
+
+def _delete_statements(table_name: str, rows: pd.DataFrame, key_cols: List[str]) -> List[str]:
+    """Una sentencia DELETE por clave eliminada."""
+    return [
+        f"DELETE FROM {table_name} WHERE {_sql_where(key_cols, keys)};\n"
+        for keys in rows.itertuples(index=False, name=None)
+    ]
+
+
+def generate_delta_sql(
+    catalogs: CatalogTables,
+    cp_records: Optional[pd.DataFrame],
+    snapshot_path: Path = SNAPSHOT_PATH,
+) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Genera un archivo con solo los cambios respecto a la publicación anterior.
+
+    Compara las seis tablas con la instantánea de la ejecución anterior y escribe
+    `delta.sql` con INSERT/UPDATE/DELETE en una transacción: altas y cambios de
+    catálogos en orden de dependencias (FK), después codigos_postales y al final
+    las bajas de catálogos en orden inverso. Si hubo cambios, la vista
+    `vm_codigos_postales` se refresca (si existe) y se registra una nueva
+    versión en dataset_version. Tras escribir el archivo se
+    actualiza la instantánea. Sin instantánea previa, el delta inserta todo.
+
+    Args:
+        catalogs (CatalogTables): Catálogos extraídos (ver `extract_catalogs`).
+        cp_records (Optional[pd.DataFrame]): Registros de codigos_postales
+            (ver `collect_cp_records`); None si faltan columnas esenciales.
+        snapshot_path (Path): Ruta de la instantánea anterior y de la actualizada.
+
+    Returns:
+        Dict[str, Tuple[int, int, int]]: (altas, cambios, bajas) por tabla; vacío
+        si no se pudo generar el delta.
+    """
+    filepath = OUTPUT_DIR / "delta.sql"
+    counts: Dict[str, Tuple[int, int, int]] = {}
+    if cp_records is None:
+        return counts
+    new_tables = build_snapshot(catalogs, cp_records)
+    if new_tables is None:
+        return counts
+
+    old_tables = load_snapshot(snapshot_path)
+    if old_tables is None:
+        logger.warning("Se generará un delta con todos los registros como altas.")
+        old_tables = {name: table.iloc[0:0] for name, table in new_tables.items()}
+
+    diffs = {}
+    for table in LOAD_ORDER:
+        key_cols, attr_cols = DELTA_TABLES[table]
+        diffs[table] = diff_table(old_tables[table], new_tables[table], key_cols, attr_cols)
+        inserts, updates, deletes = diffs[table]
+        counts[table] = (len(inserts), len(updates), len(deletes))
+        logger.info(f"Delta '{table}': {len(inserts)} altas, {len(updates)} cambios, {len(deletes)} bajas.")
+
+    try:
+        with open(filepath, "w", encoding="utf-8", errors="ignore") as f:
+            f.write("BEGIN;\n")
+            for table in LOAD_ORDER:
+                key_cols, attr_cols = DELTA_TABLES[table]
+                inserts, updates, deletes = diffs[table]
+                if table == "codigos_postales":
+                    f.writelines(_delete_statements(table, deletes, key_cols))
+                if not inserts.empty:
+                    f.write(_insert_statement(table, inserts))
+                f.writelines(_update_statements(table, updates, key_cols, attr_cols))
+            for table in reversed(LOAD_ORDER[:-1]):
+                key_cols, _ = DELTA_TABLES[table]
+                f.writelines(_delete_statements(table, diffs[table][2], key_cols))
+            if any(sum(c) for c in counts.values()):
+                f.write(
+                    "DO $$\n"
+                    "DECLARE\n"
+                    "    v_start TIMESTAMPTZ := clock_timestamp();\n"
+                    "BEGIN\n"
+                    "    IF to_regclass('vm_codigos_postales') IS NULL THEN\n"
+                    "        RETURN;\n"
+                    "    END IF;\n"
+                    "    -- CONCURRENTLY no bloquea las lecturas; requiere un índice único en la vista\n"
+                    "    IF EXISTS (SELECT 1 FROM pg_index WHERE indrelid = 'vm_codigos_postales'::regclass\n"
+                    "               AND indisunique AND indpred IS NULL AND indexprs IS NULL) THEN\n"
+                    "        REFRESH MATERIALIZED VIEW CONCURRENTLY vm_codigos_postales;\n"
+                    "    ELSE\n"
+                    "        REFRESH MATERIALIZED VIEW vm_codigos_postales;\n"
+                    "    END IF;\n"
+                    "    RAISE NOTICE 'vm_codigos_postales refrescada en %', clock_timestamp() - v_start;\n"
+                    "END $$;\n"
+                )
+                f.write(dataset_version_sql(new_dataset_version()))
+            else:
+                f.write("-- Sin cambios respecto a la publicación anterior\n")
+            f.write("COMMIT;\n")
+        logger.info(f"Delta generado en {filepath.name}")
+    except Exception:
+        logger.exception(f"Error al escribir el archivo SQL {filepath.name}")
+        return {}
+
+    save_snapshot(new_tables, snapshot_path)
+    return counts
@@ -0,0 +1,153 @@
+import pandas as pd
+import numpy as np
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .config import DIAGNOSTIC_SAMPLES, VERBOSE_DIAGNOSTICS
+
+logger = logging.getLogger(__name__)
+
+# Desplazamiento entre el índice del DataFrame y la línea del archivo fuente (encabezado)
+ROW_OFFSET = 2
+# Caracteres máximos de cada muestra en el resumen del log
+SAMPLE_WIDTH = 40
+
+
+def _short(value: Any) -> str:
+    """Representación acotada de una muestra para el log."""
+    text = repr(value)
+    return text if len(text) <= SAMPLE_WIDTH else text[: SAMPLE_WIDTH - 3] + "..."
+
+
+@dataclass
+class Issue:
+    """Incidencias de una regla sobre un campo: total y primeras muestras (fila, valor)."""
+    field: str
+    rule: str
+    count: int = 0
+    samples: List[Tuple[int, Any]] = field(default_factory=list)
+
+
+class DiagnosticsCollector:
+    """
+    Agrega las incidencias de datos de una ejecución por (campo, regla).
+
+    En lugar de una línea de log por fila, cuenta las incidencias y conserva
+    solo las `max_samples` primeras de cada regla; al final se emite un único
+    resumen. En modo detallado (`verbose`) también se registra cada fila.
+    """
+
+    def __init__(self, max_samples: int = DIAGNOSTIC_SAMPLES, verbose: bool = VERBOSE_DIAGNOSTICS) -> None:
+        self.max_samples = max_samples
+        self.verbose = verbose
+        self._issues: Dict[Tuple[str, str], Issue] = {}
+
+    def add(self, field_name: str, rule: str, mask: pd.Series, values: pd.Series) -> int:
+        """
+        Registra las filas marcadas por una máscara.
+
+        Args:
+            field_name (str): Campo afectado.
+            rule (str): Regla incumplida (p. ej. VACIO, FORMATO).
+            mask (pd.Series): Máscara booleana de filas con incidencia.
+            values (pd.Series): Valores del campo (alineados con `mask`) para las muestras.
+
+        Returns:
+            int: Número de filas con incidencia.
+        """
+        positions = np.flatnonzero(mask.to_numpy(dtype=bool))
+        if len(positions) == 0:
+            return 0
+        issue = self._issues.setdefault((field_name, rule), Issue(field_name, rule))
+        issue.count += len(positions)
+
+        wanted = len(positions) if self.verbose else self.max_samples - len(issue.samples)
+        if wanted > 0:
+            taken = positions[:wanted]
+            rows = (values.index[taken] + ROW_OFFSET).tolist()
+            sample_values = values.iloc[taken].astype(object)
+            samples = list(zip(rows, sample_values.where(sample_values.notna(), None).tolist()))
+            if self.verbose:
+                for row, value in samples:
+                    logger.debug(f"Fila {row}, campo '{field_name}': {rule} (valor: {value!r})")
+            issue.samples.extend(samples[: max(self.max_samples - len(issue.samples), 0)])
+        return len(positions)
+
+    def merge(self, other: "DiagnosticsCollector") -> None:
+        """
+        Incorpora las incidencias de otro colector (p. ej. las de un lote procesado en un worker).
+
+        Los colectores deben incorporarse en el orden de las filas para conservar
+        las mismas muestras que un único colector.
+
+        Args:
+            other (DiagnosticsCollector): Colector a incorporar.
+        """
+        for key, issue in other._issues.items():
+            merged = self._issues.setdefault(key, Issue(issue.field, issue.rule))
+            merged.count += issue.count
+            merged.samples.extend(issue.samples[: max(self.max_samples - len(merged.samples), 0)])
+
+    def issues(self) -> List[Issue]:
+        """Incidencias en orden de primera aparición."""
+        return list(self._issues.values())
+
+    def total(self) -> int:
+        """Número total de incidencias registradas."""
+        return sum(issue.count for issue in self._issues.values())
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Incidencias serializables (p. ej. para el JSON de métricas)."""
+        return [
+            {
+                "field": issue.field,
+                "rule": issue.rule,
+                "count": issue.count,
+                "samples": [{"row": row, "value": value} for row, value in issue.samples],
+            }
+            for issue in self._issues.values()
+        ]
+
+    def log_summary(self) -> None:
+        """Emite el resumen de incidencias (una línea por campo y regla, con sus muestras)."""
+        if not self._issues:
+            logger.info("Diagnóstico de datos: sin incidencias.")
+            return
+        logger.warning(f"Diagnóstico de datos: {self.total()} incidencias en {len(self._issues)} reglas.")
+        for issue in self._issues.values():
+            samples = ", ".join(f"fila {row}: {_short(value)}" for row, value in issue.samples)
+            logger.warning(f"  - {issue.field} / {issue.rule}: {issue.count} (p. ej. {samples})")
+
+
+# Colector de la ejecución en curso
+_ACTIVE = DiagnosticsCollector()
+
+
+def reset_diagnostics(max_samples: int = DIAGNOSTIC_SAMPLES, verbose: bool = VERBOSE_DIAGNOSTICS) -> DiagnosticsCollector:
+    """Reinicia el colector de diagnóstico (al inicio de cada ejecución)."""
+    global _ACTIVE
+    _ACTIVE = DiagnosticsCollector(max_samples, verbose)
+    return _ACTIVE
+
+
+@contextmanager
+def collecting(max_samples: int = DIAGNOSTIC_SAMPLES, verbose: bool = VERBOSE_DIAGNOSTICS) -> Iterator[DiagnosticsCollector]:
+    """Registra las incidencias del bloque en un colector aparte y restaura el de la ejecución al salir."""
+    global _ACTIVE
+    previous, _ACTIVE = _ACTIVE, DiagnosticsCollector(max_samples, verbose)
+    try:
+        yield _ACTIVE
+    finally:
+        _ACTIVE = previous
+
+
+def diagnostics() -> DiagnosticsCollector:
+    """Devuelve el colector de diagnóstico de la ejecución."""
+    return _ACTIVE
+
+
+def verbose_enabled() -> bool:
+    """Indica si está activo el registro fila a fila."""
+    return _ACTIVE.verbose
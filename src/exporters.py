@@ -0,0 +1,185 @@
+import pandas as pd
+import json
+import logging
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from functools import partial
+from typing import Callable, Dict, Sequence
+
+from .config import JSONL_FILENAME, PARQUET_COMPRESSION, PARQUET_DIRNAME, SQLITE_FILENAME
+from .copy_generator import unescape_sql_literal
+from .sqlite_lookup import build_sqlite_database
+
+logger = logging.getLogger(__name__)
+
+# Columnas de vm_codigos_postales que se exportan (sin id_codigo_postal, que asigna la base al cargar)
+VIEW_COLUMNS = [
+    "codigo_postal",
+    "nombre_asentamiento",
+    "nombre_tipo_asentamiento",
+    "nombre_zona",
+    "codigo_estado",
+    "nombre_estado",
+    "codigo_municipio",
+    "nombre_municipio",
+    "codigo_ciudad",
+    "nombre_ciudad",
+]
+# Columna de partición del conjunto Parquet
+PARQUET_PARTITION = "fk_codigo_estado"
+
+
+def denormalized_frame(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Registros con la forma de vm_codigos_postales a partir de las tablas normalizadas.
+
+    Aplica las mismas uniones que database/views.sql (INNER con estados,
+    tipos_asentamiento y zonas; LEFT con municipios y ciudades por código y
+    estado) y revierte el escapado SQL de los nombres. `id_codigo_postal` es
+    la posición en codigos_postales contando desde 1, el valor que le daría
+    la base al cargar las tablas en orden.
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Tablas por nombre (ver `build_snapshot`).
+
+    Returns:
+        pd.DataFrame: `id_codigo_postal` y VIEW_COLUMNS, ordenados por código postal y nombre.
+    """
+    cp = tables["codigos_postales"].reset_index(drop=True)
+    df = (
+        cp.assign(id_codigo_postal=cp.index + 1).merge(tables["estados"], left_on="fk_codigo_estado", right_on="pk_codigo_estado")
+        .merge(tables["tipos_asentamiento"], left_on="fk_codigo_tipo_asentamiento", right_on="pk_codigo_tipo_asentamiento")
+        .merge(tables["zonas"], left_on="fk_id_zona", right_on="pk_id_zona")
+        .merge(
+            tables["municipios"].rename(columns={"fk_codigo_estado": "municipio_estado"}),
+            how="left",
+            left_on=["fk_codigo_municipio", "fk_codigo_estado"],
+            right_on=["pk_codigo_municipio", "municipio_estado"],
+        )
+        .merge(
+            tables["ciudades"].rename(columns={"fk_codigo_estado": "ciudad_estado"}),
+            how="left",
+            left_on=["fk_codigo_ciudad", "fk_codigo_estado"],
+            right_on=["pk_codigo_ciudad", "ciudad_estado"],
+        )
+    )
+    df = df.rename(columns={
+        "pk_codigo_estado": "codigo_estado",
+        "pk_codigo_municipio": "codigo_municipio",
+        "pk_codigo_ciudad": "codigo_ciudad",
+    })
+    for column in ("nombre_asentamiento", "nombre_tipo_asentamiento", "nombre_estado", "nombre_municipio", "nombre_ciudad"):
+        df[column] = df[column].map(unescape_sql_literal, na_action="ignore")
+    df = df.sort_values(["codigo_postal", "nombre_asentamiento", "id_codigo_postal"], ignore_index=True)
+    columns = ["id_codigo_postal"] + VIEW_COLUMNS
+    return df[columns].astype(object).where(df[columns].notna(), None)
+
+
+def write_jsonl(df: pd.DataFrame, path: Path) -> int:
+    """
+    Escribe un registro JSON por línea (UTF-8; los nulos como null).
+
+    Se escribe en un archivo temporal y se renombra.
+
+    Returns:
+        int: Registros escritos (0 si hubo un error).
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        columns = VIEW_COLUMNS
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            # json.dumps en lugar de DataFrame.to_json, que escapa "/" como "\/"
+            for row in df[VIEW_COLUMNS].itertuples(index=False, name=None):
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(",", ":")) + "\n")
+        tmp_path.replace(path)
+    except Exception:
+        logger.exception(f"Error al escribir {path}")
+        return 0
+    logger.info(f"JSON Lines generado: {path} ({len(df)} registros)")
+    return len(df)
+
+
+def write_parquet(df: pd.DataFrame, directory: Path) -> int:
+    """
+    Escribe un conjunto Parquet particionado por estado (`fk_codigo_estado=XX/part-0.parquet`).
+
+    Las columnas se guardan con codificación de diccionario (los nombres de
+    estado, municipio, tipo y zona se repiten mucho) y la compresión de
+    PARQUET_COMPRESSION. Cada archivo conserva también `codigo_estado`, de modo
+    que se puede leer suelto. El conjunto se escribe en un directorio temporal
+    que reemplaza al anterior al terminar.
+
+    Returns:
+        int: Registros escritos (0 si falta pyarrow o hubo un error).
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.error("La exportación a Parquet requiere el paquete 'pyarrow' (pip install -r requirements.txt).")
+        return 0
+
+    tmp_dir = directory.with_name(directory.name + ".tmp")
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        schema = pa.schema([(column, pa.string()) for column in VIEW_COLUMNS])
+        for estado, part in df.groupby("codigo_estado", sort=True):
+            partition_dir = tmp_dir / f"{PARQUET_PARTITION}={estado}"
+            partition_dir.mkdir(parents=True)
+            table = pa.Table.from_pandas(part[VIEW_COLUMNS], schema=schema, preserve_index=False)
+            pq.write_table(
+                table, partition_dir / "part-0.parquet", use_dictionary=True, compression=PARQUET_COMPRESSION
+            )
+        shutil.rmtree(directory, ignore_errors=True)
+        tmp_dir.rename(directory)
+    except Exception:
+        logger.exception(f"Error al escribir el conjunto Parquet {directory}")
+        return 0
+    logger.info(f"Parquet generado: {directory} ({len(df)} registros, {df['codigo_estado'].nunique()} particiones)")
+    return len(df)
+
+
+# Destino -> ruta dentro del directorio de salida
+EXPORT_PATHS: Dict[str, str] = {
+    "parquet": PARQUET_DIRNAME,
+    "jsonl": JSONL_FILENAME,
+    "sqlite": SQLITE_FILENAME,
+}
+
+
+def export_targets(
+    tables: Dict[str, pd.DataFrame], targets: Sequence[str], output_dir: Path
+) -> Dict[str, Dict[str, float]]:
+    """
+    Genera los destinos pedidos a partir de las tablas normalizadas.
+
+    Los registros desnormalizados se construyen una sola vez y cada destino
+    se escribe en su propio hilo (pyarrow, sqlite3 y la escritura a disco
+    liberan el GIL).
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Tablas por nombre (ver `build_snapshot`).
+        targets (Sequence[str]): Destinos (claves de EXPORT_PATHS).
+        output_dir (Path): Directorio de salida.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por destino, registros escritos y segundos.
+    """
+    df = denormalized_frame(tables)
+    writers: Dict[str, Callable[[Path], int]] = {
+        "parquet": partial(write_parquet, df),
+        "jsonl": partial(write_jsonl, df),
+        "sqlite": partial(build_sqlite_database, tables, df),
+    }
+
+    def run(target: str) -> Dict[str, float]:
+        start = time.perf_counter()
+        rows = writers[target](output_dir / EXPORT_PATHS[target])
+        return {"rows": rows, "seconds": time.perf_counter() - start}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(targets))) as executor:
+        futures = {target: executor.submit(run, target) for target in dict.fromkeys(targets)}
+        return {target: future.result() for target, future in futures.items()}
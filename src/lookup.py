@@ -0,0 +1,565 @@
+import pandas as pd
+import numpy as np
+import logging
+import re
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .config import INPUT_FILE_PATH, USE_INPUT_CACHE
+from .models import (
+    PostalCodeRecord,
+    StateRecord,
+    MunicipalityRecord,
+    CityRecord,
+)
+from .copy_generator import unescape_sql_literal
+
+logger = logging.getLogger(__name__)
+
+# Límites de paginación de las funciones de database/functions.sql
+MAX_PAGE_LIMIT = 100
+
+# Se aplican con fullmatch: `$` aceptaría un salto de línea final, que las funciones SQL rechazan
+_CP_PATTERN = re.compile(r"[0-9]{5}")
+_ESTADO_PATTERN = re.compile(r"[0-9]{2}")
+_MUNICIPIO_PATTERN = re.compile(r"[0-9]{3}")
+_CIUDAD_PATTERN = re.compile(r"[0-9]{2}")
+
+
+def _check_code(value: str, pattern: re.Pattern, message: str) -> int:
+    """Valida un código como lo hacen las funciones SQL y lo devuelve como entero."""
+    if not isinstance(value, str) or not pattern.fullmatch(value):
+        raise ValueError(message)
+    return int(value)
+
+
+def _check_page(limit: int, offset: int) -> None:
+    """Valida la paginación como lo hacen las funciones SQL."""
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise ValueError(f"El límite debe estar entre 1 y {MAX_PAGE_LIMIT}")
+    if offset < 0:
+        raise ValueError("El offset debe ser mayor o igual a 0")
+
+
+def ilike_regex(query: str) -> re.Pattern:
+    """
+    Traduce `ILIKE '%' || query || '%'` a una expresión regular sin distinción de mayúsculas.
+
+    Como en PostgreSQL, `%` y `_` dentro de la consulta son comodines y `\\` escapa
+    el carácter siguiente. Una `\\` final escapa el `%` que se agrega al final del
+    patrón: el nombre debe terminar con la consulta seguida de un `%` literal.
+    """
+    parts = []
+    escaped = False
+    for char in query:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    if escaped:
+        parts.append(re.escape("%") + r"\Z")
+    return re.compile("".join(parts), flags=re.IGNORECASE | re.DOTALL)
+
+
+class StringTable:
+    """
+    Tabla de cadenas únicas en orden, guardada como un bloque UTF-8 con desplazamientos.
+
+    El identificador de cada cadena es su posición, por lo que comparar
+    identificadores equivale a comparar las cadenas (orden por punto de código,
+    el de una base de datos con intercalación "C").
+    """
+
+    def __init__(self, values: Sequence[str]) -> None:
+        encoded = [value.encode("utf-8") for value in values]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=self.offsets[1:])
+        self.data: Union[bytes, memoryview] = b"".join(encoded)
+
+    @classmethod
+    def from_buffers(cls, offsets: np.ndarray, data: Union[bytes, memoryview]) -> "StringTable":
+        """Tabla sobre desplazamientos y bloque UTF-8 existentes (p. ej. de un archivo mapeado), sin copiarlos."""
+        table = cls.__new__(cls)
+        table.offsets = offsets
+        table.data = data
+        return table
+
+    @classmethod
+    def from_values(cls, values: pd.Series) -> Tuple["StringTable", np.ndarray]:
+        """
+        Construye la tabla con los valores distintos ordenados.
+
+        Returns:
+            Tuple[StringTable, np.ndarray]: Tabla e identificador de cada valor.
+        """
+        codes, uniques = pd.factorize(values, sort=True)
+        return cls(list(uniques)), codes.astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.nbytes
+
+
+class _Grouping:
+    """
+    Posiciones de los registros agrupadas por una clave entera, en un orden base.
+
+    Los registros de una clave quedan contiguos en `positions` y en el orden
+    de `base_order`, de modo que una página es una rebanada.
+    """
+
+    def __init__(self, keys: np.ndarray, base_order: np.ndarray) -> None:
+        keys_in_order = keys[base_order]
+        grouped = np.argsort(keys_in_order, kind="stable")
+        self.positions = base_order[grouped].astype(np.int32)
+        sorted_keys = keys_in_order[grouped]
+        self.keys, self.starts = np.unique(sorted_keys, return_index=True)
+        self.starts = np.append(self.starts, len(sorted_keys)).astype(np.int32)
+
+    @classmethod
+    def from_arrays(cls, positions: np.ndarray, keys: np.ndarray, starts: np.ndarray) -> "_Grouping":
+        """Agrupación sobre arreglos ya construidos (ver `PostalLookup.arrays`)."""
+        grouping = cls.__new__(cls)
+        grouping.positions, grouping.keys, grouping.starts = positions, keys, starts
+        return grouping
+
+    def get(self, key: int) -> np.ndarray:
+        """Posiciones de una clave (vacío si no existe)."""
+        i = int(np.searchsorted(self.keys, self.keys.dtype.type(key)))
+        if i >= len(self.keys) or self.keys[i] != key:
+            return self.positions[:0]
+        return self.positions[self.starts[i]:self.starts[i + 1]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.positions.nbytes + self.keys.nbytes + self.starts.nbytes
+
+
+class PostalLookup:
+    """
+    Consultas de códigos postales en memoria, sin ir a PostgreSQL.
+
+    Se construye a partir de las seis tablas normalizadas (el formato de
+    `build_snapshot`) y responde las mismas consultas que las funciones de
+    `database/functions.sql`, con el mismo orden y las mismas columnas:
+
+    - Los códigos se guardan como enteros en arreglos de numpy (un elemento
+      por asentamiento) y los nombres de asentamiento como identificadores de
+      una `StringTable`.
+    - Los registros están ordenados por (código postal, nombre): la búsqueda
+      exacta es una búsqueda binaria y los listados por estado, municipio o
+      ciudad son rebanadas de agrupaciones precalculadas.
+
+    Los nombres se ordenan por punto de código (intercalación "C" en
+    PostgreSQL); con otra intercalación el orden de las páginas puede diferir.
+    Como en las funciones SQL, un código o una paginación inválidos lanzan
+    ValueError.
+
+    `arrays` y `from_arrays` exponen y reciben los arreglos ya construidos,
+    para guardarlos y mapearlos desde disco (ver `binary_snapshot`).
+    """
+
+    # Arreglos de la consulta (los de cada agrupación llevan el sufijo .positions/.keys/.starts)
+    ARRAYS = (
+        "codigo", "name_id", "estado", "municipio", "ciudad", "tipo", "zona",
+        "by_name", "name_starts", "cp_keys", "cp_starts",
+    )
+    GROUPINGS = ("by_estado", "by_municipio", "by_ciudad", "by_ciudad_name")
+
+    def __init__(self, tables: Dict[str, pd.DataFrame]) -> None:
+        estados = tables["estados"]
+        municipios = tables["municipios"]
+        ciudades = tables["ciudades"]
+        tipos = tables["tipos_asentamiento"]
+        zonas = tables["zonas"]
+
+        # Catálogos (pequeños): diccionarios por código entero
+        self._estados: Dict[int, str] = {
+            int(code): unescape_sql_literal(name)
+            for code, name in zip(estados["pk_codigo_estado"], estados["nombre_estado"])
+        }
+        self._municipios: Dict[Tuple[int, int], str] = {
+            (int(estado), int(code)): unescape_sql_literal(name)
+            for code, estado, name in zip(
+                municipios["pk_codigo_municipio"], municipios["fk_codigo_estado"], municipios["nombre_municipio"]
+            )
+        }
+        self._ciudades: Dict[Tuple[int, int], str] = {
+            (int(estado), int(code)): unescape_sql_literal(name)
+            for code, estado, name in zip(
+                ciudades["pk_codigo_ciudad"], ciudades["fk_codigo_estado"], ciudades["nombre_ciudad"]
+            )
+        }
+        self._tipos: Dict[int, str] = {
+            int(code): unescape_sql_literal(name)
+            for code, name in zip(tipos["pk_codigo_tipo_asentamiento"], tipos["nombre_tipo_asentamiento"])
+        }
+        self._zonas: Dict[int, str] = dict(zip(zonas["pk_id_zona"].astype(int), zonas["nombre_zona"]))
+
+        self._build_records(tables["codigos_postales"])
+        self._build_catalog_listings()
+        logger.info(
+            f"Consulta en memoria construida: {len(self)} asentamientos, "
+            f"{self.memory_bytes() / (1024 * 1024):.1f} MB."
+        )
+
+    # --- Construcción ---
+
+    def _build_records(self, cp: pd.DataFrame) -> None:
+        """Arreglos de codigos_postales con las uniones de vm_codigos_postales."""
+        estado = cp["fk_codigo_estado"].astype(int).to_numpy()
+        tipo = cp["fk_codigo_tipo_asentamiento"].astype(int).to_numpy()
+        zona = cp["fk_id_zona"].astype(int).to_numpy()
+        # INNER JOIN con estados, tipos_asentamiento y zonas
+        keep = (
+            np.isin(estado, list(self._estados))
+            & np.isin(tipo, list(self._tipos))
+            & np.isin(zona, list(self._zonas))
+        )
+        cp = cp.loc[keep]
+        estado, tipo, zona = estado[keep], tipo[keep], zona[keep]
+
+        # LEFT JOIN con municipios y ciudades por (código, estado): sin pareja queda NULL (-1)
+        municipio = self._optional_codes(cp["fk_codigo_municipio"], estado, self._municipios)
+        ciudad = self._optional_codes(cp["fk_codigo_ciudad"], estado, self._ciudades)
+
+        names = cp["nombre_asentamiento"].map(unescape_sql_literal)
+        self.names, name_id = StringTable.from_values(names)
+        codigo = cp["codigo_postal"].astype(int).to_numpy()
+
+        # Orden global: (código postal, nombre)
+        order = np.lexsort((name_id, codigo))
+        self.codigo = codigo[order].astype(np.int32)
+        self.name_id = name_id[order]
+        self.estado = estado[order].astype(np.uint8)
+        self.municipio = municipio[order]
+        self.ciudad = ciudad[order]
+        self.tipo = tipo[order].astype(np.uint8)
+        self.zona = zona[order].astype(np.uint8)
+
+        # Índice de códigos postales: valores distintos y el inicio de cada uno
+        self.cp_keys, cp_starts = np.unique(self.codigo, return_index=True)
+        self.cp_starts = np.append(cp_starts, len(self.codigo)).astype(np.int32)
+
+        everything = np.arange(len(self.codigo), dtype=np.int32)
+        # Orden por nombre (empates por código postal) y rango de cada nombre en él
+        self.by_name = np.argsort(self.name_id, kind="stable").astype(np.int32)
+        self.name_starts = np.searchsorted(
+            self.name_id[self.by_name], np.arange(len(self.names) + 1)
+        ).astype(np.int32)
+
+        municipio_key = np.where(self.municipio >= 0, self.estado.astype(np.int32) * 1000 + self.municipio, -1)
+        ciudad_key = np.where(self.ciudad >= 0, self.estado.astype(np.int32) * 100 + self.ciudad, -1)
+        self._by_estado = _Grouping(self.estado, everything)
+        self._by_municipio = _Grouping(municipio_key, everything)
+        self._by_ciudad = _Grouping(ciudad_key, everything)
+        self._by_ciudad_name = _Grouping(ciudad_key, self.by_name)
+
+    @staticmethod
+    def _optional_codes(codes: pd.Series, estado: np.ndarray, catalog: Dict[Tuple[int, int], str]) -> np.ndarray:
+        """Códigos opcionales como enteros; -1 si son nulos o no existen en el catálogo."""
+        values = pd.to_numeric(codes, errors="coerce").fillna(-1).astype(int).to_numpy()
+        present = np.fromiter(
+            ((int(e), int(v)) in catalog for e, v in zip(estado, values)), dtype=bool, count=len(values)
+        )
+        return np.where(present, values, -1).astype(np.int16)
+
+    def _build_catalog_listings(self) -> None:
+        """Listados de catálogos ya ordenados como en las funciones SQL."""
+        self._states = sorted(
+            (StateRecord(f"{code:02d}", name) for code, name in self._estados.items()),
+            key=lambda r: r.nombre_estado,
+        )
+        self._cities = sorted(
+            (CityRecord(f"{code:02d}", name, f"{estado:02d}") for (estado, code), name in self._ciudades.items()),
+            key=lambda r: r.nombre_ciudad,
+        )
+        self._cities_by_state: Dict[int, List[CityRecord]] = {}
+        for city in self._cities:
+            self._cities_by_state.setdefault(int(city.codigo_estado), []).append(city)
+        self._municipalities_by_state: Dict[int, List[MunicipalityRecord]] = {}
+        for (estado, code), name in sorted(self._municipios.items(), key=lambda item: item[1]):
+            self._municipalities_by_state.setdefault(estado, []).append(
+                MunicipalityRecord(f"{code:03d}", name, f"{estado:02d}")
+            )
+
+    @classmethod
+    def from_arrays(
+        cls, catalogs: Dict[str, Dict], names: StringTable, arrays: Dict[str, np.ndarray]
+    ) -> "PostalLookup":
+        """
+        Reconstruye la consulta a partir de arreglos ya construidos, sin copiarlos.
+
+        Args:
+            catalogs (Dict[str, Dict]): Catálogos por nombre (ver `catalogs`).
+            names (StringTable): Tabla de nombres a la que apuntan `name_id` y `name_starts`.
+            arrays (Dict[str, np.ndarray]): Arreglos por nombre (ver `arrays`).
+
+        Returns:
+            PostalLookup: Consulta que usa los arreglos recibidos.
+        """
+        lookup = cls.__new__(cls)
+        lookup._estados = catalogs["estados"]
+        lookup._municipios = catalogs["municipios"]
+        lookup._ciudades = catalogs["ciudades"]
+        lookup._tipos = catalogs["tipos_asentamiento"]
+        lookup._zonas = catalogs["zonas"]
+        lookup.names = names
+        for name in cls.ARRAYS:
+            setattr(lookup, name, arrays[name])
+        for name in cls.GROUPINGS:
+            setattr(lookup, f"_{name}", _Grouping.from_arrays(
+                arrays[f"{name}.positions"], arrays[f"{name}.keys"], arrays[f"{name}.starts"]
+            ))
+        lookup._build_catalog_listings()
+        return lookup
+
+    # --- Utilidades ---
+
+    def __len__(self) -> int:
+        return len(self.codigo)
+
+    def catalogs(self) -> Dict[str, Dict]:
+        """Catálogos por código entero (municipios y ciudades por (estado, código))."""
+        return {
+            "estados": self._estados,
+            "municipios": self._municipios,
+            "ciudades": self._ciudades,
+            "tipos_asentamiento": self._tipos,
+            "zonas": self._zonas,
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Arreglos de la consulta por nombre (`ARRAYS` y los de cada agrupación de `GROUPINGS`)."""
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        for name in self.GROUPINGS:
+            grouping = getattr(self, f"_{name}")
+            arrays[f"{name}.positions"] = grouping.positions
+            arrays[f"{name}.keys"] = grouping.keys
+            arrays[f"{name}.starts"] = grouping.starts
+        return arrays
+
+    def memory_bytes(self) -> int:
+        """Memoria aproximada de los arreglos y la tabla de nombres (sin catálogos)."""
+        return sum(a.nbytes for a in self.arrays().values()) + self.names.nbytes
+
+    def _records(self, positions: Union[np.ndarray, slice]) -> List[PostalCodeRecord]:
+        """
+        Materializa registros con la forma de PostalCodeRecord.
+
+        Args:
+            positions (Union[np.ndarray, slice]): Posiciones (o rango) en los arreglos.
+        """
+        columns = zip(
+            self.codigo[positions].tolist(),
+            self.name_id[positions].tolist(),
+            self.tipo[positions].tolist(),
+            self.zona[positions].tolist(),
+            self.estado[positions].tolist(),
+            self.municipio[positions].tolist(),
+            self.ciudad[positions].tolist(),
+        )
+        names = self.names
+        return [
+            PostalCodeRecord(
+                f"{codigo:05d}",
+                names[name_id],
+                self._tipos[tipo],
+                self._zonas[zona],
+                f"{estado:02d}",
+                self._estados[estado],
+                f"{municipio:03d}" if municipio >= 0 else None,
+                self._municipios[(estado, municipio)] if municipio >= 0 else None,
+                f"{ciudad:02d}" if ciudad >= 0 else None,
+                self._ciudades[(estado, ciudad)] if ciudad >= 0 else None,
+            )
+            for codigo, name_id, tipo, zona, estado, municipio, ciudad in columns
+        ]
+
+    # --- Consultas (mismas firmas y orden que database/functions.sql) ---
+
+    def search_by_postal_code(self, codigo_postal: str) -> List[PostalCodeRecord]:
+        """Asentamientos de un código postal exacto, ordenados por nombre."""
+        code = _check_code(codigo_postal, _CP_PATTERN, "El código postal debe ser de 5 dígitos")
+        # La clave con el tipo del arreglo evita que numpy convierta el arreglo completo
+        i = int(np.searchsorted(self.cp_keys, self.cp_keys.dtype.type(code)))
+        if i >= len(self.cp_keys) or self.cp_keys[i] != code:
+            return []
+        return self._records(slice(int(self.cp_starts[i]), int(self.cp_starts[i + 1])))
+
+    @cached_property
+    def _name_list(self) -> List[str]:
+        """Nombres decodificados para la búsqueda lineal (se calculan en la primera búsqueda)."""
+        return list(self.names)
+
+    def records_for_names(self, name_ids: Iterable[int], limit: int, offset: int) -> List[PostalCodeRecord]:
+        """
+        Página de registros de una secuencia de nombres, en el orden de la secuencia.
+
+        Los registros de cada nombre se ordenan por código postal. La secuencia
+        se consume solo hasta completar la página, por lo que puede ser perezosa.
+
+        Args:
+            name_ids (Iterable[int]): Identificadores de nombre (ver `names`).
+            limit (int): Registros por página.
+            offset (int): Registros a omitir.
+
+        Returns:
+            List[PostalCodeRecord]: Registros de la página.
+        """
+        wanted = offset + limit
+        positions: List[int] = []
+        for name_id in name_ids:
+            positions.extend(self.by_name[self.name_starts[name_id]:self.name_starts[name_id + 1]].tolist())
+            if len(positions) >= wanted:
+                break
+        return self._records(np.array(positions[offset:wanted], dtype=np.int32))
+
+    def search_settlements_by_name(self, query: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """
+        Asentamientos cuyo nombre contiene `query` (como ILIKE), ordenados por nombre.
+
+        Recorre la tabla de nombres distintos (búsqueda lineal), no los registros;
+        para búsquedas sin acentos con índice, ver `name_search.NameSearchIndex`.
+        """
+        _check_page(limit, offset)
+        pattern = ilike_regex(query)
+        matches = (name_id for name_id, name in enumerate(self._name_list) if pattern.search(name))
+        return self.records_for_names(matches, limit, offset)
+
+    def get_postal_codes_by_state(self, codigo_estado: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """Asentamientos de un estado, ordenados por código postal y nombre."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        _check_page(limit, offset)
+        return self._records(self._by_estado.get(estado)[offset:offset + limit])
+
+    def get_postal_codes_by_municipality(
+        self, codigo_estado: str, codigo_municipio: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de un municipio, ordenados por código postal y nombre."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        municipio = _check_code(codigo_municipio, _MUNICIPIO_PATTERN, "El código de municipio debe ser de 3 dígitos")
+        _check_page(limit, offset)
+        return self._records(self._by_municipio.get(estado * 1000 + municipio)[offset:offset + limit])
+
+    def get_postal_codes_by_city(
+        self, codigo_estado: str, codigo_ciudad: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de una ciudad, ordenados por código postal y nombre."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        ciudad = _check_code(codigo_ciudad, _CIUDAD_PATTERN, "El código de ciudad debe ser de 2 dígitos")
+        _check_page(limit, offset)
+        return self._records(self._by_ciudad.get(estado * 100 + ciudad)[offset:offset + limit])
+
+    def get_settlements_by_city(
+        self, codigo_estado: str, codigo_ciudad: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de una ciudad, ordenados por nombre."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        ciudad = _check_code(codigo_ciudad, _CIUDAD_PATTERN, "El código de ciudad debe ser de 2 dígitos")
+        _check_page(limit, offset)
+        return self._records(self._by_ciudad_name.get(estado * 100 + ciudad)[offset:offset + limit])
+
+    def get_all_states(self) -> List[StateRecord]:
+        """Todos los estados, ordenados por nombre."""
+        return list(self._states)
+
+    def get_state_by_id(self, codigo_estado: str) -> List[StateRecord]:
+        """El estado indicado (lista vacía si no existe)."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        name = self._estados.get(estado)
+        return [StateRecord(f"{estado:02d}", name)] if name is not None else []
+
+    def get_cities_by_state(self, codigo_estado: str) -> List[CityRecord]:
+        """Ciudades de un estado, ordenadas por nombre."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        return list(self._cities_by_state.get(estado, []))
+
+    def get_municipalities_by_state(self, codigo_estado: str) -> List[MunicipalityRecord]:
+        """Municipios de un estado, ordenados por nombre."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        return list(self._municipalities_by_state.get(estado, []))
+
+    def get_all_cities(self) -> List[CityRecord]:
+        """Todas las ciudades, ordenadas por nombre."""
+        return list(self._cities)
+
+    def get_city_by_id(self, codigo_estado: str, codigo_ciudad: str) -> List[CityRecord]:
+        """La ciudad indicada (lista vacía si no existe)."""
+        estado = _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        ciudad = _check_code(codigo_ciudad, _CIUDAD_PATTERN, "El código de ciudad debe ser de 2 dígitos")
+        name = self._ciudades.get((estado, ciudad))
+        return [CityRecord(f"{ciudad:02d}", name, f"{estado:02d}")] if name is not None else []
+
+
+def load_tables(
+    input_paths: Optional[List[Path]] = None, validate: bool = True, use_cache: bool = USE_INPUT_CACHE
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Construye las seis tablas normalizadas a partir de los archivos fuente de SEPOMEX.
+
+    Aplica la misma lectura, validación (sin archivo de rechazos) y
+    normalización que `main`, y reutiliza la caché del DataFrame normalizado.
+
+    Args:
+        input_paths (Optional[List[Path]]): Archivos fuente (por defecto el de config.py).
+        validate (bool): Validar la entrada antes de normalizar.
+        use_cache (bool): Usar y actualizar la caché del DataFrame normalizado.
+
+    Returns:
+        Optional[Dict[str, pd.DataFrame]]: Tablas por nombre (ver `build_snapshot`), o None
+        si no se pudieron leer los datos.
+    """
+    from .data_reader import read_sepomex_data
+    from .data_validator import validate_dataframe
+    from .data_normalizer import normalize_dataframe
+    from .catalogs import extract_catalogs
+    from .delta_generator import build_snapshot, collect_cp_records
+    from .input_cache import input_cache_key, load_cached_frame, save_cached_frame
+
+    input_paths = input_paths or [INPUT_FILE_PATH]
+    cache_key = input_cache_key(input_paths, validate) if use_cache else None
+    df = load_cached_frame(cache_key) if cache_key else None
+    if df is None:
+        df_raw = read_sepomex_data(input_paths)
+        if df_raw is None:
+            logger.error("No se pudieron leer los datos fuente.")
+            return None
+        if validate:
+            df_raw = validate_dataframe(df_raw, rejects_path=None)
+        df = normalize_dataframe(df_raw)
+        if cache_key:
+            save_cached_frame(cache_key, df)
+
+    cp_records, _ = collect_cp_records(df)
+    return build_snapshot(extract_catalogs(df), cp_records) if cp_records is not None else None
+
+
+def load_lookup(
+    input_paths: Optional[List[Path]] = None, validate: bool = True, use_cache: bool = USE_INPUT_CACHE
+) -> Optional[PostalLookup]:
+    """
+    Construye la consulta en memoria a partir de los archivos fuente de SEPOMEX (ver `load_tables`).
+
+    Returns:
+        Optional[PostalLookup]: Consulta en memoria, o None si no se pudieron leer los datos.
+    """
+    tables = load_tables(input_paths, validate, use_cache)
+    return PostalLookup(tables) if tables is not None else None
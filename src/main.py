@@ -1,10 +1,40 @@
+import argparse
+import pandas as pd
 import logging
 import sys
 import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
 
-from .config import LOG_FILE, LOG_LEVEL, LOG_FORMAT
-from .data_reader import read_sepomex_data
+from .config import (
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_FORMAT,
+    OUTPUT_FORMAT,
+    COPY_FORMAT,
+    DATABASE_URL,
+    BATCH_SIZE_DB_LOAD,
+    BATCH_SIZE_CODIGOS_POSTALES,
+    WORKERS_CODIGOS_POSTALES,
+    READ_CHUNK_SIZE,
+    INPUT_FILE_PATH,
+    SNAPSHOT_PATH,
+    USE_INPUT_CACHE,
+    VALIDATE_INPUT,
+    METRICS_FILENAME,
+    OUTPUT_DIR,
+    VERBOSE_DIAGNOSTICS,
+    MAX_ROWS_PER_INSERT,
+    MAX_ROWS_PER_FILE,
+    SQL_MANIFEST_FILENAME,
+    BINARY_SNAPSHOT_FILENAME,
+    WRITE_BINARY_SNAPSHOT,
+    EXPORT_TARGETS,
+)
+from .data_reader import read_sepomex_data, read_sepomex_chunks
 from .data_validator import validate_dataframe
+from .data_normalizer import normalize_dataframe
+from .catalogs import CatalogAccumulator, extract_catalogs
 from .sql_generator import (
     generate_estados_sql,
     generate_municipios_sql,
@@ -12,7 +42,28 @@ from .sql_generator import (
     generate_zonas_sql,
     generate_ciudades_sql,
     generate_codigos_postales_sql,
+    reset_sql_manifest,
+    write_sql_manifest,
+)
+from .copy_generator import (
+    COPY_FORMATS,
+    generate_estados_copy,
+    generate_municipios_copy,
+    generate_tipos_asentamiento_copy,
+    generate_zonas_copy,
+    generate_ciudades_copy,
+    generate_codigos_postales_copy,
 )
+from .db_loader import load_to_database
+from .input_cache import input_cache_key, load_cached_frame, save_cached_frame
+from .delta_generator import build_snapshot, collect_cp_records, generate_delta_sql
+from .lookup import PostalLookup
+from .binary_snapshot import write_binary_snapshot
+from .exporters import EXPORT_PATHS, export_targets
+from .utils import memo_cache_stats, reset_memo_caches
+from .metrics import record_info, stage, start_metrics
+from .diagnostics import diagnostics, reset_diagnostics
+from .worker_pipeline import WorkerPipeline
 
 def setup_logging():
     """Configura el sistema de logging para archivo y consola."""
@@ -26,58 +77,407 @@ def setup_logging():
         ]
     )
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Interpreta los argumentos de línea de comandos (los valores por defecto vienen de config.py)."""
+    parser = argparse.ArgumentParser(description="Generador de archivos SQL para SEPOMEX v2.")
+    parser.add_argument(
+        "--output-format",
+        choices=["sql", "copy", "db", "delta"],
+        default=OUTPUT_FORMAT,
+        help=(
+            "'sql' genera sentencias INSERT; 'copy' genera bloques COPY ... FROM STDIN; "
+            "'db' carga directamente en PostgreSQL sin archivos intermedios; "
+            "'delta' genera solo los cambios respecto a la instantánea anterior."
+        ),
+    )
+    parser.add_argument(
+        "--copy-format",
+        choices=COPY_FORMATS,
+        default=COPY_FORMAT,
+        help="Formato de los datos COPY (solo con --output-format copy).",
+    )
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        type=Path,
+        default=[INPUT_FILE_PATH],
+        metavar="ARCHIVO",
+        help="Archivo(s) fuente de SEPOMEX; varios archivos se procesan en el orden dado.",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=READ_CHUNK_SIZE,
+        help="Registros por bloque de lectura (0 = leer todo en memoria; >0 = modo por bloques).",
+    )
+    parser.add_argument(
+        "--no-validate",
+        dest="validate",
+        action="store_false",
+        default=VALIDATE_INPUT,
+        help="Omitir la validación de la entrada (y el archivo de rechazos).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        default=USE_INPUT_CACHE,
+        help="No usar ni actualizar la caché del DataFrame normalizado (data/cache/).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS_CODIGOS_POSTALES,
+        help=(
+            "Procesos para validar, normalizar y generar los lotes de códigos postales "
+            "(1 = en serie; solo con --output-format sql o copy; con más de 1 no se usa la caché de entrada)."
+        ),
+    )
+    parser.add_argument(
+        "--rows-per-insert",
+        type=int,
+        default=MAX_ROWS_PER_INSERT,
+        help="Máximo de filas por sentencia INSERT (0 = un único INSERT por archivo; solo con --output-format sql).",
+    )
+    parser.add_argument(
+        "--rows-per-file",
+        type=int,
+        default=MAX_ROWS_PER_FILE,
+        help=(
+            "Máximo de filas por archivo SQL; con un límite se generan partes numeradas "
+            f"y se listan en {SQL_MANIFEST_FILENAME} (0 = un archivo por tabla; solo con --output-format sql)."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        default=SNAPSHOT_PATH,
+        help="Instantánea de la publicación anterior; se actualiza al generar el delta (solo con --output-format delta).",
+    )
+    parser.add_argument(
+        "--dsn",
+        default=DATABASE_URL,
+        help="Cadena de conexión de PostgreSQL (solo con --output-format db).",
+    )
+    parser.add_argument(
+        "--load-batch-size",
+        type=int,
+        default=BATCH_SIZE_DB_LOAD,
+        help="Filas por bloque enviado en cada COPY (solo con --output-format db).",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Vaciar las tablas antes de cargar (solo con --output-format db).",
+    )
+    parser.add_argument(
+        "--binary-snapshot",
+        action="store_true",
+        default=WRITE_BINARY_SNAPSHOT,
+        help=(
+            f"Guardar también la consulta en memoria como instantánea binaria mapeable ({BINARY_SNAPSHOT_FILENAME}); "
+            "requiere --chunksize 0 salvo con --output-format delta."
+        ),
+    )
+    parser.add_argument(
+        "--export",
+        nargs="+",
+        choices=list(EXPORT_PATHS),
+        default=EXPORT_TARGETS,
+        metavar="DESTINO",
+        help=(
+            "Generar además los registros de vm_codigos_postales en Parquet (particionado por estado), "
+            "JSON Lines y/o una base SQLite autocontenida, en paralelo; requiere --chunksize 0 salvo con "
+            "--output-format delta."
+        ),
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        default=VERBOSE_DIAGNOSTICS,
+        help="Registrar en el log cada fila con incidencias (por defecto solo se emite un resumen al final).",
+    )
+    parser.add_argument(
+        "--print-metrics",
+        action="store_true",
+        help=f"Mostrar al final la tabla de métricas por etapa (siempre se guardan en {METRICS_FILENAME}).",
+    )
+    return parser.parse_args(argv)
+
+def timed_chunks(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Mide la lectura de cada bloque como parte de la etapa de lectura."""
+    while True:
+        with stage("read") as metrics_stage:
+            chunk = next(chunks, None)
+            if chunk is not None:
+                metrics_stage.rows_out += len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+def normalized_chunks(
+    chunks: Iterator[pd.DataFrame],
+    accumulator: Optional[CatalogAccumulator] = None,
+    validate: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """Valida y normaliza cada bloque leído y, si se indica, lo incorpora a los catálogos."""
+    for i, chunk in enumerate(timed_chunks(chunks)):
+        if validate:
+            chunk = validated(chunk, append=i > 0)
+        df_chunk = normalized(chunk)
+        if accumulator is not None:
+            with stage("extract_catalogs") as metrics_stage:
+                accumulator.update(df_chunk)
+                metrics_stage.rows_in += len(df_chunk)
+        yield df_chunk
+
+def validated(df: pd.DataFrame, append: bool = False) -> pd.DataFrame:
+    """`validate_dataframe` medido como etapa (errores = filas rechazadas)."""
+    with stage("validate") as metrics_stage:
+        df_valid = validate_dataframe(df, append=append)
+        metrics_stage.rows_in += len(df)
+        metrics_stage.rows_out += len(df_valid)
+        metrics_stage.errors += len(df) - len(df_valid)
+    return df_valid
+
+def normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """`normalize_dataframe` medido como etapa."""
+    with stage("normalize") as metrics_stage:
+        df_norm = normalize_dataframe(df)
+        metrics_stage.rows_in += len(df)
+        metrics_stage.rows_out += len(df_norm)
+    return df_norm
+
+def timed_table(name: str, generator: Callable[..., int], *args) -> int:
+    """Ejecuta el generador de una tabla de catálogo como etapa medida."""
+    with stage(name) as metrics_stage:
+        generated = generator(*args)
+        metrics_stage.rows_out += generated
+    return generated
+
+def timed_codigos_postales(name: str, generator: Callable[..., Tuple[int, int]], data, *args, **kwargs) -> Tuple[int, int]:
+    """Ejecuta el generador de codigos_postales como etapa medida (con sus lotes)."""
+    with stage(name) as metrics_stage:
+        inserted, errors = generator(data, *args, **kwargs)
+        metrics_stage.rows_in += inserted + errors
+        metrics_stage.rows_out += inserted
+        metrics_stage.errors += errors
+    return inserted, errors
+
+def timed_binary_snapshot(tables, path: Path) -> None:
+    """Construye la consulta en memoria y la guarda como instantánea binaria, midiendo la etapa."""
+    with stage("write_binary_snapshot") as metrics_stage:
+        lookup = PostalLookup(tables)
+        metrics_stage.rows_in += len(tables["codigos_postales"])
+        if write_binary_snapshot(lookup, path):
+            metrics_stage.rows_out += len(lookup)
+
+def timed_exports(tables, targets: List[str], output_dir: Path) -> None:
+    """Genera los destinos de exportación en paralelo, midiendo la etapa y cada destino."""
+    with stage("export") as metrics_stage:
+        results = export_targets(tables, targets, output_dir)
+        metrics_stage.rows_in += len(tables["codigos_postales"])
+        metrics_stage.rows_out += sum(int(result["rows"]) for result in results.values())
+        metrics_stage.errors += sum(1 for result in results.values() if not result["rows"])
+    record_info("exports", results)
+
+def main(argv: Optional[List[str]] = None):
     """Punto de entrada principal para la generación de archivos SQL."""
+    args = parse_args(argv)
     setup_logging()
     logger = logging.getLogger(__name__)
     start_time = time.time()
+    reset_memo_caches() # Las cachés de memoización son por ejecución
+    reset_diagnostics(verbose=args.verbose)
+    metrics = start_metrics(
+        output_format=args.output_format,
+        inputs=[str(path) for path in args.input],
+        chunksize=args.chunksize,
+        workers=args.workers,
+        validate=args.validate,
+    )
 
     logger.info("--- Iniciando proceso de generación de SQL para SEPOMEX v2 ---")
 
     # 1. Leer datos
-    df_raw = read_sepomex_data()
-    if df_raw is None:
-        logger.error("No se pudieron leer los datos. Terminando proceso.")
-        return
-
-    # 2. Validar datos (Opcional, podría ralentizar si se valida todo)
-    # Si se omite, la validación se hace registro a registro en sql_generator
-    # df_validated = validate_dataframe(df_raw)
-    # if df_validated.empty:
-    #     logger.warning("No hay datos válidos después de la validación. No se generarán archivos SQL.")
-    #     return
-    # df_to_process = df_validated
-
-    # Usar datos crudos y validar dentro de cada generador
-    df_to_process = df_raw
-
-    # 3. Generar archivos SQL (en orden de dependencias)
-    logger.info("--- Iniciando generación de archivos SQL ---")
+    pipeline = None
+    from_cache = False
+    if args.workers > 1 and args.output_format in ("sql", "copy"):
+        # Validación, normalización y formateo en el pool: aquí solo se leen los bloques
+        chunks = read_sepomex_chunks(args.chunksize if args.chunksize > 0 else BATCH_SIZE_CODIGOS_POSTALES, args.input)
+        if chunks is None:
+            logger.error("No se pudieron leer los datos. Terminando proceso.")
+            return
+        pipeline = WorkerPipeline(args.validate)
+        accumulator = pipeline.catalogs
+        df_to_process = timed_chunks(chunks)
+        catalogs = None # Se conocen al consumir todos los bloques
+    elif args.chunksize > 0:
+        # Modo por bloques: la memoria depende del tamaño de bloque, no del archivo
+        chunks = read_sepomex_chunks(args.chunksize, args.input)
+        if chunks is None:
+            logger.error("No se pudieron leer los datos. Terminando proceso.")
+            return
+        accumulator = CatalogAccumulator()
+        df_to_process = normalized_chunks(chunks, accumulator, args.validate)
+        catalogs = None # Se conocen al consumir todos los bloques
+        if args.output_format == "db":
+            # Las FKs exigen cargar los catálogos primero: una pasada previa solo para catálogos
+            logger.info("--- Primera pasada: extracción de catálogos ---")
+            for _ in df_to_process:
+                pass
+            catalogs = accumulator.result()
+            reset_diagnostics(verbose=args.verbose) # La segunda pasada vuelve a registrar las mismas incidencias
+            df_to_process = normalized_chunks(
+                read_sepomex_chunks(args.chunksize, args.input), validate=args.validate
+            )
+    else:
+        cache_key = input_cache_key(args.input, args.validate) if args.cache else None
+        df_to_process = None
+        if cache_key:
+            with stage("load_cache") as metrics_stage:
+                df_to_process = load_cached_frame(cache_key)
+                metrics_stage.rows_out += len(df_to_process) if df_to_process is not None else 0
+                from_cache = df_to_process is not None
+        if df_to_process is None:
+            with stage("read") as metrics_stage:
+                df_raw = read_sepomex_data(args.input)
+                metrics_stage.rows_out += len(df_raw) if df_raw is not None else 0
+            if df_raw is None:
+                logger.error("No se pudieron leer los datos. Terminando proceso.")
+                return
+
+            # 2. Validar datos (máscaras por columna; los rechazos van a REJECTS_FILE)
+            if args.validate:
+                df_raw = validated(df_raw)
+                if df_raw.empty:
+                    logger.warning("No hay datos válidos después de la validación. No se generarán archivos SQL.")
+                    return
+
+            # Normalizar una sola vez (códigos, nombres y zona) para todos los generadores
+            df_to_process = normalized(df_raw)
+            del df_raw
+            if cache_key:
+                save_cached_frame(cache_key, df_to_process)
+        with stage("extract_catalogs") as metrics_stage:
+            catalogs = extract_catalogs(df_to_process) # Una sola pasada para los 4 catálogos
+            metrics_stage.rows_in += len(df_to_process)
+
+    # 3. Generar archivos SQL
+    # codigos_postales se escribe primero: en modo por bloques los catálogos solo
+    # están completos tras consumir todos los bloques. Los archivos numerados
+    # mantienen el orden de dependencias para su ejecución.
     counts = {}
-    counts["estados"] = generate_estados_sql(df_to_process)
-    counts["municipios"] = generate_municipios_sql(df_to_process)
-    counts["tipos_asentamiento"] = generate_tipos_asentamiento_sql(df_to_process)
-    counts["zonas"] = generate_zonas_sql() # Zonas no depende del df
-    counts["ciudades"] = generate_ciudades_sql(df_to_process)
-
-    # Generar códigos postales (devuelve insertados y errores)
-    cp_inserted, cp_errors = generate_codigos_postales_sql(df_to_process)
+    if args.output_format == "db":
+        logger.info("--- Iniciando carga directa en PostgreSQL ---")
+        with stage("load_to_database") as metrics_stage:
+            counts, cp_errors = load_to_database(
+                catalogs, df_to_process, args.dsn, args.load_batch_size, args.replace
+            )
+            metrics_stage.rows_out += sum(counts.values())
+            metrics_stage.errors += cp_errors
+        cp_inserted = counts["codigos_postales"]
+    elif args.output_format == "delta":
+        logger.info("--- Iniciando generación del delta respecto a la publicación anterior ---")
+        with stage("collect_cp_records") as metrics_stage:
+            cp_records, cp_errors = collect_cp_records(df_to_process)
+            metrics_stage.rows_out += len(cp_records) if cp_records is not None else 0
+            metrics_stage.errors += cp_errors
+        catalogs = catalogs or accumulator.result()
+        with stage("generate_delta_sql") as metrics_stage:
+            delta_counts = generate_delta_sql(catalogs, cp_records, args.snapshot)
+            metrics_stage.rows_out += sum(sum(changes) for changes in delta_counts.values())
+        counts = {
+            table: f"{altas} altas, {cambios} cambios, {bajas} bajas"
+            for table, (altas, cambios, bajas) in delta_counts.items()
+        }
+        cp_inserted = counts.get("codigos_postales", 0)
+    elif args.output_format == "copy":
+        logger.info(f"--- Iniciando generación de archivos COPY ({args.copy_format}) ---")
+        cp_inserted, cp_errors = timed_codigos_postales(
+            "generate_codigos_postales_copy", generate_codigos_postales_copy,
+            df_to_process, args.copy_format, args.workers, pipeline=pipeline,
+        )
+        catalogs = catalogs or accumulator.result()
+        counts["estados"] = timed_table("generate_estados_copy", generate_estados_copy, catalogs.estados, args.copy_format)
+        counts["municipios"] = timed_table("generate_municipios_copy", generate_municipios_copy, catalogs.municipios, args.copy_format)
+        counts["tipos_asentamiento"] = timed_table(
+            "generate_tipos_asentamiento_copy", generate_tipos_asentamiento_copy, catalogs.tipos_asentamiento, args.copy_format
+        )
+        counts["zonas"] = timed_table("generate_zonas_copy", generate_zonas_copy, args.copy_format)
+        counts["ciudades"] = timed_table("generate_ciudades_copy", generate_ciudades_copy, catalogs.ciudades, args.copy_format)
+    else:
+        logger.info("--- Iniciando generación de archivos SQL ---")
+        # Generar códigos postales (devuelve insertados y errores)
+        limits = (args.rows_per_insert, args.rows_per_file)
+        reset_sql_manifest()
+        cp_inserted, cp_errors = timed_codigos_postales(
+            "generate_codigos_postales_sql", generate_codigos_postales_sql, df_to_process, args.workers, *limits,
+            pipeline=pipeline,
+        )
+
+        catalogs = catalogs or accumulator.result()
+        counts["estados"] = timed_table("generate_estados_sql", generate_estados_sql, catalogs.estados, *limits)
+        counts["municipios"] = timed_table("generate_municipios_sql", generate_municipios_sql, catalogs.municipios, *limits)
+        counts["tipos_asentamiento"] = timed_table(
+            "generate_tipos_asentamiento_sql", generate_tipos_asentamiento_sql, catalogs.tipos_asentamiento, *limits
+        )
+        counts["zonas"] = timed_table("generate_zonas_sql", generate_zonas_sql, *limits) # Zonas no depende del df
+        counts["ciudades"] = timed_table("generate_ciudades_sql", generate_ciudades_sql, catalogs.ciudades, *limits)
+        write_sql_manifest(OUTPUT_DIR / SQL_MANIFEST_FILENAME, *limits)
     counts["codigos_postales"] = cp_inserted
+    if pipeline is not None:
+        pipeline.finish()
+
+    # 4. Salidas derivadas de las tablas normalizadas (opcionales)
+    if args.binary_snapshot or args.export:
+        if args.output_format == "delta":
+            tables = build_snapshot(catalogs, cp_records) if cp_records is not None else None
+        elif args.chunksize <= 0 and pipeline is None:
+            tables = build_snapshot(catalogs, collect_cp_records(df_to_process)[0])
+        else:
+            logger.warning(
+                "La instantánea binaria y las exportaciones requieren --chunksize 0 y --workers 1 "
+                "(o --output-format delta); no se generan."
+            )
+            tables = None
+        if tables is not None and args.export:
+            timed_exports(tables, args.export, OUTPUT_DIR)
+        if tables is not None and args.binary_snapshot:
+            timed_binary_snapshot(tables, OUTPUT_DIR / BINARY_SNAPSHOT_FILENAME)
 
     end_time = time.time()
     duration = end_time - start_time
+    metrics.finish()
+    metrics.info["diagnostics"] = diagnostics().to_list()
+    metrics.write_json(OUTPUT_DIR / METRICS_FILENAME)
 
-    # 4. Resumen final
+    # 5. Resumen final
     logger.info("--- Proceso completado ---")
     logger.info("Resumen de registros generados:")
     for entity, count in counts.items():
         logger.info(f"  - {entity.capitalize()}: {count}")
     if cp_errors > 0:
         logger.warning(f"Se encontraron {cp_errors} errores al procesar códigos postales.")
+    if args.chunksize <= 0 and from_cache:
+        logger.info("Diagnóstico de datos: entrada tomada de la caché, sin revalidar (use --no-cache para recalcularlo).")
+    else:
+        diagnostics().log_summary()
+    stats = memo_cache_stats()
+    if stats:
+        logger.info("Cachés de memoización (aciertos / fallos / entradas):")
+        for name, hits, misses, entries in stats:
+            logger.info(f"  - {name}: {hits} / {misses} / {entries}")
+    if args.print_metrics:
+        logger.info("Métricas por etapa:")
+        for line in metrics.format_table():
+            logger.info(f"  {line}")
     logger.info(f"Tiempo total de ejecución: {duration:.2f} segundos.")
-    logger.info(f"Archivos SQL generados en: {config.OUTPUT_DIR}")
+    if args.output_format == "db":
+        logger.info("Datos cargados directamente en PostgreSQL (sin archivos intermedios).")
+    else:
+        logger.info(f"Archivos SQL generados en: {OUTPUT_DIR}")
     logger.info(f"Log detallado disponible en: {LOG_FILE}")
 
 if __name__ == "__main__":
-    from src import config
     main() 
\ No newline at end of file
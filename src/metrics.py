@@ -0,0 +1,285 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _proc_status_mb(field_name: str) -> Optional[float]:
+    """Lee un campo en kB de /proc/self/status (Linux) y lo devuelve en MB."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field_name + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Memoria residente pico del proceso en MB.
+
+    En Linux es el pico desde el último `reset_peak_rss`; en otros sistemas
+    Unix, el de toda la vida del proceso. None si no se puede medir (Windows).
+    """
+    hwm = _proc_status_mb("VmHWM")
+    if hwm is not None:
+        return hwm
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss() -> None:
+    """Reinicia el pico de memoria residente (VmHWM) del proceso, si el sistema lo permite."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _max_peak(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """Máximo de dos picos de memoria que pueden no estar disponibles."""
+    if a is None:
+        return b
+    return a if b is None else max(a, b)
+
+
+@dataclass
+class BatchMetrics:
+    """Métricas de un lote de codigos_postales (medidas en el proceso que lo procesa)."""
+    rows_in: int
+    rows_out: int = 0
+    errors: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    pid: int = 0
+
+
+@dataclass
+class StageMetrics:
+    """
+    Métricas acumuladas de una etapa del proceso.
+
+    Los tiempos son exclusivos: no incluyen las etapas anidadas (p. ej. la
+    lectura de bloques que ocurre mientras se generan los codigos_postales).
+    """
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    errors: int = 0
+    peak_rss_mb: Optional[float] = None
+    calls: int = 0
+    batches: List[BatchMetrics] = field(default_factory=list)
+
+    @property
+    def rows_per_s(self) -> float:
+        """Filas procesadas (de entrada o, si no constan, de salida) por segundo."""
+        rows = self.rows_in or self.rows_out
+        return rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["rows_per_s"] = self.rows_per_s
+        batches = data.pop("batches")
+        for batch in batches:
+            batch.pop("pid")
+        data["batches"] = batches
+        return data
+
+
+@dataclass
+class _OpenStage:
+    """Etapa en curso: instantes de inicio y tiempo consumido por etapas anidadas."""
+    stage: StageMetrics
+    wall_start: float
+    cpu_start: float
+    child_wall: float = 0.0
+    child_cpu: float = 0.0
+
+
+class PipelineMetrics:
+    """
+    Métricas de una ejecución: una entrada por etapa (lectura, validación,
+    normalización, cada generador...) con tiempo de reloj y de CPU, filas de
+    entrada/salida, filas/s, errores y memoria pico.
+
+    Una etapa puede abrirse varias veces (modo por bloques) y sus valores se
+    acumulan. Los lotes de codigos_postales se registran dentro de la etapa
+    abierta con `record_batch`.
+    """
+
+    def __init__(self, **info: Any) -> None:
+        self.info = dict(info)
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.stages: Dict[str, StageMetrics] = {}
+        self._open: List[_OpenStage] = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """
+        Mide una etapa; el llamador completa filas y errores sobre el objeto devuelto.
+
+        Args:
+            name (str): Nombre de la etapa.
+
+        Yields:
+            StageMetrics: Métricas acumuladas de la etapa.
+        """
+        stage = self.stages.setdefault(name, StageMetrics(name))
+        if self._open:
+            # El pico previo pertenece a la etapa que contiene a esta
+            parent = self._open[-1].stage
+            parent.peak_rss_mb = _max_peak(parent.peak_rss_mb, peak_rss_mb())
+        reset_peak_rss()
+        frame = _OpenStage(stage, time.perf_counter(), time.process_time())
+        self._open.append(frame)
+        try:
+            yield stage
+        finally:
+            self._open.pop()
+            wall = time.perf_counter() - frame.wall_start
+            cpu = time.process_time() - frame.cpu_start
+            stage.wall_seconds += wall - frame.child_wall
+            stage.cpu_seconds += cpu - frame.child_cpu
+            stage.calls += 1
+            stage.peak_rss_mb = _max_peak(stage.peak_rss_mb, peak_rss_mb())
+            if self._open:
+                parent = self._open[-1]
+                parent.child_wall += wall
+                parent.child_cpu += cpu
+                parent.stage.peak_rss_mb = _max_peak(parent.stage.peak_rss_mb, stage.peak_rss_mb)
+
+    def record_batch(self, batch: BatchMetrics) -> None:
+        """
+        Registra un lote en la etapa abierta.
+
+        Si el lote se procesó en otro proceso (pool de workers), su tiempo de CPU
+        se suma al de la etapa, que solo mide el proceso principal.
+        """
+        if not self._open:
+            return
+        stage = self._open[-1].stage
+        stage.batches.append(batch)
+        if batch.pid != os.getpid():
+            stage.cpu_seconds += batch.cpu_seconds
+        else:
+            stage.peak_rss_mb = _max_peak(stage.peak_rss_mb, batch.peak_rss_mb)
+
+    def finish(self) -> None:
+        """Cierra la ejecución (tiempo total)."""
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        self.cpu_seconds = time.process_time() - self._cpu_start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            **self.info,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "stages": [stage.to_dict() for stage in self.stages.values()],
+        }
+
+    def write_json(self, path: Path) -> None:
+        """Escribe las métricas en un archivo JSON."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2, ensure_ascii=False, default=str)
+                f.write("\n")
+            logger.info(f"Métricas de la ejecución guardadas en {path}")
+        except OSError:
+            logger.exception(f"Error al escribir el archivo de métricas {path}")
+
+    def format_table(self) -> List[str]:
+        """Tabla de texto con una línea por etapa."""
+        lines = [
+            f"{'etapa':<32}{'reloj s':>9}{'CPU s':>9}{'entrada':>10}{'salida':>10}"
+            f"{'filas/s':>11}{'errores':>9}{'lotes':>7}{'pico MB':>9}"
+        ]
+        for s in self.stages.values():
+            peak = "n/d" if s.peak_rss_mb is None else f"{s.peak_rss_mb:.0f}"
+            lines.append(
+                f"{s.name:<32}{s.wall_seconds:>9.3f}{s.cpu_seconds:>9.3f}{s.rows_in:>10}{s.rows_out:>10}"
+                f"{s.rows_per_s:>11.0f}{s.errors:>9}{len(s.batches):>7}{peak:>9}"
+            )
+        return lines
+
+
+class TimedBatch:
+    """
+    Envuelve la función que procesa un lote para medirla donde se ejecuta
+    (también dentro de un pool de procesos, por lo que debe ser serializable).
+
+    Devuelve `(resultado, BatchMetrics)`; el llamador completa filas de salida y
+    errores y lo registra con `record_batch`.
+    """
+
+    def __init__(self, func: Callable[[Any], Any]) -> None:
+        self.func = func
+
+    def __call__(self, batch: Any) -> Tuple[Any, BatchMetrics]:
+        reset_peak_rss()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        result = self.func(batch)
+        return result, BatchMetrics(
+            rows_in=len(batch),
+            wall_seconds=time.perf_counter() - wall_start,
+            cpu_seconds=time.process_time() - cpu_start,
+            peak_rss_mb=peak_rss_mb(),
+            pid=os.getpid(),
+        )
+
+
+# Métricas de la ejecución en curso (None fuera de `main`)
+_ACTIVE: Optional[PipelineMetrics] = None
+
+
+def start_metrics(**info: Any) -> PipelineMetrics:
+    """Inicia las métricas de una ejecución; `info` se guarda tal cual en el JSON."""
+    global _ACTIVE
+    _ACTIVE = PipelineMetrics(**info)
+    return _ACTIVE
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageMetrics]:
+    """Mide una etapa en las métricas activas (sin métricas activas no registra nada)."""
+    if _ACTIVE is None:
+        yield StageMetrics(name)
+        return
+    with _ACTIVE.stage(name) as current:
+        yield current
+
+
+def record_batch(batch: BatchMetrics) -> None:
+    """Registra un lote en la etapa abierta de las métricas activas."""
+    if _ACTIVE is not None:
+        _ACTIVE.record_batch(batch)
+
+
+def record_info(key: str, value: Any) -> None:
+    """Guarda un dato de la ejecución (se escribe tal cual en el JSON) en las métricas activas."""
+    if _ACTIVE is not None:
+        _ACTIVE.info[key] = value
@@ -48,4 +48,50 @@ class CodigoPostal:
     fk_codigo_municipio: Optional[str]
     fk_codigo_ciudad: Optional[str]
     fk_codigo_tipo_asentamiento: str
-    fk_id_zona: int 
\ No newline at end of file
+    fk_id_zona: int 
+
+
+# --- Registros devueltos por las funciones de consulta (database/functions.sql) ---
+
+@dataclass(frozen=True)
+class PostalCodeRecord:
+    """Fila de `search_by_postal_code`, `get_postal_codes_by_*` y `search_settlements_by_name`."""
+    codigo_postal: str
+    nombre_asentamiento: str
+    tipo_asentamiento: str
+    zona: str
+    codigo_estado: str
+    nombre_estado: str
+    pk_codigo_municipio: Optional[str]
+    nombre_municipio: Optional[str]
+    pk_codigo_ciudad: Optional[str]
+    nombre_ciudad: Optional[str]
+
+
+@dataclass(frozen=True)
+class KeysetPostalCodeRecord(PostalCodeRecord):
+    """Fila de las variantes `_keyset`: PostalCodeRecord más `id_codigo_postal`, el desempate del cursor."""
+    id_codigo_postal: int
+
+
+@dataclass(frozen=True)
+class StateRecord:
+    """Fila de `get_all_states` y `get_state_by_id`."""
+    codigo_estado: str
+    nombre_estado: str
+
+
+@dataclass(frozen=True)
+class MunicipalityRecord:
+    """Fila de `get_municipalities_by_state`."""
+    codigo_municipio: str
+    nombre_municipio: str
+    codigo_estado: str
+
+
+@dataclass(frozen=True)
+class CityRecord:
+    """Fila de `get_all_cities`, `get_city_by_id` y `get_cities_by_state`."""
+    codigo_ciudad: str
+    nombre_ciudad: str
+    codigo_estado: str
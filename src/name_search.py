@@ -0,0 +1,196 @@
+import pandas as pd
+import numpy as np
+import logging
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .lookup import PostalLookup, _check_page, ilike_regex
+from .models import PostalCodeRecord
+
+logger = logging.getLogger(__name__)
+
+# Longitud de los n-gramas del índice
+NGRAM = 3
+# Similitud mínima (n-gramas compartidos / n-gramas de ambos) para los resultados aproximados
+MIN_SIMILARITY = 0.3
+
+# Niveles de la búsqueda ordenada por relevancia (menor es mejor)
+RANK_EXACT = 0      # El nombre es la consulta
+RANK_PREFIX = 1     # El nombre empieza por la consulta
+RANK_WORD = 2       # Una palabra del nombre empieza por la consulta
+RANK_SUBSTRING = 3  # La consulta aparece dentro del nombre
+RANK_SIMILAR = 4    # Sin coincidencia literal, pero con n-gramas suficientes en común
+
+
+def fold(text: str) -> str:
+    """
+    Pliega acentos y mayúsculas: "Álvaro Obregón" -> "alvaro obregon".
+
+    Descompone los caracteres (NFKD), elimina las marcas diacríticas (también
+    la tilde de la ñ) y aplica `casefold`.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _ngrams(text: str) -> set:
+    """N-gramas distintos de un texto (vacío si es más corto que NGRAM)."""
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _query_ngrams(folded_query: str) -> set:
+    """N-gramas de los tramos literales de la consulta (sin comodines `%`, `_` ni escapes)."""
+    grams: set = set()
+    for segment in re.split(r"[%_\\]", folded_query):
+        grams |= _ngrams(segment)
+    return grams
+
+
+class NameSearchIndex:
+    """
+    Índice invertido de n-gramas sobre los nombres de asentamiento de una `PostalLookup`.
+
+    Cada nombre distinto se pliega (`fold`) y se indexa por sus n-gramas; las
+    listas de nombres por n-grama se guardan concatenadas en un único arreglo
+    (formato CSR). Una búsqueda intersecta las listas de los n-gramas de la
+    consulta, empezando por la más corta, y solo comprueba el texto de los
+    candidatos.
+
+    - `search`: como `search_settlements_by_name` (ILIKE '%q%', orden por
+      nombre, límite y desplazamiento), pero sin distinguir acentos ni mayúsculas.
+    - `search_ranked`: para autocompletado; ordena por relevancia (nombre
+      exacto, prefijo, prefijo de palabra, subcadena) y añade nombres parecidos
+      aunque no contengan la consulta (similitud de n-gramas).
+    """
+
+    def __init__(self, lookup: PostalLookup) -> None:
+        self.lookup = lookup
+        self.folded: List[str] = [fold(name) for name in lookup.names]
+
+        name_ids: List[int] = []
+        grams: List[str] = []
+        self.gram_counts = np.zeros(len(self.folded), dtype=np.int32)
+        for name_id, name in enumerate(self.folded):
+            name_grams = _ngrams(name)
+            self.gram_counts[name_id] = len(name_grams)
+            grams.extend(name_grams)
+            name_ids.extend([name_id] * len(name_grams))
+
+        codes, uniques = pd.factorize(pd.Series(grams, dtype=object), sort=False)
+        order = np.lexsort((np.asarray(name_ids, dtype=np.int32), codes))
+        self.postings = np.asarray(name_ids, dtype=np.int32)[order]
+        starts = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self._gram_ranges: Dict[str, Tuple[int, int]] = {
+            gram: (int(starts[i]), int(starts[i + 1])) for i, gram in enumerate(uniques)
+        }
+        logger.info(
+            f"Índice de nombres construido: {len(self.folded)} nombres, {len(self._gram_ranges)} n-gramas, "
+            f"{self.memory_bytes() / (1024 * 1024):.1f} MB de listas."
+        )
+
+    def memory_bytes(self) -> int:
+        """Memoria de las listas de n-gramas y los contadores (sin los nombres plegados)."""
+        return self.postings.nbytes + self.gram_counts.nbytes
+
+    def _postings(self, gram: str) -> np.ndarray:
+        start, end = self._gram_ranges.get(gram, (0, 0))
+        return self.postings[start:end]
+
+    def _candidates(self, grams: set) -> Optional[np.ndarray]:
+        """Nombres que contienen todos los n-gramas (None si no hay n-gramas: hay que recorrerlos todos)."""
+        if not grams:
+            return None
+        lists = sorted((self._postings(gram) for gram in grams), key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, postings, assume_unique=True)
+        return result
+
+    def match_names(self, query: str) -> Iterator[int]:
+        """
+        Identificadores de los nombres que contienen la consulta, en orden de nombre.
+
+        La consulta se pliega como los nombres, sin recortar espacios (como en ILIKE,
+        " obregon" no coincide al inicio de un nombre); `%` y `_` son comodines.
+        """
+        folded_query = fold(query)
+        pattern = ilike_regex(folded_query)
+        candidates = self._candidates(_query_ngrams(folded_query))
+        ids = range(len(self.folded)) if candidates is None else candidates.tolist()
+        return (name_id for name_id in ids if pattern.search(self.folded[name_id]))
+
+    def search(self, query: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """
+        Asentamientos cuyo nombre contiene `query` sin distinguir acentos ni mayúsculas.
+
+        Mismo orden (por nombre), límites y validación que `search_settlements_by_name`.
+        """
+        _check_page(limit, offset)
+        return self.lookup.records_for_names(self.match_names(query), limit, offset)
+
+    def rank_names(self, query: str) -> List[Tuple[int, float, int]]:
+        """
+        Nombres relevantes para la consulta, del más al menos relevante.
+
+        A diferencia de `match_names`, la consulta se recorta y sus espacios se
+        colapsan, como se teclea al autocompletar.
+
+        Returns:
+            List[Tuple[int, float, int]]: (nivel `RANK_*`, similitud, identificador de nombre).
+        """
+        folded_query = " ".join(fold(query).split())
+        if not folded_query:
+            return []
+        grams = _ngrams(folded_query)
+        ranked = []
+        if grams:
+            # N-gramas compartidos con cada nombre que comparte alguno
+            shared = np.bincount(
+                np.concatenate([self._postings(gram) for gram in grams]), minlength=len(self.folded)
+            )
+            candidates = np.flatnonzero(shared)
+            similarity = shared[candidates] / (len(grams) + self.gram_counts[candidates] - shared[candidates])
+            complete = shared[candidates] == len(grams)
+            keep = complete | (similarity >= MIN_SIMILARITY)
+            candidates, similarity, complete = candidates[keep], similarity[keep], complete[keep]
+        else:
+            candidates = np.arange(len(self.folded))
+            similarity = np.zeros(len(candidates))
+            complete = np.ones(len(candidates), dtype=bool)
+
+        word_prefix = " " + folded_query
+        for name_id, score, has_all in zip(candidates.tolist(), similarity.tolist(), complete.tolist()):
+            name = self.folded[name_id]
+            if has_all and folded_query in name:
+                if name == folded_query:
+                    rank = RANK_EXACT
+                elif name.startswith(folded_query):
+                    rank = RANK_PREFIX
+                elif word_prefix in name:
+                    rank = RANK_WORD
+                else:
+                    rank = RANK_SUBSTRING
+            elif score >= MIN_SIMILARITY:
+                rank = RANK_SIMILAR
+            else:
+                continue
+            ranked.append((rank, -score, name_id))
+        ranked.sort()
+        return [(rank, -negative_score, name_id) for rank, negative_score, name_id in ranked]
+
+    def search_ranked(self, query: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """
+        Asentamientos ordenados por relevancia para autocompletado.
+
+        Primero los nombres que contienen la consulta (nombre exacto, prefijo,
+        prefijo de una palabra, subcadena) y después los parecidos (similitud
+        de n-gramas >= MIN_SIMILARITY); dentro de cada nivel, por similitud y
+        nombre. Mismos límites y validación que `search_settlements_by_name`.
+        """
+        _check_page(limit, offset)
+        return self.lookup.records_for_names(
+            (name_id for _, _, name_id in self.rank_names(query)), limit, offset
+        )
@@ -0,0 +1,422 @@
+import argparse
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import (
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_FORMAT,
+    DATABASE_URL,
+    DATABASE_DIR,
+    OUTPUT_DIR,
+    SQL_MANIFEST_FILENAME,
+    LOAD_WORKERS,
+    INDEX_MAINTENANCE_WORK_MEM,
+)
+from .db_loader import DATASET_VERSION_TABLE, LOAD_ORDER, MATERIALIZED_VIEW, write_dataset_version
+from .metrics import record_info, start_metrics, stage
+
+logger = logging.getLogger(__name__)
+
+# Nombre del archivo de métricas de la carga (junto a los archivos generados)
+LOAD_METRICS_FILENAME = "load_metrics.json"
+
+
+@dataclass
+class TaskResult:
+    """Resultado de una tarea ejecutada en una de las conexiones del pool."""
+    label: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def split_sql_statements(text: str) -> List[str]:
+    """
+    Divide un script SQL en sentencias.
+
+    Elimina los comentarios (`/** ... */` y `--`) y separa por `;`. Sirve para
+    `schema.sql`, `indexes.sql` y `views.sql`, que no contienen cuerpos `$$`;
+    `functions.sql` se ejecuta completo.
+
+    Args:
+        text (str): Contenido del script.
+
+    Returns:
+        List[str]: Sentencias sin el `;` final.
+    """
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    text = re.sub(r"--[^\n]*", "", text)
+    return [statement.strip() for statement in text.split(";") if statement.strip()]
+
+
+def _index_target(statement: str) -> Optional[str]:
+    """Tabla (o vista) sobre la que se crea un índice."""
+    match = re.search(r"\bON\s+(\w+)", statement, flags=re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Lee el manifiesto de los archivos SQL generados (ver `write_sql_manifest`).
+
+    Returns:
+        Optional[Dict[str, Any]]: Manifiesto, o None si no existe o no es válido.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.error(f"No existe el manifiesto {path}. Genere los archivos con 'python -m src.main'.")
+    except (OSError, ValueError):
+        logger.exception(f"Error al leer el manifiesto {path}")
+    return None
+
+
+def _execute_script(conn, sql: str) -> None:
+    """
+    Ejecuta un script (una o varias sentencias) en una conexión en modo autocommit.
+
+    Si falla a mitad de una transacción del propio script (BEGIN ... COMMIT), la
+    revierte para que la conexión pueda seguir usándose.
+    """
+    import psycopg
+
+    try:
+        conn.execute(sql)
+    except psycopg.Error:
+        try:
+            conn.execute("ROLLBACK")
+        except psycopg.Error:
+            pass
+        raise
+
+
+def run_parallel(dsn: str, tasks: List[Tuple[str, str]], workers: int, settings: Optional[List[str]] = None) -> List[TaskResult]:
+    """
+    Ejecuta scripts SQL en un pool de `workers` conexiones.
+
+    Cada hilo abre una conexión (autocommit), aplica `settings` y toma tareas
+    de una cola común hasta vaciarla; psycopg libera el GIL mientras espera al
+    servidor, por lo que las sesiones trabajan en paralelo.
+
+    Args:
+        dsn (str): Cadena de conexión de PostgreSQL.
+        tasks (List[Tuple[str, str]]): Tareas (etiqueta, script).
+        workers (int): Conexiones simultáneas.
+        settings (Optional[List[str]]): Sentencias a ejecutar al abrir cada conexión (p. ej. SET).
+
+    Returns:
+        List[TaskResult]: Resultado de cada tarea, en el orden de `tasks`.
+    """
+    import psycopg
+
+    pending: "queue.Queue[Tuple[int, str, str]]" = queue.Queue()
+    for position, (label, sql) in enumerate(tasks):
+        pending.put((position, label, sql))
+    results: List[Optional[TaskResult]] = [None] * len(tasks)
+
+    def worker() -> None:
+        try:
+            conn = psycopg.connect(dsn, autocommit=True)
+        except psycopg.Error as e:
+            logger.error(f"No se pudo abrir una conexión del pool: {e}")
+            return
+        with conn:
+            for statement in settings or []:
+                conn.execute(statement)
+            while True:
+                try:
+                    position, label, sql = pending.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.perf_counter()
+                try:
+                    _execute_script(conn, sql)
+                    results[position] = TaskResult(label, time.perf_counter() - start)
+                    logger.debug(f"{label}: {results[position].seconds:.2f} s")
+                except psycopg.Error as e:
+                    results[position] = TaskResult(label, time.perf_counter() - start, str(e).strip())
+                    logger.error(f"Error en {label}: {results[position].error}")
+
+    threads = [threading.Thread(target=worker) for _ in range(max(1, min(workers, len(tasks))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Tareas que ninguna conexión llegó a ejecutar (p. ej. no se pudo conectar)
+    return [
+        result or TaskResult(tasks[position][0], 0.0, "no ejecutada")
+        for position, result in enumerate(results)
+    ]
+
+
+def _drop_existing(conn) -> None:
+    """Elimina la vista y las tablas del esquema (opción --recreate)."""
+    logger.info("Eliminando vista y tablas existentes...")
+    conn.execute(f"DROP MATERIALIZED VIEW IF EXISTS {MATERIALIZED_VIEW} CASCADE")
+    conn.execute(f"DROP TABLE IF EXISTS {DATASET_VERSION_TABLE}, {', '.join(reversed(LOAD_ORDER))} CASCADE")
+
+
+def _count_rows(conn, tables: List[str]) -> Dict[str, int]:
+    """Número de filas de cada tabla."""
+    return {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+def _failed(results: List[TaskResult]) -> List[TaskResult]:
+    return [result for result in results if result.error is not None]
+
+
+def orchestrate_load(
+    dsn: str,
+    sql_dir: Path = OUTPUT_DIR,
+    database_dir: Path = DATABASE_DIR,
+    workers: int = LOAD_WORKERS,
+    recreate: bool = False,
+    trgm: bool = False,
+    unaccent: bool = False,
+) -> Optional[Dict[str, int]]:
+    """
+    Crea la base de datos a partir de los archivos generados, difiriendo índices y vista.
+
+    Fases (cada una se mide como una etapa de las métricas):
+    1. Tablas de `schema.sql` (sin índices secundarios).
+    2. Catálogos en orden de dependencias (FK), en una conexión.
+    3. Partes de codigos_postales en paralelo sobre `workers` conexiones
+       (generadas con `--rows-per-file`; cada parte es su propia transacción).
+    4. Conciliación de `count(*)` con las filas del manifiesto.
+    5. Índices de `indexes.sql` sobre las tablas, en sesiones paralelas.
+    6. Creación (y poblado) de `vm_codigos_postales` y sus índices en paralelo;
+       el índice de trigramas de `trgm.sql` es opcional.
+    7. Funciones de `functions.sql`, la búsqueda sin acentos de `unaccent.sql`
+       (opcional) y ANALYZE.
+    8. Nueva versión de los datos en dataset_version (ver `write_dataset_version`).
+
+    Ante un error en cualquier fase se detiene; las partes fallidas se listan
+    en el log para reintentarlas.
+
+    Args:
+        dsn (str): Cadena de conexión de PostgreSQL.
+        sql_dir (Path): Directorio con los archivos generados y su manifiesto.
+        database_dir (Path): Directorio con schema.sql, indexes.sql, views.sql y functions.sql.
+        workers (int): Conexiones simultáneas para codigos_postales e índices.
+        recreate (bool): Eliminar antes la vista y las tablas existentes.
+        trgm (bool): Crear también el índice de trigramas de la búsqueda por nombre
+            (`trgm.sql`, requiere la extensión pg_trgm).
+        unaccent (bool): Crear también la búsqueda sin acentos (`unaccent.sql`, requiere
+            las extensiones unaccent y pg_trgm).
+
+    Returns:
+        Optional[Dict[str, int]]: Filas cargadas por tabla, o None si la carga falló.
+    """
+    try:
+        import psycopg
+    except ImportError:
+        logger.error("La carga requiere el paquete 'psycopg' (pip install -r requirements.txt).")
+        return None
+
+    manifest = read_manifest(sql_dir / SQL_MANIFEST_FILENAME)
+    if manifest is None:
+        return None
+    tables = {entry["table"]: entry for entry in manifest["tables"]}
+    missing = [table for table in LOAD_ORDER if table not in tables]
+    if missing:
+        logger.error(f"El manifiesto no incluye las tablas {missing}.")
+        return None
+
+    try:
+        index_statements = split_sql_statements((database_dir / "indexes.sql").read_text(encoding="utf-8"))
+        view_statements = split_sql_statements((database_dir / "views.sql").read_text(encoding="utf-8"))
+        schema_sql = (database_dir / "schema.sql").read_text(encoding="utf-8")
+        functions_sql = (database_dir / "functions.sql").read_text(encoding="utf-8")
+        trgm_sql = (database_dir / "trgm.sql").read_text(encoding="utf-8") if trgm else ""
+        unaccent_sql = (database_dir / "unaccent.sql").read_text(encoding="utf-8") if unaccent else ""
+    except OSError:
+        logger.exception(f"Error al leer los scripts de {database_dir}")
+        return None
+    table_indexes = [s for s in index_statements if _index_target(s) != MATERIALIZED_VIEW]
+    view_indexes = [s for s in index_statements if _index_target(s) == MATERIALIZED_VIEW]
+    index_settings = [f"SET maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'"]
+
+    def read_part(part: Dict[str, Any]) -> str:
+        return (sql_dir / part["file"]).read_text(encoding="utf-8")
+
+    try:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            if recreate:
+                _drop_existing(conn)
+
+            with stage("create_tables"):
+                logger.info("Creando tablas (schema.sql)...")
+                conn.execute(schema_sql)
+
+            with stage("load_catalogs") as metrics_stage:
+                for table in LOAD_ORDER[:-1]:
+                    for part in tables[table]["files"]:
+                        _execute_script(conn, read_part(part))
+                    metrics_stage.rows_out += tables[table]["rows"]
+                    logger.info(f"Cargados {tables[table]['rows']} registros en '{table}'.")
+
+            cp_parts = tables["codigos_postales"]["files"]
+            with stage("load_codigos_postales") as metrics_stage:
+                logger.info(f"Cargando {len(cp_parts)} parte(s) de codigos_postales con {workers} conexión(es)...")
+                if len(cp_parts) < workers:
+                    logger.info("Genere más partes (--rows-per-file) para aprovechar todas las conexiones.")
+                results = run_parallel(dsn, [(part["file"], read_part(part)) for part in cp_parts], workers)
+                failed = _failed(results)
+                metrics_stage.rows_out += sum(
+                    part["rows"] for part, result in zip(cp_parts, results) if result.error is None
+                )
+                metrics_stage.errors += len(failed)
+            if failed:
+                logger.error(f"Fallaron {len(failed)} parte(s) de codigos_postales; reintente: "
+                             f"{', '.join(result.label for result in failed)}")
+                return None
+
+            # Conciliación antes de construir índices
+            counts = _count_rows(conn, LOAD_ORDER)
+            mismatches = [t for t in LOAD_ORDER if counts[t] != tables[t]["rows"]]
+            for table in mismatches:
+                logger.error(f"'{table}': {counts[table]} registros en la tabla, {tables[table]['rows']} en el manifiesto.")
+            if mismatches:
+                return None
+            logger.info("Conciliación de conteos correcta.")
+
+            with stage("create_indexes") as metrics_stage:
+                logger.info(f"Creando {len(table_indexes)} índices con {workers} conexión(es)...")
+                results = run_parallel(
+                    dsn, [(f"índice {i + 1}", s) for i, s in enumerate(table_indexes)], workers, index_settings
+                )
+                metrics_stage.errors += len(_failed(results))
+            if _failed(results):
+                return None
+
+            with stage("create_view") as metrics_stage:
+                logger.info(f"Creando y poblando {MATERIALIZED_VIEW}...")
+                for statement in view_statements:
+                    conn.execute(statement)
+                metrics_stage.rows_out += _count_rows(conn, [MATERIALIZED_VIEW])[MATERIALIZED_VIEW]
+
+            with stage("create_view_indexes") as metrics_stage:
+                results = run_parallel(
+                    dsn, [(f"índice de vista {i + 1}", s) for i, s in enumerate(view_indexes)], workers, index_settings
+                )
+                metrics_stage.errors += len(_failed(results))
+            if _failed(results):
+                return None
+
+            if trgm:
+                with stage("create_trgm_index"):
+                    logger.info("Creando el índice de trigramas de la búsqueda por nombre (trgm.sql)...")
+                    for setting in index_settings:
+                        conn.execute(setting)
+                    conn.execute(trgm_sql)
+
+            with stage("create_functions"):
+                conn.execute(functions_sql)
+
+            if unaccent:
+                with stage("create_unaccent_search"):
+                    logger.info("Creando la búsqueda sin acentos (unaccent.sql)...")
+                    for setting in index_settings:
+                        conn.execute(setting)
+                    conn.execute(unaccent_sql)
+
+            with stage("analyze"):
+                logger.info("Actualizando estadísticas (ANALYZE)...")
+                conn.execute("ANALYZE")
+
+            # Al final, cuando la base ya está completa
+            version = write_dataset_version(conn.cursor())
+            if version is not None:
+                logger.info(f"Versión de los datos: {version}")
+                record_info("dataset_version", version)
+        return counts
+
+    except psycopg.Error:
+        logger.exception("Error de PostgreSQL durante la carga orquestada.")
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Interpreta los argumentos de línea de comandos (los valores por defecto vienen de config.py)."""
+    parser = argparse.ArgumentParser(
+        description="Crea la base de datos SEPOMEX v2 y carga los archivos generados con índices diferidos."
+    )
+    parser.add_argument("--dsn", default=DATABASE_URL, help="Cadena de conexión de PostgreSQL.")
+    parser.add_argument(
+        "--sql-dir",
+        type=Path,
+        default=OUTPUT_DIR,
+        help=f"Directorio con los archivos generados (--output-format sql) y {SQL_MANIFEST_FILENAME}.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=LOAD_WORKERS,
+        help="Conexiones simultáneas para las partes de codigos_postales y los índices.",
+    )
+    parser.add_argument(
+        "--recreate",
+        action="store_true",
+        help="Eliminar la vista y las tablas existentes antes de crearlas.",
+    )
+    parser.add_argument(
+        "--trgm",
+        action="store_true",
+        help="Crear también el índice de trigramas de la búsqueda por nombre (requiere la extensión pg_trgm).",
+    )
+    parser.add_argument(
+        "--unaccent",
+        action="store_true",
+        help="Crear también search_settlements_by_name_unaccent (requiere las extensiones unaccent y pg_trgm).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la carga orquestada."""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(LOG_FILE, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    logger.info("--- Iniciando carga orquestada en PostgreSQL ---")
+    metrics = start_metrics(
+        sql_dir=str(args.sql_dir), workers=args.workers, recreate=args.recreate, trgm=args.trgm,
+        unaccent=args.unaccent,
+    )
+    counts = orchestrate_load(
+        args.dsn, args.sql_dir, workers=args.workers, recreate=args.recreate, trgm=args.trgm,
+        unaccent=args.unaccent,
+    )
+    metrics.finish()
+    metrics.write_json(args.sql_dir / LOAD_METRICS_FILENAME)
+
+    logger.info("Tiempo por fase:")
+    for line in metrics.format_table():
+        logger.info(f"  {line}")
+    if counts is None:
+        logger.error("La carga no se completó.")
+        return 1
+    logger.info("Resumen de registros cargados:")
+    for table, count in counts.items():
+        logger.info(f"  - {table.capitalize()}: {count}")
+    logger.info(f"Tiempo total de la carga: {metrics.wall_seconds:.2f} segundos.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
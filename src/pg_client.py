@@ -0,0 +1,367 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple, Type
+
+from .config import (
+    DATABASE_URL,
+    PG_POOL_SIZE,
+    PG_POOL_TIMEOUT_SECONDS,
+    PG_CACHE_SIZE,
+    PG_VERSION_CHECK_SECONDS,
+)
+from .db_loader import DATASET_VERSION_TABLE
+from .models import PostalCodeRecord, KeysetPostalCodeRecord, StateRecord, MunicipalityRecord, CityRecord
+
+logger = logging.getLogger(__name__)
+
+# Tipo de fila que devuelve cada función de database/functions.sql
+RECORD_TYPES: Dict[str, Type] = {
+    "search_settlements_by_name": PostalCodeRecord,
+    "search_by_postal_code": PostalCodeRecord,
+    "get_postal_codes_by_state": PostalCodeRecord,
+    "get_postal_codes_by_municipality": PostalCodeRecord,
+    "get_postal_codes_by_city": PostalCodeRecord,
+    "get_settlements_by_city": PostalCodeRecord,
+    "get_all_states": StateRecord,
+    "get_state_by_id": StateRecord,
+    "get_cities_by_state": CityRecord,
+    "get_municipalities_by_state": MunicipalityRecord,
+    "get_all_cities": CityRecord,
+    "get_city_by_id": CityRecord,
+    "get_postal_codes_by_state_keyset": KeysetPostalCodeRecord,
+    "get_postal_codes_by_municipality_keyset": KeysetPostalCodeRecord,
+    "get_postal_codes_by_city_keyset": KeysetPostalCodeRecord,
+    "get_settlements_by_city_keyset": KeysetPostalCodeRecord,
+    "search_settlements_by_name_keyset": KeysetPostalCodeRecord,
+}
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones de psycopg, seguro entre hilos.
+
+    Abre conexiones bajo demanda hasta `max_size` y reutiliza primero la
+    última devuelta (LIFO), cuyas sentencias preparadas y caché del servidor
+    están más calientes. Las conexiones están en modo autocommit y con
+    `prepare_threshold=0`: cada consulta distinta se prepara en el servidor
+    la primera vez que se ejecuta en esa conexión y después solo se envían
+    los parámetros (`prepare=False` lo desactiva, p. ej. detrás de un
+    pgbouncer en modo transacción). Una conexión rota se descarta al devolverla.
+    """
+
+    def __init__(
+        self,
+        dsn: str = DATABASE_URL,
+        max_size: int = PG_POOL_SIZE,
+        timeout: float = PG_POOL_TIMEOUT_SECONDS,
+        prepare: bool = True,
+    ) -> None:
+        try:
+            import psycopg  # noqa: F401
+        except ImportError:
+            logger.error("El cliente de PostgreSQL requiere el paquete 'psycopg' (pip install -r requirements.txt).")
+            raise
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.prepare_threshold = 0 if prepare else None
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Toma una conexión del pool durante el bloque `with`.
+
+        Raises:
+            TimeoutError: Si no se libera ninguna conexión en `timeout` segundos.
+            psycopg.Error: Si no se puede abrir una conexión nueva.
+        """
+        if self._closed:
+            raise RuntimeError("El pool de conexiones está cerrado")
+        import psycopg
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No se liberó ninguna de las {self.max_size} conexiones en {self.timeout} s")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = psycopg.connect(self.dsn, autocommit=True, prepare_threshold=self.prepare_threshold)
+            try:
+                yield conn
+            finally:
+                if conn.broken or conn.closed or self._closed:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Cierra las conexiones libres; las que están en uso se cierran al devolverse."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SepomexClient:
+    """
+    Cliente de las funciones de database/functions.sql.
+
+    Un método por función, con la misma firma y el mismo tipo de fila que
+    `PostalLookup` (las variantes `_keyset` devuelven `KeysetPostalCodeRecord`).
+    Los errores de validación de las funciones (`RAISE EXCEPTION`) se
+    convierten en ValueError; los demás errores de psycopg se propagan.
+
+    Con `cache_size > 0` los resultados se guardan en una caché LRU. Como los
+    datos solo cambian al recargar la base, la caché no caduca por tiempo: se
+    vacía cuando cambia la marca de dataset_version que escribe la carga,
+    releída como mucho cada `version_check_seconds`. Si la base no tiene la
+    marca, no se usa la caché. El cliente es seguro entre hilos.
+
+    Ejemplo:
+        with SepomexClient(dsn) as client:
+            client.search_by_postal_code("01000")
+    """
+
+    def __init__(
+        self,
+        dsn: str = DATABASE_URL,
+        pool_size: int = PG_POOL_SIZE,
+        cache_size: int = PG_CACHE_SIZE,
+        version_check_seconds: float = PG_VERSION_CHECK_SECONDS,
+        pool_timeout: float = PG_POOL_TIMEOUT_SECONDS,
+        prepare: bool = True,
+    ) -> None:
+        self.pool = ConnectionPool(dsn, pool_size, pool_timeout, prepare)
+        self.cache_size = cache_size
+        self.version_check_seconds = version_check_seconds
+        self._cache: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._version_checked_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "SepomexClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    # --- Caché ---
+
+    def dataset_version(self) -> Optional[str]:
+        """Versión de los datos según dataset_version, o None si la base no tiene la marca."""
+        import psycopg
+
+        with self.pool.connection() as conn:
+            try:
+                row = conn.execute(f"SELECT version FROM {DATASET_VERSION_TABLE} WHERE pk_id = 1").fetchone()
+            except psycopg.errors.UndefinedTable:
+                return None
+        return row[0] if row else None
+
+    def refresh_version(self) -> Optional[str]:
+        """Relee la marca de versión ahora y vacía la caché si cambió."""
+        version = self.dataset_version()
+        with self._lock:
+            if self._version_checked_at is None and version is None:
+                logger.warning(
+                    f"La base no tiene la marca {DATASET_VERSION_TABLE} (ver database/schema.sql); "
+                    "el cliente no usará la caché."
+                )
+            elif version != self._version and self._version_checked_at is not None:
+                logger.info(f"Cambió la versión de los datos ({self._version} -> {version}); se vacía la caché.")
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            self._version_checked_at = time.monotonic()
+        return version
+
+    def _current_version(self) -> Optional[str]:
+        checked_at = self._version_checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.version_check_seconds:
+            return self.refresh_version()
+        return self._version
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses, "version": self._version}
+
+    # --- Llamadas ---
+
+    def _execute(self, function: str, args: Tuple) -> List[Any]:
+        import psycopg
+
+        placeholders = ", ".join(["%s"] * len(args))
+        with self.pool.connection() as conn:
+            try:
+                rows = conn.execute(f"SELECT * FROM {function}({placeholders})", args).fetchall()
+            except psycopg.errors.RaiseException as e:
+                raise ValueError(e.diag.message_primary) from e
+        record_type = RECORD_TYPES[function]
+        return [record_type(*row) for row in rows]
+
+    def _call(self, function: str, args: Tuple) -> List[Any]:
+        if self.cache_size <= 0:
+            return self._execute(function, args)
+        version = self._current_version()
+        if version is None:
+            return self._execute(function, args)
+        # La versión forma parte de la clave: un resultado leído justo antes de una recarga no se sirve después
+        key = (version, function, args)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+        records = self._execute(function, args)
+        with self._lock:
+            self._cache[key] = records
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(records)
+
+    # --- Funciones de database/functions.sql ---
+
+    def search_settlements_by_name(self, query: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """Asentamientos cuyo nombre contiene `query` (ILIKE), ordenados por nombre."""
+        return self._call("search_settlements_by_name", (query, limit, offset))
+
+    def search_by_postal_code(self, codigo_postal: str) -> List[PostalCodeRecord]:
+        """Asentamientos de un código postal exacto, ordenados por nombre."""
+        return self._call("search_by_postal_code", (codigo_postal,))
+
+    def get_postal_codes_by_state(self, codigo_estado: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """Asentamientos de un estado, ordenados por código postal y nombre."""
+        return self._call("get_postal_codes_by_state", (codigo_estado, limit, offset))
+
+    def get_postal_codes_by_municipality(
+        self, codigo_estado: str, codigo_municipio: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de un municipio, ordenados por código postal y nombre."""
+        return self._call("get_postal_codes_by_municipality", (codigo_estado, codigo_municipio, limit, offset))
+
+    def get_postal_codes_by_city(
+        self, codigo_estado: str, codigo_ciudad: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de una ciudad, ordenados por código postal y nombre."""
+        return self._call("get_postal_codes_by_city", (codigo_estado, codigo_ciudad, limit, offset))
+
+    def get_settlements_by_city(
+        self, codigo_estado: str, codigo_ciudad: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de una ciudad, ordenados por nombre."""
+        return self._call("get_settlements_by_city", (codigo_estado, codigo_ciudad, limit, offset))
+
+    def get_all_states(self) -> List[StateRecord]:
+        """Todos los estados, ordenados por nombre."""
+        return self._call("get_all_states", ())
+
+    def get_state_by_id(self, codigo_estado: str) -> List[StateRecord]:
+        """El estado indicado (lista vacía si no existe)."""
+        return self._call("get_state_by_id", (codigo_estado,))
+
+    def get_cities_by_state(self, codigo_estado: str) -> List[CityRecord]:
+        """Ciudades de un estado, ordenadas por nombre."""
+        return self._call("get_cities_by_state", (codigo_estado,))
+
+    def get_municipalities_by_state(self, codigo_estado: str) -> List[MunicipalityRecord]:
+        """Municipios de un estado, ordenados por nombre."""
+        return self._call("get_municipalities_by_state", (codigo_estado,))
+
+    def get_all_cities(self) -> List[CityRecord]:
+        """Todas las ciudades, ordenadas por nombre."""
+        return self._call("get_all_cities", ())
+
+    def get_city_by_id(self, codigo_estado: str, codigo_ciudad: str) -> List[CityRecord]:
+        """La ciudad indicada (lista vacía si no existe)."""
+        return self._call("get_city_by_id", (codigo_estado, codigo_ciudad))
+
+    # --- Variantes con paginación por cursor (la clave de la última fila vista; None en la primera página) ---
+
+    def get_postal_codes_by_state_keyset(
+        self,
+        codigo_estado: str,
+        limit: int,
+        after_codigo_postal: Optional[str] = None,
+        after_nombre_asentamiento: Optional[str] = None,
+        after_id: Optional[int] = None,
+    ) -> List[KeysetPostalCodeRecord]:
+        """Como `get_postal_codes_by_state`, a partir de la fila indicada."""
+        return self._call(
+            "get_postal_codes_by_state_keyset",
+            (codigo_estado, limit, after_codigo_postal, after_nombre_asentamiento, after_id),
+        )
+
+    def get_postal_codes_by_municipality_keyset(
+        self,
+        codigo_estado: str,
+        codigo_municipio: str,
+        limit: int,
+        after_codigo_postal: Optional[str] = None,
+        after_nombre_asentamiento: Optional[str] = None,
+        after_id: Optional[int] = None,
+    ) -> List[KeysetPostalCodeRecord]:
+        """Como `get_postal_codes_by_municipality`, a partir de la fila indicada."""
+        return self._call(
+            "get_postal_codes_by_municipality_keyset",
+            (codigo_estado, codigo_municipio, limit, after_codigo_postal, after_nombre_asentamiento, after_id),
+        )
+
+    def get_postal_codes_by_city_keyset(
+        self,
+        codigo_estado: str,
+        codigo_ciudad: str,
+        limit: int,
+        after_codigo_postal: Optional[str] = None,
+        after_nombre_asentamiento: Optional[str] = None,
+        after_id: Optional[int] = None,
+    ) -> List[KeysetPostalCodeRecord]:
+        """Como `get_postal_codes_by_city`, a partir de la fila indicada."""
+        return self._call(
+            "get_postal_codes_by_city_keyset",
+            (codigo_estado, codigo_ciudad, limit, after_codigo_postal, after_nombre_asentamiento, after_id),
+        )
+
+    def get_settlements_by_city_keyset(
+        self,
+        codigo_estado: str,
+        codigo_ciudad: str,
+        limit: int,
+        after_nombre_asentamiento: Optional[str] = None,
+        after_id: Optional[int] = None,
+    ) -> List[KeysetPostalCodeRecord]:
+        """Como `get_settlements_by_city`, a partir de la fila indicada."""
+        return self._call(
+            "get_settlements_by_city_keyset",
+            (codigo_estado, codigo_ciudad, limit, after_nombre_asentamiento, after_id),
+        )
+
+    def search_settlements_by_name_keyset(
+        self,
+        query: str,
+        limit: int,
+        after_nombre_asentamiento: Optional[str] = None,
+        after_id: Optional[int] = None,
+    ) -> List[KeysetPostalCodeRecord]:
+        """Como `search_settlements_by_name`, a partir de la fila indicada."""
+        return self._call("search_settlements_by_name_keyset", (query, limit, after_nombre_asentamiento, after_id))
@@ -1,22 +1,21 @@
 import pandas as pd
+import json
 import logging
-import math
 from pathlib import Path
-from typing import List, Tuple, Optional, Iterator
+from typing import Any, Dict, Iterable, List, Tuple, Optional, Iterator, Union
 
 from .config import (
     OUTPUT_DIR,
     ZONAS_MAP,
-    DEFAULT_ZONA_ID,
     BATCH_SIZE_CODIGOS_POSTALES,
-    MAX_LEN_NOMBRE_ASENTAMIENTO,
-    REGEX_CODIGO_POSTAL,
-    REGEX_CODIGO_ESTADO,
-    REGEX_CODIGO_MUNICIPIO,
-    REGEX_CODIGO_CIUDAD,
-    REGEX_CODIGO_TIPO_ASENTA,
+    WORKERS_CODIGOS_POSTALES,
+    MAX_ROWS_PER_INSERT,
+    MAX_ROWS_PER_FILE,
 )
-from .utils import format_codigo, clean_text, normalize_zona
+from .utils import BatchStream, clean_text, map_batches
+from .metrics import TimedBatch, record_batch
+from .data_normalizer import CP_TABLE_COLUMNS, select_cp_records
+from .worker_pipeline import WorkerPipeline
 from .models import (
     Estado,
     Municipio,
@@ -25,18 +24,217 @@ from .models import (
     Zona,
     CodigoPostal,
 )
-from .data_validator import validate_regex
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 1
+
 # --- Funciones auxiliares para escribir SQL ---
 
+# Partes escritas en la ejecución: tabla -> [{file, rows, statements}]
+_MANIFEST: Dict[str, List[Dict[str, Any]]] = {}
+
+
+def reset_sql_manifest() -> None:
+    """Vacía el registro de archivos generados (al inicio de cada ejecución)."""
+    _MANIFEST.clear()
+
+
+def write_sql_manifest(path: Path, rows_per_insert: int, rows_per_file: int) -> None:
+    """
+    Escribe el manifiesto de los archivos SQL generados, en orden de carga.
+
+    Cada archivo es una transacción independiente (BEGIN/COMMIT), por lo que
+    una carga fallida puede reintentarse por partes y las partes de una misma
+    tabla pueden cargarse en conexiones distintas.
+
+    Args:
+        path (Path): Ruta del manifiesto (JSON).
+        rows_per_insert (int): Límite de filas por INSERT usado (0 = sin límite).
+        rows_per_file (int): Límite de filas por archivo usado (0 = sin límite).
+    """
+    tables = sorted(_MANIFEST.items(), key=lambda item: item[1][0]["file"])
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "rows_per_insert": rows_per_insert,
+        "rows_per_file": rows_per_file,
+        "tables": [
+            {"table": table, "rows": sum(part["rows"] for part in parts), "files": parts}
+            for table, parts in tables
+        ],
+    }
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        logger.info(f"Manifiesto de archivos SQL guardado en {path.name}")
+    except OSError:
+        logger.exception(f"Error al escribir el manifiesto {path.name}")
+
+
+class InsertWriter:
+    """
+    Escribe filas de una tabla como sentencias INSERT, con un máximo de filas
+    por sentencia y por archivo.
+
+    Sin límites se genera un único archivo con un único INSERT. Con
+    `rows_per_file`, el archivo se divide en partes numeradas
+    (`<nombre>_part0001.sql`, ...), cada una con su propia transacción. Las
+    partes se registran para el manifiesto (ver `write_sql_manifest`).
+
+    Debe usarse como gestor de contexto: si ocurre un error, se cierra el
+    archivo abierto y se elimina la parte incompleta (ver `abort`).
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        table_name: str,
+        columns: List[str],
+        rows_per_insert: int = MAX_ROWS_PER_INSERT,
+        rows_per_file: int = MAX_ROWS_PER_FILE,
+        errors: str = "strict",
+    ) -> None:
+        self.filepath = filepath
+        self.table_name = table_name
+        self.rows_per_insert = rows_per_insert
+        self.rows_per_file = rows_per_file
+        self.errors = errors
+        self.insert_prefix = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES\n"
+        self.total_rows = 0
+        self.parts: List[Dict[str, Any]] = []
+        self._file = None
+        self._path: Optional[Path] = None
+        self._in_file = 0
+        self._in_statement = 0
+        self._statements = 0
+        _MANIFEST.pop(table_name, None)
+        self._remove_stale_parts()
+
+    def __enter__(self) -> "InsertWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.abort()
+        elif self._file is not None:
+            self._close_part()
+
+    def _remove_stale_parts(self) -> None:
+        """Elimina el archivo y las partes de ejecuciones anteriores (p. ej. con otro límite)."""
+        stale = [self.filepath, *self.filepath.parent.glob(f"{self.filepath.stem}_part*{self.filepath.suffix}")]
+        for path in stale:
+            if path.is_file():
+                path.unlink()
+
+    def _part_path(self) -> Path:
+        if self.rows_per_file <= 0:
+            return self.filepath
+        number = len(self.parts) + 1
+        return self.filepath.with_name(f"{self.filepath.stem}_part{number:04d}{self.filepath.suffix}")
+
+    def _open_part(self) -> None:
+        path = self._part_path()
+        logger.debug(f"Abriendo {path.name} para escritura con encoding=utf-8, errors={self.errors}")
+        self._file = open(path, "w", encoding="utf-8", errors=self.errors)
+        self._path = path
+        self.parts.append({"file": path.name, "rows": 0, "statements": 0})
+        _MANIFEST.setdefault(self.table_name, []).append(self.parts[-1])
+        self._file.write("BEGIN;\n")
+        self._in_file = 0
+        self._statements = 0
+
+    def _end_statement(self) -> None:
+        if self._in_statement:
+            self._file.write(";\n")
+            self._in_statement = 0
+
+    def _close_part(self) -> None:
+        self._end_statement()
+        self._file.write("COMMIT;\n")
+        self._file.close()
+        self._file = None
+        self._path = None
+        self.parts[-1].update(rows=self._in_file, statements=self._statements)
+
+    def abort(self) -> None:
+        """Cierra la parte abierta sin COMMIT, la elimina y la quita del manifiesto."""
+        if self._file is None:
+            return
+        path, self._path = self._path, None
+        try:
+            self._file.close()
+        finally:
+            self._file = None
+            self.total_rows -= self._in_file
+            registered = _MANIFEST.get(self.table_name, [])
+            registered.remove(self.parts.pop())
+            if not registered:
+                _MANIFEST.pop(self.table_name, None)
+            path.unlink(missing_ok=True)
+            logger.warning(f"Se eliminó la parte incompleta {path.name}")
+
+    def write(self, values: List[str]) -> None:
+        """
+        Añade filas ya formateadas como tuplas SQL ("('val1', 'val2', ...)").
+
+        Args:
+            values (List[str]): Filas a insertar.
+        """
+        start = 0
+        while start < len(values):
+            if self._file is None or (0 < self.rows_per_file <= self._in_file):
+                if self._file is not None:
+                    self._close_part()
+                self._open_part()
+            take = len(values) - start
+            if self.rows_per_file > 0:
+                take = min(take, self.rows_per_file - self._in_file)
+            if self.rows_per_insert > 0:
+                take = min(take, self.rows_per_insert - self._in_statement)
+
+            if self._in_statement:
+                self._file.write(",\n")
+            else:
+                self._file.write(self.insert_prefix)
+                self._statements += 1
+            self._file.write(",\n".join(values[start:start + take]))
+
+            start += take
+            self._in_file += take
+            self._in_statement += take
+            self.total_rows += take
+            if 0 < self.rows_per_insert <= self._in_statement:
+                self._end_statement()
+
+    def close(self, empty_comment: str) -> None:
+        """
+        Cierra la parte abierta; sin filas escritas deja un archivo con `empty_comment`.
+
+        Args:
+            empty_comment (str): Comentario para el archivo vacío.
+        """
+        if self._file is None and not self.parts:
+            self._open_part()
+            self._file.write(f"-- {empty_comment}\n")
+        if self._file is not None:
+            self._close_part()
+
+    def describe(self) -> str:
+        """Destino para el log: el archivo o el número de partes."""
+        if self.rows_per_file <= 0:
+            return self.filepath.name
+        return f"{len(self.parts)} partes de {self.filepath.stem}"
+
+
 def _write_sql_file(
     filepath: Path,
     table_name: str,
     columns: List[str],
     values: List[str],
     entity_name: str,
+    rows_per_insert: int = MAX_ROWS_PER_INSERT,
+    rows_per_file: int = MAX_ROWS_PER_FILE,
 ) -> int:
     """
     Escribe un archivo SQL con formato BEGIN/COMMIT y sentencias INSERT.
@@ -47,25 +245,21 @@ def _write_sql_file(
         columns (List[str]): Lista de nombres de columnas.
         values (List[str]): Lista de strings con formato "('val1', 'val2', ...)".
         entity_name (str): Nombre de la entidad (para logging, ej: "estados").
+        rows_per_insert (int): Máximo de filas por INSERT (0 = sin límite).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo).
 
     Returns:
         int: Número de registros escritos en el archivo.
     """
     count = len(values)
     try:
-        logger.debug(f"Abriendo {filepath.name} para escritura con encoding=utf-8, errors=ignore")
-        with open(filepath, "w", encoding="utf-8", errors="ignore") as f:
-            f.write("BEGIN;\n")
-            if values:
-                cols_sql = ", ".join(columns)
-                insert_prefix = f"INSERT INTO {table_name} ({cols_sql}) VALUES\n"
-                f.write(insert_prefix)
-                f.write(",\n".join(values) + ";\n")
-                logger.info(f"Generado SQL para {count} {entity_name} en {filepath.name}")
-            else:
-                f.write(f"-- No se encontraron {entity_name} válidos\n")
-                logger.warning(f"No se encontraron {entity_name} válidos para generar {filepath.name}")
-            f.write("COMMIT;\n")
+        with InsertWriter(filepath, table_name, columns, rows_per_insert, rows_per_file, errors="ignore") as writer:
+            writer.write(values)
+            writer.close(f"No se encontraron {entity_name} válidos")
+        if values:
+            logger.info(f"Generado SQL para {count} {entity_name} en {writer.describe()}")
+        else:
+            logger.warning(f"No se encontraron {entity_name} válidos para generar {filepath.name}")
         return count
     except IOError as e:
         logger.exception(f"Error al escribir el archivo SQL {filepath.name}")
@@ -76,35 +270,28 @@ def _write_sql_file(
 
 # --- Generadores de SQL para cada tabla ---
 
-def generate_estados_sql(df: pd.DataFrame) -> int:
+def generate_estados_sql(
+    estados_data: Optional[List[Estado]],
+    rows_per_insert: int = MAX_ROWS_PER_INSERT,
+    rows_per_file: int = MAX_ROWS_PER_FILE,
+) -> int:
     """
     Genera el archivo SQL para la tabla 'estados'.
 
     Args:
-        df (pd.DataFrame): DataFrame con los datos fuente.
+        estados_data (Optional[List[Estado]]): Catálogo de estados (ver `extract_catalogs`).
+        rows_per_insert (int): Máximo de filas por INSERT (0 = sin límite).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo).
 
     Returns:
         int: Número de estados insertados.
     """
     filepath = OUTPUT_DIR / "001_insert_estados.sql"
-    if "c_estado" not in df.columns or "d_estado" not in df.columns:
+    if estados_data is None:
         logger.error("Faltan columnas 'c_estado' o 'd_estado' para generar estados.")
-        _write_sql_file(filepath, "estados", [], [], "estados")
+        _write_sql_file(filepath, "estados", [], [], "estados", rows_per_insert, rows_per_file)
         return 0
 
-    estados_data: List[Estado] = []
-    processed_codes = set()
-
-    for _, row in df.iterrows():
-        codigo = format_codigo(row["c_estado"], 2)
-        if codigo and codigo not in processed_codes and validate_regex(codigo, REGEX_CODIGO_ESTADO, 'c_estado', _):
-            nombre = clean_text(row["d_estado"])
-            if nombre:
-                estados_data.append(Estado(pk_codigo_estado=codigo, nombre_estado=nombre))
-                processed_codes.add(codigo)
-            else:
-                 logger.debug(f"Estado con código {codigo} omitido por nombre vacío.")
-
     values = [
         f"('{e.pk_codigo_estado}', '{e.nombre_estado}')"
         for e in estados_data
@@ -115,49 +302,32 @@ def generate_estados_sql(df: pd.DataFrame) -> int:
         ["pk_codigo_estado", "nombre_estado"],
         values,
         "estados",
+        rows_per_insert,
+        rows_per_file,
     )
 
-def generate_municipios_sql(df: pd.DataFrame) -> int:
+def generate_municipios_sql(
+    municipios_data: Optional[List[Municipio]],
+    rows_per_insert: int = MAX_ROWS_PER_INSERT,
+    rows_per_file: int = MAX_ROWS_PER_FILE,
+) -> int:
     """
     Genera el archivo SQL para la tabla 'municipios'.
 
     Args:
-        df (pd.DataFrame): DataFrame con los datos fuente.
+        municipios_data (Optional[List[Municipio]]): Catálogo de municipios (ver `extract_catalogs`).
+        rows_per_insert (int): Máximo de filas por INSERT (0 = sin límite).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo).
 
     Returns:
         int: Número de municipios insertados.
     """
     filepath = OUTPUT_DIR / "002_insert_municipios.sql"
-    required_cols = ["c_mnpio", "c_estado", "D_mnpio"]
-    if not all(col in df.columns for col in required_cols):
-        logger.error(f"Faltan columnas {required_cols} para generar municipios.")
-        _write_sql_file(filepath, "municipios", [], [], "municipios")
+    if municipios_data is None:
+        logger.error("Faltan columnas ['c_mnpio', 'c_estado', 'D_mnpio'] para generar municipios.")
+        _write_sql_file(filepath, "municipios", [], [], "municipios", rows_per_insert, rows_per_file)
         return 0
 
-    municipios_data: List[Municipio] = []
-    processed_pks = set()
-
-    for _, row in df.iterrows():
-        codigo_mnpio = format_codigo(row["c_mnpio"], 3)
-        codigo_estado = format_codigo(row["c_estado"], 2)
-        pk_tuple = (codigo_mnpio, codigo_estado)
-
-        if (
-            codigo_mnpio and codigo_estado and pk_tuple not in processed_pks and
-            validate_regex(codigo_mnpio, REGEX_CODIGO_MUNICIPIO, 'c_mnpio', _) and
-            validate_regex(codigo_estado, REGEX_CODIGO_ESTADO, 'c_estado', _)
-        ):
-            nombre = clean_text(row["D_mnpio"])
-            if nombre:
-                municipios_data.append(Municipio(
-                    pk_codigo_municipio=codigo_mnpio,
-                    fk_codigo_estado=codigo_estado,
-                    nombre_municipio=nombre
-                ))
-                processed_pks.add(pk_tuple)
-            else:
-                 logger.debug(f"Municipio {pk_tuple} omitido por nombre vacío.")
-
     values = [
         f"('{m.pk_codigo_municipio}', '{m.fk_codigo_estado}', '{m.nombre_municipio}')"
         for m in municipios_data
@@ -168,43 +338,33 @@ def generate_municipios_sql(df: pd.DataFrame) -> int:
         ["pk_codigo_municipio", "fk_codigo_estado", "nombre_municipio"],
         values,
         "municipios",
+        rows_per_insert,
+        rows_per_file,
     )
 
-def generate_tipos_asentamiento_sql(df: pd.DataFrame) -> int:
+def generate_tipos_asentamiento_sql(
+    tipos_data: Optional[List[TipoAsentamiento]],
+    rows_per_insert: int = MAX_ROWS_PER_INSERT,
+    rows_per_file: int = MAX_ROWS_PER_FILE,
+) -> int:
     """
     Genera el archivo SQL para la tabla 'tipos_asentamiento'.
 
     Args:
-        df (pd.DataFrame): DataFrame con los datos fuente.
+        tipos_data (Optional[List[TipoAsentamiento]]): Catálogo de tipos de asentamiento
+            (ver `extract_catalogs`).
+        rows_per_insert (int): Máximo de filas por INSERT (0 = sin límite).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo).
 
     Returns:
         int: Número de tipos de asentamiento insertados.
     """
     filepath = OUTPUT_DIR / "003_insert_tipos_asentamiento.sql"
-    required_cols = ["c_tipo_asenta", "d_tipo_asenta"]
-    if not all(col in df.columns for col in required_cols):
-        logger.error(f"Faltan columnas {required_cols} para generar tipos de asentamiento.")
-        _write_sql_file(filepath, "tipos_asentamiento", [], [], "tipos de asentamiento")
+    if tipos_data is None:
+        logger.error("Faltan columnas ['c_tipo_asenta', 'd_tipo_asenta'] para generar tipos de asentamiento.")
+        _write_sql_file(filepath, "tipos_asentamiento", [], [], "tipos de asentamiento", rows_per_insert, rows_per_file)
         return 0
 
-    tipos_data: List[TipoAsentamiento] = []
-    processed_codes = set()
-
-    df_sorted = df.sort_values(by='d_tipo_asenta', na_position='last')
-
-    for _, row in df_sorted.iterrows():
-        codigo = format_codigo(row["c_tipo_asenta"], 2)
-        if codigo and codigo not in processed_codes and validate_regex(codigo, REGEX_CODIGO_TIPO_ASENTA, 'c_tipo_asenta', _):
-            nombre = clean_text(row["d_tipo_asenta"])
-            if nombre:
-                tipos_data.append(TipoAsentamiento(
-                    pk_codigo_tipo_asentamiento=codigo,
-                    nombre_tipo_asentamiento=nombre
-                ))
-                processed_codes.add(codigo)
-            else:
-                 logger.debug(f"Tipo asentamiento {codigo} omitido por nombre vacío.")
-
     values = [
         f"('{t.pk_codigo_tipo_asentamiento}', '{t.nombre_tipo_asentamiento}')"
         for t in tipos_data
@@ -215,12 +375,20 @@ def generate_tipos_asentamiento_sql(df: pd.DataFrame) -> int:
         ["pk_codigo_tipo_asentamiento", "nombre_tipo_asentamiento"],
         values,
         "tipos de asentamiento",
+        rows_per_insert,
+        rows_per_file,
     )
 
-def generate_zonas_sql() -> int:
+def generate_zonas_sql(
+    rows_per_insert: int = MAX_ROWS_PER_INSERT, rows_per_file: int = MAX_ROWS_PER_FILE
+) -> int:
     """
     Genera el archivo SQL para la tabla 'zonas' con valores fijos.
 
+    Args:
+        rows_per_insert (int): Máximo de filas por INSERT (0 = sin límite).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo).
+
     Returns:
         int: Número de zonas insertadas (siempre 3 si tiene éxito).
     """
@@ -244,51 +412,32 @@ def generate_zonas_sql() -> int:
         ["pk_id_zona", "nombre_zona"],
         values,
         "zonas",
+        rows_per_insert,
+        rows_per_file,
     )
 
-def generate_ciudades_sql(df: pd.DataFrame) -> int:
+def generate_ciudades_sql(
+    ciudades_data: Optional[List[Ciudad]],
+    rows_per_insert: int = MAX_ROWS_PER_INSERT,
+    rows_per_file: int = MAX_ROWS_PER_FILE,
+) -> int:
     """
     Genera el archivo SQL para la tabla 'ciudades'.
 
     Args:
-        df (pd.DataFrame): DataFrame con los datos fuente.
+        ciudades_data (Optional[List[Ciudad]]): Catálogo de ciudades (ver `extract_catalogs`).
+        rows_per_insert (int): Máximo de filas por INSERT (0 = sin límite).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo).
 
     Returns:
         int: Número de ciudades insertadas.
     """
     filepath = OUTPUT_DIR / "005_insert_ciudades.sql"
-    required_cols = ["c_cve_ciudad", "c_estado", "d_ciudad"]
-    if not all(col in df.columns for col in required_cols):
-        logger.warning(f"Faltan columnas {required_cols} para generar ciudades. El archivo estará vacío.")
-        _write_sql_file(filepath, "ciudades", [], [], "ciudades")
+    if ciudades_data is None:
+        logger.warning("Faltan columnas ['c_cve_ciudad', 'c_estado', 'd_ciudad'] para generar ciudades. El archivo estará vacío.")
+        _write_sql_file(filepath, "ciudades", [], [], "ciudades", rows_per_insert, rows_per_file)
         return 0
 
-    ciudades_data: List[Ciudad] = []
-    processed_pks = set()
-
-    df_filtered = df.dropna(subset=required_cols)
-
-    for _, row in df_filtered.iterrows():
-        codigo_ciudad = format_codigo(row["c_cve_ciudad"], 2)
-        codigo_estado = format_codigo(row["c_estado"], 2)
-        pk_tuple = (codigo_ciudad, codigo_estado)
-
-        if (
-            codigo_ciudad and codigo_estado and pk_tuple not in processed_pks and
-            validate_regex(codigo_ciudad, REGEX_CODIGO_CIUDAD, 'c_cve_ciudad', _) and
-            validate_regex(codigo_estado, REGEX_CODIGO_ESTADO, 'c_estado', _)
-        ):
-            nombre = clean_text(row["d_ciudad"])
-            if nombre:
-                ciudades_data.append(Ciudad(
-                    pk_codigo_ciudad=codigo_ciudad,
-                    fk_codigo_estado=codigo_estado,
-                    nombre_ciudad=nombre
-                ))
-                processed_pks.add(pk_tuple)
-            else:
-                 logger.debug(f"Ciudad {pk_tuple} omitida por nombre vacío.")
-
     values = [
         f"('{c.pk_codigo_ciudad}', '{c.fk_codigo_estado}', '{c.nombre_ciudad}')"
         for c in ciudades_data
@@ -299,129 +448,115 @@ def generate_ciudades_sql(df: pd.DataFrame) -> int:
         ["pk_codigo_ciudad", "fk_codigo_estado", "nombre_ciudad"],
         values,
         "ciudades",
+        rows_per_insert,
+        rows_per_file,
     )
 
 
+def _sql_optional_code(codigo: Optional[str]) -> str:
+    """Formatea un código opcional como literal SQL o NULL."""
+    return f"'{codigo}'" if codigo else "NULL"
+
+
 def _process_cp_batch(df_batch: pd.DataFrame) -> Tuple[List[str], int]:
     """
-    Procesa un lote del DataFrame para generar valores SQL de codigos_postales.
+    Procesa un lote del DataFrame normalizado para generar valores SQL de codigos_postales.
 
     Args:
-        df_batch (pd.DataFrame): Lote del DataFrame a procesar.
+        df_batch (pd.DataFrame): Lote del DataFrame normalizado a procesar.
 
     Returns:
         Tuple[List[str], int]: Tupla con la lista de valores SQL y el contador de errores.
     """
-    valores_batch = []
-    errores_batch = 0
-
-    for idx, row in df_batch.iterrows():
-        try:
-            codigo_postal = format_codigo(row.get("d_codigo"), 5)
-            fk_estado = format_codigo(row.get("c_estado"), 2)
-            fk_tipo_asenta = format_codigo(row.get("c_tipo_asenta"), 2)
-            nombre_asenta = clean_text(row.get('d_asenta'), MAX_LEN_NOMBRE_ASENTAMIENTO)
-
-            zona_norm = normalize_zona(row.get("d_zona"))
-            fk_zona = ZONAS_MAP.get(zona_norm, DEFAULT_ZONA_ID)
-
-            valid = True
-            if not validate_regex(codigo_postal, REGEX_CODIGO_POSTAL, 'd_codigo', idx):
-                 valid = False
-            if not nombre_asenta:
-                 logger.warning(f"Fila {idx}: Nombre de asentamiento vacío omitido.")
-                 valid = False
-            if not validate_regex(fk_estado, REGEX_CODIGO_ESTADO, 'c_estado', idx):
-                 valid = False
-            if not validate_regex(fk_tipo_asenta, REGEX_CODIGO_TIPO_ASENTA, 'c_tipo_asenta', idx):
-                 valid = False
-
-            if not valid:
-                errores_batch += 1
-                continue
-
-            fk_municipio_fmt = format_codigo(row.get("c_mnpio"), 3)
-            fk_municipio = f"'{fk_municipio_fmt}'" if fk_municipio_fmt and validate_regex(fk_municipio_fmt, REGEX_CODIGO_MUNICIPIO, 'c_mnpio', idx) else "NULL"
-
-            fk_ciudad_fmt = format_codigo(row.get("c_cve_ciudad"), 2)
-            fk_ciudad = f"'{fk_ciudad_fmt}'" if fk_ciudad_fmt and validate_regex(fk_ciudad_fmt, REGEX_CODIGO_CIUDAD, 'c_cve_ciudad', idx) else "NULL"
-
-            valor = f"('{codigo_postal}', '{nombre_asenta}', '{fk_estado}', {fk_municipio}, {fk_ciudad}, '{fk_tipo_asenta}', {fk_zona})"
-            valores_batch.append(valor)
-
-        except Exception as e:
-            logger.error(f"Error procesando fila {idx} para códigos postales: {e}")
-            errores_batch += 1
+    records, errores_batch = select_cp_records(df_batch)
+
+    valores_batch = [
+        f"('{codigo_postal}', '{nombre_asenta}', '{fk_estado}', "
+        f"{_sql_optional_code(fk_municipio)}, {_sql_optional_code(fk_ciudad)}, "
+        f"'{fk_tipo_asenta}', {fk_zona})"
+        for codigo_postal, nombre_asenta, fk_estado, fk_municipio, fk_ciudad, fk_tipo_asenta, fk_zona
+        in records.itertuples(index=False, name=None)
+    ]
 
     return valores_batch, errores_batch
 
 
-def generate_codigos_postales_sql(df: pd.DataFrame) -> Tuple[int, int]:
+def generate_codigos_postales_sql(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    workers: int = WORKERS_CODIGOS_POSTALES,
+    rows_per_insert: int = MAX_ROWS_PER_INSERT,
+    rows_per_file: int = MAX_ROWS_PER_FILE,
+    pipeline: Optional[WorkerPipeline] = None,
+) -> Tuple[int, int]:
     """
     Genera el archivo SQL para la tabla 'codigos_postales', procesando en lotes.
 
+    Acepta el DataFrame completo o una secuencia de bloques normalizados (modo por
+    bloques), que se consumen de forma incremental. Con `workers > 1` los lotes se
+    procesan en un pool de procesos y se escriben en su orden original, por lo que
+    el archivo es idéntico al del modo serie. Con `pipeline`, los bloques llegan
+    sin procesar y cada lote se valida y normaliza en el propio worker.
+
     Args:
-        df (pd.DataFrame): DataFrame completo con los datos fuente.
+        data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame normalizado
+            completo o bloques normalizados (ver `normalize_dataframe`); con
+            `pipeline`, bloques tal como se leen del archivo fuente.
+        workers (int): Número de procesos para procesar los lotes.
+        rows_per_insert (int): Máximo de filas por INSERT (0 = un único INSERT).
+        rows_per_file (int): Máximo de filas por archivo (0 = un solo archivo;
+            si no, partes numeradas, ver `InsertWriter`).
+        pipeline (Optional[WorkerPipeline]): Validación y normalización en los workers.
 
     Returns:
         Tuple[int, int]: Tupla con (registros insertados, número de errores).
     """
     filepath = OUTPUT_DIR / "006_insert_codigos_postales.sql"
-    required_cols = ["d_codigo", "d_asenta", "c_estado", "c_tipo_asenta"]
-    if not all(col in df.columns for col in required_cols):
-        logger.error(f"Faltan columnas {required_cols} para generar códigos postales.")
-        _write_sql_file(filepath, "codigos_postales", [], [], "códigos postales")
-        return 0, len(df)
+    batches = BatchStream(data, BATCH_SIZE_CODIGOS_POSTALES)
+    if pipeline is not None:
+        ready = not pipeline.missing_columns(batches.columns)
+    else:
+        ready = "es_valido" in batches.columns
+    if not ready:
+        logger.error("Faltan columnas ['d_codigo', 'd_asenta', 'c_estado', 'c_tipo_asenta'] para generar códigos postales.")
+        _write_sql_file(
+            filepath, "codigos_postales", [], [], "códigos postales", rows_per_insert, rows_per_file
+        )
+        return 0, batches.drain()
 
-    total_records = len(df)
     total_inserted = 0
     total_errors = 0
-    num_batches = math.ceil(total_records / BATCH_SIZE_CODIGOS_POSTALES)
-
-    columns = [
-        "codigo_postal", "nombre_asentamiento", "fk_codigo_estado",
-        "fk_codigo_municipio", "fk_codigo_ciudad", "fk_codigo_tipo_asentamiento",
-        "fk_id_zona"
-    ]
+    writer: Optional[InsertWriter] = None
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write("BEGIN;\n")
-            cols_sql = ", ".join(columns)
-            insert_prefix = f"INSERT INTO codigos_postales ({cols_sql}) VALUES\n"
-            first_batch = True
-
-            logger.info(f"Procesando {total_records} códigos postales en {num_batches} lotes de tamaño {BATCH_SIZE_CODIGOS_POSTALES}...")
-
-            for i in range(num_batches):
-                start_idx = i * BATCH_SIZE_CODIGOS_POSTALES
-                end_idx = start_idx + BATCH_SIZE_CODIGOS_POSTALES
-                df_batch = df.iloc[start_idx:end_idx]
-                logger.debug(f"Procesando lote {i+1}/{num_batches} (índices {start_idx}-{end_idx-1})...")
-
-                valores_batch, errores_batch = _process_cp_batch(df_batch)
+        with InsertWriter(filepath, "codigos_postales", CP_TABLE_COLUMNS, rows_per_insert, rows_per_file) as writer:
+            logger.info(
+                f"Procesando {batches.describe()} en lotes de tamaño "
+                f"{BATCH_SIZE_CODIGOS_POSTALES} ({workers} proceso(s))..."
+            )
+
+            process_batch = _process_cp_batch if pipeline is None else pipeline.task(_process_cp_batch)
+            batch_results = map_batches(TimedBatch(process_batch), batches, workers)
+            for i, (result, batch_metrics) in enumerate(batch_results):
+                if pipeline is not None:
+                    result = pipeline.merge(result, batch_metrics.rows_in)
+                valores_batch, errores_batch = result
+                logger.debug(f"Procesado lote {i+1} ({batches.rows} registros leídos).")
+                batch_metrics.rows_out, batch_metrics.errors = len(valores_batch), errores_batch
+                record_batch(batch_metrics)
                 total_errors += errores_batch
 
                 if valores_batch:
-                    if first_batch:
-                        f.write(insert_prefix)
-                        first_batch = False
-                    else:
-                        f.write(",\n")
-
-                    f.write(",\n".join(valores_batch))
+                    writer.write(valores_batch)
                     total_inserted += len(valores_batch)
                 else:
-                     logger.debug(f"Lote {i+1}/{num_batches} no generó valores insertables.")
+                    logger.debug(f"Lote {i+1} no generó valores insertables.")
 
-            if total_inserted > 0:
-                 f.write(";\n")
-                 logger.info(f"Generado SQL para {total_inserted} códigos postales.")
-            else:
-                 f.write(f"-- No se encontraron códigos postales válidos\n")
-                 logger.warning(f"No se encontraron códigos postales válidos para generar {filepath.name}")
+            writer.close("No se encontraron códigos postales válidos")
 
-            f.write("COMMIT;\n")
+        if total_inserted > 0:
+            logger.info(f"Generado SQL para {total_inserted} códigos postales en {writer.describe()}.")
+        else:
+            logger.warning(f"No se encontraron códigos postales válidos para generar {filepath.name}")
 
         if total_errors > 0:
             logger.warning(f"Se encontraron {total_errors} errores durante el procesamiento de códigos postales.")
@@ -430,7 +565,8 @@ def generate_codigos_postales_sql(df: pd.DataFrame) -> Tuple[int, int]:
 
     except IOError:
         logger.exception(f"Error al escribir el archivo SQL {filepath.name}")
-        return total_inserted, total_errors + (total_records - total_inserted - total_errors)
     except Exception:
         logger.exception("Error inesperado al generar SQL para códigos postales")
-        return total_inserted, total_errors + (total_records - total_inserted - total_errors) 
\ No newline at end of file
+    # Solo cuentan las filas de las partes completas: la parte abierta se eliminó al abortar
+    total_inserted = writer.total_rows if writer is not None else 0
+    return total_inserted, total_errors + (batches.total_rows() - total_inserted - total_errors)
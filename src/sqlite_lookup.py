@@ -0,0 +1,386 @@
+import pandas as pd
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .copy_generator import unescape_sql_literal
+from .lookup import (
+    _CIUDAD_PATTERN,
+    _CP_PATTERN,
+    _ESTADO_PATTERN,
+    _MUNICIPIO_PATTERN,
+    _check_code,
+    _check_page,
+)
+from .models import PostalCodeRecord, StateRecord, MunicipalityRecord, CityRecord
+
+logger = logging.getLogger(__name__)
+
+# Las seis tablas de database/schema.sql con tipos de SQLite (las FKs se declaran pero SQLite no las exige por defecto)
+SQLITE_SCHEMA = """
+CREATE TABLE estados (
+    pk_codigo_estado TEXT PRIMARY KEY,
+    nombre_estado TEXT NOT NULL
+);
+CREATE TABLE municipios (
+    pk_codigo_municipio TEXT,
+    fk_codigo_estado TEXT REFERENCES estados(pk_codigo_estado),
+    nombre_municipio TEXT NOT NULL,
+    PRIMARY KEY (pk_codigo_municipio, fk_codigo_estado)
+);
+CREATE TABLE ciudades (
+    pk_codigo_ciudad TEXT,
+    fk_codigo_estado TEXT REFERENCES estados(pk_codigo_estado),
+    nombre_ciudad TEXT NOT NULL,
+    PRIMARY KEY (pk_codigo_ciudad, fk_codigo_estado)
+);
+CREATE TABLE tipos_asentamiento (
+    pk_codigo_tipo_asentamiento TEXT PRIMARY KEY,
+    nombre_tipo_asentamiento TEXT NOT NULL
+);
+CREATE TABLE zonas (
+    pk_id_zona INTEGER PRIMARY KEY,
+    nombre_zona TEXT NOT NULL UNIQUE
+);
+CREATE TABLE codigos_postales (
+    pk_id_codigo_postal INTEGER PRIMARY KEY,
+    codigo_postal TEXT NOT NULL,
+    nombre_asentamiento TEXT NOT NULL,
+    fk_codigo_estado TEXT NOT NULL REFERENCES estados(pk_codigo_estado),
+    fk_codigo_municipio TEXT,
+    fk_codigo_ciudad TEXT,
+    fk_codigo_tipo_asentamiento TEXT NOT NULL REFERENCES tipos_asentamiento(pk_codigo_tipo_asentamiento),
+    fk_id_zona INTEGER NOT NULL REFERENCES zonas(pk_id_zona),
+    FOREIGN KEY (fk_codigo_municipio, fk_codigo_estado) REFERENCES municipios(pk_codigo_municipio, fk_codigo_estado),
+    FOREIGN KEY (fk_codigo_ciudad, fk_codigo_estado) REFERENCES ciudades(pk_codigo_ciudad, fk_codigo_estado)
+);
+-- Equivalente a la vista materializada vm_codigos_postales (SQLite no tiene vistas materializadas)
+CREATE TABLE vm_codigos_postales (
+    id_codigo_postal INTEGER PRIMARY KEY,
+    codigo_postal TEXT NOT NULL,
+    nombre_asentamiento TEXT NOT NULL,
+    nombre_tipo_asentamiento TEXT NOT NULL,
+    nombre_zona TEXT NOT NULL,
+    codigo_estado TEXT NOT NULL,
+    nombre_estado TEXT NOT NULL,
+    codigo_municipio TEXT,
+    nombre_municipio TEXT,
+    codigo_ciudad TEXT,
+    nombre_ciudad TEXT,
+    nombre_busqueda TEXT NOT NULL -- nombre_asentamiento en minúsculas (LOWER de SQLite solo convierte ASCII)
+);
+-- Índice de trigramas de nombre_busqueda para las búsquedas LIKE '%...%' (el texto se lee de la tabla)
+CREATE VIRTUAL TABLE vm_codigos_postales_fts USING fts5(
+    nombre_busqueda, content = 'vm_codigos_postales', content_rowid = 'id_codigo_postal', tokenize = 'trigram'
+);
+-- Registros por trigrama, para estimar cuántos candidatos devolverá el índice
+CREATE VIRTUAL TABLE vm_codigos_postales_fts_vocab USING fts5vocab(vm_codigos_postales_fts, row);
+"""
+
+# Índices que cubren el filtro y el orden de cada consulta (el id va implícito en cada entrada)
+SQLITE_INDEXES = """
+CREATE INDEX idx_vm_codigo_postal ON vm_codigos_postales (codigo_postal, nombre_asentamiento);
+CREATE INDEX idx_vm_estado ON vm_codigos_postales (codigo_estado, codigo_postal, nombre_asentamiento);
+CREATE INDEX idx_vm_municipio ON vm_codigos_postales (codigo_estado, codigo_municipio, codigo_postal, nombre_asentamiento);
+CREATE INDEX idx_vm_ciudad ON vm_codigos_postales (codigo_estado, codigo_ciudad, codigo_postal, nombre_asentamiento);
+CREATE INDEX idx_vm_ciudad_nombre ON vm_codigos_postales (codigo_estado, codigo_ciudad, nombre_asentamiento, codigo_postal);
+CREATE INDEX idx_vm_nombre ON vm_codigos_postales (nombre_asentamiento, codigo_postal);
+CREATE INDEX idx_municipios_estado ON municipios (fk_codigo_estado, nombre_municipio);
+CREATE INDEX idx_ciudades_estado ON ciudades (fk_codigo_estado, nombre_ciudad);
+"""
+
+# Columnas de las tablas que contienen nombres con el escapado SQL de `clean_text`
+_NAME_COLUMNS = (
+    "nombre_estado", "nombre_municipio", "nombre_ciudad", "nombre_tipo_asentamiento", "nombre_asentamiento",
+)
+
+# Coste relativo de un candidato del índice de trigramas (leerlo y ordenarlo) frente a comprobar
+# un nombre al recorrerlos en orden; medido en una base sintética de 234k asentamientos
+FTS_CANDIDATE_COST = 8
+
+_RECORD_COLUMNS = """
+    codigo_postal, nombre_asentamiento, nombre_tipo_asentamiento, nombre_zona, codigo_estado,
+    nombre_estado, codigo_municipio, nombre_municipio, codigo_ciudad, nombre_ciudad
+"""
+
+
+def _insert_frame(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    """Inserta un DataFrame en una tabla (mismas columnas); los nulos se guardan como NULL."""
+    df = df.astype(object).where(df.notna(), None)
+    for column in _NAME_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(unescape_sql_literal, na_action="ignore")
+    placeholders = ", ".join("?" * len(df.columns))
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(df.columns)}) VALUES ({placeholders})",
+        df.itertuples(index=False, name=None),
+    )
+
+
+def build_sqlite_database(tables: Dict[str, pd.DataFrame], df: pd.DataFrame, path: Path) -> int:
+    """
+    Genera una base SQLite autocontenida para consultas sin PostgreSQL.
+
+    Contiene las seis tablas, la tabla `vm_codigos_postales` con los registros
+    desnormalizados, los índices de cada consulta y un índice FTS5 de
+    trigramas sobre los nombres de asentamiento. Se escribe en un archivo
+    temporal y se renombra al terminar.
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Tablas por nombre (ver `build_snapshot`).
+        df (pd.DataFrame): Registros desnormalizados (ver `exporters.denormalized_frame`).
+        path (Path): Ruta de la base.
+
+    Returns:
+        int: Registros de vm_codigos_postales (0 si hubo un error).
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.unlink(missing_ok=True)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            # Sin diario ni fsync: si algo falla, el archivo temporal se descarta
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.executescript(SQLITE_SCHEMA)
+            for table in ("estados", "municipios", "ciudades", "tipos_asentamiento", "zonas"):
+                _insert_frame(conn, table, tables[table])
+            cp = tables["codigos_postales"]
+            _insert_frame(conn, "codigos_postales", cp.assign(pk_id_codigo_postal=cp.index + 1))
+            conn.executemany(
+                f"INSERT INTO vm_codigos_postales (id_codigo_postal, {_RECORD_COLUMNS}, nombre_busqueda) "
+                f"VALUES ({', '.join('?' * 12)})",
+                df.assign(nombre_busqueda=df["nombre_asentamiento"].str.lower()).itertuples(index=False, name=None),
+            )
+            conn.executescript(SQLITE_INDEXES)
+            conn.execute("INSERT INTO vm_codigos_postales_fts (vm_codigos_postales_fts) VALUES ('rebuild')")
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+        tmp_path.replace(path)
+    except Exception:
+        logger.exception(f"Error al generar la base SQLite {path}")
+        return 0
+    logger.info(f"Base SQLite generada: {path} ({len(df)} registros, {path.stat().st_size / (1024 * 1024):.1f} MB)")
+    return len(df)
+
+
+def _query_segments(query: str) -> List[str]:
+    """Tramos literales de la consulta (entre comodines), en minúsculas."""
+    return re.split(r"[%_]", query.lower())
+
+
+def _uses_trigram_index(query: str) -> bool:
+    """
+    Indica si el LIKE de la consulta puede resolverse con el índice de trigramas.
+
+    Hace falta un tramo literal (entre comodines) de al menos tres caracteres.
+    Además, FTS5 cuenta bytes y no caracteres al decidir si un tramo tiene
+    trigramas: un tramo de uno o dos caracteres con acentos devolvería cero
+    filas, así que en ese caso no se usa el índice.
+    """
+    segments = _query_segments(query)
+    return any(len(segment) >= 3 for segment in segments) and all(
+        len(segment) >= 3 or segment.isascii() for segment in segments
+    )
+
+
+class SQLiteLookup:
+    """
+    Consultas de `database/functions.sql` sobre la base SQLite de `build_sqlite_database`.
+
+    Mismas firmas, validaciones (ValueError), columnas y orden que `PostalLookup`
+    (los empates se resuelven por código postal y por id, como en la consulta
+    en memoria). La búsqueda por nombre usa el índice FTS5 de trigramas con
+    LIKE sobre los nombres en minúsculas, por lo que no distingue mayúsculas
+    (tampoco las acentuadas).
+    """
+
+    def __init__(self, path: Path) -> None:
+        # Solo lectura: varios procesos pueden abrir la misma base
+        self.conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        self.records = self.conn.execute("SELECT count(*) FROM vm_codigos_postales").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _prefer_trigram_index(self, query: str, wanted: int) -> bool:
+        """
+        Elige entre el índice de trigramas y el recorrido de los nombres en orden.
+
+        El índice lee y ordena todos los candidatos; el recorrido se detiene al
+        completar la página, tras comprobar unos `wanted * registros / coincidencias`
+        nombres. Las coincidencias se acotan por el trigrama menos frecuente de
+        la consulta, así que un término común se resuelve recorriendo.
+        """
+        if not _uses_trigram_index(query):
+            return False
+        trigrams = {segment[i:i + 3] for segment in _query_segments(query) for i in range(len(segment) - 2)}
+        placeholders = ", ".join("?" * len(trigrams))
+        found, candidates = self.conn.execute(
+            f"SELECT count(*), min(doc) FROM vm_codigos_postales_fts_vocab WHERE term IN ({placeholders})",
+            tuple(trigrams),
+        ).fetchone()
+        # Un trigrama ausente no tiene registros: el índice responde al instante que no hay resultados
+        if found < len(trigrams):
+            return True
+        return candidates * candidates * FTS_CANDIDATE_COST <= wanted * self.records
+
+    def _postal_code_records(self, where: str, order: str, params: tuple) -> List[PostalCodeRecord]:
+        rows = self.conn.execute(
+            f"SELECT {_RECORD_COLUMNS} FROM vm_codigos_postales WHERE {where} ORDER BY {order}", params
+        ).fetchall()
+        return [PostalCodeRecord(*row) for row in rows]
+
+    def search_by_postal_code(self, codigo_postal: str) -> List[PostalCodeRecord]:
+        """Asentamientos de un código postal exacto, ordenados por nombre."""
+        _check_code(codigo_postal, _CP_PATTERN, "El código postal debe ser de 5 dígitos")
+        return self._postal_code_records(
+            "codigo_postal = ?", "nombre_asentamiento, id_codigo_postal", (codigo_postal,)
+        )
+
+    def search_settlements_by_name(self, query: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """
+        Asentamientos cuyo nombre contiene `query` (como ILIKE), ordenados por nombre.
+
+        Si la consulta es selectiva se buscan los candidatos en el índice de
+        trigramas y se ordenan; si no, se recorren los nombres en orden
+        (idx_vm_nombre) hasta completar la página (ver `_prefer_trigram_index`).
+        """
+        _check_page(limit, offset)
+        pattern = f"%{query.lower()}%"
+        if "\\" in query:
+            # Como en ILIKE, "\" escapa el siguiente carácter (LIKE de SQLite solo lo hace con ESCAPE)
+            condition = "nombre_busqueda LIKE ? ESCAPE '\\'"
+        elif self._prefer_trigram_index(query, offset + limit):
+            condition = "id_codigo_postal IN (SELECT rowid FROM vm_codigos_postales_fts WHERE nombre_busqueda LIKE ?)"
+        else:
+            condition = "nombre_busqueda LIKE ?"
+        return self._postal_code_records(
+            condition,
+            "nombre_asentamiento, codigo_postal, id_codigo_postal LIMIT ? OFFSET ?",
+            (pattern, limit, offset),
+        )
+
+    def get_postal_codes_by_state(self, codigo_estado: str, limit: int, offset: int) -> List[PostalCodeRecord]:
+        """Asentamientos de un estado, ordenados por código postal y nombre."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        _check_page(limit, offset)
+        return self._postal_code_records(
+            "codigo_estado = ?",
+            "codigo_postal, nombre_asentamiento, id_codigo_postal LIMIT ? OFFSET ?",
+            (codigo_estado, limit, offset),
+        )
+
+    def get_postal_codes_by_municipality(
+        self, codigo_estado: str, codigo_municipio: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de un municipio, ordenados por código postal y nombre."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        _check_code(codigo_municipio, _MUNICIPIO_PATTERN, "El código de municipio debe ser de 3 dígitos")
+        _check_page(limit, offset)
+        return self._postal_code_records(
+            "codigo_estado = ? AND codigo_municipio = ?",
+            "codigo_postal, nombre_asentamiento, id_codigo_postal LIMIT ? OFFSET ?",
+            (codigo_estado, codigo_municipio, limit, offset),
+        )
+
+    def get_postal_codes_by_city(
+        self, codigo_estado: str, codigo_ciudad: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de una ciudad, ordenados por código postal y nombre."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        _check_code(codigo_ciudad, _CIUDAD_PATTERN, "El código de ciudad debe ser de 2 dígitos")
+        _check_page(limit, offset)
+        return self._postal_code_records(
+            "codigo_estado = ? AND codigo_ciudad = ?",
+            "codigo_postal, nombre_asentamiento, id_codigo_postal LIMIT ? OFFSET ?",
+            (codigo_estado, codigo_ciudad, limit, offset),
+        )
+
+    def get_settlements_by_city(
+        self, codigo_estado: str, codigo_ciudad: str, limit: int, offset: int
+    ) -> List[PostalCodeRecord]:
+        """Asentamientos de una ciudad, ordenados por nombre."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        _check_code(codigo_ciudad, _CIUDAD_PATTERN, "El código de ciudad debe ser de 2 dígitos")
+        _check_page(limit, offset)
+        return self._postal_code_records(
+            "codigo_estado = ? AND codigo_ciudad = ?",
+            "nombre_asentamiento, codigo_postal, id_codigo_postal LIMIT ? OFFSET ?",
+            (codigo_estado, codigo_ciudad, limit, offset),
+        )
+
+    def get_all_states(self) -> List[StateRecord]:
+        """Todos los estados, ordenados por nombre."""
+        rows = self.conn.execute(
+            "SELECT pk_codigo_estado, nombre_estado FROM estados ORDER BY nombre_estado, rowid"
+        ).fetchall()
+        return [StateRecord(*row) for row in rows]
+
+    def get_state_by_id(self, codigo_estado: str) -> List[StateRecord]:
+        """El estado indicado (lista vacía si no existe)."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        rows = self.conn.execute(
+            "SELECT pk_codigo_estado, nombre_estado FROM estados WHERE pk_codigo_estado = ?", (codigo_estado,)
+        ).fetchall()
+        return [StateRecord(*row) for row in rows]
+
+    def get_cities_by_state(self, codigo_estado: str) -> List[CityRecord]:
+        """Ciudades de un estado, ordenadas por nombre."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        rows = self.conn.execute(
+            "SELECT pk_codigo_ciudad, nombre_ciudad, fk_codigo_estado FROM ciudades "
+            "WHERE fk_codigo_estado = ? ORDER BY nombre_ciudad, rowid",
+            (codigo_estado,),
+        ).fetchall()
+        return [CityRecord(*row) for row in rows]
+
+    def get_municipalities_by_state(self, codigo_estado: str) -> List[MunicipalityRecord]:
+        """Municipios de un estado, ordenados por nombre."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        rows = self.conn.execute(
+            "SELECT pk_codigo_municipio, nombre_municipio, fk_codigo_estado FROM municipios "
+            "WHERE fk_codigo_estado = ? ORDER BY nombre_municipio, rowid",
+            (codigo_estado,),
+        ).fetchall()
+        return [MunicipalityRecord(*row) for row in rows]
+
+    def get_all_cities(self) -> List[CityRecord]:
+        """Todas las ciudades, ordenadas por nombre."""
+        rows = self.conn.execute(
+            "SELECT pk_codigo_ciudad, nombre_ciudad, fk_codigo_estado FROM ciudades ORDER BY nombre_ciudad, rowid"
+        ).fetchall()
+        return [CityRecord(*row) for row in rows]
+
+    def get_city_by_id(self, codigo_estado: str, codigo_ciudad: str) -> List[CityRecord]:
+        """La ciudad indicada (lista vacía si no existe)."""
+        _check_code(codigo_estado, _ESTADO_PATTERN, "El código de estado debe ser de 2 dígitos")
+        _check_code(codigo_ciudad, _CIUDAD_PATTERN, "El código de ciudad debe ser de 2 dígitos")
+        rows = self.conn.execute(
+            "SELECT pk_codigo_ciudad, nombre_ciudad, fk_codigo_estado FROM ciudades "
+            "WHERE fk_codigo_estado = ? AND pk_codigo_ciudad = ?",
+            (codigo_estado, codigo_ciudad),
+        ).fetchall()
+        return [CityRecord(*row) for row in rows]
+
+
+def open_sqlite_lookup(path: Path) -> Optional[SQLiteLookup]:
+    """
+    Abre la base SQLite en modo de solo lectura.
+
+    Returns:
+        Optional[SQLiteLookup]: Consultas sobre la base, o None si no existe o no se puede abrir.
+    """
+    if not path.is_file():
+        logger.warning(f"No existe la base SQLite {path}.")
+        return None
+    try:
+        return SQLiteLookup(path)
+    except sqlite3.Error as e:
+        logger.error(f"No se pudo abrir la base SQLite {path}: {e}")
+        return None
@@ -1,6 +1,9 @@
 import pandas as pd
 import re
-from typing import Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 import logging
 import sys # Añadido para tabla de traducción
 
@@ -13,16 +16,165 @@ from .config import (
     MAX_LEN_NOMBRE,
     MAX_LEN_NOMBRE_ASENTAMIENTO,
     DEFAULT_ZONA_NAME,
+    MEMO_CACHE_SIZE,
 )
+from .diagnostics import verbose_enabled
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+def _memo_key(value: Any) -> Hashable:
+    """Clave de memoización: distingue tipos que comparan igual (p. ej. 1 y 1.0)."""
+    return value if type(value) is str else (type(value), value)
+
+
+class MemoCache:
+    """
+    Caché acotada de resultados de una función de limpieza para unos parámetros dados.
+
+    Las columnas de SEPOMEX repiten mucho sus valores (entre columnas, entre
+    bloques de lectura y entre validación y normalización), por lo que se
+    memoriza el resultado por valor de entrada. Al superar `maxsize` entradas se
+    descartan las más antiguas. Lleva contadores de aciertos y fallos.
+    """
+
+    def __init__(self, maxsize: int = MEMO_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Guarda un resultado, descartando la entrada más antigua si se excede el límite."""
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, value: Any, compute: Callable[[], T]) -> T:
+        """Devuelve el resultado memorizado para `value` o lo calcula con `compute`."""
+        key = _memo_key(value)
+        result = self._data.get(key, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = compute()
+        self._store(key, result)
+        return result
+
+    def map_values(self, values: pd.Series, compute: Callable[[pd.Series], pd.Series]) -> List[Any]:
+        """
+        Versión por lotes de `get`: calcula con `compute` (vectorizada) solo los
+        valores que no están memorizados.
+
+        Args:
+            values (pd.Series): Valores distintos y sin nulos.
+            compute (Callable[[pd.Series], pd.Series]): Transformación vectorizada.
+
+        Returns:
+            List[Any]: Resultados alineados con `values`.
+        """
+        keys = [_memo_key(value) for value in values.tolist()]
+        results = [self._data.get(key, _MISSING) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is _MISSING]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            computed = compute(values.iloc[missing].reset_index(drop=True)).tolist()
+            for i, result in zip(missing, computed):
+                results[i] = result
+                self._store(keys[i], result)
+        return results
+
+
+# Cachés de la ejecución: (función, parámetros) -> MemoCache
+_MEMO_CACHES: Dict[Tuple[str, Any], MemoCache] = {}
+# Contadores de las cachés de los workers: (función, parámetros) -> [aciertos, fallos, entradas]
+_WORKER_MEMO_COUNTERS: Dict[Tuple[str, Any], List[int]] = {}
+
+
+def memo_cache(name: str, params: Any = None) -> MemoCache:
+    """Devuelve la caché de la ejecución para una función y sus parámetros (la crea si no existe)."""
+    key = (name, params)
+    if key not in _MEMO_CACHES:
+        _MEMO_CACHES[key] = MemoCache()
+    return _MEMO_CACHES[key]
+
+
+def reset_memo_caches() -> None:
+    """Vacía las cachés de memoización (al inicio de cada ejecución)."""
+    _MEMO_CACHES.clear()
+    _WORKER_MEMO_COUNTERS.clear()
+
+
+def memo_cache_counters() -> Dict[Tuple[str, Any], Tuple[int, int, int]]:
+    """Aciertos, fallos y entradas de cada caché de este proceso."""
+    return {key: (cache.hits, cache.misses, len(cache)) for key, cache in _MEMO_CACHES.items()}
+
+
+def memo_counters_since(before: Dict[Tuple[str, Any], Tuple[int, int, int]]) -> Dict[Tuple[str, Any], Tuple[int, int, int]]:
+    """
+    Aciertos y fallos de cada caché desde `before` (ver `memo_cache_counters`), con sus entradas actuales.
+
+    Las cachés de un worker duran lo que el proceso, así que sus contadores
+    acumulan todos los lotes que ha procesado; la diferencia es la de un lote.
+    """
+    delta = {}
+    for key, (hits, misses, entries) in memo_cache_counters().items():
+        prev_hits, prev_misses, _ = before.get(key, (0, 0, 0))
+        delta[key] = (hits - prev_hits, misses - prev_misses, entries)
+    return delta
+
+
+def add_worker_memo_counters(counters: Dict[Tuple[str, Any], Tuple[int, int, int]]) -> None:
+    """
+    Suma a la ejecución los contadores de un lote procesado en un worker (ver `memo_counters_since`).
+
+    Aciertos y fallos se suman; las entradas son las de la caché más grande de un worker.
+    """
+    for key, (hits, misses, entries) in counters.items():
+        total = _WORKER_MEMO_COUNTERS.setdefault(key, [0, 0, 0])
+        total[0] += hits
+        total[1] += misses
+        total[2] = max(total[2], entries)
+
+
+def memo_cache_stats() -> List[Tuple[str, int, int, int]]:
+    """
+    Contadores de las cachés de memoización de la ejecución.
+
+    Con `--workers > 1` incluyen los de los workers (ver `add_worker_memo_counters`):
+    aciertos y fallos suman los de todos los procesos, y las entradas son las
+    de la caché más grande entre el proceso principal y cada worker.
+
+    Returns:
+        List[Tuple[str, int, int, int]]: (nombre, aciertos, fallos, entradas) por caché.
+    """
+    counters = {key: list(values) for key, values in memo_cache_counters().items()}
+    for key, (hits, misses, entries) in _WORKER_MEMO_COUNTERS.items():
+        total = counters.setdefault(key, [0, 0, 0])
+        total[0] += hits
+        total[1] += misses
+        total[2] = max(total[2], entries)
+    return [
+        (name if params is None else f"{name}({params})", hits, misses, entries)
+        for (name, params), (hits, misses, entries) in counters.items()
+    ]
+
 
 def clean_text(text: Optional[str], max_length: int = MAX_LEN_NOMBRE) -> str:
     """
     Limpia texto: escapa comillas SQL, normaliza espacios, trunca a longitud máxima.
     Elimina caracteres no compatibles con UTF-8.
     Conserva caracteres especiales como acentos y eñes.
+    El resultado se memoriza por ejecución (ver `memo_cache`).
 
     Args:
         text (Optional[str]): Texto a limpiar.
@@ -33,7 +185,11 @@ def clean_text(text: Optional[str], max_length: int = MAX_LEN_NOMBRE) -> str:
     """
     if pd.isna(text) or text is None:
         return ""
+    return memo_cache("clean_text", max_length).get(text, lambda: _clean_text(text, max_length))
 
+
+def _clean_text(text: Any, max_length: int) -> str:
+    """Implementación sin caché de `clean_text` para un valor no nulo."""
     result = str(text)
 
     # 1. Eliminar caracteres de control C1 problemáticos
@@ -52,8 +208,8 @@ def clean_text(text: Optional[str], max_length: int = MAX_LEN_NOMBRE) -> str:
             logger.warning(f"No se pudo limpiar/codificar el texto: {text[:50]}...")
             return ""
 
-    # Log si el texto cambió durante la codificación/decodificación (útil para debug)
-    if logger.isEnabledFor(logging.DEBUG) and original_for_debug != result:
+    # Log si el texto cambió durante la codificación/decodificación (solo en modo detallado)
+    if verbose_enabled() and original_for_debug != result:
         logger.debug(f"Texto cambiado por encode/decode UTF-8: Original='{original_for_debug[:50]}...', Limpio='{result[:50]}...'")
 
     replacements = {
@@ -70,8 +226,8 @@ def clean_text(text: Optional[str], max_length: int = MAX_LEN_NOMBRE) -> str:
     # Volver a truncar por si los reemplazos alargaron el string
     final_result = result[:max_length]
 
-    # Log final de la limpieza si está en DEBUG
-    if logger.isEnabledFor(logging.DEBUG) and text != final_result:
+    # Log final de la limpieza (solo en modo detallado)
+    if verbose_enabled() and text != final_result:
          logger.debug(f"clean_text: IN='{str(text)[:50]}...' -> OUT='{final_result[:50]}...'")
 
     return final_result
@@ -93,7 +249,11 @@ def format_codigo(codigo: Optional[str | int | float], digits: int = 2) -> Optio
     """
     if pd.isna(codigo) or codigo is None:
         return None
+    return memo_cache("format_codigo", digits).get(codigo, lambda: _format_codigo(codigo, digits))
+
 
+def _format_codigo(codigo: Any, digits: int) -> Optional[str]:
+    """Implementación sin caché de `format_codigo` para un valor no nulo."""
     codigo_str = str(codigo).strip()
     if not codigo_str or codigo_str.lower() == "nan":
         return None
@@ -125,7 +285,11 @@ def normalize_zona(zona_texto: Optional[str]) -> str:
     """
     if pd.isna(zona_texto) or zona_texto is None:
         return DEFAULT_ZONA_NAME
+    return memo_cache("normalize_zona").get(zona_texto, lambda: _normalize_zona(zona_texto))
+
 
+def _normalize_zona(zona_texto: Any) -> str:
+    """Implementación sin caché de `normalize_zona` para un valor no nulo."""
     zona_limpia = " ".join(str(zona_texto).split()).strip().title()
 
     if zona_limpia == "Urbano":
@@ -133,4 +297,82 @@ def normalize_zona(zona_texto: Optional[str]) -> str:
     elif zona_limpia == "Rural":
         return "Rural"
     else:
-        return DEFAULT_ZONA_NAME 
\ No newline at end of file
+        return DEFAULT_ZONA_NAME 
+
+
+class BatchStream:
+    """
+    Divide un DataFrame, o una secuencia de bloques de lectura, en lotes consecutivos.
+
+    Permite a los generadores de codigos_postales consumir tanto el DataFrame
+    completo como los bloques del modo por bloques (streaming) sin copiarlos.
+    El primer bloque se lee por adelantado para poder comprobar sus columnas.
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]], batch_size: int) -> None:
+        self._total = len(data) if isinstance(data, pd.DataFrame) else None
+        self._frames = iter([data] if isinstance(data, pd.DataFrame) else data)
+        self._first = next(self._frames, None)
+        self.columns = self._first.columns if self._first is not None else pd.Index([])
+        self.batch_size = batch_size
+        self.rows = 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        first, self._first = self._first, None
+        frames = self._frames if first is None else chain([first], self._frames)
+        for frame in frames:
+            for start in range(0, len(frame), self.batch_size):
+                batch = frame.iloc[start:start + self.batch_size]
+                self.rows += len(batch)
+                yield batch
+
+    def describe(self) -> str:
+        """Texto para los logs: número de registros si se conoce de antemano."""
+        if self._total is None:
+            return "los códigos postales leídos por bloques"
+        return f"{self._total} códigos postales"
+
+    def total_rows(self) -> int:
+        """Registros totales si se conocen de antemano; si no, los entregados hasta ahora."""
+        return self._total if self._total is not None else self.rows
+
+    def drain(self) -> int:
+        """Consume los lotes pendientes sin procesarlos y devuelve el total de registros."""
+        for _ in self:
+            pass
+        return self.rows
+
+
+def map_batches(
+    func: Callable[[pd.DataFrame], T],
+    batches: Iterable[pd.DataFrame],
+    workers: int = 1,
+) -> Iterator[T]:
+    """
+    Aplica `func` a cada lote y devuelve los resultados en orden.
+
+    Con `workers > 1` los lotes se reparten en un pool de procesos; como mucho
+    `2 * workers` lotes están en vuelo a la vez y los resultados se entregan en el
+    orden original, por lo que la salida es idéntica a la del modo serie.
+    `func` debe poder serializarse (función de nivel de módulo o `functools.partial`).
+
+    Args:
+        func (Callable[[pd.DataFrame], T]): Función a aplicar a cada lote.
+        batches (Iterable[pd.DataFrame]): Lotes a procesar (p. ej. un `BatchStream`).
+        workers (int): Número de procesos (1 = serie, sin pool).
+
+    Yields:
+        T: Resultado de cada lote, en orden.
+    """
+    if workers <= 1:
+        yield from map(func, batches)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(executor.submit(func, batch))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
@@ -0,0 +1,133 @@
+import pandas as pd
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import REJECTS_FILE
+from .catalogs import CatalogAccumulator
+from .data_normalizer import CP_SOURCE_COLUMNS, normalize_dataframe
+from .data_validator import REPORT_COLUMNS, split_rejects, write_rejects
+from .diagnostics import DiagnosticsCollector, collecting, diagnostics
+from .utils import add_worker_memo_counters, memo_cache_counters, memo_counters_since
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerBatch:
+    """Lo que un lote procesado en un worker devuelve además del resultado del generador."""
+    rows_valid: int
+    catalogs: CatalogAccumulator
+    diagnostics: DiagnosticsCollector
+    rejects: Optional[pd.DataFrame]
+    memo_counters: Optional[Dict[Tuple[str, Any], Tuple[int, int, int]]] = None  # Solo si corrió en otro proceso
+
+
+class WorkerTask:
+    """
+    Prepara un lote sin procesar del archivo fuente y le aplica la función del generador.
+
+    Valida (opcionalmente), normaliza y extrae las combinaciones de catálogo del
+    lote, todo en el proceso que lo ejecuta. Debe poder serializarse para
+    enviarse al pool (ver `map_batches`).
+    """
+
+    def __init__(self, func: Callable[[pd.DataFrame], Any], validate: bool, max_samples: int, verbose: bool) -> None:
+        self.func = func
+        self.validate = validate
+        self.max_samples = max_samples
+        self.verbose = verbose
+        self.parent_pid = os.getpid()
+
+    def __call__(self, raw: pd.DataFrame) -> Tuple[Any, WorkerBatch]:
+        # En el propio proceso (sin pool) las cachés de memoización ya son las de la ejecución
+        in_worker = os.getpid() != self.parent_pid
+        memo_before = memo_cache_counters() if in_worker else None
+        with collecting(self.max_samples, self.verbose) as collector:
+            df, rejects = split_rejects(raw) if self.validate else (raw, None)
+            df_norm = normalize_dataframe(df)
+            catalogs = CatalogAccumulator()
+            catalogs.update(df_norm)
+            result = self.func(df_norm)
+        memo = memo_counters_since(memo_before) if in_worker else None
+        return result, WorkerBatch(len(df), catalogs, collector, rejects, memo)
+
+
+class WorkerPipeline:
+    """
+    Lleva la validación y la normalización de codigos_postales al pool de procesos.
+
+    Con `--workers > 1`, los generadores de codigos_postales reciben los bloques
+    tal como se leen del archivo fuente y cada lote se valida, normaliza y
+    formatea en un worker (`WorkerTask`). El proceso principal solo lee,
+    escribe los resultados en su orden original e incorpora, también en orden,
+    lo que no puede acumularse en los workers: catálogos, diagnóstico y archivo
+    de rechazos. La salida es la misma que la del modo por bloques en serie.
+    """
+
+    def __init__(self, validate: bool = True, rejects_path: Optional[Path] = REJECTS_FILE) -> None:
+        self.validate = validate
+        self.rejects_path = rejects_path
+        self.catalogs = CatalogAccumulator()
+        self.batches = 0
+        self.rows_in = 0
+        self.rows_valid = 0
+
+    @staticmethod
+    def missing_columns(columns: pd.Index) -> List[str]:
+        """Columnas fuente requeridas para codigos_postales que faltan en los bloques leídos."""
+        return [column for column in CP_SOURCE_COLUMNS if column not in columns]
+
+    def task(self, func: Callable[[pd.DataFrame], Any]) -> WorkerTask:
+        """
+        Envuelve la función de un generador para ejecutarla sobre lotes sin procesar.
+
+        Args:
+            func (Callable[[pd.DataFrame], Any]): Función sobre un lote normalizado.
+
+        Returns:
+            WorkerTask: Tarea serializable para `map_batches`.
+        """
+        collector = diagnostics()
+        return WorkerTask(func, self.validate, collector.max_samples, collector.verbose)
+
+    def merge(self, output: Tuple[Any, WorkerBatch], rows_in: int) -> Any:
+        """
+        Incorpora un lote procesado; los lotes deben llegar en su orden original.
+
+        Args:
+            output (Tuple[Any, WorkerBatch]): Resultado de `WorkerTask`.
+            rows_in (int): Registros del lote sin procesar.
+
+        Returns:
+            Any: El resultado de la función del generador para el lote.
+        """
+        result, batch = output
+        diagnostics().merge(batch.diagnostics)
+        self.catalogs.merge(batch.catalogs)
+        if batch.memo_counters is not None:
+            add_worker_memo_counters(batch.memo_counters)
+        if batch.rejects is not None and self.rejects_path is not None:
+            write_rejects(batch.rejects, self.rejects_path, append=self.batches > 0)
+        self.batches += 1
+        self.rows_in += rows_in
+        self.rows_valid += batch.rows_valid
+        return result
+
+    def finish(self) -> None:
+        """Resume la validación de todos los lotes (sin lotes, deja el archivo de rechazos vacío)."""
+        if not self.validate:
+            return
+        if self.batches == 0 and self.rejects_path is not None:
+            write_rejects(pd.DataFrame(columns=REPORT_COLUMNS), self.rejects_path, append=False)
+        invalid_count = self.rows_in - self.rows_valid
+        logger.info(
+            f"Validación en {self.batches} lote(s): {self.rows_valid} registros válidos de {self.rows_in}."
+        )
+        if invalid_count > 0:
+            logger.warning(
+                f"Se encontraron {invalid_count} filas con errores. "
+                f"Detalle en {self.rejects_path if self.rejects_path is not None else 'el log'}."
+            )
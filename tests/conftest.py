@@ -0,0 +1,172 @@
+"""
+Datos compartidos por las pruebas: filas de borde con la forma del archivo de SEPOMEX
+y una base de PostgreSQL cargada con ellas (solo con `SEPOMEX_DATABASE_URL`).
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import sql_generator
+from src.catalogs import extract_catalogs
+from src.config import SQL_MANIFEST_FILENAME
+from src.data_normalizer import normalize_dataframe
+from src.data_validator import validate_dataframe
+from src.delta_generator import build_snapshot, collect_cp_records
+from src.lookup import PostalLookup
+from src.parallel_loader import orchestrate_load
+
+# Variable con la cadena de conexión de una base desechable para las pruebas con PostgreSQL
+PG_DSN_VARIABLE = "SEPOMEX_DATABASE_URL"
+# Copias de las filas de borde en la base de prueba
+PG_COPIES = 3
+
+NA = np.nan
+LONG_NAME = "Ampliación " + "Ñandú O'Higgins " * 8  # Excede ambos límites de longitud
+
+# Una fila por caso: (d_codigo, d_asenta, d_tipo_asenta, D_mnpio, d_estado, d_ciudad,
+#                      c_estado, c_mnpio, c_tipo_asenta, c_cve_ciudad, d_zona)
+EDGE_ROWS = [
+    ("01000", "San Ángel", "Colonia", "Álvaro Obregón", "Ciudad de México", "Ciudad de México", "09", "010", "09", "01", "Urbano"),
+    ("1010", "  Los   Alpes\t", "Colonia", "Álvaro Obregón", "Ciudad de México", "Ciudad de México", "9", "10", "9", "1", "  urbano "),
+    ("01020", "O'Higgins \"El Viejo\"", "Barrio", "Álvaro Obregón", "Ciudad de México", NA, "09", "010", "02", NA, "URBANO"),
+    ("01030", "C:\\Ruta\\Norte", "Barrio", "Álvaro Obregón", "Ciudad de México", "Ciudad de México", "09", "010", "02", "01", "Rural"),
+    ("01040", "Control\x85 C1\x96", "Pueblo", "Álvaro Obregón", "Ciudad de México", "Ciudad de México", "09", "010", "28", "01", "Semiurbano"),
+    ("01050", "Línea\nnueva", "Pueblo", NA, "Ciudad de México", NA, "09", NA, "28", NA, "Mixta"),
+    ("20000", LONG_NAME, "Fraccionamiento", LONG_NAME, LONG_NAME, LONG_NAME, "01", "001", "21", "02", NA),
+    ("20010", "Zona Centro", "Ranchería", "Aguascalientes", "Aguascalientes", "Aguascalientes", "1", "1", "29", "2", "rural"),
+    ("20020", "   ", "Colonia", "Aguascalientes", "Aguascalientes", "Aguascalientes", "01", "001", "09", "01", "Urbano"),
+    ("2002A", "Código con letra", "Colonia", "Aguascalientes", "Aguascalientes", "Aguascalientes", "01", "001", "09", "01", "Urbano"),
+    ("200300", "Código largo", "Colonia", "Aguascalientes", "Aguascalientes", "Aguascalientes", "01", "001", "09", "01", "Urbano"),
+    ("20040", "Estado inválido", "Colonia", "Aguascalientes", "Otro", "Aguascalientes", "123", "001", "09", "01", "Urbano"),
+    ("20050", "Municipio inválido", "Colonia", "Municipio largo", "Aguascalientes", NA, "01", "1234", "09", NA, "Urbano"),
+    ("20060", "Ciudad inválida", "Colonia", "Aguascalientes", "Aguascalientes", "Ciudad larga", "01", "001", "09", "123", "Urbano"),
+    ("20070", "Tipo inválido", "Desconocido", "Aguascalientes", "Aguascalientes", "Aguascalientes", "01", "001", "-1", "01", "Urbano"),
+    ("20080", "Sin nombre de ciudad", "Colonia", "Aguascalientes", "Aguascalientes", "", "01", "001", "09", "03", "Urbano"),
+    ("20090", "Sin nombre de municipio", "Colonia", NA, "Aguascalientes", "Aguascalientes", "01", "002", "09", "01", "Urbano"),
+    ("20100", "Nombre tardío", "Colonia", "Jesús María", "Aguascalientes", "Aguascalientes", "01", "002", "09", "01", "Urbano"),
+    ("20110", "Decimal", "Colonia", "Aguascalientes", "Aguascalientes", "Aguascalientes", "1.0", "001", "09", "01", "Urbano"),
+    ("28000", "Centro", "Colonia", "Colima", "Colima", "Colima", "06", "002", "09", "01", "Urbano"),
+    ("28010", "Quinta\u00a0del Sol", "Condominio", "Colima", "Colima", "Colima", "06", "002", "10", "01", "Urbano"),
+]
+
+COLUMNS = [
+    "d_codigo", "d_asenta", "d_tipo_asenta", "D_mnpio", "d_estado", "d_ciudad",
+    "c_estado", "c_mnpio", "c_tipo_asenta", "c_cve_ciudad", "d_zona",
+]
+
+
+@pytest.fixture
+def edge_frame() -> pd.DataFrame:
+    """Filas de borde con la misma forma que `read_sepomex_data` (códigos como texto, nulos como NaN)."""
+    return pd.DataFrame(EDGE_ROWS, columns=COLUMNS, dtype=object)
+
+
+@pytest.fixture(scope="session")
+def edge_tables() -> dict:
+    """Las seis tablas normalizadas de las filas de borde (formato de `build_snapshot`); no modificarlas."""
+    df = normalize_dataframe(validate_dataframe(pd.DataFrame(EDGE_ROWS, columns=COLUMNS, dtype=object), rejects_path=None))
+    return build_snapshot(extract_catalogs(df), collect_cp_records(df)[0])
+
+
+@pytest.fixture(scope="session")
+def edge_lookup(edge_tables: dict) -> PostalLookup:
+    """Consulta en memoria de las filas de borde, la referencia de las demás implementaciones."""
+    return PostalLookup(edge_tables)
+
+
+@pytest.fixture(scope="session")
+def lookup_calls() -> list:
+    """
+    Consultas (método, argumentos) que toda implementación de `PostalLookup` debe responder igual.
+
+    Incluyen códigos inexistentes, páginas con desplazamiento y búsquedas por
+    nombre con comodines y escapes.
+    """
+    calls = [("get_all_states", ()), ("get_all_cities", ())]
+    for codigo_postal in ("01000", "01020", "01050", "20000", "28010", "99999"):
+        calls.append(("search_by_postal_code", (codigo_postal,)))
+    for estado in ("01", "06", "09", "32"):
+        calls += [
+            ("get_state_by_id", (estado,)),
+            ("get_cities_by_state", (estado,)),
+            ("get_municipalities_by_state", (estado,)),
+            ("get_postal_codes_by_state", (estado, 100, 0)),
+            ("get_postal_codes_by_state", (estado, 2, 1)),
+        ]
+    for estado, municipio in (("09", "010"), ("01", "001"), ("01", "002"), ("06", "010")):
+        calls += [
+            ("get_postal_codes_by_municipality", (estado, municipio, 100, 0)),
+            ("get_postal_codes_by_municipality", (estado, municipio, 1, 1)),
+        ]
+    for estado, ciudad in (("09", "01"), ("01", "01"), ("01", "02"), ("06", "01"), ("06", "02")):
+        calls += [
+            ("get_city_by_id", (estado, ciudad)),
+            ("get_postal_codes_by_city", (estado, ciudad, 100, 0)),
+            ("get_postal_codes_by_city", (estado, ciudad, 2, 2)),
+            ("get_settlements_by_city", (estado, ciudad, 100, 0)),
+            ("get_settlements_by_city", (estado, ciudad, 2, 1)),
+        ]
+    for query in ("Centro", "centro", "San", "O_Higgins", "Ruta/N%", "%", "\\", "Centro\\", "ñandú", "zzz"):
+        calls += [
+            ("search_settlements_by_name", (query, 100, 0)),
+            ("search_settlements_by_name", (query, 2, 1)),
+        ]
+    return calls
+
+
+def write_sql_output(df_raw: pd.DataFrame, output_dir: Path, rows_per_insert: int = 0, rows_per_file: int = 0) -> dict:
+    """
+    Genera los archivos SQL y el manifiesto de `df_raw` como `python -m src.main`.
+
+    Returns:
+        dict: Registros escritos por tabla.
+    """
+    df = normalize_dataframe(validate_dataframe(df_raw, rejects_path=None))
+    limits = (rows_per_insert, rows_per_file)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(sql_generator, "OUTPUT_DIR", output_dir)
+        sql_generator.reset_sql_manifest()
+        counts = {"codigos_postales": sql_generator.generate_codigos_postales_sql(df, 1, *limits)[0]}
+        catalogs = extract_catalogs(df)
+        counts["estados"] = sql_generator.generate_estados_sql(catalogs.estados, *limits)
+        counts["municipios"] = sql_generator.generate_municipios_sql(catalogs.municipios, *limits)
+        counts["tipos_asentamiento"] = sql_generator.generate_tipos_asentamiento_sql(catalogs.tipos_asentamiento, *limits)
+        counts["zonas"] = sql_generator.generate_zonas_sql(*limits)
+        counts["ciudades"] = sql_generator.generate_ciudades_sql(catalogs.ciudades, *limits)
+        sql_generator.write_sql_manifest(output_dir / SQL_MANIFEST_FILENAME, *limits)
+    return counts
+
+
+@pytest.fixture(scope="session")
+def pg_dsn() -> str:
+    """
+    Base de PostgreSQL de `SEPOMEX_DATABASE_URL`; sin la variable se omiten las pruebas que la usan.
+
+    La base debe ser desechable: las pruebas la recrean y la modifican.
+    """
+    dsn = os.environ.get(PG_DSN_VARIABLE)
+    if not dsn:
+        pytest.skip(f"Defina {PG_DSN_VARIABLE} (base desechable) para las pruebas con PostgreSQL")
+    pytest.importorskip("psycopg")
+    return dsn
+
+
+@pytest.fixture(scope="session")
+def edge_sql_output(tmp_path_factory) -> Path:
+    """Archivos SQL de las filas de borde repetidas (varias filas por clave de orden), en varias partes."""
+    output_dir = tmp_path_factory.mktemp("generated_sql")
+    raw = pd.concat([pd.DataFrame(EDGE_ROWS, columns=COLUMNS, dtype=object)] * PG_COPIES, ignore_index=True)
+    write_sql_output(raw, output_dir, rows_per_insert=7, rows_per_file=20)
+    return output_dir
+
+
+@pytest.fixture(scope="session")
+def loaded_pg_dsn(pg_dsn: str, edge_sql_output: Path) -> str:
+    """`pg_dsn` recreada y cargada con `edge_sql_output`."""
+    if orchestrate_load(pg_dsn, edge_sql_output, workers=2, recreate=True) is None:
+        pytest.fail("No se pudo cargar la base de prueba (ver el log)")
+    return pg_dsn
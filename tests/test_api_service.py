@@ -0,0 +1,198 @@
+"""
+`ResponseCache` y `ApiService.handle` con un backend de prueba sobre las filas de borde.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import api_service
+from src.api_service import ApiService, ResponseCache
+
+
+class _StubBackend:
+    """Backend sobre una `PostalLookup` que cuenta las llamadas y puede retenerlas o fallar."""
+
+    def __init__(self, lookup) -> None:
+        self.lookup = lookup
+        self.calls = []
+        self.gate = None
+        self.fail = False
+
+    async def call(self, function, args):
+        self.calls.append((function, args))
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("Backend caído")
+        return getattr(self.lookup, function)(*args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj manual para la caducidad de la caché."""
+    now = [0.0]
+    monkeypatch.setattr(api_service, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def backend(edge_lookup):
+    return _StubBackend(edge_lookup)
+
+
+def _body(response) -> dict:
+    return json.loads(response[1])
+
+
+def _compute(counter: list, status: int = 200):
+    async def compute():
+        counter.append(1)
+        return status, b"{}"
+    return compute
+
+
+def test_cache_ttl_expiry(clock):
+    cache = ResponseCache(max_entries=10, ttl_seconds=30)
+    computed = []
+
+    async def run():
+        assert (await cache.get_or_compute("a", _compute(computed)))[1] == "MISS"
+        clock[0] = 29.9
+        assert (await cache.get_or_compute("a", _compute(computed)))[1] == "HIT"
+        clock[0] = 30.0
+        assert (await cache.get_or_compute("a", _compute(computed)))[1] == "MISS"
+
+    asyncio.run(run())
+    assert len(computed) == 2
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "coalesced": 0}
+
+
+def test_cache_lru_eviction(clock):
+    cache = ResponseCache(max_entries=2, ttl_seconds=30)
+    computed = []
+
+    async def origin(key):
+        return (await cache.get_or_compute(key, _compute(computed)))[1]
+
+    async def run():
+        assert [await origin("a"), await origin("b"), await origin("a")] == ["MISS", "MISS", "HIT"]
+        assert await origin("c") == "MISS"   # Descarta "b", la menos usada
+        assert await origin("a") == "HIT"
+        assert await origin("b") == "MISS"   # Descarta "c"
+        assert await origin("a") == "HIT"
+        assert await origin("c") == "MISS"
+
+    asyncio.run(run())
+    assert len(cache) == 2
+
+
+def test_cache_disabled_with_zero_entries():
+    cache = ResponseCache(max_entries=0)
+    computed = []
+
+    async def run():
+        for _ in range(2):
+            assert (await cache.get_or_compute("a", _compute(computed)))[1] == "MISS"
+
+    asyncio.run(run())
+    assert len(computed) == 2 and len(cache) == 0
+
+
+def test_concurrent_misses_call_backend_once(backend):
+    service = ApiService(backend, ResponseCache())
+
+    async def run():
+        backend.gate = asyncio.Event()
+        requests = [asyncio.ensure_future(service.handle("GET", "/api/v2/postal/codigo/01000")) for _ in range(5)]
+        await asyncio.sleep(0)
+        backend.gate.set()
+        return await asyncio.gather(*requests)
+
+    results = asyncio.run(run())
+    assert len(backend.calls) == 1
+    assert sorted(origin for _, origin in results) == ["COALESCED"] * 4 + ["MISS"]
+    assert len({response for response, _ in results}) == 1
+    assert service.cache.stats()["coalesced"] == 4
+
+
+def test_server_errors_are_not_cached(backend):
+    service = ApiService(backend, ResponseCache())
+
+    async def run():
+        backend.fail = True
+        first = await service.handle("GET", "/api/v2/estado")
+        second = await service.handle("GET", "/api/v2/estado")
+        backend.fail = False
+        third = await service.handle("GET", "/api/v2/estado")
+        fourth = await service.handle("GET", "/api/v2/estado")
+        return first, second, third, fourth
+
+    first, second, third, fourth = asyncio.run(run())
+    assert first[0][0] == second[0][0] == 500
+    assert _body(first[0]) == {"success": False, "message": "Error interno del servidor."}
+    assert [first[1], second[1], third[1], fourth[1]] == ["MISS", "MISS", "MISS", "HIT"]
+    assert third[0][0] == 200 and len(backend.calls) == 3
+
+
+@pytest.mark.parametrize("target, message", [
+    ("/api/v2/postal/search", "Falta el parámetro 'q'"),
+    ("/api/v2/postal/search?q=centro&limit=abc", "El parámetro 'limit' debe ser un entero"),
+    ("/api/v2/postal/estado/09?offset=1.5", "El parámetro 'offset' debe ser un entero"),
+    ("/api/v2/postal/estado/09?limit=0", "El límite debe estar entre 1 y 100"),
+    ("/api/v2/postal/estado/9", "El código de estado debe ser de 2 dígitos"),
+])
+def test_bad_requests(backend, target, message):
+    service = ApiService(backend, ResponseCache())
+    (status, body), _ = asyncio.run(service.handle("GET", target))
+    assert status == 400
+    assert json.loads(body) == {"success": False, "message": message}
+
+
+def test_not_found_and_method_not_allowed(backend):
+    service = ApiService(backend, ResponseCache())
+
+    async def run():
+        return [
+            await service.handle("GET", "/api/v2/estado/32"),
+            await service.handle("GET", "/api/v2/cities/06/02"),
+            await service.handle("GET", "/api/v2/desconocida"),
+            await service.handle("POST", "/api/v2/estado"),
+        ]
+
+    state, city, route, post = asyncio.run(run())
+    assert state[0][0] == city[0][0] == 404
+    assert _body(state[0])["message"] == "Recurso no encontrado."
+    assert route[0][0] == 404 and route[1] == "BYPASS"
+    assert _body(route[0])["message"] == "Ruta no encontrada."
+    assert post[0][0] == 405 and post[1] == "BYPASS"
+    assert ("get_all_states", ()) not in backend.calls
+
+
+def test_single_and_list_responses(backend):
+    service = ApiService(backend, ResponseCache())
+    (status, body), _ = asyncio.run(service.handle("GET", "/api/v2/estado/06"))
+    assert status == 200
+    assert json.loads(body) == {
+        "success": True, "message": "Consulta exitosa.",
+        "data": {"codigo_estado": "06", "nombre_estado": "Colima"},
+    }
+    (status, body), _ = asyncio.run(service.handle("GET", "/api/v2/postal/search?q=Centro&limit=1&offset=1"))
+    assert [record["codigo_postal"] for record in json.loads(body)["data"]] == ["20010"]
+
+
+def test_state_route_aliases_share_cache_entry(backend):
+    service = ApiService(backend, ResponseCache())
+
+    async def run():
+        return [
+            await service.handle("GET", "/api/v2/postal/estado/09?limit=3&offset=1"),
+            await service.handle("GET", "/api/v2/estado/09/asentamientos/?offset=1&limit=3"),
+        ]
+
+    first, second = asyncio.run(run())
+    assert (first[1], second[1]) == ("MISS", "HIT")
+    assert first[0] == second[0] and first[0][0] == 200
+    assert len(backend.calls) == 1 and len(service.cache) == 1
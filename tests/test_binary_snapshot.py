@@ -0,0 +1,57 @@
+"""
+Instantánea binaria: la consulta mapeada desde disco responde igual que la `PostalLookup` original.
+"""
+
+import pytest
+
+from src.binary_snapshot import (
+    BINARY_SNAPSHOT_VERSION,
+    MAGIC,
+    _PREFIX,
+    open_binary_snapshot,
+    write_binary_snapshot,
+)
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(edge_lookup, tmp_path_factory):
+    path = tmp_path_factory.mktemp("binaria") / "lookup.bin"
+    assert write_binary_snapshot(edge_lookup, path)
+    return path
+
+
+def test_reopened_snapshot_matches_lookup(edge_lookup, snapshot_path, lookup_calls):
+    mapped = open_binary_snapshot(snapshot_path)
+    assert mapped is not None
+    assert len(mapped) == len(edge_lookup)
+    assert mapped.catalogs() == edge_lookup.catalogs()
+    for method, args in lookup_calls:
+        assert getattr(mapped, method)(*args) == getattr(edge_lookup, method)(*args), (method, args)
+
+
+def test_rewrite_from_mapped_snapshot(snapshot_path, tmp_path):
+    copy = tmp_path / "copia.bin"
+    assert write_binary_snapshot(open_binary_snapshot(snapshot_path), copy)
+    assert copy.read_bytes() == snapshot_path.read_bytes()
+    assert not copy.with_name(copy.name + ".tmp").exists()
+
+
+def test_invalid_files_return_none(snapshot_path, tmp_path):
+    content = snapshot_path.read_bytes()
+    header_length = _PREFIX.unpack_from(content)[2]
+
+    bad_magic = tmp_path / "firma.bin"
+    bad_magic.write_bytes(b"XXXXXXXX" + content[len(MAGIC):])
+    assert open_binary_snapshot(bad_magic) is None
+
+    bad_version = tmp_path / "version.bin"
+    bad_version.write_bytes(
+        _PREFIX.pack(MAGIC, BINARY_SNAPSHOT_VERSION + 1, header_length) + content[_PREFIX.size:]
+    )
+    assert open_binary_snapshot(bad_version) is None
+
+    short = tmp_path / "corto.bin"
+    short.write_bytes(content[:4])
+    assert open_binary_snapshot(short) is None
+
+    assert open_binary_snapshot(tmp_path / "no_existe.bin") is None
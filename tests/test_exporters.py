@@ -0,0 +1,47 @@
+"""
+Exportación a Parquet: conjunto particionado por estado que se lee de vuelta con pyarrow.dataset.
+"""
+
+import sys
+
+import pytest
+
+from src.exporters import PARQUET_PARTITION, VIEW_COLUMNS, denormalized_frame, write_parquet
+
+
+def test_parquet_round_trip(edge_tables, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    ds = pytest.importorskip("pyarrow.dataset")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    df = denormalized_frame(edge_tables)
+    directory = tmp_path / "parquet"
+    assert write_parquet(df, directory) == len(df) == 12
+    assert sorted(path.name for path in directory.iterdir()) == [
+        f"{PARQUET_PARTITION}=01", f"{PARQUET_PARTITION}=06", f"{PARQUET_PARTITION}=09",
+    ]
+    assert not directory.with_name(directory.name + ".tmp").exists()
+
+    partitioning = ds.partitioning(pa.schema([(PARQUET_PARTITION, pa.string())]), flavor="hive")
+    table = ds.dataset(directory, format="parquet", partitioning=partitioning).to_table()
+    assert table.num_rows == len(df)
+    assert table.column_names == VIEW_COLUMNS + [PARQUET_PARTITION]
+    assert table.column("codigo_estado").to_pylist() == table.column(PARQUET_PARTITION).to_pylist()
+
+    # Cada archivo suelto conserva codigo_estado
+    for partition_dir in directory.iterdir():
+        estado = partition_dir.name.split("=")[1]
+        part = pq.ParquetFile(partition_dir / "part-0.parquet").read()
+        assert part.column_names == VIEW_COLUMNS
+        assert set(part.column("codigo_estado").to_pylist()) == {estado}
+        assert part.num_rows == (df["codigo_estado"] == estado).sum()
+
+    # Reescribir reemplaza el conjunto anterior
+    assert write_parquet(df[df["codigo_estado"] == "06"], directory) == 2
+    assert [path.name for path in directory.iterdir()] == [f"{PARQUET_PARTITION}=06"]
+
+
+def test_parquet_without_pyarrow(edge_tables, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    assert write_parquet(denormalized_frame(edge_tables), tmp_path / "parquet") == 0
+    assert not (tmp_path / "parquet").exists()
@@ -0,0 +1,84 @@
+"""
+`InsertWriter`: un error a mitad de una parte no deja archivos incompletos ni abiertos.
+"""
+
+import pytest
+
+from src import sql_generator
+from src.data_normalizer import normalize_dataframe
+from src.data_validator import validate_dataframe
+from src.sql_generator import InsertWriter, reset_sql_manifest
+
+
+class _Boom(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _fresh_manifest():
+    reset_sql_manifest()
+    yield
+    reset_sql_manifest()
+
+
+def _rows(count: int) -> list:
+    return [f"({n}, 'x')" for n in range(count)]
+
+
+def test_error_removes_incomplete_part(tmp_path):
+    filepath = tmp_path / "001_insert_t.sql"
+    with pytest.raises(_Boom):
+        with InsertWriter(filepath, "t", ["a", "b"], rows_per_insert=2, rows_per_file=3) as writer:
+            writer.write(_rows(4))
+            open_file = writer._file
+            raise _Boom()
+
+    assert open_file.closed
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["001_insert_t_part0001.sql"]
+    assert (tmp_path / "001_insert_t_part0001.sql").read_text(encoding="utf-8").endswith("COMMIT;\n")
+    assert [part["file"] for part in sql_generator._MANIFEST["t"]] == ["001_insert_t_part0001.sql"]
+    assert writer.parts == sql_generator._MANIFEST["t"] and writer.total_rows == 3
+
+
+def test_error_in_single_file_leaves_nothing(tmp_path):
+    filepath = tmp_path / "001_insert_t.sql"
+    with pytest.raises(_Boom):
+        with InsertWriter(filepath, "t", ["a", "b"], rows_per_insert=0, rows_per_file=0) as writer:
+            writer.write(_rows(5))
+            raise _Boom()
+
+    assert list(tmp_path.iterdir()) == []
+    assert "t" not in sql_generator._MANIFEST
+    assert writer._file is None
+
+
+def test_normal_exit_closes_open_part(tmp_path):
+    filepath = tmp_path / "001_insert_t.sql"
+    with InsertWriter(filepath, "t", ["a", "b"], rows_per_insert=0, rows_per_file=0) as writer:
+        writer.write(_rows(2))
+
+    assert writer._file is None
+    assert filepath.read_text(encoding="utf-8") == (
+        "BEGIN;\nINSERT INTO t (a, b) VALUES\n(0, 'x'),\n(1, 'x');\nCOMMIT;\n"
+    )
+
+
+def test_aborted_generation_counts_completed_parts(edge_frame, tmp_path, monkeypatch):
+    df = normalize_dataframe(validate_dataframe(edge_frame, rejects_path=None))
+    monkeypatch.setattr(sql_generator, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(sql_generator, "BATCH_SIZE_CODIGOS_POSTALES", 5)
+    recorded = []
+
+    def record_then_fail(metrics):
+        recorded.append(metrics)
+        if len(recorded) == 2:
+            raise _Boom()
+
+    monkeypatch.setattr(sql_generator, "record_batch", record_then_fail)
+    inserted, errors = sql_generator.generate_codigos_postales_sql(df, 1, rows_per_insert=2, rows_per_file=3)
+
+    # El primer lote (5 filas) llenó una parte de 3 y dejó abierta otra con 2, que se eliminó
+    assert inserted == 3
+    assert inserted + errors == len(df)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["006_insert_codigos_postales_part0001.sql"]
+    assert sum(part["rows"] for part in sql_generator._MANIFEST["codigos_postales"]) == inserted
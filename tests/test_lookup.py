@@ -0,0 +1,112 @@
+"""
+`PostalLookup` sobre las filas de borde: mismas respuestas, orden y validación que database/functions.sql.
+"""
+
+import pytest
+
+from src.lookup import PostalLookup, ilike_regex
+from src.models import CityRecord, MunicipalityRecord, StateRecord
+
+
+def _codes(records) -> list:
+    return [record.codigo_postal for record in records]
+
+
+def test_search_by_postal_code(edge_lookup):
+    [record] = edge_lookup.search_by_postal_code("01000")
+    assert (record.nombre_asentamiento, record.tipo_asentamiento, record.zona) == ("San Ángel", "Colonia", "Urbano")
+    assert (record.codigo_estado, record.pk_codigo_municipio, record.pk_codigo_ciudad) == ("09", "010", "01")
+    assert (record.nombre_municipio, record.nombre_ciudad) == ("Álvaro Obregón", "Ciudad de México")
+    assert edge_lookup.search_by_postal_code("99999") == []
+
+
+def test_pages_by_state_municipality_and_city(edge_lookup):
+    state = _codes(edge_lookup.get_postal_codes_by_state("09", 100, 0))
+    assert state == ["01000", "01010", "01020", "01030", "01040", "01050"]
+    assert _codes(edge_lookup.get_postal_codes_by_state("09", 2, 3)) == state[3:5]
+    assert edge_lookup.get_postal_codes_by_state("09", 10, 6) == []
+
+    assert _codes(edge_lookup.get_postal_codes_by_municipality("01", "001", 100, 0)) == ["20000", "20010", "20110"]
+    assert _codes(edge_lookup.get_postal_codes_by_municipality("01", "001", 1, 1)) == ["20010"]
+    assert edge_lookup.get_postal_codes_by_municipality("06", "010", 10, 0) == []
+
+    assert _codes(edge_lookup.get_postal_codes_by_city("09", "01", 100, 0)) == ["01000", "01010", "01030", "01040"]
+    assert _codes(edge_lookup.get_postal_codes_by_city("09", "01", 2, 2)) == ["01030", "01040"]
+    by_name = edge_lookup.get_settlements_by_city("09", "01", 100, 0)
+    assert [record.nombre_asentamiento for record in by_name] == ["C:/Ruta/Norte", "Control C1", "Los Alpes", "San Ángel"]
+    assert edge_lookup.get_settlements_by_city("09", "01", 1, 3) == by_name[3:]
+
+
+def test_left_join_nulls(edge_lookup, edge_tables):
+    [without_city] = edge_lookup.search_by_postal_code("01020")
+    assert without_city.pk_codigo_municipio == "010"
+    assert (without_city.pk_codigo_ciudad, without_city.nombre_ciudad) == (None, None)
+
+    [without_both] = edge_lookup.search_by_postal_code("01050")
+    assert (without_both.pk_codigo_municipio, without_both.nombre_municipio) == (None, None)
+    assert (without_both.pk_codigo_ciudad, without_both.nombre_ciudad) == (None, None)
+
+    # Una ciudad que no está en el catálogo también queda en NULL
+    tables = dict(edge_tables)
+    ciudades = tables["ciudades"]
+    tables["ciudades"] = ciudades[~((ciudades["fk_codigo_estado"] == "06") & (ciudades["pk_codigo_ciudad"] == "01"))]
+    lookup = PostalLookup(tables)
+    [centro] = lookup.search_by_postal_code("28000")
+    assert (centro.pk_codigo_municipio, centro.pk_codigo_ciudad, centro.nombre_ciudad) == ("002", None, None)
+    assert lookup.get_postal_codes_by_city("06", "01", 10, 0) == []
+    assert lookup.get_city_by_id("06", "01") == []
+
+
+def test_catalogs(edge_lookup):
+    assert [state.codigo_estado for state in edge_lookup.get_all_states()] == ["01", "09", "06"]
+    assert edge_lookup.get_state_by_id("06") == [StateRecord("06", "Colima")]
+    assert edge_lookup.get_state_by_id("32") == []
+    assert edge_lookup.get_municipalities_by_state("06") == [MunicipalityRecord("002", "Colima", "06")]
+    assert [city.codigo_ciudad for city in edge_lookup.get_cities_by_state("01")] == ["01", "02"]
+    assert edge_lookup.get_city_by_id("09", "01") == [CityRecord("01", "Ciudad de México", "09")]
+
+
+@pytest.mark.parametrize("query, name, expected", [
+    ("ángel", "San Ángel", True),
+    ("SAN", "San Ángel", True),
+    ("San%gel", "San Ángel", True),
+    ("Ruta_Norte", "C:/Ruta/Norte", True),
+    ("Ruta_Sur", "C:/Ruta/Norte", False),
+    (r"\_", "a_b", True),
+    (r"\_", "ab", False),
+    (r"\%", "100%", True),
+    (r"\%", "100", False),
+    ("a.c", "abc", False),
+    (r"\\", "C:\\Ruta", True),
+    ("Centro\\", "Centro%", True),
+    ("Centro\\", "Zona Centro% x", False),
+    ("Centro\\", "Centro", False),
+    ("", "cualquiera", True),
+])
+def test_ilike_regex(query, name, expected):
+    assert bool(ilike_regex(query).search(name)) is expected
+
+
+def test_search_settlements_by_name(edge_lookup):
+    assert [record.nombre_asentamiento for record in edge_lookup.search_settlements_by_name("centro", 10, 0)] == [
+        "Centro", "Zona Centro",
+    ]
+    assert _codes(edge_lookup.search_settlements_by_name("Centro", 1, 1)) == ["20010"]
+    assert _codes(edge_lookup.search_settlements_by_name("O_Higgins", 10, 0)) == ["20000", "01020"]
+    assert edge_lookup.search_settlements_by_name("Centro\\", 10, 0) == []
+
+
+@pytest.mark.parametrize("call, message", [
+    (lambda lookup: lookup.search_by_postal_code("1000"), "El código postal debe ser de 5 dígitos"),
+    (lambda lookup: lookup.search_by_postal_code("01000\n"), "El código postal debe ser de 5 dígitos"),
+    (lambda lookup: lookup.get_state_by_id("9"), "El código de estado debe ser de 2 dígitos"),
+    (lambda lookup: lookup.get_postal_codes_by_state("09\n", 10, 0), "El código de estado debe ser de 2 dígitos"),
+    (lambda lookup: lookup.get_postal_codes_by_municipality("09", "10", 10, 0), "El código de municipio debe ser de 3 dígitos"),
+    (lambda lookup: lookup.get_postal_codes_by_city("09", "1", 10, 0), "El código de ciudad debe ser de 2 dígitos"),
+    (lambda lookup: lookup.get_postal_codes_by_state("09", 0, 0), "El límite debe estar entre 1 y 100"),
+    (lambda lookup: lookup.search_settlements_by_name("a", 101, 0), "El límite debe estar entre 1 y 100"),
+    (lambda lookup: lookup.get_settlements_by_city("09", "01", 10, -1), "El offset debe ser mayor o igual a 0"),
+])
+def test_invalid_arguments(edge_lookup, call, message):
+    with pytest.raises(ValueError, match=message):
+        call(edge_lookup)
@@ -0,0 +1,118 @@
+"""
+`NameSearchIndex`: el índice de n-gramas devuelve lo mismo que recorrer todos los nombres plegados.
+"""
+
+import pandas as pd
+import pytest
+
+from src.lookup import PostalLookup, ilike_regex
+from src.name_search import (
+    RANK_EXACT,
+    RANK_PREFIX,
+    RANK_SIMILAR,
+    RANK_SUBSTRING,
+    RANK_WORD,
+    NameSearchIndex,
+    fold,
+)
+
+# Asentamientos añadidos a las filas de borde (estado 09, municipio 010, ciudad 01)
+EXTRA_NAMES = [
+    "Álvaro Obregón", "Obregón", "Obregón Norte", "Ciudad Obregón", "Ampliación Obregón Sur",
+    "Obregon", "100% Mexicano", "Lote_5", "Lote 5", "C:\\Ruta", "Ñuñoa", "Nunoa",
+]
+
+QUERIES = [
+    "alvaro obregon", "ÁLVARO OBREGÓN", "obregón", "obregon", " obregon", "obregon ", "obregon  norte",
+    "Obr%Sur", "ob_egon", "100\\%", "100%", "lote\\_5", "lote_5", "c:\\\\ruta", "ruta\\",
+    "ñuñoa", "NUNOA", "o", "ob", "%", "_", "", "xyz", "centro", "Ángel",
+]
+
+
+@pytest.fixture(scope="module")
+def index(edge_tables) -> NameSearchIndex:
+    tables = dict(edge_tables)
+    extra = pd.DataFrame({
+        "codigo_postal": [f"{1100 + i:05d}" for i in range(len(EXTRA_NAMES))],
+        "nombre_asentamiento": [name.replace("'", "''") for name in EXTRA_NAMES],
+        "fk_codigo_estado": "09",
+        "fk_codigo_municipio": "010",
+        "fk_codigo_ciudad": "01",
+        "fk_codigo_tipo_asentamiento": "09",
+        "fk_id_zona": "1",
+    })
+    tables["codigos_postales"] = pd.concat([edge_tables["codigos_postales"], extra], ignore_index=True)
+    return NameSearchIndex(PostalLookup(tables))
+
+
+def _linear_names(index: NameSearchIndex, query: str) -> list:
+    """Referencia: recorre todos los nombres plegados con el patrón de ILIKE."""
+    pattern = ilike_regex(fold(query))
+    return [name_id for name_id, name in enumerate(index.folded) if pattern.search(name)]
+
+
+def _names(index: NameSearchIndex, records) -> list:
+    return [record.nombre_asentamiento for record in records]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_matches_linear_scan(index, query):
+    assert list(index.match_names(query)) == _linear_names(index, query)
+    expected = index.lookup.records_for_names(_linear_names(index, query), 100, 0)
+    assert index.search(query, 100, 0) == expected
+    assert index.search(query, 3, 2) == expected[2:5]
+
+
+def test_folded_matches(index):
+    assert _names(index, index.search("alvaro obregon", 10, 0)) == ["Álvaro Obregón"]
+    assert _names(index, index.search("nunoa", 10, 0)) == ["Nunoa", "Ñuñoa"]
+    assert _names(index, index.search("100\\%", 10, 0)) == ["100% Mexicano"]
+    assert _names(index, index.search("lote\\_5", 10, 0)) == ["Lote_5"]
+    assert _names(index, index.search("lote_5", 10, 0)) == ["Lote 5", "Lote_5"]
+    assert _names(index, index.search("c:\\\\ruta", 10, 0)) == ["C:\\Ruta"]
+
+
+def test_query_spaces_are_kept(index):
+    # Como ILIKE '% obregon%': el espacio inicial no coincide al principio del nombre
+    assert set(_names(index, index.search(" obregon", 100, 0))) == {
+        "Álvaro Obregón", "Ciudad Obregón", "Ampliación Obregón Sur",
+    }
+    assert _names(index, index.search("obregon ", 100, 0)) == ["Ampliación Obregón Sur", "Obregón Norte"]
+    assert index.search("obregon  norte", 10, 0) == []
+
+
+def test_short_queries_scan_all_names(index):
+    assert index._candidates(set()) is None
+    assert len(list(index.match_names(""))) == len(index.folded)
+    assert list(index.match_names("ob")) == _linear_names(index, "ob")
+    assert len(list(index.match_names("ob"))) >= 6
+
+
+def test_search_ranked_tiers(index):
+    ranked = index.rank_names("obregon")
+    tiers = {}
+    for rank, _, name_id in ranked:
+        tiers.setdefault(rank, set()).add(index.lookup.names[name_id])
+    assert tiers[RANK_EXACT] == {"Obregón", "Obregon"}
+    assert tiers[RANK_PREFIX] == {"Obregón Norte"}
+    assert tiers[RANK_WORD] == {"Álvaro Obregón", "Ciudad Obregón", "Ampliación Obregón Sur"}
+    assert RANK_SUBSTRING not in tiers
+    assert [rank for rank, _, _ in ranked] == sorted(rank for rank, _, _ in ranked)
+
+    assert {index.lookup.names[name_id] for rank, _, name_id in index.rank_names("gon") if rank == RANK_SUBSTRING} >= {
+        "Obregón", "Álvaro Obregón",
+    }
+    similar = [index.lookup.names[name_id] for rank, _, name_id in index.rank_names("obregin") if rank == RANK_SIMILAR]
+    assert "Obregón" in similar
+
+    records = index.search_ranked("obregon", 100, 0)
+    assert [record.nombre_asentamiento for record in records[:2]] == ["Obregon", "Obregón"]
+    assert index.search_ranked("obregon", 2, 2) == records[2:4]
+    assert index.rank_names("  ") == []
+
+
+def test_invalid_page(index):
+    with pytest.raises(ValueError, match="El límite debe estar entre 1 y 100"):
+        index.search("obregon", 0, 0)
+    with pytest.raises(ValueError, match="El offset debe ser mayor o igual a 0"):
+        index.search_ranked("obregon", 10, -1)
@@ -0,0 +1,176 @@
+"""
+Equivalencia entre la normalización vectorizada y el procesamiento fila a fila.
+
+`normalize_dataframe` más los generadores de SQL deben producir exactamente
+los mismos archivos que el recorrido fila a fila original con `clean_text`,
+`format_codigo` y `normalize_zona`, que aquí se reproduce como referencia.
+"""
+
+import re
+
+import pandas as pd
+import pytest
+
+from src import sql_generator
+from src.catalogs import extract_catalogs
+from src.config import (
+    DEFAULT_ZONA_ID,
+    MAX_LEN_NOMBRE_ASENTAMIENTO,
+    REGEX_CODIGO_CIUDAD,
+    REGEX_CODIGO_ESTADO,
+    REGEX_CODIGO_MUNICIPIO,
+    REGEX_CODIGO_POSTAL,
+    REGEX_CODIGO_TIPO_ASENTA,
+    ZONAS_MAP,
+)
+from src.data_normalizer import normalize_dataframe
+from src.diagnostics import reset_diagnostics
+from src.utils import clean_text, format_codigo, normalize_zona, reset_memo_caches
+
+
+def _matches(value, pattern: str) -> bool:
+    """Como el `validate_regex` original: los nulos y vacíos cumplen."""
+    if value is None or str(value).strip() == "":
+        return True
+    return re.match(pattern, str(value).strip()) is not None
+
+
+def _sql_file(table: str, columns, values, entity: str) -> str:
+    """Archivo en el formato original: un único INSERT entre BEGIN y COMMIT."""
+    if not values:
+        return f"BEGIN;\n-- No se encontraron {entity} válidos\nCOMMIT;\n"
+    return f"BEGIN;\nINSERT INTO {table} ({', '.join(columns)}) VALUES\n" + ",\n".join(values) + ";\nCOMMIT;\n"
+
+
+def _row_by_row_files(df: pd.DataFrame) -> dict:
+    """Archivos que genera el recorrido fila a fila original, por nombre de archivo."""
+    estados, seen_estados = [], set()
+    for _, row in df.iterrows():
+        codigo = format_codigo(row["c_estado"], 2)
+        if codigo and codigo not in seen_estados and _matches(codigo, REGEX_CODIGO_ESTADO):
+            nombre = clean_text(row["d_estado"])
+            if nombre:
+                estados.append(f"('{codigo}', '{nombre}')")
+                seen_estados.add(codigo)
+
+    municipios, seen_municipios = [], set()
+    for _, row in df.iterrows():
+        pk = (format_codigo(row["c_mnpio"], 3), format_codigo(row["c_estado"], 2))
+        if (
+            all(pk) and pk not in seen_municipios
+            and _matches(pk[0], REGEX_CODIGO_MUNICIPIO) and _matches(pk[1], REGEX_CODIGO_ESTADO)
+        ):
+            nombre = clean_text(row["D_mnpio"])
+            if nombre:
+                municipios.append(f"('{pk[0]}', '{pk[1]}', '{nombre}')")
+                seen_municipios.add(pk)
+
+    tipos, seen_tipos = [], set()
+    for _, row in df.sort_values(by="d_tipo_asenta", na_position="last").iterrows():
+        codigo = format_codigo(row["c_tipo_asenta"], 2)
+        if codigo and codigo not in seen_tipos and _matches(codigo, REGEX_CODIGO_TIPO_ASENTA):
+            nombre = clean_text(row["d_tipo_asenta"])
+            if nombre:
+                tipos.append(f"('{codigo}', '{nombre}')")
+                seen_tipos.add(codigo)
+
+    zonas = [f"({pk_id}, '{clean_text(nombre)}')" for nombre, pk_id in ZONAS_MAP.items()]
+
+    ciudades, seen_ciudades = [], set()
+    for _, row in df.dropna(subset=["c_cve_ciudad", "c_estado", "d_ciudad"]).iterrows():
+        pk = (format_codigo(row["c_cve_ciudad"], 2), format_codigo(row["c_estado"], 2))
+        if (
+            all(pk) and pk not in seen_ciudades
+            and _matches(pk[0], REGEX_CODIGO_CIUDAD) and _matches(pk[1], REGEX_CODIGO_ESTADO)
+        ):
+            nombre = clean_text(row["d_ciudad"])
+            if nombre:
+                ciudades.append(f"('{pk[0]}', '{pk[1]}', '{nombre}')")
+                seen_ciudades.add(pk)
+
+    codigos = []
+    for _, row in df.iterrows():
+        codigo_postal = format_codigo(row["d_codigo"], 5)
+        fk_estado = format_codigo(row["c_estado"], 2)
+        fk_tipo = format_codigo(row["c_tipo_asenta"], 2)
+        nombre = clean_text(row["d_asenta"], MAX_LEN_NOMBRE_ASENTAMIENTO)
+        fk_zona = ZONAS_MAP.get(normalize_zona(row["d_zona"]), DEFAULT_ZONA_ID)
+        if not (
+            _matches(codigo_postal, REGEX_CODIGO_POSTAL) and nombre
+            and _matches(fk_estado, REGEX_CODIGO_ESTADO) and _matches(fk_tipo, REGEX_CODIGO_TIPO_ASENTA)
+        ):
+            continue
+        municipio = format_codigo(row["c_mnpio"], 3)
+        municipio = f"'{municipio}'" if municipio and _matches(municipio, REGEX_CODIGO_MUNICIPIO) else "NULL"
+        ciudad = format_codigo(row["c_cve_ciudad"], 2)
+        ciudad = f"'{ciudad}'" if ciudad and _matches(ciudad, REGEX_CODIGO_CIUDAD) else "NULL"
+        codigos.append(f"('{codigo_postal}', '{nombre}', '{fk_estado}', {municipio}, {ciudad}, '{fk_tipo}', {fk_zona})")
+
+    return {
+        "001_insert_estados.sql": _sql_file("estados", ["pk_codigo_estado", "nombre_estado"], estados, "estados"),
+        "002_insert_municipios.sql": _sql_file(
+            "municipios", ["pk_codigo_municipio", "fk_codigo_estado", "nombre_municipio"], municipios, "municipios"
+        ),
+        "003_insert_tipos_asentamiento.sql": _sql_file(
+            "tipos_asentamiento", ["pk_codigo_tipo_asentamiento", "nombre_tipo_asentamiento"], tipos,
+            "tipos de asentamiento",
+        ),
+        "004_insert_zonas.sql": _sql_file("zonas", ["pk_id_zona", "nombre_zona"], zonas, "zonas"),
+        "005_insert_ciudades.sql": _sql_file(
+            "ciudades", ["pk_codigo_ciudad", "fk_codigo_estado", "nombre_ciudad"], ciudades, "ciudades"
+        ),
+        "006_insert_codigos_postales.sql": _sql_file(
+            "codigos_postales", sql_generator.CP_TABLE_COLUMNS, codigos, "códigos postales"
+        ),
+    }
+
+
+def _vectorized_files(df: pd.DataFrame, output_dir) -> dict:
+    """Archivos que generan `normalize_dataframe`, `extract_catalogs` y los generadores actuales."""
+    df_norm = normalize_dataframe(df)
+    catalogs = extract_catalogs(df_norm)
+    sql_generator.reset_sql_manifest()
+    sql_generator.generate_codigos_postales_sql(df_norm, 1, 0, 0)
+    sql_generator.generate_estados_sql(catalogs.estados, 0, 0)
+    sql_generator.generate_municipios_sql(catalogs.municipios, 0, 0)
+    sql_generator.generate_tipos_asentamiento_sql(catalogs.tipos_asentamiento, 0, 0)
+    sql_generator.generate_zonas_sql(0, 0)
+    sql_generator.generate_ciudades_sql(catalogs.ciudades, 0, 0)
+    return {path.name: path.read_text(encoding="utf-8") for path in sorted(output_dir.glob("*.sql"))}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_run():
+    """Cachés de memoización y diagnóstico limpios, como al inicio de cada ejecución."""
+    reset_memo_caches()
+    reset_diagnostics()
+    yield
+    reset_memo_caches()
+
+
+@pytest.mark.parametrize("batch_size", [10000, 4])
+def test_sql_files_match_row_by_row_path(tmp_path, monkeypatch, batch_size, edge_frame):
+    df = edge_frame
+    expected = _row_by_row_files(df)
+    # Sin resultados memorizados por la referencia: cada camino calcula los suyos
+    reset_memo_caches()
+    monkeypatch.setattr(sql_generator, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(sql_generator, "BATCH_SIZE_CODIGOS_POSTALES", batch_size)
+
+    assert _vectorized_files(df, tmp_path) == expected
+
+
+def test_fixture_covers_edge_cases(edge_frame):
+    """La referencia ejerce cada caso: filas descartadas, NULL opcionales, zona por defecto y truncado."""
+    files = _row_by_row_files(edge_frame)
+    codigos = files["006_insert_codigos_postales.sql"]
+
+    assert "'2002A'" not in codigos and "'20020'" not in codigos  # Código inválido y nombre vacío
+    assert "'O''Higgins \"\"El Viejo\"\"', '09', '010', NULL" in codigos
+    assert "'C:/Ruta/Norte'" in codigos
+    assert "'Control C1'" in codigos and "'Línea nueva'" in codigos
+    assert "'Línea nueva', '09', NULL, NULL, '28', 3)" in codigos  # Zona fuera del catálogo
+    assert "'01', '001', '02', '21', 3)" in codigos  # Zona nula
+    assert "'20050', 'Municipio inválido', '01', NULL, NULL" in codigos
+    long_row = next(line for line in codigos.splitlines() if line.startswith("('20000'"))
+    assert len(long_row.split("', '")[1]) == MAX_LEN_NOMBRE_ASENTAMIENTO
@@ -0,0 +1,94 @@
+"""
+Carga orquestada: división de los scripts y carga contra PostgreSQL (requiere `SEPOMEX_DATABASE_URL`).
+"""
+
+import json
+import shutil
+
+from src.config import DATABASE_DIR, SQL_MANIFEST_FILENAME
+from src.db_loader import LOAD_ORDER, MATERIALIZED_VIEW
+from src.parallel_loader import (
+    LOAD_METRICS_FILENAME,
+    _index_target,
+    main as parallel_loader_main,
+    orchestrate_load,
+    split_sql_statements,
+)
+
+
+def test_split_sql_statements_drops_comments():
+    script = """
+/**
+ * @index idx_a
+ * @description Un comentario con ; y ON otra_tabla dentro.
+ */
+CREATE INDEX idx_a
+ON codigos_postales (codigo_postal); -- comentario de línea; con punto y coma
+-- CREATE INDEX comentado ON tabla (x);
+CREATE UNIQUE INDEX idx_b ON vm_codigos_postales (id_codigo_postal);
+
+"""
+    assert split_sql_statements(script) == [
+        "CREATE INDEX idx_a\nON codigos_postales (codigo_postal)",
+        "CREATE UNIQUE INDEX idx_b ON vm_codigos_postales (id_codigo_postal)",
+    ]
+    assert split_sql_statements("/* solo comentarios; */\n-- nada;\n") == []
+
+
+def test_index_target():
+    assert _index_target("CREATE INDEX idx_x\nON codigos_postales (codigo_postal)") == "codigos_postales"
+    assert _index_target(
+        "CREATE INDEX IF NOT EXISTS idx_y on vm_codigos_postales USING gin (nombre_asentamiento)"
+    ) == MATERIALIZED_VIEW
+    assert _index_target(
+        "CREATE INDEX idx_vm_codigos_postales_ciudad ON vm_codigos_postales (codigo_ciudad) "
+        "WHERE (codigo_ciudad IS NOT NULL)"
+    ) == MATERIALIZED_VIEW
+    assert _index_target("ANALYZE") is None
+
+
+def test_indexes_sql_splits_between_tables_and_view():
+    statements = split_sql_statements((DATABASE_DIR / "indexes.sql").read_text(encoding="utf-8"))
+    targets = [_index_target(statement) for statement in statements]
+
+    assert len(statements) == (DATABASE_DIR / "indexes.sql").read_text(encoding="utf-8").count("CREATE ")
+    assert MATERIALIZED_VIEW in targets
+    assert set(targets) - {MATERIALIZED_VIEW} <= set(LOAD_ORDER)
+
+
+def test_orchestrated_load(pg_dsn, edge_sql_output, tmp_path):
+    manifest = json.loads((edge_sql_output / SQL_MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    expected = {entry["table"]: entry["rows"] for entry in manifest["tables"]}
+    cp_parts = next(entry["files"] for entry in manifest["tables"] if entry["table"] == "codigos_postales")
+    assert len(cp_parts) > 1
+
+    # Una parte dañada detiene la carga
+    corrupted = tmp_path / "dañada"
+    shutil.copytree(edge_sql_output, corrupted)
+    part = corrupted / cp_parts[-1]["file"]
+    part.write_text(part.read_text(encoding="utf-8").replace("VALUES", "VALORES", 1), encoding="utf-8")
+    assert orchestrate_load(pg_dsn, corrupted, workers=2, recreate=True) is None
+
+    # Un manifiesto que no coincide con lo cargado no se concilia
+    mismatched = tmp_path / "conteo"
+    shutil.copytree(edge_sql_output, mismatched)
+    wrong = json.loads((mismatched / SQL_MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    wrong["tables"][0]["rows"] += 1
+    (mismatched / SQL_MANIFEST_FILENAME).write_text(json.dumps(wrong), encoding="utf-8")
+    assert orchestrate_load(pg_dsn, mismatched, workers=2, recreate=True) is None
+
+    # Carga completa (deja la base como la espera `loaded_pg_dsn`)
+    counts = orchestrate_load(pg_dsn, edge_sql_output, workers=2, recreate=True)
+    assert counts == {table: expected[table] for table in LOAD_ORDER}
+
+    metrics_dir = tmp_path / "métricas"
+    shutil.copytree(edge_sql_output, metrics_dir)
+    assert parallel_loader_main(["--dsn", pg_dsn, "--sql-dir", str(metrics_dir), "--workers", "2", "--recreate"]) == 0
+    metrics = json.loads((metrics_dir / LOAD_METRICS_FILENAME).read_text(encoding="utf-8"))
+    stages = {stage["name"]: stage for stage in metrics["stages"]}
+    assert list(stages) == [
+        "create_tables", "load_catalogs", "load_codigos_postales", "create_indexes",
+        "create_view", "create_view_indexes", "create_functions", "analyze",
+    ]
+    assert stages["load_codigos_postales"]["rows_out"] == expected["codigos_postales"]
+    assert stages["create_view"]["rows_out"] == expected["codigos_postales"]
@@ -0,0 +1,96 @@
+"""
+`SepomexClient` y `ConnectionPool` contra PostgreSQL (requiere `SEPOMEX_DATABASE_URL`).
+"""
+
+from dataclasses import astuple
+
+import pytest
+
+from src.db_loader import write_dataset_version
+from src.models import KeysetPostalCodeRecord, PostalCodeRecord, StateRecord
+from src.pg_client import ConnectionPool, SepomexClient
+
+
+@pytest.fixture
+def client(loaded_pg_dsn):
+    with SepomexClient(loaded_pg_dsn, pool_size=2, cache_size=100, version_check_seconds=0) as client:
+        yield client
+
+
+def _bump_version(dsn: str) -> str:
+    import psycopg
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        return write_dataset_version(conn.cursor())
+
+
+def test_pool_times_out_and_reuses_released_connection(loaded_pg_dsn):
+    pool = ConnectionPool(loaded_pg_dsn, max_size=1, timeout=0.1)
+    try:
+        with pool.connection() as first:
+            with pytest.raises(TimeoutError):
+                with pool.connection():
+                    pass
+        with pool.connection() as second:
+            assert second is first
+            second.close()  # Rota: se descarta al devolverla
+        with pool.connection() as third:
+            assert third is not first and not third.closed
+    finally:
+        pool.close()
+
+
+def test_raise_exception_becomes_value_error(client):
+    with pytest.raises(ValueError, match="El código de estado debe ser de 2 dígitos"):
+        client.get_postal_codes_by_state("9", 10, 0)
+    with pytest.raises(ValueError, match="El límite debe estar entre 1 y 100"):
+        client.search_settlements_by_name("a", 0, 0)
+    with pytest.raises(ValueError, match="El cursor debe incluir"):
+        client.get_postal_codes_by_state_keyset("09", 10, "01000", None, 1)
+
+
+def test_typed_records(client):
+    states = client.get_all_states()
+    assert states and all(isinstance(state, StateRecord) for state in states)
+    assert client.get_state_by_id("06") == [StateRecord("06", "Colima")]
+
+    records = client.search_by_postal_code("01020")
+    assert records and all(isinstance(record, PostalCodeRecord) for record in records)
+    assert records[0].pk_codigo_ciudad is None and records[0].nombre_ciudad is None  # LEFT JOIN
+
+
+def test_keyset_walk_matches_offset_pages(client):
+    pages, after = [], (None, None, None)
+    while True:
+        page = client.get_postal_codes_by_state_keyset("09", 4, *after)
+        assert all(isinstance(record, KeysetPostalCodeRecord) for record in page)
+        pages.extend(page)
+        if len(page) < 4:
+            break
+        after = (page[-1].codigo_postal, page[-1].nombre_asentamiento, page[-1].id_codigo_postal)
+
+    by_offset = client.get_postal_codes_by_state("09", 100, 0)
+    assert len(pages) == len(by_offset) > 4
+    assert [astuple(record)[:10] for record in pages] == [astuple(record) for record in by_offset]
+    assert len({record.id_codigo_postal for record in pages}) == len(pages)
+
+
+def test_cache_invalidated_by_new_dataset_version(client, loaded_pg_dsn):
+    import psycopg
+
+    assert client.get_state_by_id("06") == [StateRecord("06", "Colima")]
+    assert client.get_state_by_id("06") == [StateRecord("06", "Colima")]
+    assert client.cache_stats()["hits"] == 1
+
+    with psycopg.connect(loaded_pg_dsn, autocommit=True) as conn:
+        conn.execute("UPDATE estados SET nombre_estado = 'Colima (nuevo)' WHERE pk_codigo_estado = '06'")
+    try:
+        # Misma versión: se sigue sirviendo el resultado en caché
+        assert client.get_state_by_id("06") == [StateRecord("06", "Colima")]
+        version = _bump_version(loaded_pg_dsn)
+        assert client.get_state_by_id("06") == [StateRecord("06", "Colima (nuevo)")]
+        assert client.cache_stats()["version"] == version
+    finally:
+        with psycopg.connect(loaded_pg_dsn, autocommit=True) as conn:
+            conn.execute("UPDATE estados SET nombre_estado = 'Colima' WHERE pk_codigo_estado = '06'")
+        _bump_version(loaded_pg_dsn)
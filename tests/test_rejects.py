@@ -0,0 +1,57 @@
+"""
+Archivo de rechazos: con varios archivos fuente, cada rechazo indica su archivo y su línea en él.
+"""
+
+import pandas as pd
+import pytest
+
+from src import data_reader
+from src.config import FILE_ENCODING, FILE_SEPARATOR
+from src.data_reader import read_sepomex_chunks, read_sepomex_data
+from src.data_validator import REJECTS_COLUMNS, validate_dataframe
+
+# Filas de borde de cada archivo: válidas y rechazadas (nombre vacío, código con letra, código largo)
+FILES = {"primero.txt": [0, 8, 7], "vacio.txt": [], "segundo.txt": [9, 19, 10]}
+EXPECTED = [
+    ("primero.txt", 3, "d_asenta", "VACIO"),
+    ("segundo.txt", 2, "d_codigo", "FORMATO"),
+    ("segundo.txt", 4, "d_codigo", "FORMATO"),
+]
+
+
+@pytest.fixture
+def source_files(edge_frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_reader, "_SOURCES", [])
+    paths = []
+    for name, rows in FILES.items():
+        path = tmp_path / name
+        edge_frame.iloc[rows].to_csv(path, sep=FILE_SEPARATOR, index=False, encoding=FILE_ENCODING)
+        paths.append(path)
+    return paths
+
+
+def _rejects(path) -> list:
+    report = pd.read_csv(path, dtype={"fila": int}, keep_default_na=False)
+    assert list(report.columns) == REJECTS_COLUMNS
+    return list(report.itertuples(index=False, name=None))
+
+
+def test_full_read_locates_rejects_per_file(source_files, tmp_path):
+    rejects_path = tmp_path / "rechazos.csv"
+    df = validate_dataframe(read_sepomex_data(source_files), rejects_path=rejects_path)
+    assert len(df) == 3
+    assert _rejects(rejects_path) == EXPECTED
+
+
+def test_chunked_read_locates_rejects_per_file(source_files, tmp_path):
+    rejects_path = tmp_path / "rechazos.csv"
+    for i, chunk in enumerate(read_sepomex_chunks(2, source_files)):
+        validate_dataframe(chunk, rejects_path=rejects_path, append=i > 0)
+    assert _rejects(rejects_path) == EXPECTED
+
+
+def test_frame_without_read_counts_from_its_index(edge_frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_reader, "_SOURCES", [])
+    rejects_path = tmp_path / "rechazos.csv"
+    validate_dataframe(edge_frame.iloc[8:11], rejects_path=rejects_path)
+    assert [(archivo, fila) for archivo, fila, _, _ in _rejects(rejects_path)] == [("", 10), ("", 11), ("", 12)]
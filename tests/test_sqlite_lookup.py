@@ -0,0 +1,102 @@
+"""
+`SQLiteLookup` sobre las filas de borde: mismas respuestas que `PostalLookup` por cualquiera de los dos planes.
+"""
+
+import pytest
+
+from src.exporters import denormalized_frame
+from src.sqlite_lookup import (
+    _query_segments,
+    _uses_trigram_index,
+    build_sqlite_database,
+    open_sqlite_lookup,
+)
+
+# Búsquedas por nombre: comodines, escapes y tramos cortos con acentos
+NAME_QUERIES = [
+    "centro", "CENTRO", "ángel", "ÁNGEL", "Ñandú", "ñ", "ñ%ndú", "ñá", "án%l", "o_higgins", "o\\_higgins",
+    "ruta/n", "100\\%", "centro\\", "\\\\", "%", "_", "lo", "zzz", "n%r%e",
+]
+
+
+@pytest.fixture(scope="module")
+def sqlite_lookup(edge_tables, tmp_path_factory):
+    path = tmp_path_factory.mktemp("sqlite") / "sepomex.sqlite"
+    assert build_sqlite_database(edge_tables, denormalized_frame(edge_tables), path) == 12
+    lookup = open_sqlite_lookup(path)
+    yield lookup
+    lookup.close()
+
+
+def _traced(sqlite_lookup, call) -> tuple:
+    """Resultado de `call` y las sentencias que ejecutó."""
+    statements = []
+    sqlite_lookup.conn.set_trace_callback(statements.append)
+    try:
+        return call(), statements
+    finally:
+        sqlite_lookup.conn.set_trace_callback(None)
+
+
+def test_matches_postal_lookup(sqlite_lookup, edge_lookup, lookup_calls):
+    assert sqlite_lookup.records == len(edge_lookup)
+    for method, args in lookup_calls:
+        assert getattr(sqlite_lookup, method)(*args) == getattr(edge_lookup, method)(*args), (method, args)
+
+
+@pytest.mark.parametrize("query", NAME_QUERIES)
+@pytest.mark.parametrize("limit, offset", [(100, 0), (1, 0), (1, 1)])
+def test_name_search_matches_postal_lookup(sqlite_lookup, edge_lookup, query, limit, offset):
+    assert sqlite_lookup.search_settlements_by_name(query, limit, offset) == (
+        edge_lookup.search_settlements_by_name(query, limit, offset)
+    )
+
+
+def test_query_segments_and_trigram_eligibility():
+    assert _query_segments("Ñan%dú_X") == ["ñan", "dú", "x"]
+    assert _uses_trigram_index("centro")
+    assert _uses_trigram_index("ñandú")
+    assert _uses_trigram_index("cen%ro")                   # Tramos cortos ASCII: el índice los ignora
+    assert not _uses_trigram_index("ce")
+    assert not _uses_trigram_index("ñ")                     # Un carácter de dos bytes: FTS5 devolvería cero filas
+    assert not _uses_trigram_index("ñá")
+    assert not _uses_trigram_index("ñ%ndú")
+    assert not _uses_trigram_index("%")
+
+
+def test_planner_branches(sqlite_lookup, edge_lookup):
+    # Selectiva para una página grande: índice de trigramas
+    assert sqlite_lookup._prefer_trigram_index("centro", 100)
+    records, statements = _traced(sqlite_lookup, lambda: sqlite_lookup.search_settlements_by_name("centro", 100, 0))
+    assert any("vm_codigos_postales_fts WHERE" in statement for statement in statements)
+    assert records == edge_lookup.search_settlements_by_name("centro", 100, 0)
+
+    # Una página de un registro se completa antes recorriendo los nombres en orden
+    assert not sqlite_lookup._prefer_trigram_index("centro", 1)
+    records, statements = _traced(sqlite_lookup, lambda: sqlite_lookup.search_settlements_by_name("centro", 1, 0))
+    assert not any("vm_codigos_postales_fts WHERE" in statement for statement in statements)
+    assert records == edge_lookup.search_settlements_by_name("centro", 1, 0)
+
+    # Un trigrama ausente: el índice responde que no hay resultados
+    assert sqlite_lookup._prefer_trigram_index("zzz", 1)
+    assert not sqlite_lookup._prefer_trigram_index("ñ", 100)
+
+    # Con `\` se usa LIKE ... ESCAPE, nunca el índice
+    records, statements = _traced(sqlite_lookup, lambda: sqlite_lookup.search_settlements_by_name("o\\_higgins", 100, 0))
+    assert any("ESCAPE" in statement for statement in statements)
+    assert records == []
+
+
+def test_invalid_arguments(sqlite_lookup):
+    with pytest.raises(ValueError, match="El código postal debe ser de 5 dígitos"):
+        sqlite_lookup.search_by_postal_code("01000\n")
+    with pytest.raises(ValueError, match="El código de municipio debe ser de 3 dígitos"):
+        sqlite_lookup.get_postal_codes_by_municipality("09", "10", 10, 0)
+    with pytest.raises(ValueError, match="El límite debe estar entre 1 y 100"):
+        sqlite_lookup.search_settlements_by_name("centro", 0, 0)
+    with pytest.raises(ValueError, match="El offset debe ser mayor o igual a 0"):
+        sqlite_lookup.get_settlements_by_city("09", "01", 10, -1)
+
+
+def test_missing_database(tmp_path):
+    assert open_sqlite_lookup(tmp_path / "no_existe.sqlite") is None
@@ -0,0 +1,83 @@
+"""
+`--workers > 1`: validar y normalizar en los workers produce la misma salida que en serie.
+"""
+
+import pandas as pd
+import pytest
+
+from src import sql_generator
+from src.catalogs import extract_catalogs
+from src.data_normalizer import normalize_dataframe
+from src.data_validator import validate_dataframe
+from src.diagnostics import diagnostics, reset_diagnostics
+from src.utils import memo_cache_stats, reset_memo_caches
+from src.worker_pipeline import WorkerPipeline
+
+COPIES = 30
+CHUNK_SIZE = 100
+
+
+def _raw_frame(edge_frame: pd.DataFrame) -> pd.DataFrame:
+    """Las filas de borde repetidas, con el índice continuo de la lectura."""
+    return pd.concat([edge_frame] * COPIES, ignore_index=True)
+
+
+def _sql_files(output_dir) -> dict:
+    return {path.name: path.read_text(encoding="utf-8") for path in sorted(output_dir.glob("*.sql"))}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_run(monkeypatch):
+    reset_memo_caches()
+    reset_diagnostics()
+    # Varios lotes por bloque de lectura, y bloques que no son múltiplo del lote
+    monkeypatch.setattr(sql_generator, "BATCH_SIZE_CODIGOS_POSTALES", 64)
+    yield
+    reset_memo_caches()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_worker_pipeline_matches_serial(tmp_path, monkeypatch, workers, edge_frame):
+    raw = _raw_frame(edge_frame)
+
+    serial_dir, pipeline_dir = tmp_path / "serie", tmp_path / "workers"
+    serial_dir.mkdir()
+    pipeline_dir.mkdir()
+
+    monkeypatch.setattr(sql_generator, "OUTPUT_DIR", serial_dir)
+    df_norm = normalize_dataframe(validate_dataframe(raw, tmp_path / "rechazos_serie.csv"))
+    serial_counts = sql_generator.generate_codigos_postales_sql(df_norm, 1, 0, 0)
+    serial_catalogs = extract_catalogs(df_norm)
+    serial_diagnostics = diagnostics().to_list()
+
+    reset_memo_caches()
+    reset_diagnostics()
+    monkeypatch.setattr(sql_generator, "OUTPUT_DIR", pipeline_dir)
+    pipeline = WorkerPipeline(validate=True, rejects_path=tmp_path / "rechazos_workers.csv")
+    chunks = (raw.iloc[start:start + CHUNK_SIZE] for start in range(0, len(raw), CHUNK_SIZE))
+    pipeline_counts = sql_generator.generate_codigos_postales_sql(chunks, workers, 0, 0, pipeline=pipeline)
+    pipeline.finish()
+
+    assert pipeline_counts == serial_counts
+    assert _sql_files(pipeline_dir) == _sql_files(serial_dir)
+    assert pipeline.catalogs.result() == serial_catalogs
+    assert diagnostics().to_list() == serial_diagnostics
+    assert (tmp_path / "rechazos_workers.csv").read_text() == (tmp_path / "rechazos_serie.csv").read_text()
+    assert pipeline.rows_in == len(raw) and pipeline.rows_valid == len(df_norm)
+
+
+def test_memo_stats_include_workers(tmp_path, monkeypatch, edge_frame):
+    raw = _raw_frame(edge_frame)
+    monkeypatch.setattr(sql_generator, "OUTPUT_DIR", tmp_path)
+
+    lookups = {}
+    for workers in (1, 3):
+        reset_memo_caches()
+        pipeline = WorkerPipeline(validate=True, rejects_path=None)
+        chunks = (raw.iloc[start:start + CHUNK_SIZE] for start in range(0, len(raw), CHUNK_SIZE))
+        sql_generator.generate_codigos_postales_sql(chunks, workers, 0, 0, pipeline=pipeline)
+        lookups[workers] = {name: hits + misses for name, hits, misses, _ in memo_cache_stats()}
+
+    # Los mismos lotes consultan los mismos valores, en el proceso principal o en los workers
+    assert lookups[3] == lookups[1]
+    assert all(count > 0 for count in lookups[1].values())